@@ -2,9 +2,13 @@
 Aplicación Flask principal para el simulador FTTH
 """
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from concurrent.futures import as_completed
 from flask_cors import CORS
+import itertools
 import json
+import threading
+import time
 
 # Importar db antes de cualquier otra cosa
 from database import db
@@ -22,20 +26,265 @@ app.config['SQLALCHEMY_DATABASE_URI'] = (
 )
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Pool de conexiones por proceso: se comprueban antes de usarlas y se
+# renuevan antes del wait_timeout de MySQL
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+    'pool_pre_ping': True,
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280))
+}
+
+# Topologías con al menos este número de ONUs usan la representación por arrays
+app.config['ARRAY_NETWORK_THRESHOLD'] = int(os.getenv('ARRAY_NETWORK_THRESHOLD', 20000))
+
+# Redes multi-PON con al menos este número de ONUs calculan el power budget
+# por puertos en el pool de procesos (con menos, en el propio proceso)
+app.config['PON_SHARD_MIN_ONUS'] = int(os.getenv('PON_SHARD_MIN_ONUS', 16384))
+
+# Permitir perfilar peticiones con la cabecera X-Profile: 1
+app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', '0') == '1'
+
+# Directorio compartido para que /api/metrics sume las métricas de todos los
+# workers de gunicorn (sin él, cada scrape ve sólo el worker que lo atiende)
+app.config['METRICS_DIR'] = os.getenv('METRICS_DIR')
+app.config['METRICS_WRITE_INTERVAL'] = float(os.getenv('METRICS_WRITE_INTERVAL', 1))
+
+# Número de procesos para ejecutar simulaciones en segundo plano
+app.config['SIMULATION_WORKERS'] = int(os.getenv('SIMULATION_WORKERS', os.cpu_count() or 1))
+
+# Segundos entre lecturas del progreso y entre mensajes keepalive en /events
+app.config['SSE_POLL_INTERVAL'] = float(os.getenv('SSE_POLL_INTERVAL', 0.5))
+app.config['SSE_KEEPALIVE'] = float(os.getenv('SSE_KEEPALIVE', 15))
+
+# Flujos /events abiertos a la vez por proceso: cada uno ocupa un hilo de
+# gunicorn (GUNICORN_THREADS) mientras dura la simulación, así que deben
+# quedar hilos libres para el resto de la API
+app.config['SSE_MAX_CONNECTIONS'] = int(os.getenv('SSE_MAX_CONNECTIONS', 2))
+
+# Plazas de los flujos /events de este proceso
+sse_slots = threading.BoundedSemaphore(app.config['SSE_MAX_CONNECTIONS'])
+
 # Inicializar db con la app
 db.init_app(app)
 
+# Cola de simulaciones asíncronas
+from jobs import job_queue
+job_queue.init_app(app)
+
+# Tiempos por petición y fase, consultas SQL y /api/metrics
+from instrumentation import instrumentation, timed
+instrumentation.init_app(app)
+
 # Importar otros módulos (estos no dependen de db directamente)
 from models.network_elements import OpticalNetwork, OLT, ONU, Splitter, OpticalFiber
-from simulators.traffic_simulator import TrafficSimulator
-from simulators.dba_algorithm import DynamicBandwidthAllocation
+from models.network_arrays import ArrayNetwork
+from models.network_pons import PonNetwork, pon_ports_option
+from simulators.traffic_simulator import SIMULATION_MODES, simulation_time_option
+from simulators.time_series import window_options
+from simulators.progress import progress_interval
+from simulators.gpon_upstream import upstream_options
+from simulators.dba_algorithm import DynamicBandwidthAllocation, DBA_STRATEGIES
+from simulators.parameter_sweep import expand_sweep_grid, sweep_seeds, summarize_sweep_point, MAX_SWEEP_SEED
+from simulators.power_budget_montecarlo import (
+    monte_carlo_parameters, run_power_budget_montecarlo, summarize_montecarlo
+)
+from simulators.topology_optimizer import (
+    optimizer_request, candidate_designs, evaluate_design, select_designs
+)
+from simulators.pon_sharding import (
+    shard_batches, pon_seeds, power_budget_batch, montecarlo_batch, merge_montecarlo, merge_allocations
+)
 
 # Importar modelos de DB - debe estar después de db.init_app()
-from models.db_models import NetworkTopology, NetworkElement, Simulation, PerformanceMetric
+from models.db_models import NetworkTopology, NetworkElement, Simulation, ParameterSweep
+from models.topology_edits import TopologyEdit, MAX_EDIT_OPERATIONS, patch_power_budgets
+from cache import LRUCache, DiskCache, ResultCache, content_hash
+from streaming import RawJSON, iter_json, json_stream_response, ndjson_response, sse_event, sse_response
+
+
+@app.cli.command('init-db')
+def init_db():
+    """
+    Crear las tablas de la base de datos y añadir a las ya existentes las
+    columnas de versiones posteriores (flask --app app init-db)
+    """
+    from migrations import upgrade_database
+    
+    statements, backfilled = upgrade_database(db)
+    print("Tablas creadas")
+    for statement in statements:
+        print(f"Migración: {statement}")
+    if backfilled:
+        print(f"Topologías completadas: {backfilled}")
+
+
+# Redes deserializadas por (topology_id, content_hash), locales a cada proceso
+network_cache = LRUCache(maxsize=int(os.getenv('NETWORK_CACHE_SIZE', 32)))
+
+# Resultados deterministas (redes generadas, power budget) por hash de contenido;
+# con RESULT_CACHE_PATH se guardan también en un fichero SQLite compartido
+result_cache = ResultCache(
+    max_bytes=int(os.getenv('RESULT_CACHE_BYTES', 64 * 1024 * 1024)),
+    disk=DiskCache(
+        os.getenv('RESULT_CACHE_PATH'),
+        max_bytes=int(os.getenv('RESULT_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+    ) if os.getenv('RESULT_CACHE_PATH') else None
+)
+
+# Tamaño máximo de página al listar topologías
+MAX_TOPOLOGY_PAGE = 1000
+
 
-# Crear tablas dentro del contexto de la aplicación
-with app.app_context():
-    db.create_all()
+def network_class(num_onus):
+    """Representación de red según el tamaño: objetos o arrays NumPy"""
+    if num_onus >= app.config['ARRAY_NETWORK_THRESHOLD']:
+        return ArrayNetwork
+    return OpticalNetwork
+
+
+def load_network(topology_id):
+    """
+    Obtener la red de una topología guardada
+    
+    Sólo se consulta content_hash para validar la caché (cambia con cada
+    edición); el JSON de olt_config se lee y deserializa únicamente cuando
+    la topología cambió o no está en la caché. Las topologías grandes se
+    cargan como ArrayNetwork, y las de varios puertos PON como PonNetwork
+    (con la representación de cada puerto según su tamaño). La red devuelta
+    es compartida: sólo la modifica edit_topology, y los cálculos sobre
+    ella deben hacerse con compute_on_network.
+    """
+    network_hash = topology_hash(topology_id)
+    
+    def deserialize():
+        topology = db.session.get(NetworkTopology, topology_id)
+        with timed('olt_config_decode'):
+            data = json.loads(topology.olt_config)
+        with timed('network_rebuild'):
+            if 'olts' in data:
+                return PonNetwork.from_dict(data, network_class)
+            return network_class(len(data.get('onus', []))).from_dict(data)
+    
+    return network_cache.get_or_create((topology_id, network_hash), deserialize)
+
+
+def compute_on_network(topology_id, compute, attempts=3):
+    """
+    Ejecutar compute(network) sobre la red compartida de una topología
+    
+    Si una edición modificó la red mientras se calculaba (version impar o
+    distinta al terminar), el cálculo se repite con la red recargada para
+    no devolver ni guardar en caché resultados de una red a medio editar.
+    """
+    for _ in range(attempts):
+        network = load_network(topology_id)
+        version = getattr(network, 'version', 0)
+        result = compute(network)
+        if version % 2 == 0 and getattr(network, 'version', 0) == version:
+            return result
+    raise RuntimeError(f"Topology {topology_id} changed during the calculation")
+
+
+def generate_network(name, num_onus, split_ratio, topology_type, pon_ports=1):
+    """
+    Red serializada de un diseño (num_onus, split_ratio, topology_type)
+    
+    Con pon_ports > 1 la red es una PonNetwork con las ONUs repartidas entre
+    pon_ports árboles iguales. La generación es determinista, así que la
+    red se guarda en result_cache sin nombre y sólo se genera la primera
+    vez que se pide cada diseño.
+    """
+    def generate():
+        with timed('topology_build'):
+            if pon_ports > 1:
+                network = PonNetwork(name=None, shard_class=network_class)
+                network.create_ftth_topology(
+                    num_onus=num_onus,
+                    split_ratio=split_ratio,
+                    topology_type=topology_type,
+                    pon_ports=pon_ports
+                )
+                return network.to_dict()
+            network = network_class(num_onus)(name=None)
+            network.create_ftth_topology(
+                num_onus=num_onus,
+                split_ratio=split_ratio,
+                topology_type=topology_type
+            )
+            return network.to_dict()
+    
+    design = [num_onus, split_ratio, topology_type]
+    if pon_ports > 1:
+        design.append(pon_ports)
+    key = 'network:' + content_hash(design)
+    return {**result_cache.get_or_create(key, generate), 'name': name}
+
+
+def topology_hash(topology_id):
+    """Hash de la red de una topología; se calcula y guarda si la fila no lo tiene"""
+    row = NetworkTopology.query.with_entities(
+        NetworkTopology.content_hash
+    ).filter_by(id=topology_id).first_or_404()
+    if row.content_hash:
+        return row.content_hash
+    
+    topology = db.session.get(NetworkTopology, topology_id)
+    topology.content_hash = NetworkTopology.network_hash(json.loads(topology.olt_config))
+    db.session.commit()
+    return topology.content_hash
+
+
+def conditional_response(etag, body_factory):
+    """
+    Respuesta JSON con ETag
+    
+    Si el cliente ya tiene la versión (If-None-Match) se responde 304 sin
+    llamar a body_factory(), que devuelve el cuerpo como texto JSON.
+    """
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(body_factory(), mimetype='application/json')
+    response.set_etag(etag)
+    # El navegador revalida siempre con If-None-Match y reutiliza su copia
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def stream_format():
+    """
+    Formato de respuesta por partes pedido en la consulta
+    
+    Returns:
+        'ndjson' con ?format=ndjson, 'json' con ?stream=1, o None para la
+        respuesta JSON normal
+    """
+    if request.args.get('format') == 'ndjson':
+        return 'ndjson'
+    if request.args.get('stream') in ('1', 'true'):
+        return 'json'
+    return None
+
+
+def map_pons(function, items, *args):
+    """
+    Ejecutar function(lote, *args) sobre lotes de puertos PON en el pool de
+    procesos
+    
+    Los puertos se agrupan en tantos lotes como procesos; function devuelve
+    una lista por lote y el resultado es su concatenación en el orden de items.
+    """
+    futures = [
+        job_queue.submit_process(function, batch, *args)
+        for batch in shard_batches(items, job_queue.max_workers)
+    ]
+    return [result for future in futures for result in future.result()]
+
+
+def is_valid_seed(seed):
+    """Las semillas de SeedSequence deben ser enteros no negativos"""
+    return isinstance(seed, int) and not isinstance(seed, bool) and seed >= 0
 
 
 @app.route('/api/health', methods=['GET'])
@@ -46,12 +295,48 @@ def health_check():
 
 @app.route('/api/topologies', methods=['GET'])
 def get_topologies():
-    """Obtener todas las topologías"""
+    """
+    Listar topologías (sólo columnas de resumen, sin olt_config)
+    
+    Parámetros de consulta:
+        topology_type: Filtrar por tipo de topología
+        after_id: Paginación por clave; devolver topologías con id mayor
+        limit: Máximo de topologías por página (1-MAX_TOPOLOGY_PAGE); la
+            respuesta incluye next_after_id si hay más páginas
+    
+    Con ?stream=1 (JSON por partes) o ?format=ndjson (una topología por
+    línea) las filas se envían por lotes. La red completa se obtiene con
+    GET /api/topologies/<id>.
+    """
     try:
-        topologies = NetworkTopology.query.all()
+        topology_type = request.args.get('topology_type')
+        after_id = request.args.get('after_id', type=int)
+        limit = request.args.get('limit', type=int)
+        if limit is not None and not 1 <= limit <= MAX_TOPOLOGY_PAGE:
+            return jsonify({"success": False, "error": f"limit must be between 1 and {MAX_TOPOLOGY_PAGE}"}), 400
+        
+        query = NetworkTopology.summary_query(topology_type=topology_type, after_id=after_id)
+        
+        mode = stream_format()
+        if mode:
+            if limit is not None:
+                query = query.limit(limit)
+            topologies = (NetworkTopology.summary_dict(row) for row in query.yield_per(500))
+            if mode == 'ndjson':
+                return ndjson_response(topologies)
+            return json_stream_response({"success": True, "data": topologies})
+        
+        # Se pide una fila de más para saber si hay otra página
+        rows = query.limit(limit + 1).all() if limit is not None else query.all()
+        next_after_id = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_after_id = rows[-1].id
+        
         return jsonify({
             "success": True,
-            "data": [t.to_dict() for t in topologies]
+            "data": [NetworkTopology.summary_dict(row) for row in rows],
+            "next_after_id": next_after_id
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -59,76 +344,50 @@ def get_topologies():
 
 @app.route('/api/topologies', methods=['POST'])
 def create_topology():
-    """Crear una nueva topología"""
+    """
+    Crear una nueva topología
+    
+    Con pon_ports > 1 se crea una red con varios OLT (uno por puerto PON),
+    cada uno con su propio árbol y las ONUs repartidas entre ellos.
+    """
     try:
         data = request.json
-        network = OpticalNetwork(name=data.get('name', 'New Network'))
-        
-        # Crear topología según parámetros
         num_onus = data.get('num_onus', 32)
-        split_ratio = data.get('split_ratio', '1:32')
-        topology_type = data.get('topology_type', 'star')
-        network.create_ftth_topology(
-            num_onus=num_onus, 
-            split_ratio=split_ratio,
-            topology_type=topology_type
-        )
+        try:
+            pon_ports = pon_ports_option(data.get('pon_ports'))
+            if pon_ports > 1 and (not isinstance(num_onus, int) or num_onus < pon_ports):
+                raise ValueError("num_onus debe ser al menos pon_ports")
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
         
-        # Guardar en base de datos
-        topology = NetworkTopology(
-            name=network.name,
-            description=data.get('description', ''),
-            olt_config=json.dumps(network.to_dict())
+        # Crear topología según parámetros
+        network_dict = generate_network(
+            name=data.get('name', 'New Network'),
+            num_onus=num_onus,
+            split_ratio=data.get('split_ratio', '1:32'),
+            topology_type=data.get('topology_type', 'star'),
+            pon_ports=pon_ports
         )
-        db.session.add(topology)
-        db.session.flush()
         
-        # Guardar elementos
-        if network.olt:
-            element = NetworkElement(
-                topology_id=topology.id,
-                element_type='OLT',
-                element_id=network.olt.id,
-                properties=json.dumps(network.olt.to_dict())
-            )
-            db.session.add(element)
-        
-        for splitter in network.splitters:
-            element = NetworkElement(
-                topology_id=topology.id,
-                element_type='SPLITTER',
-                element_id=splitter.id,
-                properties=json.dumps(splitter.to_dict())
-            )
-            db.session.add(element)
-        
-        for onu in network.onus:
-            element = NetworkElement(
-                topology_id=topology.id,
-                element_type='ONU',
-                element_id=onu.id,
-                properties=json.dumps(onu.to_dict())
-            )
-            db.session.add(element)
-        
-        for fiber in network.fibers:
-            element = NetworkElement(
-                topology_id=topology.id,
-                element_type='FIBER',
-                element_id=fiber.id,
-                properties=json.dumps(fiber.to_dict())
-            )
-            db.session.add(element)
+        # Guardar en base de datos (la red se serializa una sola vez)
+        with timed('db_write'):
+            topology = NetworkTopology.from_network(network_dict, description=data.get('description', ''))
+            db.session.add(topology)
+            db.session.flush()
+            
+            # Guardar elementos con un INSERT masivo por tipo de elemento
+            NetworkElement.bulk_insert(topology.id, network_dict)
+            
+            db.session.commit()
         
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "data": {
-                "id": topology.id,
-                "network": network.to_dict()
-            }
-        })
+        with timed('serialize'):
+            return jsonify({
+                "success": True,
+                "data": {
+                    "id": topology.id,
+                    "network": network_dict
+                }
+            })
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
@@ -136,61 +395,323 @@ def create_topology():
 
 @app.route('/api/topologies/<int:topology_id>', methods=['GET'])
 def get_topology(topology_id):
-    """Obtener una topología específica"""
+    """
+    Obtener una topología específica
+    
+    Con ?stream=1 la red se envía por partes con el mismo formato, y con
+    ?format=ndjson se envía una línea de cabecera {type: 'TOPOLOGY', id, name,
+    topology_type} seguida de un elemento por línea (OLT, splitters, ONUs y
+    fibras). En ambos casos los elementos se leen por lotes de
+    network_elements sin deserializar olt_config.
+    
+    La respuesta JSON normal lleva un ETag derivado del contenido de la red;
+    con If-None-Match se responde 304 sin leer olt_config.
+    """
     try:
-        topology = NetworkTopology.query.get_or_404(topology_id)
-        elements = NetworkElement.query.filter_by(topology_id=topology_id).all()
+        mode = stream_format()
+        if mode:
+            return stream_topology(topology_id, mode)
         
-        # Reconstruir red desde base de datos
-        network_data = json.loads(topology.olt_config)
-        return jsonify({
-            "success": True,
-            "data": {
-                "id": topology.id,
+        network_hash = topology_hash(topology_id)
+        name = NetworkTopology.query.with_entities(NetworkTopology.name).filter_by(id=topology_id).scalar()
+        
+        def body():
+            # olt_config ya es JSON: se incluye tal cual sin deserializarlo
+            olt_config = NetworkTopology.query.with_entities(
+                NetworkTopology.olt_config
+            ).filter_by(id=topology_id).scalar()
+            with timed('serialize'):
+                return ''.join(iter_json({
+                    "success": True,
+                    "data": {
+                        "id": topology_id,
+                        "name": name,
+                        "network": RawJSON(olt_config)
+                    }
+                }))
+        
+        return conditional_response(
+            'topology-' + content_hash([topology_id, name, network_hash]), body
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def stream_topology(topology_id, mode):
+    """Respuesta por partes (JSON o NDJSON) de una topología guardada"""
+    topology = NetworkTopology.query.with_entities(
+        NetworkTopology.id, NetworkTopology.name, NetworkTopology.topology_type
+    ).filter_by(id=topology_id).first_or_404()
+    topology_type = topology.topology_type
+    if topology_type is None:
+        # Topologías guardadas antes de existir la columna
+        olt_config = db.session.get(NetworkTopology, topology_id).olt_config
+        topology_type = json.loads(olt_config).get('topology_type', 'star')
+    
+    def elements(element_type):
+        return NetworkElement.iter_properties(topology_id, element_type)
+    
+    # Las redes multi-PON se envían con la lista de OLT, como en PonNetwork.to_dict()
+    olts = list(elements('OLT')) if mode == 'json' else None
+    
+    if mode == 'ndjson':
+        header = {"type": "TOPOLOGY", "id": topology.id, "name": topology.name, "topology_type": topology_type}
+        return ndjson_response(itertools.chain(
+            [header], *(elements(element_type) for element_type, _ in NetworkElement.NETWORK_KEYS)
+        ))
+    
+    return json_stream_response({
+        "success": True,
+        "data": {
+            "id": topology.id,
+            "name": topology.name,
+            "network": {
                 "name": topology.name,
-                "network": network_data
+                "topology_type": topology_type,
+                **({"pon_ports": len(olts), "olts": olts} if len(olts) > 1 else {"olt": next(iter(olts), None)}),
+                "splitters": elements('SPLITTER'),
+                "onus": elements('ONU'),
+                "fibers": elements('FIBER')
             }
-        })
+        }
+    })
+
+
+@app.route('/api/topologies/<int:topology_id>', methods=['PATCH'])
+def edit_topology(topology_id):
+    """
+    Editar una topología guardada sin regenerarla
+    
+    El cuerpo es {"operations": [...]} con operaciones add_onu, remove_onu,
+    set_fiber_length y set_splitter_ratio (ver TopologyEdit). Sólo se
+    reescriben las filas de network_elements y los sub-árboles de
+    olt_config de los elementos afectados.
+    
+    Si la red está en la caché del proceso se actualiza en su sitio y sólo
+    se recalcula el power budget de las ONUs aguas abajo de los elementos
+    editados; si además estaba guardado el power budget de la versión
+    anterior, se guarda el de la nueva sin recalcular el resto de ONUs.
+    
+    La respuesta incluye las operaciones aplicadas (con los ids generados)
+    y, si la red estaba en memoria, las ONUs afectadas y su power budget.
+    Las topologías con varios puertos PON no admiten ediciones.
+    """
+    try:
+        operations = (request.json or {}).get('operations')
+        if not isinstance(operations, list) or not 1 <= len(operations) <= MAX_EDIT_OPERATIONS:
+            return jsonify({"success": False, "error": f"operations must be a list of 1 to {MAX_EDIT_OPERATIONS} operations"}), 400
+        
+        # Bloquear la fila para serializar las ediciones de una topología
+        topology = NetworkTopology.query.filter_by(id=topology_id).with_for_update().first_or_404()
+        if NetworkElement.query.filter_by(topology_id=topology_id, element_type='OLT').count() > 1:
+            db.session.rollback()
+            return jsonify({"success": False, "error": "multi-PON topologies cannot be edited"}), 400
+        previous_hash = topology.content_hash or NetworkTopology.network_hash(json.loads(topology.olt_config))
+        
+        try:
+            with timed('topology_edit'):
+                edit = TopologyEdit(topology.olt_config)
+                for operation in operations:
+                    edit.apply(operation)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        network_hash = content_hash([previous_hash, edit.operations])
+        counts = {
+            "num_onus": edit.count('ONU'),
+            "num_splitters": edit.count('SPLITTER'),
+            "num_fibers": edit.count('FIBER')
+        }
+        
+        # La red en memoria se retira de la caché mientras se edita; sólo la
+        # representación por objetos admite ediciones, la de arrays se
+        # reconstruye al pedirla
+        network = network_cache.pop((topology_id, previous_hash))
+        if not isinstance(network, OpticalNetwork) or network_class(counts['num_onus']) is not OpticalNetwork:
+            network = None
+        
+        affected = budgets = None
+        if network is not None:
+            with timed('network_edit'):
+                affected = edit.apply_to_network(network)
+            with timed('power_budget'):
+                budgets = {}
+                for onu_id in affected:
+                    power_budget = network.calculate_power_budget_path(
+                        network.onus.get(onu_id), include_fiber_losses=False
+                    )
+                    budgets[onu_id] = {"onu_id": onu_id, **power_budget} if power_budget else None
+        
+        with timed('db_write'):
+            NetworkElement.apply_changes(topology_id, *edit.row_changes())
+            topology.olt_config = edit.document.text
+            topology.num_onus = counts['num_onus']
+            topology.num_splitters = counts['num_splitters']
+            topology.num_fibers = counts['num_fibers']
+            topology.content_hash = network_hash
+            db.session.commit()
+        
+        if network is not None:
+            network_cache.set((topology_id, network_hash), network)
+            previous_budgets = result_cache.get_text('power-budget:' + previous_hash)
+            if previous_budgets is not None:
+                with timed('power_budget'):
+                    patched = patch_power_budgets(
+                        previous_budgets, budgets, edit.removed_onus(), edit.added_onus()
+                    )
+                if patched is not None:
+                    result_cache.set_text('power-budget:' + network_hash, patched)
+        
+        with timed('serialize'):
+            return jsonify({
+                "success": True,
+                "data": {
+                    "id": topology_id,
+                    "operations": edit.operations,
+                    **counts,
+                    "affected_onus": affected,
+                    "power_budgets": [b for b in budgets.values() if b] if budgets is not None else None
+                }
+            })
     except Exception as e:
+        db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route('/api/topologies/<int:topology_id>/power-budget', methods=['GET'])
 def calculate_power_budget(topology_id):
-    """Calcular power budget para todas las ONUs"""
+    """
+    Calcular power budget para todas las ONUs
+    
+    El resultado sólo depende de la definición de la red, así que se guarda
+    en result_cache por hash de contenido (compartido entre topologías
+    iguales) y se responde con ETag. En las redes multi-PON cada ONU lleva
+    el olt_id de su puerto; a partir de PON_SHARD_MIN_ONUS ONUs los puertos
+    se calculan por lotes en el pool de procesos.
+    
+    Cada ONU lleva los totales de su ruta y 'previous' (el elemento desde
+    el que se llega a ella). Con ?onu_id= se devuelve sólo esa ONU con el
+    detalle de su ruta ('fiber_losses' y 'splitters'), que para todas las
+    ONUs crecería con el cuadrado de su número en bus y anillo.
+    """
     try:
-        topology = NetworkTopology.query.get_or_404(topology_id)
-        network_data = json.loads(topology.olt_config)
-        
-        # Reconstruir red (versión simplificada)
-        network = OpticalNetwork(name=network_data['name'])
-        topology_type = network_data.get('topology_type', 'star')
-        network.create_ftth_topology(
-            num_onus=len(network_data.get('onus', [])),
-            split_ratio=network_data.get('splitters', [{}])[0].get('ratio', '1:32') if network_data.get('splitters') else '1:32',
-            topology_type=topology_type
-        )
+        onu_id = request.args.get('onu_id')
+        if onu_id is not None:
+            return onu_power_budget(topology_id, onu_id)
         
-        results = []
-        for onu in network.onus:
-            power_budget = network.calculate_power_budget_path(onu)
-            if power_budget:
-                results.append({
-                    "onu_id": onu.id,
-                    **power_budget
-                })
+        network_hash = topology_hash(topology_id)
         
-        return jsonify({
-            "success": True,
-            "data": results
-        })
+        def body():
+            # Red reconstruida exactamente desde la base de datos; rutas
+            # OLT-ONU calculadas en un solo recorrido de la red
+            def compute():
+                def power_budgets(network):
+                    if isinstance(network, PonNetwork) and network.num_onus >= app.config['PON_SHARD_MIN_ONUS']:
+                        return None, network.pon_dicts()
+                    with timed('power_budget'):
+                        return network.calculate_all_power_budgets(), None
+                
+                results, pon_dicts = compute_on_network(topology_id, power_budgets)
+                if pon_dicts is not None:
+                    with timed('power_budget'):
+                        results = map_pons(power_budget_batch, pon_dicts, app.config['ARRAY_NETWORK_THRESHOLD'])
+                return results
+            
+            results = result_cache.get_or_create_text('power-budget:' + network_hash, compute)
+            with timed('serialize'):
+                return ''.join(iter_json({"success": True, "data": RawJSON(results)}))
+        
+        return conditional_response('power-budget-' + network_hash, body)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def onu_power_budget(topology_id, onu_id):
+    """Power budget de una ONU con el detalle de fibras y splitters de su ruta"""
+    def power_budget(network):
+        pon = network.pon_with_onu(onu_id) if isinstance(network, PonNetwork) else network
+        onu = pon.onus.get(onu_id) if pon is not None else None
+        if onu is None:
+            return None
+        with timed('power_budget'):
+            result = pon.calculate_power_budget_path(onu, include_fiber_losses=True)
+        if result is None:
+            return None
+        if isinstance(network, PonNetwork):
+            return {"onu_id": onu_id, "olt_id": pon.olt.id if pon.olt else None, **result}
+        return {"onu_id": onu_id, **result}
+    
+    result = compute_on_network(topology_id, power_budget)
+    if result is None:
+        return jsonify({"success": False, "error": f"ONU {onu_id} not found or unreachable"}), 404
+    return jsonify({"success": True, "data": result})
+
+
+@app.route('/api/topologies/<int:topology_id>/power-budget/montecarlo', methods=['GET'])
+def power_budget_montecarlo(topology_id):
+    """
+    Análisis Monte Carlo del power budget con tolerancias de los componentes
+    
+    Los parámetros (trials, seed y las tolerancias de MONTE_CARLO_DEFAULTS)
+    se pasan en la consulta. Devuelve por ONU la probabilidad de violar el
+    presupuesto y los percentiles del margen, y la fracción de realizaciones
+    en que cumplen todas. Con la misma semilla el resultado es determinista,
+    así que se guarda en result_cache por hash de la red y parámetros.
+    
+    En las redes multi-PON cada puerto se muestrea en el pool de procesos
+    con una semilla derivada de la de la consulta, y el yield de la red es
+    el producto del de los puertos (no comparten componentes).
+    """
+    try:
+        try:
+            parameters = monte_carlo_parameters(request.args.to_dict())
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        key = content_hash([topology_hash(topology_id), parameters])
+        
+        def body():
+            def compute():
+                empty = {"parameters": parameters, "yield": None, "violating_onus": 0, "onus": []}
+                # Sólo la extracción de las rutas necesita la red compartida
+                def power_paths(network):
+                    if isinstance(network, PonNetwork):
+                        return network.pon_paths()
+                    return network.power_path_arrays()
+                
+                paths = compute_on_network(topology_id, power_paths)
+                if isinstance(paths, list):
+                    # Rutas de cada puerto: un Monte Carlo por puerto en el pool de procesos
+                    with timed('montecarlo'):
+                        results = merge_montecarlo(map_pons(
+                            montecarlo_batch, list(zip(paths, pon_seeds(parameters['seed'], len(paths)))), parameters
+                        ))
+                    return summarize_montecarlo(results, parameters) if results is not None else empty
+                if paths is None:
+                    return empty
+                with timed('montecarlo'):
+                    results = run_power_budget_montecarlo(paths, parameters)
+                return summarize_montecarlo(results, parameters)
+            
+            results = result_cache.get_or_create_text('power-budget-montecarlo:' + key, compute)
+            with timed('serialize'):
+                return ''.join(iter_json({"success": True, "data": RawJSON(results)}))
+        
+        return conditional_response('power-budget-montecarlo-' + key, body)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 @app.route('/api/simulations', methods=['POST'])
 def create_simulation():
-    """Crear y ejecutar una simulación"""
+    """
+    Crear una simulación y encolarla para su ejecución asíncrona
+    
+    Las simulaciones de redes multi-PON se ejecutan con un trabajo por
+    puerto en paralelo; el resultado une los de todos los puertos e incluye
+    el resumen de cada uno en 'pons'.
+    """
     try:
         data = request.json
         topology_id = data.get('topology_id')
@@ -198,52 +719,51 @@ def create_simulation():
         if not topology_id:
             return jsonify({"success": False, "error": "topology_id is required"}), 400
         
-        topology = NetworkTopology.query.get_or_404(topology_id)
-        network_data = json.loads(topology.olt_config)
+        network = load_network(topology_id)
+        parameters = data.get('parameters', {})
+        
+        if parameters.get('mode', 'simpy') not in SIMULATION_MODES:
+            return jsonify({"success": False, "error": f"mode must be one of {', '.join(SIMULATION_MODES)}"}), 400
+        
+        if parameters.get('results_format', 'json') not in Simulation.RESULTS_FORMATS:
+            return jsonify({"success": False, "error": "results_format must be 'json' or 'compact'"}), 400
         
-        # Crear simulación
+        seed = parameters.get('seed')
+        if seed is not None and not is_valid_seed(seed):
+            return jsonify({"success": False, "error": "seed must be a non-negative integer"}), 400
+        
+        try:
+            simulation_time_option(parameters.get('simulation_time', 100))
+            window_options(parameters)
+            progress_interval(parameters)
+            upstream_options(parameters)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        # Crear simulación pendiente
         simulation = Simulation(
             topology_id=topology_id,
             name=data.get('name', 'Simulation'),
-            parameters=json.dumps(data.get('parameters', {})),
-            status='RUNNING'
+            parameters=json.dumps(parameters),
+            status='PENDING'
         )
         db.session.add(simulation)
-        db.session.flush()
-        
-        # Ejecutar simulación
-        simulator = TrafficSimulator(
-            num_onus=len(network_data.get('onus', [])),
-            simulation_time=data.get('parameters', {}).get('simulation_time', 100)
-        )
-        
-        results = simulator.run()
-        
-        # Guardar resultados
-        simulation.results = json.dumps(results)
-        simulation.status = 'COMPLETED'
-        
-        # Guardar métricas
-        for metric in results.get('metrics', []):
-            perf_metric = PerformanceMetric(
-                simulation_id=simulation.id,
-                onu_id=metric.get('onu_id'),
-                metric_type=metric.get('type'),
-                metric_value=metric.get('value'),
-                timestamp=metric.get('timestamp', 0)
-            )
-            db.session.add(perf_metric)
-        
         db.session.commit()
         
+        # Encolar ejecución en el pool de procesos
+        if isinstance(network, PonNetwork):
+            job_queue.submit_sharded(simulation.id, network.pon_onu_ids(), parameters)
+        else:
+            job_queue.submit(simulation.id, len(network.onus), parameters)
+        
         return jsonify({
             "success": True,
             "data": {
                 "id": simulation.id,
                 "name": simulation.name,
-                "results": results
+                "status": simulation.status
             }
-        })
+        }), 202
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "error": str(e)}), 500
@@ -251,20 +771,302 @@ def create_simulation():
 
 @app.route('/api/simulations/<int:simulation_id>', methods=['GET'])
 def get_simulation(simulation_id):
-    """Obtener resultados de una simulación"""
+    """
+    Obtener resultados de una simulación
+    
+    Las métricas se devuelven una sola vez, en results.metrics. Con
+    ?format=columnar se devuelven como columnas {onu_id: [...], type: [...],
+    value: [...], timestamp: [...]} en results.columns.
+    
+    Con ?stream=1 la respuesta tiene el mismo formato pero se envía por
+    partes. Con ?format=ndjson se envía una línea de cabecera
+    {type: 'SIMULATION', ...} con los resultados agregados y después una
+    métrica por línea.
+    """
     try:
+        mode = stream_format()
+        if mode:
+            return stream_simulation(simulation_id, mode)
+        
         simulation = Simulation.query.get_or_404(simulation_id)
-        metrics = PerformanceMetric.query.filter_by(simulation_id=simulation_id).all()
+        columnar = request.args.get('format') == 'columnar'
         
-        return jsonify({
-            "success": True,
-            "data": {
+        with timed('results_decode'):
+            results = simulation.load_results(columnar=columnar)
+        data = {
+            "id": simulation.id,
+            "name": simulation.name,
+            "status": simulation.status,
+            "completed_at": simulation.completed_at.isoformat() if simulation.completed_at else None,
+            "parameters": json.loads(simulation.parameters),
+            "results": results
+        }
+        
+        with timed('serialize'):
+            return jsonify({
+                "success": True,
+                "data": data
+            })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/simulations/<int:simulation_id>/events', methods=['GET'])
+def simulation_events(simulation_id):
+    """
+    Progreso de una simulación como Server-Sent Events
+    
+    Envía un evento 'status' con el estado inicial y cada vez que cambia, y
+    un evento 'progress' (con el informe de SimulationProgress como datos y
+    su número como id) cada vez que el trabajo guarda un informe nuevo. El
+    flujo termina con el evento 'status' COMPLETED o FAILED; el resultado
+    completo se obtiene después con GET /api/simulations/<id>.
+    
+    Cada proceso admite SSE_MAX_CONNECTIONS flujos a la vez; con todos
+    ocupados responde 503 y el cliente debe consultar GET
+    /api/simulations/<id> periódicamente.
+    """
+    try:
+        Simulation.query.get_or_404(simulation_id)
+        poll_interval = app.config['SSE_POLL_INTERVAL']
+        keepalive = app.config['SSE_KEEPALIVE']
+        
+        def events():
+            status = progress = None
+            idle = 0.0
+            while True:
+                current_status, current_progress = db.session.query(
+                    Simulation.status, Simulation.progress
+                ).filter(Simulation.id == simulation_id).one()
+                # Terminar la transacción para ver lo que escriba el trabajo
+                db.session.commit()
+                
+                if current_progress is not None and current_progress != progress:
+                    progress = current_progress
+                    yield sse_event('progress', RawJSON(progress), json.loads(progress)['update'])
+                    idle = 0.0
+                if current_status != status:
+                    status = current_status
+                    yield sse_event('status', {'id': simulation_id, 'status': status})
+                    idle = 0.0
+                if status in ('COMPLETED', 'FAILED'):
+                    return
+                
+                if idle >= keepalive:
+                    yield ': keepalive\n\n'
+                    idle = 0.0
+                time.sleep(poll_interval)
+                idle += poll_interval
+        
+        return sse_response(events(), sse_slots)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def stream_simulation(simulation_id, mode):
+    """Respuesta por partes (JSON o NDJSON) de una simulación"""
+    simulation = Simulation.query.get_or_404(simulation_id)
+    data = {
+        "id": simulation.id,
+        "name": simulation.name,
+        "status": simulation.status,
+        "completed_at": simulation.completed_at.isoformat() if simulation.completed_at else None,
+        "parameters": json.loads(simulation.parameters)
+    }
+    
+    if mode == 'ndjson':
+        results = json.loads(simulation.results) if simulation.results else None
+        if results is not None:
+            results = summarize_sweep_point(results)
+        header = {"type": "SIMULATION", **data, "results": results}
+        return ndjson_response(itertools.chain(
+            [header], ({"type": "METRIC", **metric} for metric in Simulation.iter_metrics(simulation_id))
+        ))
+    
+    # Los resultados sin blob compacto se emiten tal como están guardados
+    compact = db.session.query(Simulation.results_blob.isnot(None)).filter(
+        Simulation.id == simulation_id
+    ).scalar()
+    if simulation.results and not compact:
+        data["results"] = RawJSON(simulation.results)
+    else:
+        data["results"] = simulation.load_results()
+    return json_stream_response({"success": True, "data": data})
+
+
+@app.route('/api/sweeps', methods=['POST'])
+def create_sweep():
+    """
+    Crear un barrido de parámetros y ejecutarlo en el pool de procesos
+    
+    El cuerpo incluye una rejilla {num_onus, split_ratio, topology_type,
+    simulation_time} con un valor o una lista de valores por parámetro, los
+    parámetros comunes de simulación y una semilla base opcional. Cada punto
+    se guarda como una Simulation enlazada al barrido con su propia semilla.
+    
+    La respuesta es NDJSON: una primera línea con el id del barrido y los
+    puntos, y después una línea por punto a medida que terminan.
+    """
+    try:
+        data = request.json
+        parameters = data.get('parameters', {})
+        
+        if parameters.get('mode', 'simpy') not in SIMULATION_MODES:
+            return jsonify({"success": False, "error": f"mode must be one of {', '.join(SIMULATION_MODES)}"}), 400
+        
+        if parameters.get('results_format', 'json') not in Simulation.RESULTS_FORMATS:
+            return jsonify({"success": False, "error": "results_format must be 'json' or 'compact'"}), 400
+        
+        try:
+            points = expand_sweep_grid(data.get('grid', {}))
+            window_options(parameters)
+            upstream_options(parameters)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        base_seed = data.get('seed', 0)
+        if not is_valid_seed(base_seed) or base_seed > MAX_SWEEP_SEED:
+            return jsonify({"success": False, "error": f"seed must be an integer between 0 and {MAX_SWEEP_SEED}"}), 400
+        seeds = sweep_seeds(base_seed, len(points))
+        
+        sweep = ParameterSweep(
+            name=data.get('name', 'Sweep'),
+            grid=json.dumps(data.get('grid', {})),
+            seed=base_seed
+        )
+        db.session.add(sweep)
+        db.session.flush()
+        
+        # Una topología guardada por diseño distinto del barrido
+        topology_ids = {}
+        for point in points:
+            design = (point['num_onus'], point['split_ratio'], point['topology_type'])
+            if design in topology_ids:
+                continue
+            network_dict = generate_network(
+                name=f"{sweep.name} {design[2]} {design[1]} x{design[0]}",
+                num_onus=design[0],
+                split_ratio=design[1],
+                topology_type=design[2]
+            )
+            topology = NetworkTopology.from_network(network_dict, description=f"Parameter sweep {sweep.id}")
+            db.session.add(topology)
+            db.session.flush()
+            NetworkElement.bulk_insert(topology.id, network_dict)
+            topology_ids[design] = topology.id
+        
+        simulations = []
+        for point, seed in zip(points, seeds):
+            design = (point['num_onus'], point['split_ratio'], point['topology_type'])
+            simulation = Simulation(
+                topology_id=topology_ids[design],
+                sweep_id=sweep.id,
+                name=f"{sweep.name} #{len(simulations) + 1}",
+                parameters=json.dumps({**parameters, **point, 'seed': seed}),
+                status='PENDING'
+            )
+            db.session.add(simulation)
+            simulations.append(simulation)
+        db.session.commit()
+        
+        # Encolar todos los puntos antes de empezar a responder
+        sweep_id = sweep.id
+        futures = {}
+        for simulation, point, seed in zip(simulations, points, seeds):
+            future = job_queue.submit_sweep_point(simulation.id, point, parameters, seed)
+            futures[future] = (simulation.id, point, seed)
+        
+        def generate():
+            yield json.dumps({"sweep_id": sweep_id, "points": len(points)}) + "\n"
+            for future in as_completed(futures):
+                simulation_id, point, seed = futures[future]
+                line = {"simulation_id": simulation_id, "point": point, "seed": seed}
+                try:
+                    line["status"] = "COMPLETED"
+                    line["summary"] = summarize_sweep_point(future.result())
+                except Exception as e:
+                    line["status"] = "FAILED"
+                    line["error"] = str(e)
+                yield json.dumps(line) + "\n"
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/sweeps/<int:sweep_id>', methods=['GET'])
+def get_sweep(sweep_id):
+    """Obtener un barrido con el resumen de cada una de sus simulaciones"""
+    try:
+        sweep = ParameterSweep.query.get_or_404(sweep_id)
+        simulations = Simulation.query.filter_by(sweep_id=sweep_id).order_by(Simulation.id).all()
+        
+        data = sweep.to_dict()
+        data["grid"] = json.loads(sweep.grid)
+        data["simulations"] = [
+            {
                 "id": simulation.id,
-                "name": simulation.name,
                 "status": simulation.status,
                 "parameters": json.loads(simulation.parameters),
-                "results": json.loads(simulation.results) if simulation.results else None,
-                "metrics": [m.to_dict() for m in metrics]
+                "summary": summarize_sweep_point(json.loads(simulation.results)) if simulation.results else None
+            }
+            for simulation in simulations
+        ]
+        
+        return jsonify({
+            "success": True,
+            "data": data
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/optimizer', methods=['POST'])
+def optimize_topology():
+    """
+    Buscar los diseños de topología Pareto-óptimos para un número de ONUs
+    
+    El cuerpo incluye num_onus y, opcionalmente, los tipos de topología y
+    ratios candidatos, las restricciones y los pesos de coste (ver
+    simulators/topology_optimizer.py). Cada diseño (num_onus, tipo, ratio)
+    se evalúa en el pool de procesos y su evaluación se guarda en
+    result_cache, así que sólo se calculan los diseños no evaluados antes;
+    las restricciones y los pesos se aplican después sobre las evaluaciones.
+    """
+    try:
+        try:
+            options = optimizer_request(request.json or {})
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        
+        designs = candidate_designs(options['topology_types'], options['split_ratios'])
+        evaluations = {}
+        pending = {}
+        for design in designs:
+            key = 'design:' + content_hash([options['num_onus'], *design])
+            text = result_cache.get_text(key)
+            if text is not None:
+                evaluations[design] = json.loads(text)
+            else:
+                future = job_queue.submit_process(evaluate_design, options['num_onus'], *design)
+                pending[future] = (design, key)
+        cached = len(evaluations)
+        
+        with timed('design_evaluation'):
+            for future in as_completed(pending):
+                design, key = pending[future]
+                evaluations[design] = future.result()
+                result_cache.set_text(key, json.dumps(evaluations[design]))
+        
+        selection = select_designs([evaluations[design] for design in designs], options)
+        return jsonify({
+            "success": True,
+            "data": {
+                **options,
+                "evaluated": len(pending),
+                "cached": cached,
+                **selection
             }
         })
     except Exception as e:
@@ -273,14 +1075,51 @@ def get_simulation(simulation_id):
 
 @app.route('/api/dba/allocate', methods=['POST'])
 def allocate_bandwidth():
-    """Calcular asignación de ancho de banda con DBA"""
+    """
+    Calcular asignación de ancho de banda con DBA
+    
+    Con topology_id de una red multi-PON las solicitudes se agrupan por el
+    puerto de cada ONU y cada puerto reparte su propia total_capacity; la
+    respuesta incluye el resumen de cada puerto en 'pons'.
+    """
     try:
         data = request.json
         requests = data.get('onu_requests', {})
         total_capacity = data.get('total_capacity', 2500)
         
+        strategy = data.get('strategy', 'ipact')
+        
+        if strategy not in DBA_STRATEGIES:
+            return jsonify({"success": False, "error": f"strategy must be one of {', '.join(DBA_STRATEGIES)}"}), 400
+        
+        groups = {None: requests}
+        topology_id = data.get('topology_id')
+        if topology_id is not None:
+            network = load_network(topology_id)
+            if isinstance(network, PonNetwork):
+                pon_of = network.pon_of()
+                unknown = [onu_id for onu_id in requests if onu_id not in pon_of]
+                if unknown:
+                    return jsonify({"success": False, "error": f"ONUs not in topology {topology_id}: {', '.join(unknown[:10])}"}), 400
+                groups = {}
+                for onu_id, requested in requests.items():
+                    groups.setdefault(pon_of[onu_id], {})[onu_id] = requested
+        
         dba = DynamicBandwidthAllocation()
-        allocation = dba.allocate_bandwidth(requests, total_capacity)
+        try:
+            allocations = {
+                pon: dba.allocate(
+                    group,
+                    total_capacity,
+                    strategy=strategy,
+                    weights=data.get('weights'),
+                    service_classes=data.get('service_classes')
+                )
+                for pon, group in groups.items()
+            }
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        allocation = allocations[None] if None in groups else merge_allocations(allocations, total_capacity)
         
         return jsonify({
             "success": True,
@@ -291,5 +1130,11 @@ def allocate_bandwidth():
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Servidor de desarrollo; en producción se usa gunicorn (gunicorn.conf.py)
+    from migrations import upgrade_database
+    
+    with app.app_context():
+        upgrade_database(db)
+    job_queue.fail_interrupted()
+    app.run(host='0.0.0.0', port=5000, debug=os.getenv('FLASK_DEBUG', '1') == '1')
 
@@ -0,0 +1,9 @@
+"""
+Benchmarks de rendimiento del simulador
+
+Uso (desde backend/):
+    python -m benchmarks                         # perfil rápido
+    python -m benchmarks --profile full          # hasta 100k ONUs
+    python -m benchmarks --save-baseline         # guardar línea base
+    python -m benchmarks --compare               # fallar si hay regresiones
+"""
@@ -0,0 +1,74 @@
+"""
+Línea de comandos de los benchmarks (python -m benchmarks)
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.suite import PROFILES, benchmarks
+from benchmarks.runner import run_benchmarks, compare_results, load_results, save_results
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick',
+                        help="Conjunto de parámetros a medir (por defecto 'quick')")
+    parser.add_argument('--filter', dest='pattern',
+                        help="Ejecutar sólo los casos cuyo nombre contiene este texto")
+    parser.add_argument('--repeat', type=int, default=5, help="Ejecuciones por caso")
+    parser.add_argument('--max-time', type=float, default=10.0,
+                        help="Segundos máximos por caso antes de dejar de repetir")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="Fichero JSON de resultados")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Fichero JSON de línea base")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Guardar también los resultados como línea base")
+    parser.add_argument('--compare', action='store_true',
+                        help="Comparar con la línea base y salir con código 1 si hay regresiones")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Factor de la mediana a partir del cual un caso es una regresión")
+    parser.add_argument('--min-delta', type=float, default=0.0005,
+                        help="Diferencia mínima en segundos para marcar una regresión")
+    args = parser.parse_args(argv)
+    
+    results = run_benchmarks(
+        benchmarks(args.profile),
+        pattern=args.pattern,
+        repeat=args.repeat,
+        min_repeat=min(3, args.repeat),
+        max_time=args.max_time
+    )
+    results['profile'] = args.profile
+    save_results(results, args.output)
+    print(f"\nResultados guardados en {args.output}")
+    
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Línea base guardada en {args.baseline}")
+    
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"No existe la línea base {args.baseline}")
+            return 2
+        comparison = compare_results(
+            results, load_results(args.baseline), threshold=args.threshold, min_delta=args.min_delta
+        )
+        print(f"\nComparación con {args.baseline} (umbral x{args.threshold}):")
+        for case in comparison:
+            mark = 'REGRESIÓN' if case['regression'] else 'ok'
+            print(f"  {case['name']:<45} x{case['ratio']:.2f}  {mark}")
+        regressions = [case for case in comparison if case['regression']]
+        if regressions:
+            print(f"\n{len(regressions)} regresiones de rendimiento")
+            return 1
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Ejecución de benchmarks, resultados en JSON y comparación con una línea base
+"""
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+def time_case(run, repeat=5, min_repeat=3, max_time=10.0):
+    """
+    Cronometrar una función varias veces
+    
+    Se hacen `repeat` ejecuciones, o menos (pero al menos `min_repeat`) si
+    las ejecuciones superan `max_time` segundos en total.
+    
+    Returns:
+        Diccionario {min, median, mean, stdev, repeats} en segundos
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat:
+        gc.collect()
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= min_repeat and time.perf_counter() - started > max_time:
+            break
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'repeats': len(times)
+    }
+
+
+def machine_info():
+    """Datos del entorno para interpretar los resultados"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run_benchmarks(benchmarks, pattern=None, repeat=5, min_repeat=3, max_time=10.0, log=print):
+    """
+    Ejecutar todos los casos de una lista de benchmarks
+    
+    Args:
+        benchmarks: Lista de Benchmark (ver suite.py)
+        pattern: Sólo ejecutar los casos cuyo nombre contiene este texto
+    
+    Returns:
+        Documento de resultados {created_at, machine, results: {caso: tiempos}}
+    """
+    results = {}
+    for benchmark in benchmarks:
+        for name, params in benchmark.cases():
+            if pattern and pattern not in name:
+                continue
+            run = benchmark.setup(**params)
+            results[name] = {'params': params, **time_case(run, repeat, min_repeat, max_time)}
+            log(f"{name:<45} {results[name]['median'] * 1000:12.3f} ms  (x{results[name]['repeats']})")
+            del run
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'machine': machine_info(),
+        'results': results
+    }
+
+
+def compare_results(current, baseline, threshold=1.2, min_delta=0.0005):
+    """
+    Comparar resultados con una línea base por la mediana de cada caso
+    
+    Un caso es una regresión si su mediana supera la de la línea base en un
+    factor mayor que `threshold` y en más de `min_delta` segundos (para no
+    marcar el ruido de los casos de microsegundos).
+    
+    Returns:
+        Lista de {name, baseline, current, ratio, regression} de los casos
+        presentes en ambos documentos
+    """
+    comparison = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        ratio = result['median'] / reference['median'] if reference['median'] > 0 else float('inf')
+        comparison.append({
+            'name': name,
+            'baseline': reference['median'],
+            'current': result['median'],
+            'ratio': ratio,
+            'regression': ratio > threshold and result['median'] - reference['median'] > min_delta
+        })
+    return comparison
+
+
+def load_results(path):
+    """Leer un documento de resultados JSON"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    """Guardar un documento de resultados JSON"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
@@ -0,0 +1,167 @@
+"""
+Definición de los benchmarks de las rutas críticas del simulador
+"""
+import itertools
+import os
+
+import numpy as np
+
+from models.network_elements import OpticalNetwork
+from models.network_arrays import ArrayNetwork
+from simulators.dba_algorithm import DynamicBandwidthAllocation
+from simulators.traffic_simulator import TrafficSimulator
+
+
+TOPOLOGY_TYPES = ('star', 'bus', 'ring', 'tree')
+SIMULATION_MODES = ('simpy', 'vectorized', 'gpon')
+DBA_STRATEGIES = ('ipact', 'fair')
+
+# Parámetros de cada perfil: 'quick' para comprobaciones rápidas (CI) y
+# 'full' para medir hasta 100k ONUs
+PROFILES = {
+    'quick': {
+        'onu_counts': (32, 1000),
+        'insert_onus': (32, 1000),
+        'simulation_onus': (32,),
+        'simulation_times': (1,)
+    },
+    'full': {
+        'onu_counts': (32, 1000, 10000, 100000),
+        'insert_onus': (1000, 10000),
+        'simulation_onus': (32, 256),
+        'simulation_times': (1, 10)
+    }
+}
+
+# Formas de guardar los elementos de una red (NetworkElement)
+INSERT_METHODS = ('bulk', 'each')
+
+# Mismo umbral que la API para elegir la representación de la red
+ARRAY_NETWORK_THRESHOLD = int(os.getenv('ARRAY_NETWORK_THRESHOLD', 20000))
+
+
+def network_class(num_onus):
+    """Representación de red según el tamaño, igual que en app.py"""
+    return ArrayNetwork if num_onus >= ARRAY_NETWORK_THRESHOLD else OpticalNetwork
+
+
+def split_ratio_for(topology_type, num_onus):
+    """Ratio de splitter con el que cada topología alcanza num_onus ONUs"""
+    if topology_type == 'star':
+        return f"1:{num_onus}"
+    if topology_type == 'tree':
+        return "1:512"
+    return "1:32"
+
+
+def build_network(topology_type, num_onus):
+    """Generar una red de benchmark"""
+    network = network_class(num_onus)(name=f"Benchmark {topology_type} {num_onus}")
+    network.create_ftth_topology(
+        num_onus=num_onus,
+        split_ratio=split_ratio_for(topology_type, num_onus),
+        topology_type=topology_type
+    )
+    return network
+
+
+class Benchmark:
+    """
+    Benchmark parametrizado
+    
+    setup(**params) prepara los datos fuera de la medición y devuelve la
+    función sin argumentos que se cronometra.
+    """
+    
+    def __init__(self, name, setup, **params):
+        self.name = name
+        self.setup = setup
+        self.params = params
+    
+    def cases(self):
+        """Combinaciones de parámetros como (nombre del caso, parámetros)"""
+        keys = list(self.params)
+        for values in itertools.product(*(self.params[key] for key in keys)):
+            label = '-'.join(str(value) for value in values)
+            yield f"{self.name}[{label}]", dict(zip(keys, values))
+
+
+def setup_topology_build(topology_type, num_onus):
+    def run():
+        build_network(topology_type, num_onus)
+    return run
+
+
+def setup_power_budget(topology_type, num_onus):
+    network = build_network(topology_type, num_onus)
+    
+    def run():
+        # Medir el cálculo completo de rutas, no la caché de la red; sin el
+        # detalle de fibras de cada ruta, como la API
+        network.invalidate()
+        network.calculate_all_power_budgets(include_fiber_losses=False)
+    return run
+
+
+def setup_element_insert(method, num_onus):
+    """
+    Guardar los elementos de una red en SQLite en memoria, con un INSERT
+    masivo por tipo (bulk_insert) o con un objeto ORM por elemento
+    (insert_each); cada ejecución se deshace al terminar
+    """
+    from flask import Flask
+    from database import db
+    from models.db_models import NetworkTopology, NetworkElement
+    
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    network_dict = build_network('tree', num_onus).to_dict()
+    with app.app_context():
+        db.create_all()
+        topology = NetworkTopology.from_network(network_dict)
+        db.session.add(topology)
+        db.session.commit()
+        topology_id = topology.id
+    insert = NetworkElement.bulk_insert if method == 'bulk' else NetworkElement.insert_each
+    
+    def run():
+        with app.app_context():
+            insert(topology_id, network_dict)
+            db.session.flush()
+            db.session.rollback()
+    return run
+
+
+def setup_dba_allocate(strategy, num_onus):
+    dba = DynamicBandwidthAllocation(total_capacity=2500)
+    rng = np.random.default_rng(0)
+    requests = {f"ONU-{i+1}": float(r) for i, r in enumerate(rng.uniform(1, 200, num_onus))}
+    
+    def run():
+        dba.allocate(requests, strategy=strategy)
+    return run
+
+
+def setup_simulation(mode, num_onus, simulation_time):
+    def run():
+        TrafficSimulator(num_onus=num_onus, simulation_time=simulation_time, seed=0).run(mode=mode)
+    return run
+
+
+def benchmarks(profile='quick'):
+    """Lista de benchmarks del perfil indicado"""
+    config = PROFILES[profile]
+    return [
+        Benchmark('topology_build', setup_topology_build,
+                  topology_type=TOPOLOGY_TYPES, num_onus=config['onu_counts']),
+        Benchmark('power_budget', setup_power_budget,
+                  topology_type=TOPOLOGY_TYPES, num_onus=config['onu_counts']),
+        Benchmark('element_insert', setup_element_insert,
+                  method=INSERT_METHODS, num_onus=config['insert_onus']),
+        Benchmark('dba_allocate', setup_dba_allocate,
+                  strategy=DBA_STRATEGIES, num_onus=config['onu_counts']),
+        Benchmark('simulation', setup_simulation,
+                  mode=SIMULATION_MODES, num_onus=config['simulation_onus'],
+                  simulation_time=config['simulation_times'])
+    ]
@@ -0,0 +1,208 @@
+"""
+Cachés en memoria del proceso y en disco
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def content_hash(value):
+    """Hash SHA-256 del contenido JSON canónico de un valor"""
+    text = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """
+    Caché LRU con tamaño máximo, segura entre hilos
+    
+    Args:
+        maxsize: Número máximo de entradas (None para no limitarlo)
+        max_bytes: Tamaño total máximo, medido con sizeof(valor) (opcional)
+        sizeof: Función de tamaño de cada valor cuando se usa max_bytes
+    """
+    
+    def __init__(self, maxsize=32, max_bytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, default=None):
+        """Obtener un valor y marcarlo como usado recientemente"""
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+    
+    def set(self, key, value):
+        """Guardar un valor, descartando el menos usado si se supera maxsize"""
+        with self._lock:
+            if self.max_bytes is not None:
+                if key in self._data:
+                    self._bytes -= self.sizeof(self._data[key])
+                self._bytes += self.sizeof(value)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while (self.maxsize is not None and len(self._data) > self.maxsize) or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._data) > 1
+            ):
+                _, evicted = self._data.popitem(last=False)
+                if self.max_bytes is not None:
+                    self._bytes -= self.sizeof(evicted)
+    
+    def pop(self, key, default=None):
+        """Quitar un valor de la caché y devolverlo"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            value = self._data.pop(key)
+            if self.max_bytes is not None:
+                self._bytes -= self.sizeof(value)
+            return value
+    
+    def get_or_create(self, key, factory):
+        """Obtener un valor o crearlo con factory() si no está en la caché"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+    
+    def clear(self):
+        """Vaciar la caché"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
+
+
+class DiskCache:
+    """
+    Caché de texto en un fichero SQLite, compartida entre procesos
+    
+    Cada entrada guarda la fecha de último acceso; al superar max_bytes se
+    eliminan las entradas usadas hace más tiempo.
+    """
+    
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'size INTEGER NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON cache (accessed)')
+    
+    @contextmanager
+    def _connect(self):
+        """Conexión de corta duración; confirma la transacción al salir"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def get(self, key, default=None):
+        """Obtener un valor y actualizar su fecha de acceso"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return default
+            conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+    
+    def set(self, key, value):
+        """Guardar un valor de texto, descartando los menos usados si se supera max_bytes"""
+        size = len(value)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, value, size, time.time())
+            )
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                rows = conn.execute('SELECT key, size FROM cache WHERE key != ? ORDER BY accessed', (key,))
+                evicted = []
+                for old_key, old_size in rows:
+                    if excess <= 0:
+                        break
+                    evicted.append((old_key,))
+                    excess -= old_size
+                conn.executemany('DELETE FROM cache WHERE key = ?', evicted)
+    
+    def clear(self):
+        """Vaciar la caché"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache')
+
+
+class ResultCache:
+    """
+    Caché de resultados direccionada por contenido
+    
+    Los valores se guardan como texto JSON en un LRU en memoria limitado por
+    tamaño y, opcionalmente, en una DiskCache que sobrevive a reinicios y se
+    comparte entre procesos.
+    """
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk=None):
+        self.memory = LRUCache(maxsize=None, max_bytes=max_bytes)
+        self.disk = disk
+    
+    def get_text(self, key):
+        """Obtener el texto JSON guardado, o None"""
+        text = self.memory.get(key)
+        if text is None and self.disk is not None:
+            text = self.disk.get(key)
+            if text is not None:
+                self.memory.set(key, text)
+        return text
+    
+    def set_text(self, key, text):
+        """Guardar texto JSON en ambos niveles"""
+        self.memory.set(key, text)
+        if self.disk is not None:
+            self.disk.set(key, text)
+    
+    def get_or_create_text(self, key, factory):
+        """Obtener el texto JSON de key o calcular factory() y guardarlo"""
+        text = self.get_text(key)
+        if text is None:
+            text = json.dumps(factory())
+            self.set_text(key, text)
+        return text
+    
+    def get_or_create(self, key, factory):
+        """Como get_or_create_text, devolviendo el valor decodificado"""
+        return json.loads(self.get_or_create_text(key, factory))
+    
+    def clear(self):
+        """Vaciar ambos niveles"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
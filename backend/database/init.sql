@@ -2,14 +2,24 @@ CREATE DATABASE IF NOT EXISTS ftth_db;
 
 USE ftth_db;
 
+-- Este script sólo se ejecuta con el volumen de MySQL vacío. Las columnas e
+-- índices añadidos después del esquema original se aplican a una base de
+-- datos existente con `flask --app app init-db` (ver backend/migrations.py)
+
 -- Tabla para guardar topologías de red
 CREATE TABLE IF NOT EXISTS network_topologies (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     description TEXT,
+    topology_type VARCHAR(20),
+    num_onus INT,
+    num_splitters INT,
+    num_fibers INT,
+    content_hash CHAR(64),
     olt_config JSON,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_topology_type (topology_type)
 );
 
 -- Tabla para guardar elementos de red
@@ -23,21 +33,36 @@ CREATE TABLE IF NOT EXISTS network_elements (
     position_y FLOAT,
     FOREIGN KEY (topology_id) REFERENCES network_topologies(id) ON DELETE CASCADE,
     INDEX idx_topology (topology_id),
-    INDEX idx_element_type (element_type)
+    INDEX idx_element_type (element_type),
+    INDEX idx_topology_element (topology_id, element_id)
+);
+
+-- Tabla para guardar barridos de parámetros
+CREATE TABLE IF NOT EXISTS parameter_sweeps (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    grid JSON,
+    seed BIGINT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Tabla para guardar simulaciones
 CREATE TABLE IF NOT EXISTS simulations (
     id INT AUTO_INCREMENT PRIMARY KEY,
     topology_id INT NOT NULL,
+    sweep_id INT NULL,
     name VARCHAR(255) NOT NULL,
     parameters JSON,
     results JSON,
+    results_blob LONGBLOB,
+    progress JSON,
     status ENUM('PENDING', 'RUNNING', 'COMPLETED', 'FAILED') DEFAULT 'PENDING',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     completed_at TIMESTAMP NULL,
     FOREIGN KEY (topology_id) REFERENCES network_topologies(id) ON DELETE CASCADE,
+    FOREIGN KEY (sweep_id) REFERENCES parameter_sweeps(id) ON DELETE SET NULL,
     INDEX idx_topology (topology_id),
+    INDEX idx_sweep (sweep_id),
     INDEX idx_status (status)
 );
 
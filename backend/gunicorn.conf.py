@@ -0,0 +1,65 @@
+"""
+Configuración de gunicorn para servir la API en producción
+
+Uso:
+    flask --app app init-db
+    gunicorn -c gunicorn.conf.py app:app
+"""
+import os
+import multiprocessing
+import tempfile
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Un proceso por núcleo (más uno) para repartir las peticiones limitadas por CPU
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+
+# Hilos por proceso para las respuestas largas (NDJSON, barridos)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# La aplicación se importa una vez en el proceso maestro y se comparte con fork
+preload_app = True
+
+# Los barridos envían su respuesta mientras se ejecutan los puntos
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 300))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Cada worker guarda aquí sus métricas y /api/metrics las suma todas
+# (el fichero se lee antes de importar la aplicación con preload_app)
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'ftth-metrics'))
+
+
+def when_ready(server):
+    """
+    Borrar las métricas de la ejecución anterior y marcar como FAILED las
+    simulaciones que quedaron a medias; se hace una vez en el maestro antes
+    de crear los workers, así que ningún trabajo de esta ejecución está en
+    marcha
+    """
+    from jobs import job_queue
+    from instrumentation import clear_metrics_dir
+    
+    clear_metrics_dir(os.environ['METRICS_DIR'])
+    interrupted = job_queue.fail_interrupted()
+    if interrupted:
+        server.log.info("Simulaciones interrumpidas marcadas como FAILED: %s", interrupted)
+
+
+def post_fork(server, worker):
+    """
+    Descartar las conexiones y las métricas heredadas del maestro; cada
+    worker abre sus conexiones y cuenta sólo sus peticiones
+    """
+    from app import app
+    from database import db
+    from instrumentation import reset_metrics
+    
+    with app.app_context():
+        db.engine.dispose()
+    reset_metrics()
@@ -0,0 +1,366 @@
+"""
+Instrumentación de la API: tiempos por fase, consultas SQL y métricas
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Límites de los histogramas de latencia en segundos
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PROFILE_HEADER = 'X-Profile'
+
+
+class Counter:
+    """Contador con etiquetas en formato Prometheus"""
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def values(self):
+        """Copia de los valores por etiquetas"""
+        with self._lock:
+            return dict(self._values)
+    
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+    
+    @staticmethod
+    def merge(values, key, value):
+        """Sumar el valor de otro proceso a `values`"""
+        values[key] = values.get(key, 0) + value
+    
+    def collect(self, values=None):
+        """Líneas de texto de la exposición Prometheus (por defecto, las de este proceso)"""
+        if values is None:
+            values = self.values()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Histograma acumulado con etiquetas en formato Prometheus"""
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [conteos acumulados por límite, suma, número de observaciones]
+                series = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def values(self):
+        """Copia de los valores por etiquetas"""
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self._values.items()}
+    
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+    
+    @staticmethod
+    def merge(values, key, value):
+        """Sumar la serie de otro proceso a `values`"""
+        counts, total, count = value
+        series = values.get(key)
+        if series is None:
+            values[key] = [list(counts), total, count]
+            return
+        series[0] = [a + b for a, b in zip(series[0], counts)]
+        series[1] += total
+        series[2] += count
+    
+    def collect(self, values=None):
+        """Líneas de texto de la exposición Prometheus (por defecto, las de este proceso)"""
+        if values is None:
+            values = self.values()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _labels(self.labelnames + ('le',), key + (repr(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _labels(self.labelnames + ('le',), key + ('+Inf',))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def _labels(names, values):
+    """Etiquetas {nombre="valor"} de una serie"""
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+REQUEST_LATENCY = Histogram(
+    'ftth_request_duration_seconds', 'Latencia de las peticiones HTTP por ruta',
+    labelnames=('method', 'route', 'status')
+)
+PHASE_LATENCY = Histogram(
+    'ftth_phase_duration_seconds', 'Duración de las fases instrumentadas',
+    labelnames=('phase',)
+)
+DB_QUERIES = Counter(
+    'ftth_db_queries_total', 'Consultas SQL ejecutadas por ruta',
+    labelnames=('route',)
+)
+DB_QUERY_LATENCY = Histogram(
+    'ftth_db_query_duration_seconds', 'Duración de las consultas SQL por ruta',
+    labelnames=('route',)
+)
+
+METRICS = (REQUEST_LATENCY, PHASE_LATENCY, DB_QUERIES, DB_QUERY_LATENCY)
+
+
+def reset_metrics():
+    """Vaciar las métricas de este proceso (p. ej. las heredadas del maestro tras fork)"""
+    for metric in METRICS:
+        metric.reset()
+
+
+def clear_metrics_dir(directory):
+    """Borrar los ficheros de métricas de una ejecución anterior"""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith('.json'):
+            os.remove(os.path.join(directory, name))
+
+
+class SharedMetrics:
+    """
+    Métricas de todos los procesos a través de un directorio compartido
+    
+    Cada proceso guarda sus valores en su propio fichero JSON (desde un
+    hilo, como máximo cada `interval` segundos) y /api/metrics suma los
+    ficheros de todos los procesos, también los de workers ya terminados,
+    así que las series no retroceden cuando el scrape llega a otro worker.
+    """
+    
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+        self._path = None
+        self._written = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Crear el fichero y el hilo de escritura de este proceso (una vez por proceso)"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            # El sufijo evita reutilizar el fichero de un proceso terminado con el mismo pid
+            self._path = os.path.join(self.directory, f'{pid}-{secrets.token_hex(4)}.json')
+            self._written = None
+            self._pid = pid
+            threading.Thread(target=self._run, name='metrics-writer', daemon=True).start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.write()
+    
+    def write(self):
+        """Guardar los valores de este proceso si han cambiado"""
+        data = json.dumps({
+            metric.name: [[list(key), value] for key, value in metric.values().items()]
+            for metric in METRICS
+        })
+        with self._lock:
+            if data == self._written:
+                return
+            temporary = self._path + '.tmp'
+            with open(temporary, 'w') as f:
+                f.write(data)
+            os.replace(temporary, self._path)
+            self._written = data
+    
+    def values(self):
+        """Valores de cada métrica sumados entre todos los procesos"""
+        self.start()
+        self.write()
+        totals = {metric.name: {} for metric in METRICS}
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for metric in METRICS:
+                for key, value in data.get(metric.name, []):
+                    metric.merge(totals[metric.name], tuple(key), value)
+        return totals
+
+
+def _in_request():
+    return has_app_context() and 'request_started' in g
+
+
+@contextmanager
+def timed(phase):
+    """
+    Medir una fase (decodificar olt_config, reconstruir la red, ...)
+    
+    La duración se acumula en el histograma global de fases y, dentro de
+    una petición, en los tiempos de la petición (cabecera Server-Timing).
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PHASE_LATENCY.observe(elapsed, phase=phase)
+        if _in_request():
+            g.phases[phase] = g.phases.get(phase, 0.0) + elapsed
+
+
+def _route():
+    """Regla de la ruta de la petición (p. ej. /api/topologies/<int:topology_id>)"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    route = _route() if _in_request() else 'background'
+    DB_QUERIES.inc(route=route)
+    DB_QUERY_LATENCY.observe(elapsed, route=route)
+    if _in_request():
+        g.db_queries += 1
+        g.db_time += elapsed
+
+
+class Instrumentation:
+    """
+    Registro de tiempos de las peticiones de una aplicación Flask
+    
+    Cada respuesta incluye una cabecera Server-Timing con las fases medidas
+    y el tiempo en la base de datos. Con PROFILING_ENABLED activo, una
+    petición con la cabecera X-Profile: 1 devuelve el resumen de cProfile
+    en lugar de su respuesta.
+    """
+    
+    def __init__(self, app=None):
+        self.app = None
+        self.shared = None
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Registrar los hooks de petición y el endpoint /api/metrics"""
+        self.app = app
+        app.extensions['instrumentation'] = self
+        if app.config.get('METRICS_DIR'):
+            self.shared = SharedMetrics(app.config['METRICS_DIR'], app.config.get('METRICS_WRITE_INTERVAL', 1.0))
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/api/metrics', 'metrics', self.metrics_view, methods=['GET'])
+    
+    def _before_request(self):
+        if self.shared is not None:
+            self.shared.start()
+        g.request_started = time.perf_counter()
+        g.phases = {}
+        g.db_queries = 0
+        g.db_time = 0.0
+        g.profiler = None
+        if self.app.config.get('PROFILING_ENABLED') and request.headers.get(PROFILE_HEADER) == '1':
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+    
+    def _after_request(self, response):
+        if 'request_started' not in g:
+            return response
+        
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+        
+        elapsed = time.perf_counter() - g.request_started
+        REQUEST_LATENCY.observe(
+            elapsed, method=request.method, route=_route(), status=str(response.status_code)
+        )
+        
+        timings = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in g.phases.items()]
+        timings.append(f'db;dur={g.db_time * 1000:.2f};desc="{g.db_queries} queries"')
+        timings.append(f'total;dur={elapsed * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(timings)
+        
+        if profiler is not None:
+            return self._profile_response(profiler, response)
+        return response
+    
+    def _profile_response(self, profiler, response):
+        """Resumen de cProfile (las 40 funciones con más tiempo acumulado)"""
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats('cumulative').print_stats(40)
+        profile = Response(output.getvalue(), mimetype='text/plain')
+        profile.headers['X-Original-Status'] = str(response.status_code)
+        profile.headers['Server-Timing'] = response.headers['Server-Timing']
+        return profile
+    
+    def metrics_view(self):
+        """
+        Métricas en formato de texto Prometheus: las de todos los procesos con
+        METRICS_DIR y, sin él, sólo las del proceso que atiende la petición
+        """
+        totals = self.shared.values() if self.shared is not None else {}
+        lines = []
+        for metric in METRICS:
+            lines.extend(metric.collect(totals.get(metric.name)))
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+instrumentation = Instrumentation()
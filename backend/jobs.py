@@ -0,0 +1,357 @@
+"""
+Cola de trabajos asíncrona para simulaciones
+"""
+import os
+import json
+import functools
+import queue
+import threading
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from database import db
+from instrumentation import timed
+from simulators.parameter_sweep import run_sweep_point
+
+
+# Espera máxima por un informe de progreso antes de comprobar si el trabajo terminó
+PROGRESS_POLL_INTERVAL = 0.5
+
+
+def run_simulation_job(num_onus, parameters, progress_queue=None, onu_ids=None, seed=None, pon=None):
+    """
+    Ejecutar una simulación de tráfico en un proceso worker
+    
+    Se define a nivel de módulo para que pueda serializarse hacia el pool
+    de procesos; no accede a la base de datos.
+    
+    Args:
+        num_onus: Número de ONUs de la topología
+        parameters: Parámetros de la simulación (simulation_time, mode, seed,
+            upstream, window, series_windows, progress_interval)
+        progress_queue: Cola (de un Manager) donde se envían los informes
+            de progreso (opcional)
+        onu_ids: Ids de las ONUs simuladas (las de un puerto PON)
+        seed: Semilla o SeedSequence que sustituye a la de los parámetros
+        pon: Puerto PON simulado; se añade a cada informe de progreso
+    """
+    from simulators.traffic_simulator import TrafficSimulator
+    from simulators.gpon_upstream import upstream_options
+    from simulators.time_series import window_options
+    from simulators.progress import progress_interval
+    
+    progress = None
+    if progress_queue is not None:
+        progress = progress_queue.put
+        if pon is not None:
+            def progress(update):
+                progress_queue.put({**update, 'pon': pon})
+    
+    simulator = TrafficSimulator(
+        num_onus=num_onus,
+        simulation_time=parameters.get('simulation_time', 100),
+        seed=seed if seed is not None else parameters.get('seed'),
+        onu_ids=onu_ids
+    )
+    return simulator.run(
+        mode=parameters.get('mode', 'simpy'),
+        upstream_options=upstream_options(parameters),
+        window_options=window_options(parameters),
+        progress=progress,
+        progress_interval=progress_interval(parameters)
+    )
+
+
+class SimulationJobQueue:
+    """
+    Cola de simulaciones respaldada por un pool de procesos
+    
+    Cada trabajo se despacha desde un hilo que actualiza el estado de la
+    simulación en la base de datos (RUNNING, COMPLETED, FAILED), mientras
+    que el cálculo se ejecuta en un proceso separado para no quedar
+    serializado por el GIL. Hay tantos hilos como procesos, por lo que un
+    trabajo sólo pasa a RUNNING cuando tiene un proceso disponible.
+    
+    Mientras una simulación se ejecuta, su hilo recibe los informes de
+    progreso del proceso por una cola de un Manager y guarda el último en
+    la simulación, de donde lo lee cualquier proceso del servidor.
+    
+    Las simulaciones de redes con varios puertos PON se dividen en un
+    trabajo por puerto, que se ejecutan en paralelo en el pool; su hilo une
+    los informes de progreso y los resultados de todos los puertos.
+    
+    Los pools y el Manager se crean en el primer uso bajo un lock, porque
+    las primeras peticiones pueden llegar a la vez desde varios hilos. Si
+    un proceso worker muere (por ejemplo, por falta de memoria) el pool
+    queda roto y se crea uno nuevo en el siguiente envío.
+    """
+    
+    def __init__(self, app=None):
+        self.app = None
+        self.max_workers = None
+        self._processes = None
+        self._dispatchers = None
+        self._manager = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Registrar la cola en la aplicación Flask"""
+        self.app = app
+        self.max_workers = app.config.get('SIMULATION_WORKERS') or os.cpu_count() or 1
+        app.extensions['simulation_jobs'] = self
+    
+    @property
+    def processes(self):
+        """Pool de procesos, creado de forma diferida en el primer uso"""
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._processes
+    
+    @property
+    def dispatchers(self):
+        """Hilos que coordinan cada trabajo con la base de datos"""
+        with self._lock:
+            if self._dispatchers is None:
+                self._dispatchers = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='simulation-job'
+                )
+            return self._dispatchers
+    
+    @property
+    def manager(self):
+        """Manager para las colas de progreso, creado de forma diferida"""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context('spawn').Manager()
+            return self._manager
+    
+    def submit_process(self, function, *args):
+        """
+        Ejecutar function(*args) en el pool de procesos
+        
+        Si el pool está roto porque murió un proceso worker, se descarta y
+        el trabajo se envía a un pool nuevo.
+        """
+        pool = self.processes
+        try:
+            return pool.submit(function, *args)
+        except BrokenProcessPool:
+            self._discard_processes(pool)
+            return self.processes.submit(function, *args)
+    
+    def _discard_processes(self, pool):
+        """Descartar un pool roto (si otro hilo no lo ha sustituido ya)"""
+        with self._lock:
+            if self._processes is pool:
+                self._processes = None
+        pool.shutdown(wait=False)
+    
+    def fail_interrupted(self):
+        """
+        Marcar como FAILED las simulaciones PENDING o RUNNING de una
+        ejecución anterior del servidor
+        
+        Sus trabajos se perdieron al detenerse los procesos, así que nunca
+        terminarían. Debe llamarse al arrancar, antes de aceptar peticiones.
+        
+        Returns:
+            Número de simulaciones marcadas
+        """
+        from models.db_models import Simulation
+        
+        with self.app.app_context():
+            count = Simulation.query.filter(
+                Simulation.status.in_(('PENDING', 'RUNNING'))
+            ).update({
+                Simulation.status: 'FAILED',
+                Simulation.results: json.dumps({"error": "Simulación interrumpida al reiniciar el servidor"}),
+                Simulation.completed_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.session.commit()
+        return count
+    
+    def submit(self, simulation_id, num_onus, parameters):
+        """Encolar una simulación ya guardada con estado PENDING"""
+        return self.dispatchers.submit(
+            self._dispatch, simulation_id, parameters,
+            run_simulation_job, num_onus, parameters, progress=True
+        )
+    
+    def submit_sweep_point(self, simulation_id, point, parameters, seed):
+        """Encolar un punto de un barrido de parámetros ya guardado como PENDING"""
+        return self.dispatchers.submit(
+            self._dispatch, simulation_id, parameters,
+            run_sweep_point, point, parameters, seed
+        )
+    
+    def submit_sharded(self, simulation_id, pons, parameters):
+        """
+        Encolar la simulación de una red multi-PON ya guardada como PENDING
+        
+        Args:
+            pons: Lista [(olt_id, [onu_id, ...])] de PonNetwork.pon_onu_ids()
+        """
+        return self.dispatchers.submit(self._dispatch_sharded, simulation_id, pons, parameters)
+    
+    def _dispatch(self, simulation_id, parameters, job, *args, progress=False):
+        """
+        Ejecutar un trabajo en el pool de procesos y registrar su resultado
+        
+        Devuelve los resultados para quien espere el futuro; si el trabajo
+        falla se marca como FAILED y la excepción se propaga al futuro. Con
+        progress=True el trabajo recibe una cola de progreso como último
+        argumento.
+        """
+        def run():
+            if progress:
+                updates = self.manager.Queue()
+                future = self.submit_process(job, *args, updates)
+                self._relay_progress(simulation_id, future, updates)
+            else:
+                future = self.submit_process(job, *args)
+            return future.result()
+        
+        return self._execute(simulation_id, parameters, run)
+    
+    def _dispatch_sharded(self, simulation_id, pons, parameters):
+        """
+        Ejecutar la simulación de cada puerto PON en el pool y unir los resultados
+        
+        Cada puerto recibe una SeedSequence hija de la semilla de la
+        simulación, así que el resultado es reproducible con la semilla
+        guardada ('seed'). Si falla un puerto se cancelan los pendientes.
+        """
+        from simulators.pon_sharding import pon_seeds, merge_pon_results, merge_progress
+        from simulators.traffic_simulator import random_seed
+        
+        def run():
+            updates = self.manager.Queue()
+            seed = parameters.get('seed')
+            seeds = pon_seeds(seed if seed is not None else random_seed(), len(pons))
+            futures = [
+                self.submit_process(
+                    run_simulation_job, len(onu_ids), parameters, updates, onu_ids, seed, olt_id
+                )
+                for (olt_id, onu_ids), seed in zip(pons, seeds)
+            ]
+            try:
+                self._relay_progress(
+                    simulation_id, futures, updates,
+                    merge=functools.partial(merge_progress, num_pons=len(pons))
+                )
+                results = [future.result() for future in futures]
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+            return merge_pon_results(results, pons)
+        
+        return self._execute(simulation_id, parameters, run)
+    
+    def _execute(self, simulation_id, parameters, run):
+        """Marcar la simulación como RUNNING, ejecutar run() y guardar su resultado"""
+        with self.app.app_context():
+            try:
+                self._set_status(simulation_id, 'RUNNING')
+                with timed('simulation_run'):
+                    results = run()
+                with timed('results_store'):
+                    self._save_results(
+                        simulation_id, results, parameters.get('results_format', 'json')
+                    )
+                return results
+            except Exception as e:
+                db.session.rollback()
+                self._set_status(simulation_id, 'FAILED', error=str(e))
+                raise
+    
+    def _relay_progress(self, simulation_id, futures, updates, merge=None):
+        """
+        Guardar el último informe de progreso de la cola hasta que terminen
+        el trabajo o los trabajos de `futures`
+        
+        Con merge, cada informe lleva el puerto PON que lo envía ('pon') y
+        se guarda merge({pon: último informe}).
+        """
+        if not isinstance(futures, (list, tuple)):
+            futures = [futures]
+        latest = {}
+        while True:
+            done = all(future.done() for future in futures)
+            received = []
+            try:
+                received.append(updates.get_nowait() if done else updates.get(timeout=PROGRESS_POLL_INTERVAL))
+                while True:
+                    received.append(updates.get_nowait())
+            except queue.Empty:
+                pass
+            if received:
+                if merge is None:
+                    self._set_progress(simulation_id, received[-1])
+                else:
+                    for update in received:
+                        latest[update['pon']] = update
+                    self._set_progress(simulation_id, merge(latest))
+            if done:
+                return
+    
+    def _set_progress(self, simulation_id, progress):
+        """Guardar el último informe de progreso de una simulación"""
+        from models.db_models import Simulation
+        
+        simulation = db.session.get(Simulation, simulation_id)
+        simulation.progress = json.dumps(progress)
+        db.session.commit()
+    
+    def _set_status(self, simulation_id, status, error=None):
+        """Actualizar el estado de una simulación"""
+        from models.db_models import Simulation
+        
+        simulation = db.session.get(Simulation, simulation_id)
+        simulation.status = status
+        if error is not None:
+            simulation.results = json.dumps({"error": error})
+        if status in ('COMPLETED', 'FAILED'):
+            simulation.completed_at = datetime.utcnow()
+        db.session.commit()
+    
+    def _save_results(self, simulation_id, results, results_format='json'):
+        """
+        Guardar resultados y métricas de una simulación completada
+        
+        En formato compacto las métricas sólo se guardan en results_blob; en
+        JSON se guardan además como filas de PerformanceMetric.
+        """
+        from models.db_models import Simulation, PerformanceMetric
+        
+        simulation = db.session.get(Simulation, simulation_id)
+        simulation.store_results(results, results_format)
+        
+        # Guardar métricas con un único INSERT masivo
+        if results_format != 'compact':
+            PerformanceMetric.bulk_insert(simulation.id, results.get('metrics', []))
+        
+        simulation.status = 'COMPLETED'
+        simulation.completed_at = datetime.utcnow()
+        db.session.commit()
+    
+    def shutdown(self, wait=True):
+        """Detener los pools de hilos y procesos"""
+        if self._dispatchers is not None:
+            self._dispatchers.shutdown(wait=wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+
+job_queue = SimulationJobQueue()
@@ -0,0 +1,106 @@
+"""
+Migraciones del esquema para bases de datos creadas con versiones anteriores
+
+init.sql y db.create_all() sólo crean las tablas que no existen, así que una
+base de datos ya creada (p. ej. el volumen mysql_data de docker-compose) no
+recibe las columnas añadidas después. upgrade_schema() añade las que faltan;
+se ejecuta con `flask --app app init-db` y puede repetirse sin efectos.
+"""
+import json
+
+from sqlalchemy import inspect, text
+
+
+# Columnas añadidas después de la primera versión del esquema: (tabla, columna, definición)
+COLUMNS = (
+    ('network_topologies', 'topology_type', 'VARCHAR(20)'),
+    ('network_topologies', 'num_onus', 'INT'),
+    ('network_topologies', 'num_splitters', 'INT'),
+    ('network_topologies', 'num_fibers', 'INT'),
+    ('network_topologies', 'content_hash', 'CHAR(64)'),
+    ('simulations', 'sweep_id', 'INT NULL'),
+    ('simulations', 'results_blob', 'LONGBLOB'),
+    ('simulations', 'progress', 'JSON')
+)
+
+# Índices de init.sql añadidos después: (tabla, índice, columnas)
+INDEXES = (
+    ('network_topologies', 'idx_topology_type', ('topology_type',)),
+    ('network_elements', 'idx_topology_element', ('topology_id', 'element_id')),
+    ('simulations', 'idx_sweep', ('sweep_id',))
+)
+
+# Claves ajenas añadidas después: (tabla, columna, tabla referida, columna referida, ON DELETE)
+FOREIGN_KEYS = (
+    ('simulations', 'sweep_id', 'parameter_sweeps', 'id', 'SET NULL'),
+)
+
+
+def upgrade_database(db):
+    """
+    Crear las tablas que falten, migrar las existentes y completar sus datos
+    
+    Returns:
+        Tupla (sentencias de migración ejecutadas, topologías completadas)
+    """
+    db.create_all()
+    statements = upgrade_schema(db.engine)
+    return statements, backfill_topology_summaries(db.session)
+
+
+def upgrade_schema(engine):
+    """
+    Añadir las columnas, índices y claves ajenas que falten
+    
+    Debe llamarse después de db.create_all(), que crea las tablas nuevas
+    (parameter_sweeps). SQLite no admite añadir claves ajenas a una tabla
+    existente, así que con SQLite sólo se añaden columnas e índices.
+    
+    Returns:
+        Lista de sentencias ejecutadas
+    """
+    inspector = inspect(engine)
+    statements = []
+    for table, column, definition in COLUMNS:
+        if column not in {c['name'] for c in inspector.get_columns(table)}:
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    for table, index, columns in INDEXES:
+        if index not in {i['name'] for i in inspector.get_indexes(table)}:
+            statements.append(f"CREATE INDEX {index} ON {table} ({', '.join(columns)})")
+    if engine.dialect.name != 'sqlite':
+        for table, column, referred_table, referred_column, ondelete in FOREIGN_KEYS:
+            existing = {
+                (tuple(fk['constrained_columns']), fk['referred_table'])
+                for fk in inspector.get_foreign_keys(table)
+            }
+            if ((column,), referred_table) not in existing:
+                statements.append(
+                    f"ALTER TABLE {table} ADD FOREIGN KEY ({column}) "
+                    f"REFERENCES {referred_table}({referred_column}) ON DELETE {ondelete}"
+                )
+    
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    return statements
+
+
+def backfill_topology_summaries(session):
+    """
+    Completar el tipo y los contadores de las topologías guardadas antes de
+    que existieran esas columnas (content_hash se calcula al usarlas)
+    
+    Returns:
+        Número de topologías actualizadas
+    """
+    from models.db_models import NetworkTopology
+    
+    topologies = NetworkTopology.query.filter(NetworkTopology.num_onus.is_(None)).all()
+    for topology in topologies:
+        network_dict = json.loads(topology.olt_config) if topology.olt_config else {}
+        topology.topology_type = network_dict.get('topology_type')
+        topology.num_onus = len(network_dict.get('onus', []))
+        topology.num_splitters = len(network_dict.get('splitters', []))
+        topology.num_fibers = len(network_dict.get('fibers', []))
+    session.commit()
+    return len(topologies)
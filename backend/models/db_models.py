@@ -4,6 +4,10 @@ Modelos de base de datos SQLAlchemy
 from database import db
 import json
 
+from models.results_encoding import encode_metrics, decode_metrics, columns_to_metrics
+from streaming import RawJSON
+from cache import content_hash
+
 
 class NetworkTopology(db.Model):
     """Modelo para topologías de red"""
@@ -12,15 +16,75 @@ class NetworkTopology(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
+    topology_type = db.Column(db.String(20))
+    # Conteos guardados al crear la topología para listar sin leer olt_config
+    num_onus = db.Column(db.Integer)
+    num_splitters = db.Column(db.Integer)
+    num_fibers = db.Column(db.Integer)
+    # Hash de la definición de la red (sin el nombre) para cachés y ETag; tras
+    # una edición incremental es el hash del anterior y de las operaciones
+    content_hash = db.Column(db.String(64))
     olt_config = db.Column(db.JSON)
     created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
+    SUMMARY_FIELDS = (
+        'id', 'name', 'description', 'topology_type',
+        'num_onus', 'num_splitters', 'num_fibers', 'created_at', 'updated_at'
+    )
+    
+    @classmethod
+    def from_network(cls, network_dict, description=''):
+        """Crear la topología a partir de una red serializada con to_dict()"""
+        return cls(
+            name=network_dict['name'],
+            description=description,
+            topology_type=network_dict['topology_type'],
+            num_onus=len(network_dict['onus']),
+            num_splitters=len(network_dict['splitters']),
+            num_fibers=len(network_dict['fibers']),
+            content_hash=cls.network_hash(network_dict),
+            olt_config=json.dumps(network_dict)
+        )
+    
+    @staticmethod
+    def network_hash(network_dict):
+        """Hash del contenido de una red serializada, sin tener en cuenta su nombre"""
+        return content_hash({**network_dict, 'name': None})
+    
+    @classmethod
+    def summary_query(cls, topology_type=None, after_id=None):
+        """
+        Consulta de las columnas de resumen, ordenada por id
+        
+        Args:
+            topology_type: Filtrar por tipo de topología
+            after_id: Paginación por clave; sólo topologías con id mayor
+        """
+        query = cls.query.with_entities(*(getattr(cls, field) for field in cls.SUMMARY_FIELDS))
+        if topology_type is not None:
+            query = query.filter(cls.topology_type == topology_type)
+        if after_id is not None:
+            query = query.filter(cls.id > after_id)
+        return query.order_by(cls.id)
+    
+    @classmethod
+    def summary_dict(cls, row):
+        """Diccionario de una fila de summary_query()"""
+        data = dict(zip(cls.SUMMARY_FIELDS, row))
+        for field in ('created_at', 'updated_at'):
+            data[field] = data[field].isoformat() if data[field] else None
+        return data
+    
     def to_dict(self):
         return {
             "id": self.id,
             "name": self.name,
             "description": self.description,
+            "topology_type": self.topology_type,
+            "num_onus": self.num_onus,
+            "num_splitters": self.num_splitters,
+            "num_fibers": self.num_fibers,
             "olt_config": self.olt_config,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
@@ -41,6 +105,109 @@ class NetworkElement(db.Model):
     
     topology = db.relationship('NetworkTopology', backref=db.backref('elements', lazy=True, cascade='all, delete-orphan'))
     
+    # Tipo de elemento -> clave en OpticalNetwork.to_dict()
+    NETWORK_KEYS = (
+        ('OLT', 'olt'),
+        ('SPLITTER', 'splitters'),
+        ('ONU', 'onus'),
+        ('FIBER', 'fibers')
+    )
+    
+    @classmethod
+    def mappings_from_network(cls, topology_id, network_dict):
+        """
+        Generar las filas de cada tipo de elemento a partir de una red ya
+        serializada con OpticalNetwork.to_dict(), sin volver a llamar
+        to_dict() por elemento
+        
+        Returns:
+            Diccionario {element_type: [fila, ...]}
+        """
+        mappings = {}
+        for element_type, key in cls.NETWORK_KEYS:
+            # Las redes multi-PON (PonNetwork.to_dict()) tienen una lista de OLT
+            if element_type == 'OLT' and 'olts' in network_dict:
+                key = 'olts'
+            items = network_dict.get(key) or []
+            if isinstance(items, dict):
+                items = [items]
+            mappings[element_type] = [
+                {
+                    "topology_id": topology_id,
+                    "element_type": element_type,
+                    "element_id": item["id"],
+                    "properties": json.dumps(item)
+                }
+                for item in items
+            ]
+        return mappings
+    
+    @classmethod
+    def bulk_insert(cls, topology_id, network_dict):
+        """Guardar los elementos de una red con un INSERT (executemany) por tipo"""
+        for rows in cls.mappings_from_network(topology_id, network_dict).values():
+            if rows:
+                db.session.execute(cls.__table__.insert(), rows)
+    
+    @classmethod
+    def apply_changes(cls, topology_id, added=(), updated=(), removed=()):
+        """
+        Aplicar los cambios de una edición incremental a las filas de una topología
+        
+        Args:
+            added: Elementos nuevos como (element_type, diccionario)
+            updated: Elementos modificados como (element_type, diccionario);
+                sólo se reescriben sus propiedades
+            removed: Ids de los elementos a borrar (antes de insertar)
+        """
+        if removed:
+            cls.query.filter(
+                cls.topology_id == topology_id, cls.element_id.in_(list(removed))
+            ).delete(synchronize_session=False)
+        if updated:
+            db.session.execute(
+                cls.__table__.update().where(
+                    cls.topology_id == topology_id,
+                    cls.element_id == db.bindparam('b_element_id')
+                ).values(properties=db.bindparam('b_properties')),
+                [
+                    {"b_element_id": element["id"], "b_properties": json.dumps(element)}
+                    for _, element in updated
+                ]
+            )
+        if added:
+            db.session.execute(cls.__table__.insert(), [
+                {
+                    "topology_id": topology_id,
+                    "element_type": element_type,
+                    "element_id": element["id"],
+                    "properties": json.dumps(element)
+                }
+                for element_type, element in added
+            ])
+    
+    @classmethod
+    def insert_each(cls, topology_id, network_dict):
+        """Guardar los elementos creando un objeto ORM por elemento (ruta original)"""
+        for rows in cls.mappings_from_network(topology_id, network_dict).values():
+            for row in rows:
+                db.session.add(cls(**row))
+    
+    @classmethod
+    def iter_properties(cls, topology_id, element_type, batch_size=1000):
+        """
+        Recorrer las propiedades JSON de un tipo de elemento sin cargar todas
+        las filas a la vez
+        
+        Las propiedades se guardan ya serializadas, así que se devuelven como
+        RawJSON para emitirlas tal cual en respuestas por partes.
+        """
+        rows = cls.query.with_entities(cls.properties).filter_by(
+            topology_id=topology_id, element_type=element_type
+        ).order_by(cls.id).yield_per(batch_size)
+        for (properties,) in rows:
+            yield RawJSON(properties if isinstance(properties, str) else json.dumps(properties))
+    
     def to_dict(self):
         return {
             "id": self.id,
@@ -53,25 +220,116 @@ class NetworkElement(db.Model):
         }
 
 
+class ParameterSweep(db.Model):
+    """Modelo para barridos de parámetros (grupo de simulaciones)"""
+    __tablename__ = 'parameter_sweeps'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    grid = db.Column(db.JSON)
+    seed = db.Column(db.BigInteger)
+    created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
+    
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "grid": self.grid,
+            "seed": self.seed,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
 class Simulation(db.Model):
     """Modelo para simulaciones"""
     __tablename__ = 'simulations'
     
     id = db.Column(db.Integer, primary_key=True)
     topology_id = db.Column(db.Integer, db.ForeignKey('network_topologies.id', ondelete='CASCADE'), nullable=False)
+    sweep_id = db.Column(db.Integer, db.ForeignKey('parameter_sweeps.id', ondelete='SET NULL'))
     name = db.Column(db.String(255), nullable=False)
     parameters = db.Column(db.JSON)
     results = db.Column(db.JSON)
+    # Métricas en formato compacto (npz); sólo se carga cuando se accede
+    results_blob = db.deferred(db.Column(db.LargeBinary(length=2**32 - 1)))
+    # Último informe de progreso mientras se ejecuta (SimulationProgress)
+    progress = db.deferred(db.Column(db.JSON))
     status = db.Column(db.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED'), default='PENDING')
     created_at = db.Column(db.TIMESTAMP, server_default=db.func.current_timestamp())
     completed_at = db.Column(db.TIMESTAMP)
     
     topology = db.relationship('NetworkTopology', backref=db.backref('simulations', lazy=True))
+    sweep = db.relationship('ParameterSweep', backref=db.backref('simulations', lazy=True))
+    
+    RESULTS_FORMATS = ('json', 'compact')
+    
+    def store_results(self, results, results_format='json'):
+        """
+        Guardar resultados de la simulación
+        
+        Con results_format='compact' la lista de métricas se guarda como arrays
+        NumPy en results_blob y results sólo conserva los valores agregados.
+        """
+        if results_format not in self.RESULTS_FORMATS:
+            raise ValueError(f"Formato de resultados no soportado: {results_format}")
+        
+        if results_format == 'compact':
+            summary = {k: v for k, v in results.items() if k != 'metrics'}
+            summary['results_format'] = 'compact'
+            self.results = json.dumps(summary)
+            self.results_blob = encode_metrics(results.get('metrics', []))
+        else:
+            self.results = json.dumps(results)
+            self.results_blob = None
+    
+    def load_results(self, columnar=False):
+        """
+        Leer resultados, decodificando las métricas compactas si existen
+        
+        Args:
+            columnar: Devolver las métricas como columnas {columna: [valores]}
+                en lugar de una lista de diccionarios
+        """
+        if not self.results:
+            return None
+        results = json.loads(self.results)
+        if results.get('results_format') != 'compact':
+            return results
+        
+        columns = decode_metrics(self.results_blob)
+        if columnar:
+            results['columns'] = {name: values.tolist() for name, values in columns.items()}
+        else:
+            results['metrics'] = columns_to_metrics(columns)
+        return results
+    
+    @classmethod
+    def iter_metrics(cls, simulation_id, batch_size=1000):
+        """
+        Recorrer las métricas de una simulación con el formato de
+        PerformanceMetric.to_dict()
+        
+        En formato compacto no se guardan filas de PerformanceMetric, así que
+        las métricas se decodifican de results_blob (sin id de fila).
+        """
+        blob = db.session.query(cls.results_blob).filter(cls.id == simulation_id).scalar()
+        if blob is None:
+            yield from PerformanceMetric.iter_dicts(simulation_id, batch_size)
+            return
+        for metric in columns_to_metrics(decode_metrics(blob)):
+            yield {
+                "simulation_id": simulation_id,
+                "onu_id": metric['onu_id'],
+                "metric_type": metric['type'],
+                "metric_value": metric['value'],
+                "timestamp": metric['timestamp']
+            }
     
     def to_dict(self):
         return {
             "id": self.id,
             "topology_id": self.topology_id,
+            "sweep_id": self.sweep_id,
             "name": self.name,
             "parameters": self.parameters,
             "results": self.results,
@@ -94,6 +352,29 @@ class PerformanceMetric(db.Model):
     
     simulation = db.relationship('Simulation', backref=db.backref('metrics', lazy=True))
     
+    @classmethod
+    def bulk_insert(cls, simulation_id, metrics):
+        """Guardar todas las métricas de una simulación con un único INSERT (executemany)"""
+        rows = [
+            {
+                "simulation_id": simulation_id,
+                "onu_id": metric.get('onu_id'),
+                "metric_type": metric.get('type'),
+                "metric_value": metric.get('value'),
+                "timestamp": metric.get('timestamp', 0)
+            }
+            for metric in metrics
+        ]
+        if rows:
+            db.session.execute(cls.__table__.insert(), rows)
+    
+    @classmethod
+    def iter_dicts(cls, simulation_id, batch_size=1000):
+        """Recorrer las métricas de una simulación por lotes, como diccionarios"""
+        rows = cls.query.filter_by(simulation_id=simulation_id).order_by(cls.id).yield_per(batch_size)
+        for metric in rows:
+            yield metric.to_dict()
+    
     def to_dict(self):
         return {
             "id": self.id,
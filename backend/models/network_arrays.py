@@ -0,0 +1,1045 @@
+"""
+Representación de la red óptica por arrays NumPy (structure-of-arrays)
+
+Alternativa a OpticalNetwork para topologías con cientos de miles de ONUs:
+cada tipo de elemento se guarda como columnas NumPy y las conexiones como
+índices enteros de nodo (0 = OLT, 1..S = splitters, S+1..S+O = ONUs). Las
+clases de network_elements se ofrecen como vistas ligeras sobre las filas.
+"""
+import heapq
+import math
+import numpy as np
+
+from models.network_elements import OpticalNetwork, _split_loss
+
+
+POWER_MARGIN = 3.0  # dB, igual que OpticalNetwork.calculate_power_budget_path
+
+OLT_NODE = 0
+
+
+def _numbered(prefix, numbers, suffix=''):
+    """Array de etiquetas prefix + número + suffix (con el ancho justo)"""
+    return np.array([f"{prefix}{number}{suffix}" for number in numbers.tolist()], dtype=str)
+
+
+def _interleave(*arrays):
+    """Intercalar arrays de la misma longitud: a0, b0, a1, b1, ..."""
+    return np.stack(arrays, axis=1).reshape(-1)
+
+
+def _splitter_columns(ids, names, ratios, olt_connected):
+    """Columnas de splitters; la pérdida se calcula una vez por ratio distinto"""
+    ratios = np.asarray(ratios, dtype=str)
+    unique, inverse = np.unique(ratios, return_inverse=True)
+    losses = np.array([_split_loss(str(ratio)) for ratio in unique], dtype=np.float64)
+    return {
+        'id': np.asarray(ids, dtype=str),
+        'name': np.asarray(names, dtype=str),
+        'ratio': ratios,
+        'split_loss': losses[inverse] if len(ratios) else np.zeros(0),
+        'olt_connected': np.asarray(olt_connected, dtype=bool)
+    }
+
+
+def _onu_columns(ids, names, splitter, tx_power=1.5, rx_sensitivity=-24,
+                 traffic_rate=0, requested_bandwidth=0):
+    """Columnas de ONUs; splitter es el índice del splitter conectado o -1"""
+    count = len(ids)
+    return {
+        'id': np.asarray(ids, dtype=str),
+        'name': np.asarray(names, dtype=str),
+        'tx_power': np.broadcast_to(np.asarray(tx_power, dtype=np.float64), (count,)).copy(),
+        'rx_sensitivity': np.broadcast_to(np.asarray(rx_sensitivity, dtype=np.float64), (count,)).copy(),
+        'traffic_rate': np.broadcast_to(np.asarray(traffic_rate, dtype=np.float64), (count,)).copy(),
+        'requested_bandwidth': np.broadcast_to(np.asarray(requested_bandwidth, dtype=np.float64), (count,)).copy(),
+        'splitter': np.broadcast_to(np.asarray(splitter, dtype=np.int64), (count,)).copy()
+    }
+
+
+def _fiber_columns(ids, names, length, from_node, to_node, attenuation=0.2, dispersion=17):
+    """Columnas de fibras; los extremos son índices de nodo o -1"""
+    count = len(ids)
+    return {
+        'id': np.asarray(ids, dtype=str),
+        'name': np.asarray(names, dtype=str),
+        'length': np.asarray(length, dtype=np.float64),
+        'attenuation': np.broadcast_to(np.asarray(attenuation, dtype=np.float64), (count,)).copy(),
+        'dispersion': np.broadcast_to(np.asarray(dispersion, dtype=np.float64), (count,)).copy(),
+        'from_node': np.asarray(from_node, dtype=np.int64),
+        'to_node': np.asarray(to_node, dtype=np.int64)
+    }
+
+
+class ArrayNetwork:
+    """
+    Red óptica GPON almacenada como arrays por tipo de elemento
+    
+    Ofrece la misma interfaz de consulta que OpticalNetwork (olt, splitters,
+    onus, fibers, power budget y to_dict/from_dict), pero el power budget,
+    las pérdidas de fibra y la serialización se calculan con operaciones
+    NumPy sobre todas las filas a la vez. Los elementos se crean con
+    create_ftth_topology o from_dict; no se añaden uno a uno.
+    """
+    
+    def __init__(self, name="GPON Network"):
+        self.name = name
+        self.topology_type = 'star'
+        self.olt_data = None
+        self.splitter_data = _splitter_columns([], [], [], [])
+        self.onu_data = _onu_columns([], [], -1)
+        self.fiber_data = _fiber_columns([], [], [], [], [])
+        self._power_paths = None
+        self._indexes = {}
+    
+    # --- Vistas compatibles con network_elements ---
+    
+    @property
+    def olt(self):
+        return OLTView(self) if self.olt_data is not None else None
+    
+    @property
+    def splitters(self):
+        return ElementArray(self, SplitterView, self.splitter_data['id'])
+    
+    @property
+    def onus(self):
+        return ElementArray(self, ONUView, self.onu_data['id'])
+    
+    @property
+    def fibers(self):
+        return ElementArray(self, FiberView, self.fiber_data['id'])
+    
+    @property
+    def num_splitters(self):
+        return len(self.splitter_data['id'])
+    
+    @property
+    def num_onus(self):
+        return len(self.onu_data['id'])
+    
+    def _index_of(self, kind, element_id):
+        """Índice de fila de un id (los índices se construyen una vez por tipo)"""
+        if kind not in self._indexes:
+            ids = {'splitter': self.splitter_data, 'onu': self.onu_data, 'fiber': self.fiber_data}[kind]['id']
+            self._indexes[kind] = {value: i for i, value in enumerate(ids.tolist())}
+        return self._indexes[kind].get(element_id)
+    
+    def get_element(self, element_id):
+        """Buscar el OLT, un splitter o una ONU por id"""
+        if self.olt_data is not None and self.olt_data['id'] == element_id:
+            return self.olt
+        index = self._index_of('splitter', element_id)
+        if index is not None:
+            return SplitterView(self, index)
+        index = self._index_of('onu', element_id)
+        return ONUView(self, index) if index is not None else None
+    
+    def _node_ids(self):
+        """Ids de todos los nodos en orden de índice de nodo"""
+        olt_id = self.olt_data['id'] if self.olt_data is not None else None
+        return [olt_id] + self.splitter_data['id'].tolist() + self.onu_data['id'].tolist()
+    
+    def _node_view(self, node):
+        """Vista del elemento de un índice de nodo"""
+        if node < 0:
+            return None
+        if node == OLT_NODE:
+            return self.olt
+        if node <= self.num_splitters:
+            return SplitterView(self, node - 1)
+        return ONUView(self, node - 1 - self.num_splitters)
+    
+    def invalidate(self):
+        """Descartar las rutas de power budget tras modificar los arrays"""
+        self._power_paths = None
+    
+    # --- Generación de topologías ---
+    
+    def create_ftth_topology(self, num_onus=32, split_ratio="1:32", topology_type="star"):
+        """
+        Generar topología FTTH según el tipo especificado
+        
+        Produce los mismos elementos, ids y longitudes que
+        OpticalNetwork.create_ftth_topology, pero directamente como arrays.
+        """
+        self.topology_type = topology_type
+        self.olt_data = {
+            "id": "OLT-1", "name": "OLT Principal",
+            "tx_power": 2.5, "rx_sensitivity": -27, "total_capacity": 2500
+        }
+        
+        if topology_type == "bus":
+            self._create_bus_topology(num_onus)
+        elif topology_type == "ring":
+            self._create_ring_topology(num_onus)
+        elif topology_type == "tree":
+            self._create_tree_topology(num_onus, split_ratio)
+        else:
+            self._create_star_topology(num_onus, split_ratio)
+        
+        self._power_paths = None
+        self._indexes = {}
+    
+    def _create_star_topology(self, num_onus, split_ratio):
+        """Estrella: un splitter central y una fibra por ONU"""
+        index = np.arange(num_onus)
+        numbers = index + 1
+        
+        self.splitter_data = _splitter_columns(
+            ["SPLIT-1"], [f"Splitter {split_ratio}"], [split_ratio], [True]
+        )
+        self.onu_data = _onu_columns(
+            _numbered("ONU-", numbers), _numbered("ONU ", numbers), 0
+        )
+        self.fiber_data = _fiber_columns(
+            np.concatenate([["FIBER-OLT-SPLIT"], _numbered("FIBER-", numbers)]),
+            np.concatenate([["OLT to Splitter"], _numbered("Splitter to ONU ", numbers)]),
+            np.concatenate([[2.0], 3.0 + index * 0.1]),
+            np.concatenate([[OLT_NODE], np.full(num_onus, 1)]),
+            np.concatenate([[1], 2 + index])
+        )
+    
+    def _create_bus_topology(self, num_onus):
+        """Bus: un splitter 1:2 por ONU encadenado al anterior"""
+        index = np.arange(num_onus)
+        numbers = index + 1
+        splitter_nodes = 1 + index
+        onu_nodes = 1 + num_onus + index
+        
+        self.splitter_data = _splitter_columns(
+            _numbered("SPLIT-TAP-", numbers),
+            _numbered("Tapping Splitter ", numbers),
+            np.full(num_onus, "1:2"),
+            index == 0
+        )
+        self.onu_data = _onu_columns(
+            _numbered("ONU-", numbers), _numbered("ONU ", numbers), index
+        )
+        
+        # Segmento de bus (el primero sale del OLT) seguido de la bajada a la ONU
+        first = ["FIBER-BUS-OLT"], ["OLT to Bus"]
+        if not num_onus:
+            first = [], []
+        bus_ids = np.concatenate([first[0], _numbered("FIBER-BUS-", index[1:])])
+        bus_names = np.concatenate([first[1], _numbered("Bus Segment ", index[1:])])
+        bus_length = np.full(num_onus, 0.5)
+        bus_length[:1] = 1.0
+        
+        self.fiber_data = _fiber_columns(
+            _interleave(bus_ids, _numbered("FIBER-", numbers)),
+            _interleave(bus_names, _numbered("Tapping to ONU ", numbers)),
+            _interleave(bus_length, np.full(num_onus, 0.2)),
+            _interleave(splitter_nodes - 1, splitter_nodes),
+            _interleave(splitter_nodes, onu_nodes)
+        )
+    
+    def _create_ring_topology(self, num_onus):
+        """Anillo: splitter principal y un splitter 1:2 por ONU cerrando el anillo"""
+        index = np.arange(num_onus)
+        numbers = index + 1
+        onu_nodes = 2 + num_onus + index
+        
+        self.splitter_data = _splitter_columns(
+            np.concatenate([["SPLIT-RING-0"], _numbered("SPLIT-RING-", numbers)]),
+            np.concatenate([["Ring Main Splitter"], _numbered("Ring Splitter ", numbers)]),
+            np.full(num_onus + 1, "1:2"),
+            np.arange(num_onus + 1) == 0
+        )
+        self.onu_data = _onu_columns(
+            _numbered("ONU-", numbers), _numbered("ONU ", numbers), 1 + index
+        )
+        
+        ids = [np.array(["FIBER-OLT-RING"])]
+        names = [np.array(["OLT to Ring"])]
+        lengths = [np.array([2.0])]
+        from_nodes = [np.array([OLT_NODE])]
+        to_nodes = [np.array([1])]
+        if num_onus:
+            segment = 5.0 / num_onus  # ring_radius / num_onus
+            # Segmento i (splitter i -> splitter i+1) y bajada a la ONU i+1;
+            # el cierre del anillo va antes de la última bajada
+            pairs = (
+                (_numbered("FIBER-RING-", index), _numbered("FIBER-RING-ONU-", numbers), "FIBER-RING-CLOSE"),
+                (_numbered("Ring Segment ", index), _numbered("Ring Splitter to ONU ", numbers), "Ring Closure"),
+                (np.full(num_onus, segment), np.full(num_onus, 0.5), segment),
+                (1 + index, 2 + index, 1 + num_onus),
+                (2 + index, onu_nodes, 1)
+            )
+            for target, (ring, drop, close) in zip((ids, names, lengths, from_nodes, to_nodes), pairs):
+                values = _interleave(ring, drop)
+                target.append(np.concatenate([values[:-1], [close], values[-1:]]))
+        
+        self.fiber_data = _fiber_columns(
+            np.concatenate(ids), np.concatenate(names), np.concatenate(lengths),
+            np.concatenate(from_nodes), np.concatenate(to_nodes)
+        )
+    
+    def _create_tree_topology(self, num_onus, split_ratio):
+        """Árbol de dos niveles: splitter raíz, splitters intermedios y ONUs"""
+        split_num = int(split_ratio.split(":")[1]) if ":" in split_ratio else 32
+        
+        if num_onus <= split_num:
+            # Un solo nivel (árbol degenerado = estrella)
+            self._create_star_topology(num_onus, split_ratio)
+            return
+        
+        num_intermediate = min(split_num, math.ceil(num_onus / split_num))
+        num_onus = min(num_onus, num_intermediate * split_num)
+        intermediate = np.arange(num_intermediate)
+        index = np.arange(num_onus)
+        numbers = index + 1
+        parent = index // split_num
+        position = index % split_num
+        
+        self.splitter_data = _splitter_columns(
+            np.concatenate([["SPLIT-ROOT"], _numbered("SPLIT-INTER-", intermediate + 1)]),
+            np.concatenate([["Root Splitter"], _numbered("Intermediate Splitter ", intermediate + 1)]),
+            np.full(num_intermediate + 1, split_ratio),
+            np.arange(num_intermediate + 1) == 0
+        )
+        self.onu_data = _onu_columns(
+            _numbered("ONU-", numbers), _numbered("ONU ", numbers), 1 + parent
+        )
+        self.fiber_data = _fiber_columns(
+            np.concatenate([
+                ["FIBER-ROOT"],
+                _numbered("FIBER-INTER-", intermediate + 1),
+                _numbered("FIBER-TREE-", numbers)
+            ]),
+            np.concatenate([
+                ["OLT to Root Splitter"],
+                _numbered("Root to Intermediate ", intermediate + 1),
+                np.array([
+                    f"Intermediate {inter} to ONU {number}"
+                    for inter, number in zip((parent + 1).tolist(), numbers.tolist())
+                ], dtype=str)
+            ]),
+            np.concatenate([[2.0], 2.0 + intermediate * 0.3, 1.5 + position * 0.2]),
+            np.concatenate([[OLT_NODE], np.ones(num_intermediate, dtype=np.int64), 2 + parent]),
+            np.concatenate([[1], 2 + intermediate, 2 + num_intermediate + index])
+        )
+    
+    # --- Pérdidas y power budget vectorizados ---
+    
+    def calculate_fiber_losses(self):
+        """
+        Pérdidas de todas las fibras
+        
+        Returns:
+            Diccionario de arrays {loss, splice_loss, total_loss}
+        """
+        length = self.fiber_data['length']
+        loss = length * self.fiber_data['attenuation']
+        splice_loss = 0.1 * (np.trunc(length / 2) + 1)  # 0.1 dB por empalme cada 2 km
+        return {'loss': loss, 'splice_loss': splice_loss, 'total_loss': loss + splice_loss}
+    
+    def _leave_losses(self):
+        """Pérdida al salir de cada nodo del troncal (split_loss en los splitters)"""
+        return np.concatenate([[0.0], self.splitter_data['split_loss']])
+    
+    def _tree_parents(self, fibers, from_node, to_node):
+        """
+        Padres por la orientación de las fibras si el troncal es un árbol
+        dirigido desde el OLT (una fibra de entrada por nodo); None si no
+        """
+        num_nodes = 1 + self.num_splitters
+        if len(fibers) != num_nodes - 1 or np.any(to_node == OLT_NODE):
+            return None
+        if len(np.unique(to_node)) != len(to_node):
+            return None
+        parent = np.full(num_nodes, -1)
+        parent_fiber = np.full(num_nodes, -1)
+        parent[to_node] = from_node
+        parent_fiber[to_node] = fibers
+        return parent, parent_fiber
+    
+    def _dijkstra_parents(self, fibers, from_node, to_node, edge_loss, leave_loss):
+        """Árbol de rutas de menor pérdida desde el OLT sobre el troncal (grafo no dirigido)"""
+        num_nodes = 1 + self.num_splitters
+        ends = np.concatenate([from_node, to_node])
+        others = np.concatenate([to_node, from_node]).tolist()
+        edge_fibers = np.concatenate([fibers, fibers]).tolist()
+        order = np.argsort(ends, kind='stable')
+        starts = np.searchsorted(ends[order], np.arange(num_nodes + 1)).tolist()
+        order = order.tolist()
+        edge_loss = edge_loss.tolist()
+        leave_loss = leave_loss.tolist()
+        
+        dist = [math.inf] * num_nodes
+        parent = [-1] * num_nodes
+        parent_fiber = [-1] * num_nodes
+        visited = [False] * num_nodes
+        dist[OLT_NODE] = 0.0
+        heap = [(0.0, OLT_NODE)]
+        
+        while heap:
+            loss, node = heapq.heappop(heap)
+            if visited[node]:
+                continue
+            visited[node] = True
+            for k in range(starts[node], starts[node + 1]):
+                edge = order[k]
+                neighbor = others[edge]
+                if visited[neighbor] or neighbor == OLT_NODE:
+                    continue
+                fiber = edge_fibers[edge]
+                total = loss + leave_loss[node] + edge_loss[fiber]
+                if total < dist[neighbor]:
+                    dist[neighbor] = total
+                    parent[neighbor] = node
+                    parent_fiber[neighbor] = fiber
+                    heapq.heappush(heap, (total, neighbor))
+        
+        return np.array(parent), np.array(parent_fiber)
+    
+    def _accumulate(self, parent, parent_fiber, losses, leave_loss):
+        """
+        Sumar las pérdidas desde el OLT hasta cada nodo por duplicación de
+        punteros (log2(profundidad) pasadas NumPy en lugar de un recorrido)
+        
+        Returns:
+            Matriz (nodos, 3) con [fibra, empalmes, splitters], o None si los
+            padres forman un ciclo que no llega al OLT
+        """
+        num_nodes = len(parent)
+        reachable = parent >= 0
+        reachable[OLT_NODE] = True
+        
+        acc = np.zeros((num_nodes, 3))
+        nodes = np.flatnonzero(reachable)
+        nodes = nodes[nodes != OLT_NODE]
+        fiber = parent_fiber[nodes]
+        acc[nodes, 0] = losses['loss'][fiber]
+        acc[nodes, 1] = losses['splice_loss'][fiber]
+        acc[nodes, 2] = leave_loss[parent[nodes]]
+        acc[~reachable] = np.inf
+        
+        ancestor = np.where(reachable, parent, OLT_NODE)
+        ancestor[OLT_NODE] = OLT_NODE
+        for _ in range(max(1, math.ceil(math.log2(num_nodes + 1)) + 1)):
+            if not ancestor.any():
+                break
+            acc = acc + acc[ancestor]
+            ancestor = ancestor[ancestor]
+        
+        if ancestor.any():
+            return None
+        return acc
+    
+    def _compute_power_paths(self):
+        """
+        Calcular las rutas de menor pérdida OLT -> ONU para todas las ONUs
+        
+        El troncal (OLT y splitters) se resuelve como árbol por la
+        orientación de las fibras cuando es posible y con Dijkstra si tiene
+        ciclos (anillo); las ONUs son hojas y se resuelven en un solo paso
+        vectorizado eligiendo la fibra de menor pérdida de cada una.
+        """
+        num_splitters = self.num_splitters
+        losses = self.calculate_fiber_losses()
+        leave_loss = self._leave_losses()
+        from_node = self.fiber_data['from_node']
+        to_node = self.fiber_data['to_node']
+        connected = (from_node >= 0) & (to_node >= 0)
+        onu_from = from_node > num_splitters
+        onu_to = to_node > num_splitters
+        
+        backbone = np.flatnonzero(connected & ~onu_from & ~onu_to)
+        parents = self._tree_parents(backbone, from_node[backbone], to_node[backbone])
+        acc = self._accumulate(*parents, losses, leave_loss) if parents else None
+        if acc is None:
+            parents = self._dijkstra_parents(
+                backbone, from_node[backbone], to_node[backbone], losses['total_loss'], leave_loss
+            )
+            acc = self._accumulate(*parents, losses, leave_loss)
+        parent, parent_fiber = parents
+        
+        # Fibras de bajada: exactamente un extremo es una ONU
+        drops = np.flatnonzero(connected & (onu_from != onu_to))
+        drop_onu = np.where(onu_from[drops], from_node[drops], to_node[drops]) - 1 - num_splitters
+        drop_source = np.where(onu_from[drops], to_node[drops], from_node[drops])
+        candidate = np.column_stack([
+            acc[drop_source, 0] + losses['loss'][drops],
+            acc[drop_source, 1] + losses['splice_loss'][drops],
+            acc[drop_source, 2] + leave_loss[drop_source]
+        ])
+        total = candidate.sum(axis=1)
+        
+        # Mejor fibra de bajada por ONU
+        order = np.lexsort((total, drop_onu))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = drop_onu[order][1:] != drop_onu[order][:-1]
+        best = order[first]
+        
+        onu_losses = np.full((self.num_onus, 3), np.inf)
+        onu_source = np.full(self.num_onus, -1)
+        onu_fiber = np.full(self.num_onus, -1)
+        onu_losses[drop_onu[best]] = candidate[best]
+        onu_source[drop_onu[best]] = drop_source[best]
+        onu_fiber[drop_onu[best]] = drops[best]
+        
+        # Como en OpticalNetwork, sólo cuentan las ONUs que cuelgan de un splitter
+        valid = np.isfinite(onu_losses.sum(axis=1)) & (onu_source >= 1) & (onu_source <= num_splitters)
+        
+        return {
+            'parent': parent,
+            'parent_fiber': parent_fiber,
+            'onu_losses': onu_losses,
+            'onu_source': onu_source,
+            'onu_fiber': onu_fiber,
+            'valid': valid
+        }
+    
+    def _get_power_paths(self):
+        """Obtener las rutas, calculándolas una sola vez mientras no cambien los arrays"""
+        if self._power_paths is None:
+            self._power_paths = self._compute_power_paths()
+        return self._power_paths
+    
+    def power_budget_arrays(self):
+        """
+        Power budget de todas las ONUs alcanzables como arrays
+        
+        Returns:
+            Diccionario de arrays alineados por ONU alcanzable: onu_index,
+            splitter_index, splitter_loss, total_fiber_loss, total_splice_loss,
+            total_loss, available_power, is_valid
+        """
+        if self.olt_data is None:
+            return None
+        
+        paths = self._get_power_paths()
+        onu_index = np.flatnonzero(paths['valid'])
+        losses = paths['onu_losses'][onu_index]
+        total_loss = losses[:, 0] + losses[:, 1] + losses[:, 2]
+        power_budget = self.olt_data['tx_power'] - self.olt_data['rx_sensitivity']
+        available_power = power_budget - total_loss - POWER_MARGIN
+        
+        return {
+            'onu_index': onu_index,
+            'splitter_index': paths['onu_source'][onu_index] - 1,
+            'splitter_loss': losses[:, 2],
+            'total_fiber_loss': losses[:, 0],
+            'total_splice_loss': losses[:, 1],
+            'total_loss': total_loss,
+            'available_power': available_power,
+            'is_valid': available_power >= 0
+        }
+    
+    def power_path_arrays(self):
+        """Rutas OLT -> ONU como columnas (mismo formato que OpticalNetwork)"""
+        arrays = self.power_budget_arrays()
+        if arrays is None:
+            return None
+        
+        paths = self._get_power_paths()
+        length = self.fiber_data['length']
+        attenuation = self.fiber_data['attenuation']
+        parent_fiber = paths['parent_fiber']
+        has_fiber = parent_fiber >= 0
+        fiber = np.where(has_fiber, parent_fiber, 0)
+        onu_index = arrays['onu_index']
+        drops = paths['onu_fiber'][onu_index]
+        
+        return {
+            'parent': paths['parent'],
+            'parent_length': np.where(has_fiber, length[fiber], 0.0) if len(length) else np.zeros(len(fiber)),
+            'parent_attenuation': np.where(has_fiber, attenuation[fiber], 0.0) if len(length) else np.zeros(len(fiber)),
+            'split_loss': self._leave_losses(),
+            'onu_ids': self.onu_data['id'][onu_index].tolist(),
+            'onu_source': paths['onu_source'][onu_index],
+            'onu_length': length[drops],
+            'onu_attenuation': attenuation[drops],
+            'total_loss': arrays['total_loss'],
+            'power_budget': float(self.olt_data['tx_power'] - self.olt_data['rx_sensitivity'])
+        }
+    
+    def _path_details(self, paths, onu_index, node_ids, losses):
+        """Reconstruir el detalle de fibras y splitters de la ruta OLT -> ONU"""
+        fiber_ids = []
+        splitters = []
+        fiber_ids.append(int(paths['onu_fiber'][onu_index]))
+        node = int(paths['onu_source'][onu_index])
+        while node != OLT_NODE:
+            splitters.append(node_ids[node])
+            fiber_ids.append(int(paths['parent_fiber'][node]))
+            node = int(paths['parent'][node])
+        fiber_ids.reverse()
+        splitters.reverse()
+        
+        from_node = self.fiber_data['from_node']
+        to_node = self.fiber_data['to_node']
+        fiber_losses = [
+            {
+                "from": node_ids[from_node[f]],
+                "to": node_ids[to_node[f]],
+                "length": float(self.fiber_data['length'][f]),
+                "attenuation": float(self.fiber_data['attenuation'][f]),
+                "fiber_loss": float(losses['loss'][f]),
+                "splice_loss": float(losses['splice_loss'][f])
+            }
+            for f in fiber_ids
+        ]
+        return fiber_losses, splitters
+    
+    def calculate_all_power_budgets(self, include_fiber_losses=False):
+        """Calcular power budget para todas las ONUs (mismo formato que OpticalNetwork)"""
+        arrays = self.power_budget_arrays()
+        if arrays is None:
+            return []
+        return self._power_budget_dicts(arrays, np.arange(len(arrays['onu_index'])), include_fiber_losses)
+    
+    def calculate_power_budget_path(self, onu, include_fiber_losses=True):
+        """Calcular power budget para una ONU (vista o elemento con el mismo id)"""
+        arrays = self.power_budget_arrays()
+        index = self._index_of('onu', onu.id)
+        if arrays is None or index is None:
+            return None
+        rows = np.flatnonzero(arrays['onu_index'] == index)
+        if not len(rows):
+            return None
+        result = self._power_budget_dicts(arrays, rows, include_fiber_losses)[0]
+        del result["onu_id"]
+        return result
+    
+    def _power_budget_dicts(self, arrays, rows, include_fiber_losses):
+        """Convertir filas de power_budget_arrays a diccionarios"""
+        paths = self._get_power_paths()
+        node_ids = self._node_ids()
+        losses = self.calculate_fiber_losses() if include_fiber_losses else None
+        onu_ids = self.onu_data['id']
+        ratios = self.splitter_data['ratio']
+        power_budget = self.olt_data['tx_power'] - self.olt_data['rx_sensitivity']
+        
+        columns = {key: arrays[key][rows].tolist() for key in (
+            'onu_index', 'splitter_index', 'splitter_loss', 'total_fiber_loss',
+            'total_splice_loss', 'total_loss', 'available_power', 'is_valid'
+        )}
+        results = []
+        for i in range(len(rows)):
+            onu_index = columns['onu_index'][i]
+            result = {
+                "onu_id": str(onu_ids[onu_index]),
+                "power_budget": power_budget,
+                "tx_power": self.olt_data['tx_power'],
+                "rx_sensitivity": self.olt_data['rx_sensitivity'],
+                "splitter_loss": columns['splitter_loss'][i],
+                "split_ratio": str(ratios[columns['splitter_index'][i]]),
+                "previous": node_ids[columns['splitter_index'][i] + 1],
+                "total_fiber_loss": columns['total_fiber_loss'][i],
+                "total_splice_loss": columns['total_splice_loss'][i],
+                "total_loss": columns['total_loss'][i],
+                "margin": POWER_MARGIN,
+                "available_power": columns['available_power'][i],
+                "is_valid": columns['is_valid'][i]
+            }
+            if include_fiber_losses:
+                result["fiber_losses"], result["splitters"] = self._path_details(paths, onu_index, node_ids, losses)
+            results.append(result)
+        return results
+    
+    # --- Serialización ---
+    
+    def to_dict(self):
+        """Convertir red completa a diccionario (mismo formato que OpticalNetwork)"""
+        node_ids = self._node_ids()
+        olt_id = node_ids[0]
+        num_splitters = self.num_splitters
+        
+        splitters = self.splitter_data
+        onus = self.onu_data
+        fibers = self.fiber_data
+        losses = self.calculate_fiber_losses()
+        onu_splitter = onus['splitter']
+        connected_onus = np.bincount(onu_splitter[onu_splitter >= 0], minlength=num_splitters)
+        
+        olt = None
+        if self.olt_data is not None:
+            olt = {
+                "id": olt_id,
+                "name": self.olt_data['name'],
+                "type": "OLT",
+                "tx_power": self.olt_data['tx_power'],
+                "rx_sensitivity": self.olt_data['rx_sensitivity'],
+                "total_capacity": self.olt_data['total_capacity'],
+                "connected_splitters": int(splitters['olt_connected'].sum())
+            }
+        
+        splitter_olt = np.where(splitters['olt_connected'], olt_id, None).tolist() if olt else [None] * num_splitters
+        splitter_dicts = [
+            {"id": i, "name": n, "type": "SPLITTER", "ratio": r, "split_loss": l, "olt_id": o, "connected_onus": c}
+            for i, n, r, l, o, c in zip(
+                splitters['id'].tolist(), splitters['name'].tolist(), splitters['ratio'].tolist(),
+                splitters['split_loss'].tolist(), splitter_olt, connected_onus.tolist()
+            )
+        ]
+        
+        # El índice -1 (sin splitter) selecciona el None añadido al final
+        splitter_ids = np.append(splitters['id'].astype(object), None)[onu_splitter].tolist()
+        onu_dicts = [
+            {
+                "id": i, "name": n, "type": "ONU", "tx_power": tx, "rx_sensitivity": rx,
+                "traffic_rate": t, "requested_bandwidth": b, "splitter_id": s
+            }
+            for i, n, tx, rx, t, b, s in zip(
+                onus['id'].tolist(), onus['name'].tolist(), onus['tx_power'].tolist(),
+                onus['rx_sensitivity'].tolist(), onus['traffic_rate'].tolist(),
+                onus['requested_bandwidth'].tolist(), splitter_ids
+            )
+        ]
+        
+        from_ids = self._endpoint_ids(fibers['from_node'], node_ids)
+        to_ids = self._endpoint_ids(fibers['to_node'], node_ids)
+        fiber_dicts = [
+            {
+                "id": i, "name": n, "type": "FIBER", "length": length, "attenuation": a,
+                "dispersion": d, "loss": loss, "total_loss": total, "from_element": f, "to_element": t
+            }
+            for i, n, length, a, d, loss, total, f, t in zip(
+                fibers['id'].tolist(), fibers['name'].tolist(), fibers['length'].tolist(),
+                fibers['attenuation'].tolist(), fibers['dispersion'].tolist(),
+                losses['loss'].tolist(), losses['total_loss'].tolist(), from_ids, to_ids
+            )
+        ]
+        
+        return {
+            "name": self.name,
+            "topology_type": self.topology_type,
+            "olt": olt,
+            "splitters": splitter_dicts,
+            "onus": onu_dicts,
+            "fibers": fiber_dicts
+        }
+    
+    @staticmethod
+    def _endpoint_ids(nodes, node_ids):
+        """Ids de extremos de fibra; el índice -1 (sin conectar) se traduce a None"""
+        lookup = np.array(node_ids + [None], dtype=object)
+        return lookup[nodes].tolist()
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruir la red desde el diccionario de to_dict (de cualquiera de los dos backends)"""
+        network = cls(name=data.get("name", "GPON Network"))
+        network.topology_type = data.get("topology_type", "star")
+        
+        olt = data.get("olt")
+        if olt:
+            network.olt_data = {
+                "id": olt["id"],
+                "name": olt.get("name", "OLT Principal"),
+                "tx_power": olt.get("tx_power", 2.5),
+                "rx_sensitivity": olt.get("rx_sensitivity", -27),
+                "total_capacity": olt.get("total_capacity", 2500)
+            }
+        olt_id = olt["id"] if olt else None
+        
+        splitters = data.get("splitters", [])
+        onus = data.get("onus", [])
+        fibers = data.get("fibers", [])
+        splitter_index = {s["id"]: i for i, s in enumerate(splitters)}
+        
+        network.splitter_data = _splitter_columns(
+            [s["id"] for s in splitters],
+            [s.get("name", "Splitter") for s in splitters],
+            [s.get("ratio", "1:32") for s in splitters],
+            [olt_id is not None and s.get("olt_id") == olt_id for s in splitters]
+        )
+        network.onu_data = _onu_columns(
+            [o["id"] for o in onus],
+            [o.get("name", "ONU") for o in onus],
+            [splitter_index.get(o.get("splitter_id"), -1) for o in onus],
+            tx_power=[o.get("tx_power", 1.5) for o in onus],
+            rx_sensitivity=[o.get("rx_sensitivity", -24) for o in onus],
+            traffic_rate=[o.get("traffic_rate", 0) for o in onus],
+            requested_bandwidth=[o.get("requested_bandwidth", 0) for o in onus]
+        )
+        
+        # Misma prioridad que OpticalNetwork.get_element: OLT, splitters, ONUs
+        nodes = {o["id"]: 1 + len(splitters) + i for i, o in enumerate(onus)}
+        nodes.update({s["id"]: 1 + i for i, s in enumerate(splitters)})
+        if olt_id is not None:
+            nodes[olt_id] = OLT_NODE
+        from_node = np.array([nodes.get(f.get("from_element"), -1) for f in fibers], dtype=np.int64)
+        to_node = np.array([nodes.get(f.get("to_element"), -1) for f in fibers], dtype=np.int64)
+        unconnected = (from_node < 0) | (to_node < 0)
+        from_node[unconnected] = -1
+        to_node[unconnected] = -1
+        
+        network.fiber_data = _fiber_columns(
+            [f["id"] for f in fibers],
+            [f.get("name", "Fiber") for f in fibers],
+            [f.get("length", 5.0) for f in fibers],
+            from_node,
+            to_node,
+            attenuation=[f.get("attenuation", 0.2) for f in fibers],
+            dispersion=[f.get("dispersion", 17) for f in fibers]
+        )
+        return network
+    
+    @classmethod
+    def from_network(cls, network):
+        """Convertir una OpticalNetwork de objetos a arrays"""
+        return cls.from_dict(network.to_dict())
+    
+    def to_network(self):
+        """Convertir a una OpticalNetwork de objetos"""
+        return OpticalNetwork.from_dict(self.to_dict())
+
+
+class ElementArray:
+    """Secuencia de vistas sobre las filas de un tipo de elemento"""
+    
+    __slots__ = ('_network', '_view', '_ids')
+    
+    def __init__(self, network, view, ids):
+        self._network = network
+        self._view = view
+        self._ids = ids
+    
+    def get(self, element_id, default=None):
+        """Buscar un elemento por id"""
+        index = self._network._index_of(self._view.kind, element_id)
+        return self._view(self._network, index) if index is not None else default
+    
+    def __contains__(self, item):
+        element_id = item if isinstance(item, str) else getattr(item, 'id', None)
+        return self._network._index_of(self._view.kind, element_id) is not None
+    
+    def __iter__(self):
+        for index in range(len(self._ids)):
+            yield self._view(self._network, index)
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._ids)
+        if not 0 <= index < len(self._ids):
+            raise IndexError(index)
+        return self._view(self._network, index)
+
+
+class _ElementView:
+    """Vista ligera de una fila: (red, índice) con atributos leídos de los arrays"""
+    
+    __slots__ = ('network', 'index')
+    kind = None
+    
+    def __init__(self, network, index):
+        self.network = network
+        self.index = index
+    
+    def __eq__(self, other):
+        return (
+            type(other) is type(self)
+            and other.network is self.network
+            and other.index == self.index
+        )
+    
+    def __hash__(self):
+        return hash((id(self.network), self.kind, self.index))
+    
+    def _column(self, name):
+        return getattr(self.network, f"{self.kind}_data")[name]
+    
+    @property
+    def id(self):
+        return str(self._column('id')[self.index])
+    
+    @property
+    def name(self):
+        return str(self._column('name')[self.index])
+
+
+def _float_property(column, doc):
+    """Propiedad numérica leída y escrita en una columna; escribir invalida las rutas"""
+    def getter(self):
+        return float(self._column(column)[self.index])
+    
+    def setter(self, value):
+        self._column(column)[self.index] = value
+        self.network.invalidate()
+    return property(getter, setter, doc=doc)
+
+
+class OLTView:
+    """Vista del OLT de una ArrayNetwork"""
+    
+    __slots__ = ('network',)
+    
+    def __init__(self, network):
+        self.network = network
+    
+    def __eq__(self, other):
+        return isinstance(other, OLTView) and other.network is self.network
+    
+    def __hash__(self):
+        return hash((id(self.network), 'olt'))
+    
+    id = property(lambda self: self.network.olt_data['id'])
+    name = property(lambda self: self.network.olt_data['name'])
+    tx_power = property(lambda self: self.network.olt_data['tx_power'])
+    rx_sensitivity = property(lambda self: self.network.olt_data['rx_sensitivity'])
+    total_capacity = property(lambda self: self.network.olt_data['total_capacity'])
+    
+    @property
+    def connected_splitters(self):
+        indices = np.flatnonzero(self.network.splitter_data['olt_connected'])
+        return [SplitterView(self.network, int(i)) for i in indices]
+    
+    def connect_splitter(self, splitter):
+        """Conectar un splitter al OLT"""
+        self.network.splitter_data['olt_connected'][splitter.index] = True
+    
+    def calculate_power_budget(self):
+        """Calcular el power budget disponible"""
+        return self.tx_power - self.rx_sensitivity
+    
+    def to_dict(self):
+        """Convertir a diccionario para serialización"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": "OLT",
+            "tx_power": self.tx_power,
+            "rx_sensitivity": self.rx_sensitivity,
+            "total_capacity": self.total_capacity,
+            "connected_splitters": int(self.network.splitter_data['olt_connected'].sum())
+        }
+
+
+class SplitterView(_ElementView):
+    """Vista de un splitter de una ArrayNetwork"""
+    
+    __slots__ = ()
+    kind = 'splitter'
+    
+    @property
+    def ratio(self):
+        return str(self._column('ratio')[self.index])
+    
+    @property
+    def split_loss(self):
+        return float(self._column('split_loss')[self.index])
+    
+    @property
+    def connected_olt(self):
+        return self.network.olt if self._column('olt_connected')[self.index] else None
+    
+    @property
+    def connected_onus(self):
+        indices = np.flatnonzero(self.network.onu_data['splitter'] == self.index)
+        return [ONUView(self.network, int(i)) for i in indices]
+    
+    def connect_olt(self, olt):
+        """Conectar el splitter al OLT"""
+        olt.connect_splitter(self)
+    
+    def connect_onu(self, onu):
+        """Conectar una ONU al splitter"""
+        self.network.onu_data['splitter'][onu.index] = self.index
+        self.network.invalidate()
+    
+    def to_dict(self):
+        """Convertir a diccionario para serialización"""
+        connected_olt = self.connected_olt
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": "SPLITTER",
+            "ratio": self.ratio,
+            "split_loss": self.split_loss,
+            "olt_id": connected_olt.id if connected_olt else None,
+            "connected_onus": int(np.count_nonzero(self.network.onu_data['splitter'] == self.index))
+        }
+
+
+class ONUView(_ElementView):
+    """Vista de una ONU de una ArrayNetwork"""
+    
+    __slots__ = ()
+    kind = 'onu'
+    
+    tx_power = _float_property('tx_power', "dBm")
+    rx_sensitivity = _float_property('rx_sensitivity', "dBm")
+    traffic_rate = _float_property('traffic_rate', "Mbps")
+    requested_bandwidth = _float_property('requested_bandwidth', "Mbps")
+    
+    @property
+    def connected_splitter(self):
+        splitter = self._column('splitter')[self.index]
+        return SplitterView(self.network, int(splitter)) if splitter >= 0 else None
+    
+    def connect_splitter(self, splitter):
+        """Conectar la ONU a un splitter"""
+        splitter.connect_onu(self)
+    
+    def set_traffic_rate(self, rate):
+        """Establecer tasa de tráfico"""
+        self.traffic_rate = rate
+        self.requested_bandwidth = rate * 1.2  # 20% overhead
+    
+    def to_dict(self):
+        """Convertir a diccionario para serialización"""
+        splitter = self.connected_splitter
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": "ONU",
+            "tx_power": self.tx_power,
+            "rx_sensitivity": self.rx_sensitivity,
+            "traffic_rate": self.traffic_rate,
+            "requested_bandwidth": self.requested_bandwidth,
+            "splitter_id": splitter.id if splitter else None
+        }
+
+
+class FiberView(_ElementView):
+    """Vista de una fibra de una ArrayNetwork"""
+    
+    __slots__ = ()
+    kind = 'fiber'
+    
+    length = _float_property('length', "km")
+    attenuation = _float_property('attenuation', "dB/km")
+    dispersion = _float_property('dispersion', "ps/(nm·km)")
+    
+    @property
+    def from_element(self):
+        return self.network._node_view(int(self._column('from_node')[self.index]))
+    
+    @property
+    def to_element(self):
+        return self.network._node_view(int(self._column('to_node')[self.index]))
+    
+    def calculate_loss(self):
+        """Calcular pérdida total de la fibra"""
+        return self.length * self.attenuation
+    
+    def calculate_splice_loss(self):
+        """Calcular pérdida por empalmes"""
+        return 0.1 * (int(self.length / 2) + 1)  # 0.1 dB por empalme cada 2 km
+    
+    def calculate_total_loss(self):
+        """Calcular pérdida total incluyendo empalmes"""
+        return self.calculate_loss() + self.calculate_splice_loss()
+    
+    def to_dict(self):
+        """Convertir a diccionario para serialización"""
+        from_element = self.from_element
+        to_element = self.to_element
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": "FIBER",
+            "length": self.length,
+            "attenuation": self.attenuation,
+            "dispersion": self.dispersion,
+            "loss": self.calculate_loss(),
+            "total_loss": self.calculate_total_loss(),
+            "from_element": from_element.id if from_element else None,
+            "to_element": to_element.id if to_element else None
+        }
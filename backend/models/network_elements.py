@@ -1,7 +1,90 @@
 
+import gc
+import heapq
+import math
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pausar el recolector cíclico mientras se crean muchos elementos
+    
+    Los elementos se enlazan entre sí, así que el recolector recorre toda
+    la red en cada pasada; sin pausarlo, construir redes grandes pasa la
+    mitad del tiempo en recolecciones que no liberan nada.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+class ElementCollection:
+    """
+    Colección ordenada de elementos indexada por id
+    
+    Se comporta como la lista que reemplaza (iteración en orden de
+    inserción, len, acceso por posición y `in`), pero añadir, comprobar
+    pertenencia y buscar por id son O(1).
+    """
+    
+    __slots__ = ('_items', '_by_id')
+    
+    def __init__(self, elements=()):
+        self._items = []
+        self._by_id = {}
+        for element in elements:
+            self.add(element)
+    
+    def add(self, element):
+        """Añadir un elemento si su id no está ya; devuelve True si se añadió"""
+        if element.id in self._by_id:
+            return False
+        self._by_id[element.id] = element
+        self._items.append(element)
+        return True
+    
+    def get(self, element_id, default=None):
+        """Buscar un elemento por id"""
+        return self._by_id.get(element_id, default)
+    
+    def __contains__(self, item):
+        """Pertenencia por elemento o por id"""
+        if isinstance(item, str):
+            return item in self._by_id
+        return self._by_id.get(getattr(item, 'id', None)) is item
+    
+    def __iter__(self):
+        return iter(self._items)
+    
+    def remove(self, element_id):
+        """Quitar un elemento por id; devuelve el elemento quitado o None"""
+        element = self._by_id.pop(element_id, None)
+        if element is not None:
+            self._items.remove(element)
+        return element
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def __getitem__(self, index):
+        return self._items[index]
+    
+    def __repr__(self):
+        return f"ElementCollection({self._items!r})"
+
+
 class OLT:
     """Optical Line Terminal - Terminal de línea óptica"""
     
+    __slots__ = ('id', 'name', 'tx_power', 'rx_sensitivity', 'connected_splitters', 'total_capacity')
+    
     def __init__(self, id="OLT-1", name="OLT Principal", tx_power=2.5, rx_sensitivity=-27):
         self.id = id
         self.name = name
@@ -11,10 +94,10 @@ class OLT:
         self.total_capacity = 2500  # Mbps (GPON estándar)
         
     def connect_splitter(self, splitter):
-        """Conectar un splitter al OLT"""
-        if splitter not in self.connected_splitters:
+        """Conectar un splitter al OLT (el enlace inverso evita buscar en la lista)"""
+        if splitter.connected_olt is not self:
             self.connected_splitters.append(splitter)
-            splitter.connect_olt(self)
+            splitter.connected_olt = self
     
     def calculate_power_budget(self):
         """Calcular el power budget disponible"""
@@ -31,11 +114,26 @@ class OLT:
             "total_capacity": self.total_capacity,
             "connected_splitters": len(self.connected_splitters)
         }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crear OLT desde un diccionario generado por to_dict"""
+        olt = cls(
+            id=data["id"],
+            name=data.get("name", "OLT Principal"),
+            tx_power=data.get("tx_power", 2.5),
+            rx_sensitivity=data.get("rx_sensitivity", -27)
+        )
+        olt.total_capacity = data.get("total_capacity", olt.total_capacity)
+        return olt
 
 
 class ONU:
     """Optical Network Unit - Unidad de red óptica"""
     
+    __slots__ = ('id', 'name', 'tx_power', 'rx_sensitivity', 'connected_splitter',
+                 'traffic_rate', 'requested_bandwidth')
+    
     def __init__(self, id="ONU-1", name="ONU", tx_power=1.5, rx_sensitivity=-24):
         self.id = id
         self.name = name
@@ -47,7 +145,6 @@ class ONU:
         
     def connect_splitter(self, splitter):
         """Conectar la ONU a un splitter"""
-        self.connected_splitter = splitter
         splitter.connect_onu(self)
     
     def set_traffic_rate(self, rate):
@@ -67,11 +164,37 @@ class ONU:
             "requested_bandwidth": self.requested_bandwidth,
             "splitter_id": self.connected_splitter.id if self.connected_splitter else None
         }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crear ONU desde un diccionario generado por to_dict (sin conexiones)"""
+        onu = cls(
+            id=data["id"],
+            name=data.get("name", "ONU"),
+            tx_power=data.get("tx_power", 1.5),
+            rx_sensitivity=data.get("rx_sensitivity", -24)
+        )
+        onu.traffic_rate = data.get("traffic_rate", 0)
+        onu.requested_bandwidth = data.get("requested_bandwidth", 0)
+        return onu
+
+
+@lru_cache(maxsize=None)
+def _split_loss(ratio):
+    """Pérdida por splitting de un ratio (hay pocos ratios distintos por red)"""
+    # Formato esperado: "1:32" o "1:8"
+    if ":" in ratio:
+        split_count = int(ratio.split(":")[1])
+        # Fórmula: 10 * log10(N) donde N es el número de puertos de salida
+        return 10 * math.log10(split_count)
+    return 15  # Valor por defecto
 
 
 class Splitter:
     """Splitter óptico pasivo"""
     
+    __slots__ = ('id', 'name', 'ratio', 'split_loss', 'connected_olt', 'connected_onus')
+    
     def __init__(self, id="SPLIT-1", name="Splitter", ratio="1:32"):
         self.id = id
         self.name = name
@@ -82,21 +205,17 @@ class Splitter:
         
     def _calculate_split_loss(self, ratio):
         """Calcular pérdida por splitting"""
-        # Formato esperado: "1:32" o "1:8"
-        if ":" in ratio:
-            split_count = int(ratio.split(":")[1])
-            # Fórmula: 10 * log10(N) donde N es el número de puertos de salida
-            return 10 * __import__('math').log10(split_count)
-        return 15  # Valor por defecto
+        return _split_loss(ratio)
     
     def connect_olt(self, olt):
         """Conectar el splitter a un OLT"""
-        self.connected_olt = olt
+        olt.connect_splitter(self)
     
     def connect_onu(self, onu):
-        """Conectar una ONU al splitter"""
-        if onu not in self.connected_onus:
+        """Conectar una ONU al splitter (el enlace inverso evita buscar en la lista)"""
+        if onu.connected_splitter is not self:
             self.connected_onus.append(onu)
+            onu.connected_splitter = self
     
     def to_dict(self):
         """Convertir a diccionario para serialización"""
@@ -109,11 +228,22 @@ class Splitter:
             "olt_id": self.connected_olt.id if self.connected_olt else None,
             "connected_onus": len(self.connected_onus)
         }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crear splitter desde un diccionario generado por to_dict (sin conexiones)"""
+        return cls(
+            id=data["id"],
+            name=data.get("name", "Splitter"),
+            ratio=data.get("ratio", "1:32")
+        )
 
 
 class OpticalFiber:
     """Fibra óptica con propiedades de transmisión"""
     
+    __slots__ = ('id', 'name', 'length', 'attenuation', 'dispersion', 'from_element', 'to_element')
+    
     def __init__(self, id="FIBER-1", name="Fiber", length=5.0, 
                  attenuation=0.2, dispersion=17):
         self.id = id
@@ -133,11 +263,13 @@ class OpticalFiber:
         """Calcular pérdida total de la fibra"""
         return self.length * self.attenuation
     
+    def calculate_splice_loss(self):
+        """Calcular pérdida por empalmes"""
+        return 0.1 * (int(self.length / 2) + 1)  # 0.1 dB por empalme cada 2 km
+    
     def calculate_total_loss(self):
         """Calcular pérdida total incluyendo empalmes"""
-        fiber_loss = self.calculate_loss()
-        splice_loss = 0.1 * (int(self.length / 2) + 1)  # 0.1 dB por empalme cada 2 km
-        return fiber_loss + splice_loss
+        return self.calculate_loss() + self.calculate_splice_loss()
     
     def to_dict(self):
         """Convertir a diccionario para serialización"""
@@ -153,6 +285,17 @@ class OpticalFiber:
             "from_element": self.from_element.id if self.from_element else None,
             "to_element": self.to_element.id if self.to_element else None
         }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crear fibra desde un diccionario generado por to_dict (sin conexiones)"""
+        return cls(
+            id=data["id"],
+            name=data.get("name", "Fiber"),
+            length=data.get("length", 5.0),
+            attenuation=data.get("attenuation", 0.2),
+            dispersion=data.get("dispersion", 17)
+        )
 
 
 class OpticalNetwork:
@@ -161,28 +304,46 @@ class OpticalNetwork:
     def __init__(self, name="GPON Network"):
         self.name = name
         self.olt = None
-        self.splitters = []
-        self.onus = []
-        self.fibers = []
+        self.splitters = ElementCollection()
+        self.onus = ElementCollection()
+        self.fibers = ElementCollection()
+        self._power_paths = None
+        self._power_children = None
+        # Se incrementa al empezar y al terminar cada edición (impar mientras dura)
+        self.version = 0
+        # Hilo de la edición en curso y cerrojo entre el inicio de una edición
+        # y el guardado de las rutas calculadas por otro hilo
+        self._editor = None
+        self._paths_lock = threading.Lock()
         
     def add_olt(self, olt):
         """Agregar OLT a la red"""
         self.olt = olt
+        self.invalidate()
     
     def add_splitter(self, splitter):
         """Agregar splitter a la red"""
-        if splitter not in self.splitters:
-            self.splitters.append(splitter)
+        self.splitters.add(splitter)
     
     def add_onu(self, onu):
         """Agregar ONU a la red"""
-        if onu not in self.onus:
-            self.onus.append(onu)
+        self.onus.add(onu)
     
     def add_fiber(self, fiber):
         """Agregar fibra a la red"""
-        if fiber not in self.fibers:
-            self.fibers.append(fiber)
+        if self.fibers.add(fiber):
+            self.invalidate()
+    
+    def invalidate(self):
+        """Descartar las rutas de power budget calculadas tras modificar la red"""
+        self._power_paths = None
+        self._power_children = None
+    
+    def get_element(self, element_id):
+        """Buscar el OLT, un splitter o una ONU por id"""
+        if self.olt is not None and self.olt.id == element_id:
+            return self.olt
+        return self.splitters.get(element_id) or self.onus.get(element_id)
     
     def create_ftth_topology(self, num_onus=32, split_ratio="1:32", topology_type="star"):
         """
@@ -194,18 +355,20 @@ class OpticalNetwork:
             topology_type: Tipo de topología ('star', 'bus', 'ring', 'tree')
         """
         self.topology_type = topology_type
+        self.invalidate()
         
-        if topology_type == "star":
-            self._create_star_topology(num_onus, split_ratio)
-        elif topology_type == "bus":
-            self._create_bus_topology(num_onus)
-        elif topology_type == "ring":
-            self._create_ring_topology(num_onus)
-        elif topology_type == "tree":
-            self._create_tree_topology(num_onus, split_ratio)
-        else:
-            # Por defecto estrella
-            self._create_star_topology(num_onus, split_ratio)
+        with _gc_paused():
+            if topology_type == "star":
+                self._create_star_topology(num_onus, split_ratio)
+            elif topology_type == "bus":
+                self._create_bus_topology(num_onus)
+            elif topology_type == "ring":
+                self._create_ring_topology(num_onus)
+            elif topology_type == "tree":
+                self._create_tree_topology(num_onus, split_ratio)
+            else:
+                # Por defecto estrella
+                self._create_star_topology(num_onus, split_ratio)
     
     def _create_star_topology(self, num_onus=32, split_ratio="1:32"):
         """Generar topología en estrella (GPON estándar)"""
@@ -230,7 +393,7 @@ class OpticalNetwork:
         for i in range(num_onus):
             onu = ONU(id=f"ONU-{i+1}", name=f"ONU {i+1}")
             self.add_onu(onu)
-            splitter.connect_onu(onu)
+            onu.connect_splitter(splitter)
             
             # Crear fibra Splitter-ONU
             fiber = OpticalFiber(
@@ -278,7 +441,7 @@ class OpticalNetwork:
                 fiber_bus.connect(prev_splitter, splitter)
                 self.add_fiber(fiber_bus)
             
-            splitter.connect_onu(onu)
+            onu.connect_splitter(splitter)
             
             # Fibra del splitter a la ONU
             fiber = OpticalFiber(
@@ -351,7 +514,7 @@ class OpticalNetwork:
                 fiber_close.connect(splitter, main_splitter)
                 self.add_fiber(fiber_close)
             
-            splitter.connect_onu(onu)
+            onu.connect_splitter(splitter)
             
             # Fibra del splitter a la ONU
             fiber = OpticalFiber(
@@ -368,7 +531,6 @@ class OpticalNetwork:
         self.olt = OLT(id="OLT-1", name="OLT Principal")
         
         # Calcular niveles del árbol
-        import math
         split_num = int(split_ratio.split(":")[1]) if ":" in split_ratio else 32
         
         if num_onus <= split_num:
@@ -419,7 +581,7 @@ class OpticalNetwork:
             for j in range(onus_per_intermediate):
                 onu = ONU(id=f"ONU-{onu_counter+1}", name=f"ONU {onu_counter+1}")
                 self.add_onu(onu)
-                inter_splitter.connect_onu(onu)
+                onu.connect_splitter(inter_splitter)
                 
                 fiber_onu = OpticalFiber(
                     id=f"FIBER-TREE-{onu_counter+1}",
@@ -437,37 +599,367 @@ class OpticalNetwork:
             if onu_counter >= num_onus:
                 break
     
-    def calculate_power_budget_path(self, onu):
-        """Calcular power budget para una ruta OLT-ONU"""
-        if not self.olt or not onu.connected_splitter:
-            return None
+    def _build_adjacency(self):
+        """Construir índice de adyacencia {element_id: [(fibra, vecino), ...]}"""
+        adjacency = {}
+        for fiber in self.fibers:
+            if fiber.from_element is None or fiber.to_element is None:
+                continue
+            adjacency.setdefault(fiber.from_element.id, []).append((fiber, fiber.to_element))
+            adjacency.setdefault(fiber.to_element.id, []).append((fiber, fiber.from_element))
+        return adjacency
+    
+    def _compute_power_paths(self):
+        """
+        Calcular en un solo recorrido la ruta de menor pérdida desde el OLT
+        hasta cada elemento (Dijkstra sobre el índice de adyacencia)
         
-        # Calcular power budget base
-        power_budget = self.olt.calculate_power_budget()
+        Cada fibra aporta su atenuación y sus empalmes, y cada splitter
+        atravesado aporta su pérdida de splitting, por lo que las rutas en
+        bus, anillo y árbol acumulan todos los splitters en cascada.
         
-        # Pérdida en splitter
-        splitter_loss = onu.connected_splitter.split_loss
-        split_ratio = onu.connected_splitter.ratio
+        Returns:
+            Diccionario {element_id: etiqueta} con las pérdidas acumuladas y
+            el predecesor (element_id, fibra) de cada elemento alcanzable
+        """
+        adjacency = self._build_adjacency()
+        labels = {
+            self.olt.id: {
+                "total_loss": 0.0,
+                "fiber_loss": 0.0,
+                "splice_loss": 0.0,
+                "splitter_loss": 0.0,
+                "previous": None,
+                "splitter": None
+            }
+        }
+        visited = set()
+        heap = [(0.0, 0, self.olt.id, self.olt)]
+        counter = 1
         
-        # Pérdidas en fibras
+        while heap:
+            _, _, element_id, element = heapq.heappop(heap)
+            if element_id in visited:
+                continue
+            visited.add(element_id)
+            
+            # Las ONUs son hojas: no se propaga la señal a través de ellas
+            if isinstance(element, ONU):
+                continue
+            
+            label = labels[element_id]
+            
+            for fiber, neighbor in adjacency.get(element_id, []):
+                if neighbor.id in visited or isinstance(neighbor, OLT):
+                    continue
+                candidate = self._next_label(label, element, fiber)
+                
+                current = labels.get(neighbor.id)
+                if current is None or candidate["total_loss"] < current["total_loss"]:
+                    labels[neighbor.id] = candidate
+                    heapq.heappush(heap, (candidate["total_loss"], counter, neighbor.id, neighbor))
+                    counter += 1
+        
+        return labels
+    
+    @staticmethod
+    def _next_label(label, element, fiber):
+        """Etiqueta de un vecino alcanzado desde element (con etiqueta label) por fiber"""
+        leaving_loss = element.split_loss if isinstance(element, Splitter) else 0.0
+        fiber_loss = fiber.calculate_loss()
+        splice_loss = fiber.calculate_splice_loss()
+        return {
+            "total_loss": label["total_loss"] + leaving_loss + fiber_loss + splice_loss,
+            "fiber_loss": label["fiber_loss"] + fiber_loss,
+            "splice_loss": label["splice_loss"] + splice_loss,
+            "splitter_loss": label["splitter_loss"] + leaving_loss,
+            "previous": (element.id, fiber),
+            "splitter": element if isinstance(element, Splitter) else label["splitter"]
+        }
+    
+    def _cacheable(self, version):
+        """
+        Si un cálculo empezado en `version` puede guardarse (con _paths_lock)
+        
+        Las rutas de un lector que coincidió con una edición serían las de
+        la red anterior y la edición ya las habría descartado; sólo el hilo
+        que edita guarda las que calcula durante la edición.
+        """
+        return self.version == version and (version % 2 == 0 or self._editor == threading.get_ident())
+    
+    def _get_power_paths(self):
+        """Obtener el índice de rutas, construyéndolo una sola vez por red"""
+        paths = self._power_paths
+        if paths is None:
+            version = self.version
+            paths = self._compute_power_paths()
+            with self._paths_lock:
+                if self._cacheable(version):
+                    self._power_paths = paths
+        return paths
+    
+    def _get_power_children(self):
+        """
+        Hijos de cada elemento en el árbol de rutas y si la red es un árbol
+        
+        La red es un árbol cuando tiene una fibra conectada menos que
+        elementos alcanzables: cada elemento tiene una única ruta posible
+        y cambiar una pérdida no desvía ninguna ruta.
+        
+        Returns:
+            Tupla ({element_id: [ids de los hijos]}, es_arbol)
+        """
+        power_children = self._power_children
+        if power_children is None:
+            version = self.version
+            labels = self._get_power_paths()
+            children = {}
+            for element_id, label in labels.items():
+                if label["previous"] is not None:
+                    children.setdefault(label["previous"][0], []).append(element_id)
+            connected = sum(
+                1 for fiber in self.fibers
+                if fiber.from_element is not None and fiber.to_element is not None
+            )
+            power_children = (children, connected == len(labels) - 1)
+            with self._paths_lock:
+                if self._cacheable(version):
+                    self._power_children = power_children
+        return power_children
+    
+    def _path_root(self, element_id):
+        """Elemento desde el que cuelga el subárbol de rutas que pasa por un splitter o una fibra"""
+        labels = self._get_power_paths()
+        fiber = self.fibers.get(element_id)
+        if fiber is None:
+            return element_id if element_id in labels else None
+        for end in (fiber.to_element, fiber.from_element):
+            label = labels.get(end.id) if end is not None else None
+            if label is not None and label["previous"] is not None and label["previous"][1] is fiber:
+                return end.id
+        return None
+    
+    def _subtree(self, element_id):
+        """Ids de un elemento y de todos los que cuelgan de él (cada padre antes que sus hijos)"""
+        children, _ = self._get_power_children()
+        subtree = []
+        pending = [element_id]
+        while pending:
+            current = pending.pop()
+            subtree.append(current)
+            pending.extend(children.get(current, ()))
+        return subtree
+    
+    def downstream_onus(self, element_id):
+        """Ids de las ONUs cuya ruta desde el OLT pasa por un splitter o una fibra"""
+        root = self._path_root(element_id)
+        if root is None:
+            return []
+        return [node for node in self._subtree(root) if node in self.onus]
+    
+    # --- Edición incremental ---
+    
+    @contextmanager
+    def _editing(self):
+        """
+        Marcar una edición en curso
+        
+        version es impar mientras dura la edición y cambia al terminar, así
+        que quien calcula sobre una red compartida puede comprobar al final
+        si la red cambió mientras tanto.
+        """
+        with self._paths_lock:
+            self.version += 1
+            self._editor = threading.get_ident()
+        try:
+            yield
+        finally:
+            self._editor = None
+            self.version += 1
+    
+    def _reroute(self, element_id, change):
+        """
+        Aplicar change() a un splitter o una fibra y actualizar las rutas
+        
+        En una red en árbol sólo se recalculan, con la misma aritmética que
+        el recorrido completo, las etiquetas del subárbol del elemento. Con
+        rutas alternativas (anillo) se recalculan todas y las afectadas son
+        las ONUs que estaban o quedan aguas abajo del elemento.
+        
+        Returns:
+            Ids de las ONUs cuyo power budget cambia
+        """
+        if self._power_paths is None:
+            change()
+            return self.downstream_onus(element_id)
+        
+        _, is_tree = self._get_power_children()
+        if not is_tree:
+            before = self.downstream_onus(element_id)
+            change()
+            self.invalidate()
+            after = self.downstream_onus(element_id)
+            return list(dict.fromkeys(before + after))
+        
+        change()
+        root = self._path_root(element_id)
+        if root is None:
+            return []
+        labels = self._power_paths
+        affected = []
+        for node in self._subtree(root):
+            previous_id, fiber = labels[node]["previous"]
+            labels[node] = self._next_label(labels[previous_id], self.get_element(previous_id), fiber)
+            if node in self.onus:
+                affected.append(node)
+        return affected
+    
+    def set_fiber_length(self, fiber_id, length):
+        """
+        Cambiar la longitud de una fibra
+        
+        Returns:
+            Ids de las ONUs aguas abajo de la fibra, cuyo power budget cambia
+        """
+        fiber = self.fibers.get(fiber_id)
+        if fiber is None:
+            raise KeyError(fiber_id)
+        
+        def change():
+            fiber.length = length
+        
+        with self._editing():
+            return self._reroute(fiber_id, change)
+    
+    def set_splitter_ratio(self, splitter_id, ratio):
+        """
+        Cambiar el ratio (y la pérdida por splitting) de un splitter
+        
+        Returns:
+            Ids de las ONUs aguas abajo del splitter, cuyo power budget cambia
+        """
+        splitter = self.splitters.get(splitter_id)
+        if splitter is None:
+            raise KeyError(splitter_id)
+        
+        def change():
+            splitter.ratio = ratio
+            splitter.split_loss = _split_loss(ratio)
+        
+        with self._editing():
+            return self._reroute(splitter_id, change)
+    
+    def attach_onu(self, onu, splitter_id, fiber):
+        """
+        Agregar una ONU colgada de un splitter con su fibra de bajada
+        
+        Las ONUs son hojas, así que sólo se calcula la ruta de la nueva ONU.
+        
+        Returns:
+            Ids de las ONUs cuyo power budget cambia (sólo la nueva)
+        """
+        splitter = self.splitters.get(splitter_id)
+        if splitter is None:
+            raise KeyError(splitter_id)
+        
+        with self._editing():
+            self.onus.add(onu)
+            onu.connect_splitter(splitter)
+            fiber.connect(splitter, onu)
+            self.fibers.add(fiber)
+            
+            labels = self._power_paths
+            if labels is None:
+                return [onu.id]
+            if splitter.id not in labels:
+                # Fibra conectada a un elemento inalcanzable: ya no es un árbol
+                self._power_children = None
+                return [onu.id]
+            labels[onu.id] = self._next_label(labels[splitter.id], splitter, fiber)
+            if self._power_children is not None:
+                self._power_children[0].setdefault(splitter.id, []).append(onu.id)
+            return [onu.id]
+    
+    def remove_onu(self, onu_id):
+        """
+        Quitar una ONU y sus fibras
+        
+        Returns:
+            Fibras quitadas
+        """
+        onu = self.onus.get(onu_id)
+        if onu is None:
+            raise KeyError(onu_id)
+        
+        with self._editing():
+            fibers = [f for f in self.fibers if f.from_element is onu or f.to_element is onu]
+            for fiber in fibers:
+                self.fibers.remove(fiber.id)
+            self.onus.remove(onu_id)
+            splitter = onu.connected_splitter
+            if splitter is not None:
+                splitter.connected_onus.remove(onu)
+                onu.connected_splitter = None
+            
+            if self._power_paths is not None:
+                label = self._power_paths.pop(onu_id, None)
+                if len(fibers) != 1 or label is None:
+                    self._power_children = None
+                elif self._power_children is not None:
+                    self._power_children[0][label["previous"][0]].remove(onu_id)
+            return fibers
+    
+    def _path_fiber_losses(self, labels, element_id):
+        """Reconstruir el detalle de fibras de la ruta OLT -> elemento"""
         fiber_losses = []
-        total_fiber_loss = 0
-        total_splice_loss = 0
+        splitters = []
+        previous = labels[element_id]["previous"]
+        while previous is not None:
+            previous_id, fiber = previous
+            fiber_losses.append({
+                "from": fiber.from_element.id if fiber.from_element else "N/A",
+                "to": fiber.to_element.id if fiber.to_element else "N/A",
+                "length": fiber.length,
+                "attenuation": fiber.attenuation,
+                "fiber_loss": fiber.calculate_loss(),
+                "splice_loss": fiber.calculate_splice_loss()
+            })
+            if previous_id != self.olt.id:
+                splitters.append(previous_id)
+            previous = labels[previous_id]["previous"]
+        fiber_losses.reverse()
+        splitters.reverse()
+        return fiber_losses, splitters
+    
+    def calculate_power_budget_path(self, onu, include_fiber_losses=True):
+        """
+        Calcular power budget para una ruta OLT-ONU
         
-        for fiber in self.fibers:
-            if fiber.to_element == onu or (fiber.from_element == self.olt and fiber.to_element == onu.connected_splitter):
-                fiber_attenuation = fiber.calculate_loss()
-                splice_loss = 0.1 * (int(fiber.length / 2) + 1)
-                total_fiber_loss += fiber_attenuation
-                total_splice_loss += splice_loss
-                fiber_losses.append({
-                    "from": fiber.from_element.id if fiber.from_element else "N/A",
-                    "to": fiber.to_element.id if fiber.to_element else "N/A",
-                    "length": fiber.length,
-                    "attenuation": fiber.attenuation,
-                    "fiber_loss": fiber_attenuation,
-                    "splice_loss": splice_loss
-                })
+        La ruta incluye todas las fibras, empalmes y splitters en cascada
+        entre el OLT y la ONU. Las rutas se calculan una sola vez por red.
+        'previous' es el elemento desde el que se llega a la ONU.
+        
+        Args:
+            onu: ONU destino
+            include_fiber_losses: Incluir el detalle de cada fibra de la ruta
+                ('fiber_losses') y los splitters que atraviesa ('splitters')
+        """
+        if not self.olt:
+            return None
+        
+        labels = self._get_power_paths()
+        label = labels.get(onu.id)
+        if label is None or label["splitter"] is None:
+            return None
+        
+        # Calcular power budget base
+        power_budget = self.olt.calculate_power_budget()
+        
+        # Pérdida acumulada en splitters y fibras
+        splitter_loss = label["splitter_loss"]
+        split_ratio = label["splitter"].ratio
+        total_fiber_loss = label["fiber_loss"]
+        total_splice_loss = label["splice_loss"]
         
         total_loss = splitter_loss + total_fiber_loss + total_splice_loss
         
@@ -475,13 +967,13 @@ class OpticalNetwork:
         margin = 3.0
         available_power = power_budget - total_loss - margin
         
-        return {
+        result = {
             "power_budget": power_budget,
             "tx_power": self.olt.tx_power,
             "rx_sensitivity": self.olt.rx_sensitivity,
             "splitter_loss": splitter_loss,
             "split_ratio": split_ratio,
-            "fiber_losses": fiber_losses,
+            "previous": label["previous"][0],
             "total_fiber_loss": total_fiber_loss,
             "total_splice_loss": total_splice_loss,
             "total_loss": total_loss,
@@ -489,6 +981,88 @@ class OpticalNetwork:
             "available_power": available_power,
             "is_valid": available_power >= 0
         }
+        if include_fiber_losses:
+            result["fiber_losses"], result["splitters"] = self._path_fiber_losses(labels, onu.id)
+        return result
+    
+    def calculate_all_power_budgets(self, include_fiber_losses=False):
+        """
+        Calcular power budget para todas las ONUs alcanzables desde el OLT
+        
+        Por defecto cada ONU sólo lleva los totales de su ruta y 'previous';
+        el detalle de fibras de todas las rutas crece con el cuadrado del
+        número de ONUs en bus y anillo, así que se pide por ONU con
+        calculate_power_budget_path.
+        """
+        results = []
+        for onu in self.onus:
+            power_budget = self.calculate_power_budget_path(onu, include_fiber_losses)
+            if power_budget:
+                results.append({
+                    "onu_id": onu.id,
+                    **power_budget
+                })
+        return results
+    
+    def power_path_arrays(self):
+        """
+        Rutas OLT -> ONU como columnas, para cálculos vectorizados
+        
+        Los nodos del troncal se numeran 0 (OLT) y 1..S (splitters en orden);
+        cada uno guarda su padre en el árbol de rutas (-1 para el OLT y los
+        inalcanzables) y la fibra por la que se llega a él. Las ONUs son las
+        de calculate_all_power_budgets, con el nodo del que cuelgan y su
+        fibra de bajada.
+        
+        Returns:
+            Diccionario {parent, parent_length, parent_attenuation, split_loss,
+            onu_ids, onu_source, onu_length, onu_attenuation, total_loss,
+            power_budget}, o None si la red no tiene OLT
+        """
+        if not self.olt:
+            return None
+        
+        labels = self._get_power_paths()
+        nodes = {self.olt.id: 0}
+        for splitter in self.splitters:
+            nodes[splitter.id] = len(nodes)
+        
+        parent = [-1] * len(nodes)
+        parent_length = [0.0] * len(nodes)
+        parent_attenuation = [0.0] * len(nodes)
+        for splitter in self.splitters:
+            label = labels.get(splitter.id)
+            if label is None or label["previous"] is None:
+                continue
+            previous_id, fiber = label["previous"]
+            node = nodes[splitter.id]
+            parent[node] = nodes[previous_id]
+            parent_length[node] = fiber.length
+            parent_attenuation[node] = fiber.attenuation
+        
+        paths = {
+            "parent": parent,
+            "parent_length": parent_length,
+            "parent_attenuation": parent_attenuation,
+            "split_loss": [0.0] + [splitter.split_loss for splitter in self.splitters],
+            "onu_ids": [],
+            "onu_source": [],
+            "onu_length": [],
+            "onu_attenuation": [],
+            "total_loss": [],
+            "power_budget": self.olt.calculate_power_budget()
+        }
+        for onu in self.onus:
+            label = labels.get(onu.id)
+            if label is None or label["splitter"] is None:
+                continue
+            previous_id, fiber = label["previous"]
+            paths["onu_ids"].append(onu.id)
+            paths["onu_source"].append(nodes[previous_id])
+            paths["onu_length"].append(fiber.length)
+            paths["onu_attenuation"].append(fiber.attenuation)
+            paths["total_loss"].append(label["splitter_loss"] + label["fiber_loss"] + label["splice_loss"])
+        return paths
     
     def to_dict(self):
         """Convertir red completa a diccionario"""
@@ -500,4 +1074,40 @@ class OpticalNetwork:
             "onus": [o.to_dict() for o in self.onus],
             "fibers": [f.to_dict() for f in self.fibers]
         }
-
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruir la red exacta a partir del diccionario de to_dict
+        
+        Se restauran las conexiones OLT-splitter, splitter-ONU y los extremos
+        y longitudes de cada fibra, sin volver a generar la topología.
+        """
+        network = cls(name=data.get("name", "GPON Network"))
+        network.topology_type = data.get("topology_type", "star")
+        
+        if data.get("olt"):
+            network.add_olt(OLT.from_dict(data["olt"]))
+        
+        for splitter_data in data.get("splitters", []):
+            splitter = Splitter.from_dict(splitter_data)
+            network.add_splitter(splitter)
+            if network.olt and splitter_data.get("olt_id") == network.olt.id:
+                network.olt.connect_splitter(splitter)
+        
+        for onu_data in data.get("onus", []):
+            onu = ONU.from_dict(onu_data)
+            network.add_onu(onu)
+            splitter = network.splitters.get(onu_data.get("splitter_id"))
+            if splitter is not None:
+                onu.connect_splitter(splitter)
+        
+        for fiber_data in data.get("fibers", []):
+            fiber = OpticalFiber.from_dict(fiber_data)
+            from_element = network.get_element(fiber_data.get("from_element"))
+            to_element = network.get_element(fiber_data.get("to_element"))
+            if from_element is not None and to_element is not None:
+                fiber.connect(from_element, to_element)
+            network.add_fiber(fiber)
+        
+        return network
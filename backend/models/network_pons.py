@@ -0,0 +1,244 @@
+"""
+Redes con varios puertos PON: un árbol de splitters y ONUs por OLT
+"""
+from collections import deque
+
+from models.network_elements import OpticalNetwork
+
+
+MAX_PON_PORTS = 128
+
+# Claves de los elementos de cada árbol en to_dict()
+ELEMENT_KEYS = ('splitters', 'onus', 'fibers')
+
+
+def pon_ports_option(value):
+    """Validar el número de puertos PON de una topología (por defecto 1)"""
+    if value is None:
+        return 1
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_PON_PORTS:
+        raise ValueError(f"pon_ports debe ser un entero entre 1 y {MAX_PON_PORTS}")
+    return value
+
+
+def relabel_pon(data, port):
+    """
+    Renombrar una red serializada de un solo OLT como el puerto PON `port`
+    
+    El OLT pasa a ser OLT-<port> y el resto de ids llevan el prefijo
+    PON<port>-, de modo que los árboles de todos los puertos pueden
+    guardarse juntos. Devuelve un diccionario nuevo sin modificar data.
+    """
+    prefix = f"PON{port}-"
+    olt = data.get("olt")
+    olt_id = f"OLT-{port}"
+    ids = {olt["id"]: olt_id} if olt else {}
+    
+    def rename(element_id):
+        if element_id is None:
+            return None
+        return ids.get(element_id) or prefix + element_id
+    
+    def element(item, **references):
+        return {
+            **item,
+            "id": rename(item["id"]),
+            "name": f"{item['name']} (PON {port})",
+            **{key: rename(item.get(key)) for key in references}
+        }
+    
+    return {
+        "name": data.get("name"),
+        "topology_type": data.get("topology_type", "star"),
+        "olt": {**olt, "id": olt_id, "name": f"OLT PON {port}"} if olt else None,
+        "splitters": [element(item, olt_id=True) for item in data.get("splitters", [])],
+        "onus": [element(item, splitter_id=True) for item in data.get("onus", [])],
+        "fibers": [
+            element(item, from_element=True, to_element=True) for item in data.get("fibers", [])
+        ]
+    }
+
+
+def split_pons(data):
+    """
+    Separar una red serializada con varios OLT en una red por OLT
+    
+    Cada splitter, ONU y fibra pertenece al árbol del OLT desde el que se
+    alcanza por sus conexiones (olt_id, splitter_id y extremos de fibra).
+    Los elementos que no se alcanzan desde ningún OLT se asignan al primero.
+    
+    Returns:
+        Lista de diccionarios con el formato de OpticalNetwork.to_dict()
+    """
+    olts = data.get("olts") or [None]
+    owner = {olt["id"]: port for port, olt in enumerate(olts) if olt}
+    
+    neighbours = {}
+    
+    def link(a, b):
+        if a is not None and b is not None:
+            neighbours.setdefault(a, []).append(b)
+            neighbours.setdefault(b, []).append(a)
+    
+    for splitter in data.get("splitters", []):
+        link(splitter["id"], splitter.get("olt_id"))
+    for onu in data.get("onus", []):
+        link(onu["id"], onu.get("splitter_id"))
+    for fiber in data.get("fibers", []):
+        link(fiber.get("from_element"), fiber.get("to_element"))
+    
+    # Recorrido en anchura simultáneo desde todos los OLT
+    pending = deque(owner)
+    while pending:
+        element_id = pending.popleft()
+        for neighbour in neighbours.get(element_id, ()):
+            if neighbour not in owner:
+                owner[neighbour] = owner[element_id]
+                pending.append(neighbour)
+    
+    pons = [
+        {
+            "name": data.get("name"),
+            "topology_type": data.get("topology_type", "star"),
+            "olt": olt,
+            "splitters": [],
+            "onus": [],
+            "fibers": []
+        }
+        for olt in olts
+    ]
+    for key in ('splitters', 'onus'):
+        for item in data.get(key, []):
+            pons[owner.get(item["id"], 0)][key].append(item)
+    for fiber in data.get("fibers", []):
+        port = owner.get(fiber.get("from_element"), owner.get(fiber.get("to_element"), 0))
+        pons[port]["fibers"].append(fiber)
+    return pons
+
+
+def _object_network(num_onus):
+    """Representación por defecto de cada puerto PON"""
+    return OpticalNetwork
+
+
+class PonNetwork:
+    """
+    Red con varios puertos PON (uno o varios OLT con su propio árbol)
+    
+    Cada puerto es una red de un solo OLT (OpticalNetwork o ArrayNetwork,
+    según su tamaño) con ids propios, así que el power budget, el DBA y la
+    simulación de tráfico se pueden calcular por puerto de forma
+    independiente y unirse después. to_dict() devuelve la red completa con
+    la lista 'olts' en lugar de 'olt'.
+    """
+    
+    def __init__(self, name="GPON Network", shard_class=None):
+        self.name = name
+        self.topology_type = "star"
+        self.pons = []
+        # Clase de red de cada puerto según su número de ONUs
+        self.shard_class = shard_class or _object_network
+    
+    @property
+    def olts(self):
+        """OLT de cada puerto PON"""
+        return [pon.olt for pon in self.pons]
+    
+    @property
+    def onus(self):
+        """ONUs de todos los puertos, en orden de puerto"""
+        return [onu for pon in self.pons for onu in pon.onus]
+    
+    @property
+    def num_onus(self):
+        """Número de ONUs de todos los puertos"""
+        return sum(len(pon.onus) for pon in self.pons)
+    
+    def create_ftth_topology(self, num_onus=32, split_ratio="1:32", topology_type="star", pon_ports=1):
+        """
+        Generar pon_ports árboles FTTH iguales con las ONUs repartidas entre ellos
+        
+        Los primeros num_onus % pon_ports puertos tienen una ONU más. Cada
+        árbol distinto se genera una sola vez con el generador de un OLT y
+        se renombra para cada puerto.
+        """
+        pon_ports = pon_ports_option(pon_ports)
+        if num_onus < pon_ports:
+            raise ValueError("num_onus debe ser al menos pon_ports")
+        self.topology_type = topology_type
+        
+        base, extra = divmod(num_onus, pon_ports)
+        generated = {}
+        pon_dicts = []
+        for port in range(1, pon_ports + 1):
+            size = base + (1 if port <= extra else 0)
+            if size not in generated:
+                network = self.shard_class(size)(name=None)
+                network.create_ftth_topology(num_onus=size, split_ratio=split_ratio, topology_type=topology_type)
+                generated[size] = network.to_dict()
+            pon_dicts.append(relabel_pon(generated[size], port))
+        self._build(pon_dicts)
+    
+    def _build(self, pon_dicts):
+        """Reconstruir la red de cada puerto"""
+        self.pons = []
+        for data in pon_dicts:
+            network = self.shard_class(len(data.get("onus", []))).from_dict({**data, "name": self.name})
+            self.pons.append(network)
+    
+    def pon_dicts(self):
+        """Red serializada de cada puerto PON"""
+        return [pon.to_dict() for pon in self.pons]
+    
+    def pon_onu_ids(self):
+        """Lista [(olt_id, [onu_id, ...])] con las ONUs de cada puerto"""
+        return [(pon.olt.id if pon.olt else None, [onu.id for onu in pon.onus]) for pon in self.pons]
+    
+    def pon_of(self):
+        """Diccionario {onu_id: olt_id} con el puerto de cada ONU"""
+        return {onu_id: olt_id for olt_id, onu_ids in self.pon_onu_ids() for onu_id in onu_ids}
+    
+    def pon_with_onu(self, onu_id):
+        """Red del puerto al que pertenece una ONU (None si no existe)"""
+        return next((pon for pon in self.pons if onu_id in pon.onus), None)
+    
+    def pon_paths(self):
+        """Rutas OLT -> ONU de cada puerto (power_path_arrays, None si no tiene OLT)"""
+        return [pon.power_path_arrays() for pon in self.pons]
+    
+    def calculate_all_power_budgets(self, include_fiber_losses=False):
+        """Power budget de las ONUs de todos los puertos, con el OLT de cada una"""
+        results = []
+        for pon in self.pons:
+            results.extend(pon_power_budgets(pon, include_fiber_losses))
+        return results
+    
+    def to_dict(self):
+        """Convertir la red completa a diccionario (con la lista 'olts')"""
+        pon_dicts = self.pon_dicts()
+        data = {
+            "name": self.name,
+            "topology_type": self.topology_type,
+            "pon_ports": len(pon_dicts),
+            "olts": [pon["olt"] for pon in pon_dicts]
+        }
+        for key in ELEMENT_KEYS:
+            data[key] = [item for pon in pon_dicts for item in pon[key]]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data, shard_class=None):
+        """Reconstruir la red desde el diccionario de to_dict"""
+        network = cls(name=data.get("name", "GPON Network"), shard_class=shard_class)
+        network.topology_type = data.get("topology_type", "star")
+        network._build(split_pons(data))
+        return network
+
+
+def pon_power_budgets(network, include_fiber_losses=False):
+    """Power budget de las ONUs de una red de un puerto, con el id de su OLT"""
+    olt_id = network.olt.id if network.olt else None
+    return [
+        {"onu_id": budget["onu_id"], "olt_id": olt_id, **budget}
+        for budget in network.calculate_all_power_budgets(include_fiber_losses)
+    ]
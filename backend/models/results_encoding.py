@@ -0,0 +1,44 @@
+"""
+Codificación compacta (columnar) de métricas de simulación
+"""
+import io
+import numpy as np
+
+
+METRIC_COLUMNS = ('onu_id', 'type', 'value', 'timestamp')
+
+
+def metrics_to_columns(metrics):
+    """Convertir una lista de métricas {onu_id, type, value, timestamp} en arrays NumPy"""
+    return {
+        'onu_id': np.array([m.get('onu_id') or '' for m in metrics], dtype=str),
+        'type': np.array([m.get('type') or '' for m in metrics], dtype=str),
+        'value': np.array([m.get('value') or 0 for m in metrics], dtype=np.float64),
+        'timestamp': np.array([m.get('timestamp') or 0 for m in metrics], dtype=np.float64)
+    }
+
+
+def columns_to_metrics(columns):
+    """Convertir arrays columnar de nuevo a la lista de métricas original"""
+    return [
+        {'onu_id': onu_id, 'type': metric_type, 'value': value, 'timestamp': timestamp}
+        for onu_id, metric_type, value, timestamp in zip(
+            columns['onu_id'].tolist(),
+            columns['type'].tolist(),
+            columns['value'].tolist(),
+            columns['timestamp'].tolist()
+        )
+    ]
+
+
+def encode_metrics(metrics):
+    """Codificar métricas como blob binario npz comprimido"""
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **metrics_to_columns(metrics))
+    return buffer.getvalue()
+
+
+def decode_metrics(blob):
+    """Decodificar un blob npz a arrays columnar {columna: ndarray}"""
+    with np.load(io.BytesIO(blob), allow_pickle=False) as data:
+        return {column: data[column] for column in METRIC_COLUMNS}
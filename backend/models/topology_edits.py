@@ -0,0 +1,412 @@
+"""
+Edición incremental de topologías guardadas
+"""
+import json
+import math
+import re
+
+from models.network_elements import ONU, OpticalFiber, _split_loss
+
+
+EDIT_OPERATIONS = ('add_onu', 'remove_onu', 'set_fiber_length', 'set_splitter_ratio')
+
+# Máximo de operaciones por petición: cada una recorre el texto de olt_config
+MAX_EDIT_OPERATIONS = 1000
+
+# Array de olt_config -> clave que lo sigue en to_dict() (None si es el último)
+NEXT_NETWORK_KEY = {'splitters': 'onus', 'onus': 'fibers', 'fibers': None}
+
+_decoder = json.JSONDecoder()
+
+
+class JSONDocument:
+    """
+    Texto JSON editable objeto a objeto sin decodificar el documento completo
+    
+    Cada objeto se localiza por el fragmento {"<id_key>": <id>, con el que
+    empieza (el id de los elementos de to_dict() y el onu_id de cada power
+    budget); sólo se decodifican y codifican los objetos editados y el resto
+    del texto se copia tal cual. Los fragmentos buscados llevan comillas sin
+    escapar, que no pueden aparecer dentro de un valor de texto JSON.
+    
+    El texto debe estar generado con json.dumps y sus separadores por
+    defecto, como olt_config y los resultados guardados en result_cache.
+    """
+    
+    def __init__(self, text, id_key='id'):
+        self.text = text
+        self.id_key = id_key
+    
+    def _span(self, object_id):
+        """(inicio, fin, objeto) del objeto con un id, o None si no está"""
+        anchor = '{' + json.dumps(self.id_key) + ': ' + json.dumps(object_id) + ', '
+        start = self.text.find(anchor)
+        if start < 0:
+            return None
+        value, end = _decoder.raw_decode(self.text, start)
+        return start, end, value
+    
+    def get(self, object_id):
+        """Objeto con un id, o None"""
+        span = self._span(object_id)
+        return span[2] if span else None
+    
+    def replace(self, value):
+        """Sustituir el objeto con el mismo id que value"""
+        start, end, _ = self._span(value[self.id_key])
+        self.text = self.text[:start] + json.dumps(value) + self.text[end:]
+    
+    def remove(self, object_id):
+        """Quitar un objeto (y su separador) del array que lo contiene"""
+        start, end, _ = self._span(object_id)
+        if self.text.startswith(', ', end):
+            end += 2
+        elif self.text.endswith(', ', 0, start):
+            start -= 2
+        self.text = self.text[:start] + self.text[end:]
+    
+    def append(self, value, next_key=None):
+        """
+        Añadir un objeto al final de un array
+        
+        Args:
+            next_key: Clave que sigue al array en su objeto; None para el
+                último array del documento
+        """
+        if next_key is None:
+            end = self.text.rindex(']')
+        else:
+            end = self.text.index('], ' + json.dumps(next_key) + ': ')
+        separator = '' if self.text[end - 1] == '[' else ', '
+        self.text = self.text[:end] + separator + json.dumps(value) + self.text[end:]
+    
+    def find_all(self, key, value):
+        """Objetos del documento con key == value (p. ej. fibras por extremo)"""
+        fragment = json.dumps(key) + ': ' + json.dumps(value)
+        anchor = '{' + json.dumps(self.id_key) + ': '
+        found = []
+        position = self.text.find(fragment)
+        while position >= 0:
+            # Sólo las claves del propio objeto: los objetos no están anidados
+            start = self.text.rfind(anchor, 0, position)
+            if start >= 0:
+                obj, end = _decoder.raw_decode(self.text, start)
+                if position < end and obj.get(key) == value and obj not in found:
+                    found.append(obj)
+            position = self.text.find(fragment, position + len(fragment))
+        return found
+    
+    def count(self, key, value):
+        """Número de objetos con key == value"""
+        return self.text.count(json.dumps(key) + ': ' + json.dumps(value))
+
+
+def _number(operation, key, default=None, positive=False):
+    """Valor numérico de una operación, con su valor por defecto"""
+    value = operation.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{key} must be a number")
+    if positive and value <= 0:
+        raise ValueError(f"{key} must be positive")
+    return value
+
+
+def _ratio(operation):
+    """Ratio '1:N' de una operación"""
+    ratio = operation.get('ratio')
+    parts = ratio.split(':') if isinstance(ratio, str) else []
+    if len(parts) != 2 or parts[0] != '1' or not parts[1].isdigit() or int(parts[1]) < 2:
+        raise ValueError("ratio must have the form '1:N' with N >= 2")
+    return ratio
+
+
+def _ports(ratio):
+    """Puertos de salida de un ratio '1:N'"""
+    return int(ratio.split(':')[1])
+
+
+def onu_elements(operation):
+    """ONU y fibra de bajada (sin conectar) de una operación add_onu normalizada"""
+    onu = ONU(
+        id=operation['onu_id'],
+        name=operation['name'],
+        tx_power=operation['tx_power'],
+        rx_sensitivity=operation['rx_sensitivity']
+    )
+    fiber = OpticalFiber(
+        id=operation['fiber_id'],
+        name=f"{operation['splitter_id']} to {operation['onu_id']}",
+        length=operation['fiber_length']
+    )
+    return onu, fiber
+
+
+class TopologyEdit:
+    """
+    Operaciones de edición aplicadas al texto de olt_config de una topología
+    
+    Cada operación se valida y sólo reescribe los sub-árboles de los
+    elementos que cambian. Los elementos modificados se registran para
+    actualizar sus filas de network_elements, y las operaciones
+    normalizadas (con los ids generados) pueden repetirse sobre la
+    OpticalNetwork en memoria con apply_to_network().
+    
+    Operaciones:
+        add_onu: splitter_id y opcionalmente onu_id, name, tx_power,
+            rx_sensitivity, fiber_id y fiber_length; el splitter debe
+            tener un puerto libre
+        remove_onu: onu_id (se quitan también sus fibras)
+        set_fiber_length: fiber_id y length
+        set_splitter_ratio: splitter_id y ratio ('1:N'), con al menos
+            tantos puertos como salidas usadas
+    
+    Los errores de validación se lanzan como ValueError.
+    """
+    
+    def __init__(self, olt_config):
+        self.document = JSONDocument(olt_config)
+        self.operations = []
+        # element_id -> (element_type, diccionario o None si se eliminó)
+        self._elements = {}
+        # Elementos añadidos en esta edición y elementos previos eliminados
+        # (un id puede estar en ambos si se elimina y se vuelve a añadir)
+        self._added = set()
+        self._removed = set()
+    
+    def apply(self, operation):
+        """Validar y aplicar una operación; devuelve la operación normalizada"""
+        if not isinstance(operation, dict) or operation.get('op') not in EDIT_OPERATIONS:
+            raise ValueError(f"op must be one of {', '.join(EDIT_OPERATIONS)}")
+        applied = getattr(self, '_' + operation['op'])(operation)
+        self.operations.append(applied)
+        return applied
+    
+    def _element(self, element_id, element_type):
+        """Diccionario de un elemento existente del tipo indicado"""
+        element = self.document.get(element_id) if isinstance(element_id, str) else None
+        if element is None or element.get('type') != element_type:
+            raise ValueError(f"{element_type} {element_id} not found")
+        return element
+    
+    def _record(self, element_type, element, added=False):
+        self._elements[element['id']] = (element_type, element)
+        if added:
+            self._added.add(element['id'])
+    
+    def _record_removal(self, element_type, element_id):
+        self._elements[element_id] = (element_type, None)
+        if element_id not in self._added:
+            self._removed.add(element_id)
+    
+    def _new_id(self, key, element_id):
+        """Id de un elemento nuevo, que no debe existir ya"""
+        if not isinstance(element_id, str):
+            raise ValueError(f"{key} must be a string")
+        if self.document.get(element_id) is not None:
+            raise ValueError(f"Element {element_id} already exists")
+        return element_id
+    
+    def _next_onu_id(self):
+        """Primer id ONU-N libre a partir del número de ONUs"""
+        number = self.count('ONU') + 1
+        while self.document.get(f"ONU-{number}") is not None:
+            number += 1
+        return f"ONU-{number}"
+    
+    def _outputs(self, splitter_id):
+        """Salidas usadas de un splitter (fibras que salen de él)"""
+        return self.document.count('from_element', splitter_id)
+    
+    def _add_onu(self, operation):
+        splitter = self._element(operation.get('splitter_id'), 'SPLITTER')
+        if self._outputs(splitter['id']) >= _ports(splitter['ratio']):
+            raise ValueError(f"Splitter {splitter['id']} has no free ports ({splitter['ratio']})")
+        onu_id = self._new_id('onu_id', operation.get('onu_id') or self._next_onu_id())
+        applied = {
+            "op": "add_onu",
+            "splitter_id": splitter['id'],
+            "onu_id": onu_id,
+            "name": str(operation.get('name', onu_id)),
+            "tx_power": _number(operation, 'tx_power', 1.5),
+            "rx_sensitivity": _number(operation, 'rx_sensitivity', -24),
+            "fiber_id": self._new_id('fiber_id', operation.get('fiber_id') or f"FIBER-{onu_id}"),
+            "fiber_length": _number(operation, 'fiber_length', 5.0, positive=True)
+        }
+        if applied['fiber_id'] == onu_id:
+            raise ValueError(f"Element {onu_id} already exists")
+        
+        onu, fiber = onu_elements(applied)
+        onu_dict = {**onu.to_dict(), "splitter_id": splitter['id']}
+        fiber_dict = {**fiber.to_dict(), "from_element": splitter['id'], "to_element": onu_id}
+        splitter = {**splitter, "connected_onus": splitter.get('connected_onus', 0) + 1}
+        
+        self.document.append(onu_dict, NEXT_NETWORK_KEY['onus'])
+        self.document.append(fiber_dict, NEXT_NETWORK_KEY['fibers'])
+        self.document.replace(splitter)
+        self._record('ONU', onu_dict, added=True)
+        self._record('FIBER', fiber_dict, added=True)
+        self._record('SPLITTER', splitter)
+        return applied
+    
+    def _remove_onu(self, operation):
+        onu = self._element(operation.get('onu_id'), 'ONU')
+        fibers = [
+            fiber for key in ('from_element', 'to_element')
+            for fiber in self.document.find_all(key, onu['id'])
+            if fiber.get('type') == 'FIBER'
+        ]
+        for fiber in fibers:
+            self.document.remove(fiber['id'])
+            self._record_removal('FIBER', fiber['id'])
+        self.document.remove(onu['id'])
+        self._record_removal('ONU', onu['id'])
+        
+        splitter_id = onu.get('splitter_id')
+        splitter = self.document.get(splitter_id) if splitter_id else None
+        if splitter is not None:
+            splitter = {**splitter, "connected_onus": max(splitter.get('connected_onus', 1) - 1, 0)}
+            self.document.replace(splitter)
+            self._record('SPLITTER', splitter)
+        return {"op": "remove_onu", "onu_id": onu['id']}
+    
+    def _set_fiber_length(self, operation):
+        fiber = self._element(operation.get('fiber_id'), 'FIBER')
+        length = _number(operation, 'length', positive=True)
+        updated = OpticalFiber.from_dict({**fiber, "length": length})
+        fiber = {
+            **fiber,
+            "length": length,
+            "loss": updated.calculate_loss(),
+            "total_loss": updated.calculate_total_loss()
+        }
+        self.document.replace(fiber)
+        self._record('FIBER', fiber)
+        return {"op": "set_fiber_length", "fiber_id": fiber['id'], "length": length}
+    
+    def _set_splitter_ratio(self, operation):
+        splitter = self._element(operation.get('splitter_id'), 'SPLITTER')
+        ratio = _ratio(operation)
+        outputs = self._outputs(splitter['id'])
+        if outputs > _ports(ratio):
+            raise ValueError(f"Splitter {splitter['id']} has {outputs} outputs, more than {ratio} allows")
+        splitter = {**splitter, "ratio": ratio, "split_loss": _split_loss(ratio)}
+        self.document.replace(splitter)
+        self._record('SPLITTER', splitter)
+        return {"op": "set_splitter_ratio", "splitter_id": splitter['id'], "ratio": ratio}
+    
+    def count(self, element_type):
+        """Número de elementos de un tipo en el documento editado"""
+        return self.document.count('type', element_type)
+    
+    def row_changes(self):
+        """
+        Cambios de filas de network_elements
+        
+        Los elementos eliminados y vueltos a añadir se borran e insertan de
+        nuevo para que las filas sigan el orden de olt_config.
+        
+        Returns:
+            Tupla (nuevos, modificados, eliminados): listas de
+            (element_type, diccionario) y lista de ids a borrar antes de
+            insertar los nuevos
+        """
+        added, updated, removed = [], [], []
+        for element_id, (element_type, element) in self._elements.items():
+            if element_id in self._removed:
+                removed.append(element_id)
+            if element is None:
+                continue
+            if element_id in self._added:
+                added.append((element_type, element))
+            else:
+                updated.append((element_type, element))
+        return added, updated, removed
+    
+    def removed_onus(self):
+        """Ids de las ONUs existentes antes de la edición que se eliminaron"""
+        return [
+            element_id for element_id, (element_type, _) in self._elements.items()
+            if element_type == 'ONU' and element_id in self._removed
+        ]
+    
+    def added_onus(self):
+        """Ids de las ONUs nuevas que siguen en la red"""
+        return [
+            element_id for element_id, (element_type, element) in self._elements.items()
+            if element_type == 'ONU' and element is not None and element_id in self._added
+        ]
+    
+    def apply_to_network(self, network):
+        """
+        Repetir las operaciones sobre una OpticalNetwork en memoria
+        
+        Returns:
+            Ids de las ONUs cuyo power budget cambia (aguas abajo de los
+            elementos editados), sin las ONUs eliminadas
+        """
+        affected = {}
+        for operation in self.operations:
+            op = operation['op']
+            if op == 'add_onu':
+                onu, fiber = onu_elements(operation)
+                changed = network.attach_onu(onu, operation['splitter_id'], fiber)
+            elif op == 'remove_onu':
+                network.remove_onu(operation['onu_id'])
+                affected.pop(operation['onu_id'], None)
+                changed = []
+            elif op == 'set_fiber_length':
+                changed = network.set_fiber_length(operation['fiber_id'], operation['length'])
+            else:
+                changed = network.set_splitter_ratio(operation['splitter_id'], operation['ratio'])
+            affected.update(dict.fromkeys(changed))
+        return list(affected)
+
+
+_BUDGET_ENTRY = re.compile(r'\{"onu_id": ("(?:[^"\\]|\\.)*"), ')
+
+
+def patch_power_budgets(text, budgets, removed_onus=(), added_onus=()):
+    """
+    Actualizar el JSON de calculate_all_power_budgets() de la versión anterior
+    
+    Las entradas de las ONUs no afectadas se copian como texto sin
+    decodificarlas, en una sola pasada.
+    
+    Args:
+        text: Lista de power budgets de la versión anterior (JSON)
+        budgets: {onu_id: power budget, o None si ya no es alcanzable} de
+            las ONUs afectadas
+        removed_onus: ONUs eliminadas
+        added_onus: ONUs nuevas; se añaden al final, como en la red
+    
+    Returns:
+        JSON de la lista actualizada, o None si una ONU afectada que no
+        estaba en la lista (y no es nueva) necesitaría otra posición
+    """
+    encoded = {json.dumps(onu_id): budget for onu_id, budget in budgets.items()}
+    removed = {json.dumps(onu_id) for onu_id in removed_onus}
+    added = set(added_onus)
+    
+    matches = list(_BUDGET_ENTRY.finditer(text))
+    entries = []
+    seen = set()
+    for i, match in enumerate(matches):
+        key = match.group(1)
+        end = matches[i + 1].start() - 2 if i + 1 < len(matches) else text.rindex(']')
+        seen.add(key)
+        if key in removed:
+            continue
+        if key in encoded:
+            if encoded[key] is not None:
+                entries.append(json.dumps(encoded[key]))
+        else:
+            entries.append(text[match.start():end])
+    
+    for onu_id, budget in budgets.items():
+        key = json.dumps(onu_id)
+        if budget is None or (key in seen and key not in removed):
+            continue
+        if onu_id not in added:
+            return None
+        entries.append(json.dumps(budget))
+    return '[' + ', '.join(entries) + ']'
@@ -1,15 +1,64 @@
 """
-Algoritmo DBA (Dynamic Bandwidth Allocation) - IPACT
+Algoritmo DBA (Dynamic Bandwidth Allocation) - IPACT y max-min fair
 """
 import numpy as np
 
 
+DBA_STRATEGIES = ('ipact', 'fair', 'weighted_fair')
+
+# Pesos por clase de servicio para la asignación max-min ponderada
+SERVICE_CLASS_WEIGHTS = {
+    'video': 3.0,
+    'internet': 2.0,
+    'voice': 1.0
+}
+
+
 class DynamicBandwidthAllocation:
     """Asignación dinámica de ancho de banda usando IPACT"""
     
     def __init__(self, total_capacity=2500):
         self.total_capacity = total_capacity  # Mbps (GPON estándar)
     
+    def allocate_batch(self, requests, total_capacity=None, onu_ids=None):
+        """
+        Asignar ancho de banda IPACT para muchas ONUs y ciclos a la vez
+        
+        Las ONUs se ordenan una sola vez y cada concesión se obtiene con una
+        suma acumulada: granted = clip(capacidad - solicitado_previo, 0, solicitado),
+        equivalente a recorrer las ONUs restando la capacidad restante.
+        
+        Args:
+            requests: Array (n_onus,) o matriz (n_ciclos, n_onus) en Mbps
+            total_capacity: Capacidad por ciclo (escalar o array (n_ciclos,))
+            onu_ids: IDs de las ONUs (n_onus,) que definen el orden IPACT;
+                si se omite se usa el orden de las columnas
+        
+        Returns:
+            Array con las concesiones, con la misma forma que requests
+        """
+        if total_capacity is None:
+            total_capacity = self.total_capacity
+        
+        requests = np.asarray(requests, dtype=np.float64)
+        single_cycle = requests.ndim == 1
+        matrix = np.atleast_2d(requests)
+        capacity = np.asarray(total_capacity, dtype=np.float64).reshape(-1, 1)
+        
+        if onu_ids is not None:
+            order = np.argsort(np.asarray(onu_ids), kind='stable')
+            matrix = matrix[:, order]
+        
+        requested_before = np.cumsum(matrix, axis=1) - matrix
+        granted = np.clip(capacity - requested_before, 0, matrix)
+        
+        if onu_ids is not None:
+            unsorted = np.empty_like(granted)
+            unsorted[:, order] = granted
+            granted = unsorted
+        
+        return granted[0] if single_cycle else granted
+    
     def allocate_bandwidth(self, onu_requests, total_capacity=None):
         """
         Asignar ancho de banda usando estrategia IPACT
@@ -24,35 +73,26 @@ class DynamicBandwidthAllocation:
         if total_capacity is None:
             total_capacity = self.total_capacity
         
-        allocation = {}
-        remaining = total_capacity
-        
         # IPACT: asignar en orden de llegada (sorted by ONU ID para consistencia)
-        sorted_requests = sorted(onu_requests.items())
+        onu_ids = sorted(onu_requests)
+        requested = np.array([onu_requests[onu_id] for onu_id in onu_ids], dtype=np.float64)
+        granted = self.allocate_batch(requested, total_capacity)
         
-        for onu_id, requested in sorted_requests:
-            # Asignar mínimo entre lo solicitado y lo disponible
-            granted = min(requested, remaining)
+        return self._build_result(onu_requests, onu_ids, requested, granted, total_capacity)
+    
+    def _build_result(self, onu_requests, onu_ids, requested, granted, total_capacity):
+        """Construir el diccionario de asignaciones y métricas globales"""
+        allocation = {}
+        for onu_id, req, grant in zip(onu_ids, requested.tolist(), granted.tolist()):
             allocation[onu_id] = {
-                'requested': requested,
-                'granted': granted,
-                'utilization': (granted / requested * 100) if requested > 0 else 0
+                'requested': onu_requests[onu_id],
+                'granted': grant,
+                'utilization': (grant / req * 100) if req > 0 else 0
             }
-            remaining -= granted
-            
-            if remaining <= 0:
-                # Si no hay más capacidad, asignar 0 a las restantes
-                for remaining_onu_id, _ in sorted_requests[sorted_requests.index((onu_id, requested)) + 1:]:
-                    allocation[remaining_onu_id] = {
-                        'requested': onu_requests[remaining_onu_id],
-                        'granted': 0,
-                        'utilization': 0
-                    }
-                break
         
         # Calcular métricas globales
         total_requested = sum(onu_requests.values())
-        total_granted = sum(a['granted'] for a in allocation.values())
+        total_granted = float(granted.sum())
         global_utilization = (total_granted / total_capacity * 100) if total_capacity > 0 else 0
         
         return {
@@ -60,35 +100,129 @@ class DynamicBandwidthAllocation:
             'total_requested': total_requested,
             'total_granted': total_granted,
             'total_capacity': total_capacity,
-            'remaining_capacity': remaining,
+            'remaining_capacity': total_capacity - total_granted,
             'global_utilization': global_utilization
         }
     
-    def fair_allocate(self, onu_requests, total_capacity=None):
+    def max_min_batch(self, requests, total_capacity=None, weights=None):
         """
-        Asignación justa (Fair) - distribuir equitativamente
+        Asignación max-min fair (water-filling) para muchas ONUs y ciclos
+        
+        Se busca el nivel de agua L tal que sum(min(solicitado, peso * L)) sea
+        igual a la capacidad: la capacidad que no usan las ONUs con poca
+        demanda se reparte entre las demás en proporción a su peso. Las ONUs
+        se ordenan una vez por solicitado / peso y el nivel se obtiene con
+        sumas acumuladas.
+        
+        Args:
+            requests: Array (n_onus,) o matriz (n_ciclos, n_onus) en Mbps
+            total_capacity: Capacidad por ciclo (escalar o array (n_ciclos,))
+            weights: Pesos positivos por ONU (n_onus,); por defecto todos 1
+        
+        Returns:
+            Tupla (concesiones con la forma de requests, nivel de agua por ciclo)
         """
         if total_capacity is None:
             total_capacity = self.total_capacity
         
-        num_onus = len(onu_requests)
-        if num_onus == 0:
+        requests = np.asarray(requests, dtype=np.float64)
+        single_cycle = requests.ndim == 1
+        matrix = np.atleast_2d(requests)
+        capacity = np.asarray(total_capacity, dtype=np.float64).reshape(-1)
+        
+        if weights is None:
+            weights = np.ones(matrix.shape[1])
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64), matrix.shape)
+        if np.any(weights <= 0):
+            raise ValueError("Los pesos deben ser positivos")
+        
+        # Ordenar por demanda normalizada (solicitado / peso)
+        order = np.argsort(matrix / weights, axis=1, kind='stable')
+        sorted_requests = np.take_along_axis(matrix, order, axis=1)
+        sorted_weights = np.take_along_axis(weights, order, axis=1)
+        
+        # Nivel candidato si la ONU k y las siguientes comparten lo que queda
+        requested_before = np.cumsum(sorted_requests, axis=1) - sorted_requests
+        weight_from = np.cumsum(sorted_weights[:, ::-1], axis=1)[:, ::-1]
+        levels = (capacity[:, None] - requested_before) / weight_from
+        
+        # La primera ONU que no puede satisfacerse fija el nivel de agua
+        unsatisfied = levels < sorted_requests / sorted_weights
+        first = np.argmax(unsatisfied, axis=1)
+        water_level = np.where(
+            unsatisfied.any(axis=1),
+            levels[np.arange(matrix.shape[0]), first],
+            np.inf
+        )
+        
+        granted = np.minimum(matrix, weights * water_level[:, None])
+        if single_cycle:
+            return granted[0], water_level[0]
+        return granted, water_level
+    
+    def fair_allocate(self, onu_requests, total_capacity=None, weights=None):
+        """
+        Asignación justa max-min (water-filling)
+        
+        Cada ONU recibe min(solicitado, peso * nivel), donde el nivel se eleva
+        hasta repartir toda la capacidad disponible. Si la demanda total supera
+        la capacidad, la utilización global alcanza el 100%.
+        
+        Args:
+            onu_requests: Diccionario {onu_id: requested_mbps}
+            total_capacity: Capacidad total disponible en Mbps
+            weights: Diccionario opcional {onu_id: peso} (por defecto 1)
+        """
+        if total_capacity is None:
+            total_capacity = self.total_capacity
+        
+        onu_ids = sorted(onu_requests)
+        if not onu_ids:
             return {}
         
-        fair_share = total_capacity / num_onus
-        allocation = {}
+        requested = np.array([onu_requests[onu_id] for onu_id in onu_ids], dtype=np.float64)
+        onu_weights = None
+        if weights is not None:
+            onu_weights = np.array([weights.get(onu_id, 1.0) for onu_id in onu_ids], dtype=np.float64)
+        granted, water_level = self.max_min_batch(requested, total_capacity, onu_weights)
         
-        for onu_id, requested in onu_requests.items():
-            granted = min(requested, fair_share)
-            allocation[onu_id] = {
-                'requested': requested,
-                'granted': granted,
-                'utilization': (granted / requested * 100) if requested > 0 else 0
-            }
+        result = self._build_result(onu_requests, onu_ids, requested, granted, total_capacity)
+        # Nivel de agua: concesión máxima por unidad de peso (None si no hay congestión)
+        result['fair_share'] = float(water_level) if np.isfinite(water_level) else None
+        return result
+    
+    def weighted_fair_allocate(self, onu_requests, service_classes, total_capacity=None, class_weights=None):
+        """
+        Asignación max-min ponderada por clase de servicio
         
-        return {
-            'allocations': allocation,
-            'total_capacity': total_capacity,
-            'fair_share': fair_share
+        Args:
+            onu_requests: Diccionario {onu_id: requested_mbps}
+            service_classes: Diccionario {onu_id: 'video' | 'internet' | 'voice'}
+            total_capacity: Capacidad total disponible en Mbps
+            class_weights: Pesos por clase (por defecto SERVICE_CLASS_WEIGHTS)
+        """
+        if class_weights is None:
+            class_weights = SERVICE_CLASS_WEIGHTS
+        
+        weights = {
+            onu_id: class_weights.get(service_classes.get(onu_id), 1.0)
+            for onu_id in onu_requests
         }
-
+        return self.fair_allocate(onu_requests, total_capacity, weights)
+    
+    def allocate(self, onu_requests, total_capacity=None, strategy='ipact', weights=None, service_classes=None):
+        """
+        Asignar ancho de banda con la estrategia indicada
+        
+        Args:
+            strategy: 'ipact', 'fair' (max-min) o 'weighted_fair' (max-min
+                ponderado por weights o por service_classes)
+        """
+        if strategy not in DBA_STRATEGIES:
+            raise ValueError(f"Estrategia DBA no soportada: {strategy}")
+        
+        if strategy == 'ipact':
+            return self.allocate_bandwidth(onu_requests, total_capacity)
+        if strategy == 'weighted_fair' and weights is None:
+            return self.weighted_fair_allocate(onu_requests, service_classes or {}, total_capacity)
+        return self.fair_allocate(onu_requests, total_capacity, weights if strategy == 'weighted_fair' else None)
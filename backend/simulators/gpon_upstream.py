@@ -0,0 +1,281 @@
+"""
+Simulación del canal ascendente GPON por ciclos DBA
+"""
+import numpy as np
+
+from simulators.dba_algorithm import DynamicBandwidthAllocation
+
+
+GPON_FRAME_TIME = 125e-6  # s (trama GPON)
+GPON_UPSTREAM_CAPACITY = 1244.16  # Mbps (canal ascendente GPON)
+DEFAULT_BUFFER_SIZE = 1000000  # bytes por ONU
+UPSTREAM_ALLOCATORS = ('ipact', 'fair')
+
+# Opciones configurables desde los parámetros de la simulación
+UPSTREAM_OPTIONS = ('cycle_time', 'capacity', 'allocator', 'buffer_size')
+
+# Tamaño medio de paquete por patrón (igual que TrafficGenerator)
+MEAN_PACKET_SIZE = {
+    'constant': 1500,
+    'poisson': 1000,
+    'bursty': 0.3 * 1450 + 0.7 * 288
+}
+
+
+def upstream_options(parameters):
+    """
+    Validar las opciones del canal ascendente ('upstream') de los
+    parámetros de una simulación
+    
+    Returns:
+        Diccionario con las opciones de UPSTREAM_OPTIONS indicadas; las
+        demás claves se ignoran
+    """
+    upstream = parameters.get('upstream')
+    if upstream is None:
+        return {}
+    if not isinstance(upstream, dict):
+        raise ValueError("upstream debe ser un objeto con las opciones del canal ascendente")
+    
+    options = {key: value for key, value in upstream.items() if key in UPSTREAM_OPTIONS}
+    for key in ('cycle_time', 'capacity', 'buffer_size'):
+        value = options.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0):
+            raise ValueError(f"upstream.{key} debe ser un número mayor que 0")
+    if 'allocator' in options and options['allocator'] not in UPSTREAM_ALLOCATORS:
+        raise ValueError(f"upstream.allocator debe ser uno de {', '.join(UPSTREAM_ALLOCATORS)}")
+    return {key: value for key, value in options.items() if value is not None}
+
+
+class GponUpstreamSimulator:
+    """
+    Simulador del canal ascendente GPON acoplado al DBA
+    
+    El tiempo avanza en ciclos DBA (por defecto una trama de 125 µs). En cada
+    ciclo las ONUs reportan su cola, el asignador calcula las concesiones y
+    las colas se vacían; después llegan los paquetes del ciclo y se descartan
+    los que no caben en el buffer. Todo el trabajo de un ciclo se hace con
+    operaciones NumPy sobre todas las ONUs a la vez.
+    
+    El retardo de los bytes que llegan en un ciclo se estima como medio ciclo
+    de espera más el tiempo de vaciar la cola con la concesión del ciclo
+    siguiente, y se acumula en histogramas logarítmicos por ONU para obtener
+    percentiles con memoria acotada.
+    """
+    
+    def __init__(self, generators, simulation_time, cycle_time=GPON_FRAME_TIME,
+                 capacity=GPON_UPSTREAM_CAPACITY, allocator='ipact',
+                 buffer_size=DEFAULT_BUFFER_SIZE, block_cycles=1024, delay_bins=128,
+                 rng=None, windows=None, progress=None):
+        if allocator not in UPSTREAM_ALLOCATORS:
+            raise ValueError(f"Asignador no soportado: {allocator}")
+        
+        self.generators = generators
+        self.simulation_time = simulation_time
+        self.cycle_time = cycle_time
+        self.capacity = capacity  # Mbps
+        self.allocator = allocator
+        self.buffer_size = buffer_size
+        self.block_cycles = block_cycles
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.windows = windows  # WindowedMetrics opcional (bytes entregados por ciclo)
+        self.progress = progress  # SimulationProgress opcional (informes por bloque de ciclos)
+        self.dba = DynamicBandwidthAllocation(total_capacity=capacity)
+        
+        self.num_cycles = int(round(simulation_time / cycle_time))
+        self.onu_ids = [g.onu_id for g in generators]
+        self.rates = np.array([g.rate for g in generators], dtype=np.float64)
+        self.patterns = np.array([g.traffic_pattern for g in generators])
+        
+        # Histograma de retardos: desde medio ciclo hasta el tiempo simulado
+        self.delay_edges = np.geomspace(
+            cycle_time / 2, max(simulation_time, cycle_time), delay_bins
+        )
+    
+    def _packets_per_second(self):
+        """Tasa media de paquetes por ONU según su patrón"""
+        pps = np.empty(len(self.generators))
+        for i, generator in enumerate(self.generators):
+            pattern = generator.traffic_pattern
+            rate = generator.rate * 1e6
+            if pattern in ('constant', 'poisson'):
+                pps[i] = rate / (8 * MEAN_PACKET_SIZE[pattern])
+            else:
+                # bursty: 20% de intervalos de 1 ms, el resto exponenciales
+                mean_interval = 0.2 * 0.001 + 0.8 * 8 * MEAN_PACKET_SIZE['bursty'] / rate
+                pps[i] = 1 / mean_interval
+        return pps
+    
+    def _arrivals(self, start_cycle, num_cycles, pps):
+        """
+        Generar llegadas de un bloque de ciclos
+        
+        Returns:
+            Tupla (paquetes, bytes), ambas matrices (num_cycles, n_onus)
+        """
+        expected = pps * self.cycle_time
+        shape = (num_cycles, len(self.generators))
+        packets = self.rng.poisson(np.broadcast_to(expected, shape)).astype(np.float64)
+        sizes = np.full(len(self.generators), 1500.0)
+        
+        constant = self.patterns == 'constant'
+        if constant.any():
+            # Llegadas periódicas: paquetes completos acumulados hasta cada ciclo
+            cycles = np.arange(start_cycle, start_cycle + num_cycles + 1)[:, None]
+            cumulative = np.floor(cycles * expected[constant])
+            packets[:, constant] = np.diff(cumulative, axis=0)
+        
+        nbytes = packets * sizes
+        
+        poisson = self.patterns == 'poisson'
+        if poisson.any():
+            # Suma de tamaños exponenciales de media 1000 bytes
+            counts = packets[:, poisson]
+            poisson_bytes = np.zeros_like(counts)
+            nonzero = counts > 0
+            poisson_bytes[nonzero] = self.rng.gamma(counts[nonzero], 1000.0)
+            nbytes[:, poisson] = poisson_bytes
+        
+        bursty = ~(constant | poisson)
+        if bursty.any():
+            counts = packets[:, bursty].astype(np.int64)
+            large = self.rng.binomial(counts, 0.3)
+            nbytes[:, bursty] = large * 1450.0 + (counts - large) * 288.0
+        
+        return packets, nbytes
+    
+    def _allocate(self, queue, capacity_bytes):
+        """Concesiones del ciclo en bytes a partir de las colas reportadas"""
+        if self.allocator == 'fair':
+            granted, _ = self.dba.max_min_batch(queue, capacity_bytes)
+            return granted
+        return self.dba.allocate_batch(queue, capacity_bytes)
+    
+    def run(self):
+        """Ejecutar la simulación y devolver métricas por ONU"""
+        num_onus = len(self.generators)
+        capacity_bytes = self.capacity * 1e6 * self.cycle_time / 8
+        pps = self._packets_per_second()
+        num_bins = len(self.delay_edges)
+        
+        queue = np.zeros(num_onus)
+        pending = np.zeros(num_onus)  # bytes que llegaron en el ciclo anterior
+        delivered = np.zeros(num_onus)
+        offered = np.zeros(num_onus)
+        dropped = np.zeros(num_onus)
+        packets_sent = np.zeros(num_onus)
+        queue_sum = np.zeros(num_onus)
+        queue_max = np.zeros(num_onus)
+        delay_hist = np.zeros(num_onus * num_bins)
+        onu_offsets = np.arange(num_onus) * num_bins
+        granted_cycles = np.empty((self.block_cycles, num_onus)) if self.windows is not None else None
+        
+        for block_start in range(0, self.num_cycles, self.block_cycles):
+            num_cycles = min(self.block_cycles, self.num_cycles - block_start)
+            packets, arrivals = self._arrivals(block_start, num_cycles, pps)
+            packets_sent += packets.sum(axis=0)
+            offered += arrivals.sum(axis=0)
+            
+            for k in range(num_cycles):
+                # Reporte de colas y concesiones del DBA
+                granted = self._allocate(queue, capacity_bytes)
+                
+                # Retardo estimado de lo que llegó en el ciclo anterior
+                delay = self.cycle_time * (0.5 + queue / np.maximum(granted, 1e-9))
+                bins = np.minimum(np.searchsorted(self.delay_edges, delay), num_bins - 1)
+                delay_hist[onu_offsets + bins] += pending
+                
+                # Vaciar colas con las concesiones
+                queue -= granted
+                delivered += granted
+                if granted_cycles is not None:
+                    granted_cycles[k] = granted
+                
+                # Llegadas del ciclo y descarte por buffer lleno
+                accepted = np.minimum(arrivals[k], self.buffer_size - queue)
+                dropped += arrivals[k] - accepted
+                queue += accepted
+                pending = accepted
+                
+                queue_sum += queue
+                np.maximum(queue_max, queue, out=queue_max)
+            
+            if granted_cycles is not None:
+                cycles = np.arange(block_start, block_start + num_cycles)
+                self.windows.add_rows(cycles * self.cycle_time, granted_cycles[:num_cycles], packets)
+            
+            end_cycle = block_start + num_cycles
+            if self.progress is not None and (
+                    self.progress.due(end_cycle * self.cycle_time) or end_cycle == self.num_cycles):
+                self.progress.report(
+                    end_cycle * self.cycle_time, end_cycle, delivered,
+                    progress=end_cycle / self.num_cycles
+                )
+        
+        return self._build_results(
+            delivered, offered, dropped, packets_sent, queue_sum, queue_max,
+            delay_hist.reshape(num_onus, num_bins)
+        )
+    
+    def _delay_percentiles(self, delay_hist, percentiles=(50, 95, 99)):
+        """Percentiles de retardo por ONU a partir de los histogramas"""
+        cumulative = np.cumsum(delay_hist, axis=1)
+        totals = cumulative[:, -1:]
+        result = {}
+        for p in percentiles:
+            reached = cumulative >= totals * (p / 100)
+            index = np.argmax(reached, axis=1)
+            values = self.delay_edges[index]
+            values[totals[:, 0] == 0] = 0.0
+            result[p] = values
+        return result
+    
+    def _build_results(self, delivered, offered, dropped, packets_sent,
+                       queue_sum, queue_max, delay_hist):
+        """Construir el diccionario de resultados con el formato de TrafficSimulator"""
+        duration = self.num_cycles * self.cycle_time or self.simulation_time
+        throughput = delivered * 8 / (duration * 1e6)
+        offered_load = offered * 8 / (duration * 1e6)
+        queue_avg = queue_sum / max(self.num_cycles, 1)
+        percentiles = self._delay_percentiles(delay_hist)
+        
+        per_onu = {
+            'throughput': throughput,
+            'packets_sent': packets_sent,
+            'offered_load': offered_load,
+            'dropped_bytes': dropped,
+            'queue_avg': queue_avg,
+            'queue_max': queue_max,
+            'delay_p50': percentiles[50],
+            'delay_p95': percentiles[95],
+            'delay_p99': percentiles[99]
+        }
+        
+        metrics = []
+        for i, onu_id in enumerate(self.onu_ids):
+            for metric_type, values in per_onu.items():
+                metrics.append({
+                    'onu_id': onu_id,
+                    'type': metric_type,
+                    'value': float(values[i]),
+                    'timestamp': self.simulation_time
+                })
+        
+        total_throughput = float(throughput.sum())
+        total_offered = float(offered.sum())
+        num_onus = len(self.generators)
+        return {
+            'simulation_time': self.simulation_time,
+            'mode': 'gpon',
+            'total_throughput': total_throughput,
+            'total_packets': int(packets_sent.sum()),
+            'average_throughput': total_throughput / num_onus if num_onus > 0 else 0,
+            'cycle_time': self.cycle_time,
+            'cycles': self.num_cycles,
+            'allocator': self.allocator,
+            'upstream_capacity': self.capacity,
+            'total_offered_load': float(offered_load.sum()),
+            'total_dropped_bytes': float(dropped.sum()),
+            'drop_ratio': float(dropped.sum()) / total_offered if total_offered > 0 else 0,
+            'metrics': metrics
+        }
@@ -0,0 +1,131 @@
+"""
+Barrido de parámetros de diseño (topología y simulación)
+"""
+import itertools
+import numpy as np
+
+from simulators.topology_optimizer import TOPOLOGY_TYPES
+from simulators.traffic_simulator import simulation_time_option
+
+
+# Parámetros que se pueden barrer y su valor por defecto
+SWEEP_DEFAULTS = {
+    'num_onus': 32,
+    'split_ratio': '1:32',
+    'topology_type': 'star',
+    'simulation_time': 100
+}
+
+MAX_SWEEP_POINTS = 1000
+
+# Máximo de ONUs de un punto del barrido (cada punto ejecuta una simulación)
+MAX_SWEEP_ONUS = 10000
+
+# ParameterSweep.seed es un BIGINT con signo
+MAX_SWEEP_SEED = 2**63 - 1
+
+
+def _sweep_value(key, value):
+    """Validar un valor de la rejilla; lanza ValueError si no es válido"""
+    if key == 'num_onus':
+        if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_SWEEP_ONUS:
+            raise ValueError(f"num_onus debe ser un entero entre 1 y {MAX_SWEEP_ONUS}")
+    elif key == 'split_ratio':
+        parts = value.split(':') if isinstance(value, str) else []
+        if len(parts) != 2 or parts[0] != '1' or not parts[1].isdigit() or int(parts[1]) < 2:
+            raise ValueError(f"Ratio no válido: {value} (formato '1:N' con N >= 2)")
+    elif key == 'topology_type':
+        if value not in TOPOLOGY_TYPES:
+            raise ValueError(f"topology_type debe ser uno de {', '.join(TOPOLOGY_TYPES)}")
+    else:
+        simulation_time_option(value)
+
+
+def expand_sweep_grid(grid):
+    """
+    Expandir una rejilla de parámetros al producto cartesiano de sus valores
+    
+    Args:
+        grid: Diccionario {parámetro: valor o lista de valores}; los parámetros
+            omitidos toman su valor de SWEEP_DEFAULTS
+    
+    Returns:
+        Lista de puntos {num_onus, split_ratio, topology_type, simulation_time}
+    
+    Los parámetros no soportados y los valores no válidos se rechazan con
+    ValueError antes de crear ningún punto.
+    """
+    if not isinstance(grid, dict):
+        raise ValueError("grid debe ser un objeto")
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parámetros de barrido no soportados: {', '.join(sorted(unknown))}")
+    
+    keys = list(SWEEP_DEFAULTS)
+    values = []
+    for key in keys:
+        value = grid.get(key, SWEEP_DEFAULTS[key])
+        value = value if isinstance(value, list) else [value]
+        for item in value:
+            _sweep_value(key, item)
+        values.append(value)
+    
+    num_points = int(np.prod([len(v) for v in values]))
+    if num_points == 0:
+        raise ValueError("La rejilla de parámetros está vacía")
+    if num_points > MAX_SWEEP_POINTS:
+        raise ValueError(f"La rejilla tiene {num_points} puntos (máximo {MAX_SWEEP_POINTS})")
+    
+    return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+
+def sweep_seeds(base_seed, num_points):
+    """Semillas deterministas e independientes para cada punto del barrido"""
+    children = np.random.SeedSequence(base_seed).spawn(num_points)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_sweep_point(point, parameters, seed):
+    """
+    Evaluar un punto del barrido en un proceso worker
+    
+    Genera la topología del punto, calcula su power budget y ejecuta la
+    simulación de tráfico con la semilla del punto.
+    
+    Returns:
+        Resultados de la simulación con el resumen de power budget
+    """
+    from models.network_arrays import ArrayNetwork
+    from simulators.traffic_simulator import TrafficSimulator
+    from simulators.gpon_upstream import upstream_options
+    from simulators.time_series import window_options
+    
+    network = ArrayNetwork(name=f"Sweep {point['topology_type']} {point['num_onus']}")
+    network.create_ftth_topology(
+        num_onus=point['num_onus'],
+        split_ratio=point['split_ratio'],
+        topology_type=point['topology_type']
+    )
+    available = network.power_budget_arrays()['available_power']
+    
+    simulator = TrafficSimulator(
+        num_onus=network.num_onus,
+        simulation_time=point['simulation_time'],
+        seed=seed
+    )
+    results = simulator.run(
+        mode=parameters.get('mode', 'simpy'),
+        upstream_options=upstream_options(parameters),
+        window_options=window_options(parameters)
+    )
+    results['power_budget'] = {
+        'min_available_power': float(available.min()) if len(available) else None,
+        'invalid_onus': int((available < 0).sum()),
+        'total_fiber_length': float(network.fiber_data['length'].sum())
+    }
+    return results
+
+
+def summarize_sweep_point(results):
+    """Resumen de un punto del barrido (sin métricas por ONU)"""
+    return {k: v for k, v in results.items() if k != 'metrics'}
@@ -0,0 +1,208 @@
+"""
+Cálculos por puerto PON en procesos worker y unión de sus resultados
+"""
+import numpy as np
+
+from simulators.progress import PROGRESS_MAX_ONUS
+
+
+def shard_batches(items, workers):
+    """
+    Repartir items en como mucho `workers` lotes consecutivos de tamaño parecido
+    
+    Agrupar los puertos reduce el número de tareas (y de serializaciones)
+    cuando hay más puertos que procesos.
+    """
+    items = list(items)
+    count = min(len(items), max(1, workers))
+    bounds = np.linspace(0, len(items), count + 1).round().astype(int).tolist()
+    return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def pon_seeds(seed, count):
+    """SeedSequence independiente de cada puerto, derivada de la semilla de la red"""
+    return np.random.SeedSequence(seed).spawn(count)
+
+
+def power_budget_batch(pon_dicts, array_threshold):
+    """
+    Calcular el power budget de un lote de puertos en un proceso worker
+    
+    Cada puerto se reconstruye desde su diccionario con la misma
+    representación que usaría la aplicación según su número de ONUs.
+    
+    Returns:
+        Lista con el power budget (con olt_id) de las ONUs de los puertos
+    """
+    from models.network_elements import OpticalNetwork
+    from models.network_arrays import ArrayNetwork
+    from models.network_pons import pon_power_budgets
+    
+    results = []
+    for data in pon_dicts:
+        network_class = ArrayNetwork if len(data.get("onus", [])) >= array_threshold else OpticalNetwork
+        results.extend(pon_power_budgets(network_class.from_dict(data)))
+    return results
+
+
+def montecarlo_batch(pons, parameters):
+    """
+    Ejecutar el Monte Carlo del power budget de un lote de puertos en un
+    proceso worker
+    
+    Args:
+        pons: Lista [(rutas de power_path_arrays, SeedSequence del puerto)]
+        parameters: Parámetros de monte_carlo_parameters()
+    
+    Returns:
+        Lista de resultados de run_power_budget_montecarlo (None para los
+        puertos sin rutas)
+    """
+    from simulators.power_budget_montecarlo import run_power_budget_montecarlo
+    
+    return [
+        run_power_budget_montecarlo(paths, {**parameters, 'seed': seed}) if paths is not None else None
+        for paths, seed in pons
+    ]
+
+
+def merge_montecarlo(results):
+    """
+    Unir los resultados Monte Carlo de los puertos en los de la red
+    
+    Los puertos no comparten componentes y se muestrean con semillas
+    independientes, así que el yield de la red es el producto del de cada
+    puerto. Devuelve None si ningún puerto tiene rutas.
+    """
+    results = [result for result in results if result is not None]
+    if not results:
+        return None
+    merged = {
+        'onu_ids': [onu_id for result in results for onu_id in result['onu_ids']],
+        'margin_percentiles': {
+            key: np.concatenate([result['margin_percentiles'][key] for result in results])
+            for key in results[0]['margin_percentiles']
+        },
+        'yield': float(np.prod([result['yield'] for result in results]))
+    }
+    for key in ('nominal_margin', 'mean_margin', 'std_margin', 'violation_probability'):
+        merged[key] = np.concatenate([result[key] for result in results])
+    return merged
+
+
+def merge_pon_results(results, pons):
+    """
+    Unir los resultados de las simulaciones de tráfico de cada puerto
+    
+    Los totales se suman, las métricas por ONU se concatenan y la tasa de
+    descarte del modo 'gpon' se pondera con la carga ofrecida de cada
+    puerto. Los campos comunes (modo, semilla, ciclos, ventanas) son los
+    del primer puerto. Se añade 'pons' con el resumen de cada puerto.
+    
+    Args:
+        results: Resultados de TrafficSimulator.run de cada puerto
+        pons: Lista [(olt_id, [onu_id, ...])] en el mismo orden
+    """
+    num_onus = sum(len(onu_ids) for _, onu_ids in pons)
+    total_throughput = sum(result['total_throughput'] for result in results)
+    merged = {
+        **{key: value for key, value in results[0].items() if key != 'metrics'},
+        'total_throughput': total_throughput,
+        'total_packets': sum(result['total_packets'] for result in results),
+        'average_throughput': total_throughput / num_onus if num_onus > 0 else 0,
+        'metrics': [metric for result in results for metric in result['metrics']]
+    }
+    
+    summaries = []
+    for (olt_id, onu_ids), result in zip(pons, results):
+        summary = {
+            'olt_id': olt_id,
+            'num_onus': len(onu_ids),
+            'total_throughput': result['total_throughput'],
+            'total_packets': result['total_packets']
+        }
+        if 'drop_ratio' in result:
+            summary['drop_ratio'] = result['drop_ratio']
+        summaries.append(summary)
+    
+    if merged.get('mode') == 'gpon':
+        offered = sum(result['total_offered_load'] for result in results)
+        merged['total_offered_load'] = offered
+        merged['total_dropped_bytes'] = sum(result['total_dropped_bytes'] for result in results)
+        merged['drop_ratio'] = sum(
+            result['drop_ratio'] * result['total_offered_load'] for result in results
+        ) / offered if offered > 0 else 0
+    merged['pon_ports'] = len(pons)
+    merged['pons'] = summaries
+    return merged
+
+
+def merge_allocations(allocations, total_capacity):
+    """
+    Unir las asignaciones DBA de los puertos PON
+    
+    Cada puerto reparte su propia capacidad total_capacity entre sus ONUs,
+    así que la capacidad de la red es la suma de la de los puertos.
+    
+    Args:
+        allocations: Diccionario {olt_id: resultado de DynamicBandwidthAllocation.allocate}
+    
+    Returns:
+        Diccionario con el formato de allocate y el resumen de cada puerto en 'pons'
+    """
+    capacity = total_capacity * len(allocations)
+    total_granted = sum(allocation['total_granted'] for allocation in allocations.values())
+    merged = {
+        'allocations': {},
+        'total_requested': sum(allocation['total_requested'] for allocation in allocations.values()),
+        'total_granted': total_granted,
+        'total_capacity': capacity,
+        'remaining_capacity': capacity - total_granted,
+        'global_utilization': (total_granted / capacity * 100) if capacity > 0 else 0,
+        'pons': {}
+    }
+    for olt_id, allocation in allocations.items():
+        merged['allocations'].update(allocation['allocations'])
+        merged['pons'][olt_id] = {key: value for key, value in allocation.items() if key != 'allocations'}
+    return merged
+
+
+def merge_progress(latest, num_pons):
+    """
+    Informe de progreso de la red a partir del último de cada puerto
+    
+    El progreso es la media de los puertos (0 para los que aún no han
+    informado), los eventos se suman y el tiempo simulado es el del puerto
+    más atrasado. El throughput es la suma del último intervalo de cada
+    puerto; el de cada ONU sólo se incluye hasta PROGRESS_MAX_ONUS ONUs.
+    
+    Args:
+        latest: Diccionario {pon: último informe de SimulationProgress}
+        num_pons: Número de puertos de la simulación
+    """
+    updates = list(latest.values())
+    sim_times = [update['sim_time'] for update in updates]
+    elapsed = max(update['elapsed'] for update in updates)
+    merged = {
+        'update': sum(update['update'] for update in updates),
+        'sim_time': min(sim_times) if len(updates) == num_pons and None not in sim_times else None,
+        'simulation_time': updates[0]['simulation_time'],
+        'progress': sum(update['progress'] for update in updates) / num_pons,
+        'events': sum(update['events'] for update in updates),
+        'elapsed': elapsed,
+        'events_per_second': sum(update['events_per_second'] for update in updates),
+        'interval_start': None,
+        'total_throughput': sum(update['total_throughput'] for update in updates),
+        'pon_ports': num_pons,
+        'reporting_pons': len(updates)
+    }
+    if merged['sim_time'] is not None:
+        merged['interval_start'] = min(update['interval_start'] for update in updates)
+    
+    if all('throughput' in update for update in updates):
+        throughput = {}
+        for update in updates:
+            throughput.update(update['throughput'])
+        if len(throughput) <= PROGRESS_MAX_ONUS:
+            merged['throughput'] = throughput
+    return merged
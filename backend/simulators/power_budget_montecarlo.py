@@ -0,0 +1,318 @@
+"""
+Análisis Monte Carlo del power budget con tolerancias de los componentes
+"""
+import numpy as np
+
+from models.network_arrays import POWER_MARGIN
+
+
+# Parámetros del análisis y su valor por defecto. Las medias de fibras,
+# empalmes y splitters son las del cálculo nominal; las tolerancias son
+# desviaciones típicas de una distribución normal por componente.
+MONTE_CARLO_DEFAULTS = {
+    'trials': 10000,
+    'seed': 0,
+    'attenuation_sd': 0.01,   # dB/km, atenuación de cada fibra
+    'splice_sd': 0.05,        # dB por empalme
+    'connectors': 2,          # conectores por fibra
+    'connector_loss': 0.0,    # dB medios por conector (el cálculo nominal no los incluye)
+    'connector_sd': 0.1,      # dB por conector
+    'splitter_sd': 0.5,       # dB por salida de splitter (uniformidad)
+    'safety_margin': POWER_MARGIN
+}
+
+MAX_MONTE_CARLO_TRIALS = 100000
+
+MARGIN_PERCENTILES = (1, 5, 50, 95, 99)
+
+SPLICE_LOSS = 0.1  # dB por empalme, un empalme cada 2 km como OpticalFiber
+
+# Histograma de márgenes por ONU: HISTOGRAM_BINS intervalos en
+# ±HISTOGRAM_WIDTH desviaciones típicas alrededor del margen esperado
+HISTOGRAM_BINS = 128
+HISTOGRAM_WIDTH = 6
+
+# Elementos por bloque de realizaciones (limita la memoria por petición)
+CHUNK_ELEMENTS = 1 << 22
+
+
+def monte_carlo_parameters(values):
+    """
+    Validar los parámetros del análisis
+    
+    Args:
+        values: Diccionario {parámetro: valor} (p. ej. los de la consulta);
+            los omitidos toman su valor de MONTE_CARLO_DEFAULTS
+    
+    Returns:
+        Diccionario con todos los parámetros con su tipo
+    """
+    unknown = set(values) - set(MONTE_CARLO_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parámetros no soportados: {', '.join(sorted(unknown))}")
+    
+    parameters = {}
+    for key, default in MONTE_CARLO_DEFAULTS.items():
+        value = values.get(key, default)
+        try:
+            value = type(default)(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor no válido para {key}: {value}")
+        if not np.isfinite(value) or value < 0:
+            raise ValueError(f"{key} debe ser un número no negativo")
+        parameters[key] = value
+    
+    if not 1 <= parameters['trials'] <= MAX_MONTE_CARLO_TRIALS:
+        raise ValueError(f"trials debe estar entre 1 y {MAX_MONTE_CARLO_TRIALS}")
+    return parameters
+
+
+def _edge_distributions(length, attenuation, from_splitter, leave_loss, parameters):
+    """
+    Pérdida nominal, desplazamiento medio y desviación típica de cada tramo
+    
+    Un tramo es la fibra por la que se llega a un nodo, sus empalmes y
+    conectores y, si sale de un splitter, la salida del splitter.
+    """
+    splices = np.trunc(length / 2) + 1
+    nominal = leave_loss + length * attenuation + SPLICE_LOSS * splices
+    shift = np.full(len(length), parameters['connectors'] * parameters['connector_loss'])
+    variance = (
+        (length * parameters['attenuation_sd']) ** 2
+        + splices * parameters['splice_sd'] ** 2
+        + parameters['connectors'] * parameters['connector_sd'] ** 2
+        + from_splitter * parameters['splitter_sd'] ** 2
+    )
+    return nominal, shift, np.sqrt(variance)
+
+
+def _euler_tour(parent):
+    """
+    Recorrido en profundidad del árbol de rutas del troncal
+    
+    Cada tramo aparece con signo +1 al entrar en su nodo y -1 al salir, así
+    que la suma acumulada del recorrido hasta la entrada de un nodo es la
+    suma de los tramos de su ruta desde el OLT: una sola np.cumsum da la
+    ruta de todos los nodos, también en cadenas largas (bus, anillo).
+    
+    Returns:
+        Tupla (tramos, signos, entrada): índices de tramo y signo de cada
+        paso y, por nodo, la posición de su entrada en la suma acumulada
+        (0 para el OLT, -1 para los nodos inalcanzables)
+    """
+    num_nodes = len(parent)
+    edges = np.flatnonzero(parent >= 0)
+    edge_of = np.full(num_nodes, -1)
+    edge_of[edges] = np.arange(len(edges))
+    
+    order = edges[np.argsort(parent[edges], kind='stable')]
+    starts = np.searchsorted(parent[order], np.arange(num_nodes + 1))
+    order = order.tolist()
+    starts = starts.tolist()
+    
+    steps = []
+    signs = []
+    entry = [-1] * num_nodes
+    entry[0] = 0
+    pending = [(0, 1)]
+    while pending:
+        node, sign = pending.pop()
+        if sign < 0:
+            steps.append(edge_of[node])
+            signs.append(-1.0)
+            continue
+        if node != 0:
+            steps.append(edge_of[node])
+            signs.append(1.0)
+            entry[node] = len(steps)
+            pending.append((node, -1))
+        pending.extend((child, 1) for child in reversed(order[starts[node]:starts[node + 1]]))
+    
+    # Las salidas del final del recorrido no preceden a ninguna entrada
+    last = max(entry)
+    return np.array(steps[:last], dtype=np.int64), np.array(signs[:last]), np.array(entry)
+
+
+def run_power_budget_montecarlo(paths, parameters):
+    """
+    Muestrear las pérdidas de todas las rutas OLT -> ONU
+    
+    Cada realización toma una pérdida por tramo (truncada a no negativa) y
+    las ONUs comparten los tramos de su ruta común, así que los márgenes
+    de una realización están correlacionados como en la planta real. Las
+    realizaciones se generan por bloques de una matriz (realizaciones ×
+    ONUs); por ONU se acumulan las violaciones, los momentos y un
+    histograma del margen del que se interpolan los percentiles.
+    
+    Args:
+        paths: Rutas de power_path_arrays() de OpticalNetwork o ArrayNetwork
+        parameters: Parámetros de monte_carlo_parameters()
+    
+    Returns:
+        Diccionario de arrays por ONU (onu_ids, nominal_margin, mean_margin,
+        std_margin, violation_probability, margin_percentiles) y la
+        fracción de realizaciones en que todas las ONUs cumplen (yield)
+    """
+    trials = parameters['trials']
+    parent = np.asarray(paths['parent'], dtype=np.int64)
+    split_loss = np.asarray(paths['split_loss'], dtype=np.float64)
+    source = np.asarray(paths['onu_source'], dtype=np.int64)
+    nominal_margin = (
+        paths['power_budget'] - np.asarray(paths['total_loss'], dtype=np.float64)
+        - parameters['safety_margin']
+    )
+    num_onus = len(source)
+    
+    edges = np.flatnonzero(parent >= 0)
+    edge_parent = parent[edges]
+    edge_nominal, edge_shift, edge_sd = _edge_distributions(
+        np.asarray(paths['parent_length'], dtype=np.float64)[edges],
+        np.asarray(paths['parent_attenuation'], dtype=np.float64)[edges],
+        edge_parent > 0, split_loss[edge_parent], parameters
+    )
+    drop_nominal, drop_shift, drop_sd = _edge_distributions(
+        np.asarray(paths['onu_length'], dtype=np.float64),
+        np.asarray(paths['onu_attenuation'], dtype=np.float64),
+        np.ones(num_onus), split_loss[source], parameters
+    )
+    steps, signs, entry = _euler_tour(parent)
+    source_entry = entry[source]
+    
+    def path_sums(values):
+        walk = np.concatenate([[0.0], np.cumsum(values[steps] * signs)])
+        return walk[source_entry]
+    
+    # Pérdida extra esperada de cada ruta y su desviación (sin truncar): los
+    # momentos y el histograma se acumulan sobre la pérdida extra centrada,
+    # que cabe en float32 sin perder precisión
+    expected = path_sums(edge_shift) + drop_shift
+    spread = np.sqrt(np.maximum(path_sums(edge_sd ** 2), 0.0) + drop_sd ** 2)
+    spread = np.where(spread > 0, spread, 1e-9)
+    scale = (HISTOGRAM_BINS / (2 * HISTOGRAM_WIDTH) / spread).astype(np.float32)
+    threshold = (nominal_margin - expected).astype(np.float32)
+    offsets = np.arange(num_onus, dtype=np.int64) * HISTOGRAM_BINS
+    
+    edge_sd32 = edge_sd.astype(np.float32)
+    edge_low = (-edge_nominal - edge_shift).astype(np.float32)
+    drop_sd32 = drop_sd.astype(np.float32)
+    drop_low = (-drop_nominal - drop_shift).astype(np.float32)
+    
+    violations = np.zeros(num_onus, dtype=np.int64)
+    total = np.zeros(num_onus)
+    total_squares = np.zeros(num_onus)
+    counts = np.zeros(num_onus * HISTOGRAM_BINS, dtype=np.int64)
+    passing = 0
+    
+    rng = np.random.default_rng(parameters['seed'])
+    chunk = max(1, CHUNK_ELEMENTS // (2 * len(edges) + len(steps) + 2 * num_onus + 1))
+    for start in range(0, trials, chunk):
+        count = min(chunk, trials - start)
+        
+        # Pérdida extra de cada tramo del troncal, acumulada por la ruta de
+        # cada nodo con una suma del recorrido en profundidad
+        extra = rng.standard_normal((count, len(edges)), dtype=np.float32)
+        extra *= edge_sd32
+        np.maximum(extra, edge_low, out=extra)
+        walk = np.zeros((count, len(steps) + 1), dtype=np.float32)
+        np.multiply(extra[:, steps], signs, out=walk[:, 1:], casting='unsafe')
+        np.cumsum(walk, axis=1, out=walk)
+        
+        # Pérdida extra de cada ruta completa (realizaciones × ONUs)
+        loss = rng.standard_normal((count, num_onus), dtype=np.float32)
+        loss *= drop_sd32
+        np.maximum(loss, drop_low, out=loss)
+        loss += walk[:, source_entry]
+        del walk
+        
+        failed = loss > threshold
+        violations += np.count_nonzero(failed, axis=0)
+        passing += count - int(np.count_nonzero(failed.any(axis=1)))
+        del failed
+        total += loss.sum(axis=0, dtype=np.float64)
+        total_squares += np.square(loss).sum(axis=0, dtype=np.float64)
+        
+        # Intervalo del histograma: HISTOGRAM_BINS / 2 es la pérdida esperada
+        loss *= scale
+        loss += HISTOGRAM_BINS / 2
+        np.clip(loss, 0, HISTOGRAM_BINS - 1, out=loss)
+        counts += np.bincount((loss.astype(np.int64) + offsets).ravel(), minlength=len(counts))
+    
+    mean = total / trials
+    variance = np.maximum(total_squares / trials - mean ** 2, 0.0)
+    
+    # La cola inferior del margen es la cola superior de la pérdida extra
+    positions = _histogram_percentiles(
+        counts.reshape(num_onus, HISTOGRAM_BINS), [100 - q for q in MARGIN_PERCENTILES], trials
+    )
+    margin_percentiles = {}
+    for q in MARGIN_PERCENTILES:
+        loss_percentile = (positions[100 - q] - HISTOGRAM_BINS / 2) / scale
+        margin_percentiles[f'p{q}'] = nominal_margin - expected - loss_percentile
+    
+    return {
+        'onu_ids': list(paths['onu_ids']),
+        'nominal_margin': nominal_margin,
+        'mean_margin': nominal_margin - expected - mean,
+        'std_margin': np.sqrt(variance * trials / (trials - 1)) if trials > 1 else np.zeros(num_onus),
+        'violation_probability': violations / trials,
+        'margin_percentiles': margin_percentiles,
+        'yield': passing / trials
+    }
+
+
+def _histogram_percentiles(counts, quantiles, trials):
+    """
+    Percentiles de cada fila de un histograma de intervalos unitarios
+    
+    Returns:
+        Diccionario {q: posiciones}, interpolando linealmente dentro del
+        intervalo en que la frecuencia acumulada alcanza q
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    rows = np.arange(len(counts))
+    positions = {}
+    for q in quantiles:
+        target = q / 100 * trials
+        index = np.minimum((cumulative < target).sum(axis=1), counts.shape[1] - 1)
+        before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+        in_bin = counts[rows, index]
+        fraction = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.5)
+        positions[q] = index + fraction
+    return positions
+
+
+def summarize_montecarlo(results, parameters, decimals=4):
+    """
+    Resultado del análisis en formato JSON
+    
+    Returns:
+        Diccionario {parameters, yield, violating_onus, onus: [...]} con una
+        entrada por ONU: márgenes nominal, medio y su desviación, probabilidad
+        de violación del presupuesto y percentiles del margen (dB)
+    """
+    percentiles = {
+        key: np.round(values, decimals).tolist()
+        for key, values in results['margin_percentiles'].items()
+    }
+    columns = {
+        key: np.round(results[key], decimals).tolist()
+        for key in ('nominal_margin', 'mean_margin', 'std_margin')
+    }
+    probability = results['violation_probability'].tolist()
+    
+    onus = []
+    for i, onu_id in enumerate(results['onu_ids']):
+        onus.append({
+            "onu_id": onu_id,
+            "nominal_margin": columns['nominal_margin'][i],
+            "mean_margin": columns['mean_margin'][i],
+            "std_margin": columns['std_margin'][i],
+            "violation_probability": probability[i],
+            "margin_percentiles": {key: values[i] for key, values in percentiles.items()}
+        })
+    return {
+        "parameters": parameters,
+        "yield": results['yield'],
+        "violating_onus": int(np.count_nonzero(results['violation_probability'] > 0)),
+        "onus": onus
+    }
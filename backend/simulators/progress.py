@@ -0,0 +1,105 @@
+"""
+Informes de progreso de una simulación de tráfico en ejecución
+"""
+import time
+import numpy as np
+
+
+# Número de informes por simulación si no se indica progress_interval
+PROGRESS_UPDATES = 50
+
+# Máximo de informes por simulación: progress_interval menores se suben a
+# simulation_time / PROGRESS_MAX_UPDATES
+PROGRESS_MAX_UPDATES = 1000
+
+# Por encima de este número de ONUs sólo se informa el throughput total
+PROGRESS_MAX_ONUS = 128
+
+
+def progress_interval(parameters):
+    """
+    Validar el intervalo de progreso de los parámetros de una simulación
+    
+    Returns:
+        Segundos simulados entre informes, al menos simulation_time /
+        PROGRESS_MAX_UPDATES, o None para el valor por defecto
+        (simulation_time / PROGRESS_UPDATES)
+    """
+    interval = parameters.get('progress_interval')
+    if interval is None:
+        return None
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or not interval > 0:
+        raise ValueError("progress_interval debe ser un número de segundos mayor que 0")
+    simulation_time = parameters.get('simulation_time', 100)
+    if isinstance(simulation_time, bool) or not isinstance(simulation_time, (int, float)):
+        return float(interval)
+    return max(float(interval), simulation_time / PROGRESS_MAX_UPDATES)
+
+
+class SimulationProgress:
+    """
+    Informes periódicos del progreso de una simulación
+    
+    El bucle de simulación llama a report cada `interval` segundos
+    simulados (o al terminar cada ONU en el modo vectorizado); cada informe
+    se entrega a callback como un diccionario JSON con el tiempo simulado,
+    los eventos procesados y por segundo de reloj, y el throughput de cada
+    ONU en el intervalo desde el informe anterior.
+    """
+    
+    def __init__(self, callback, onu_ids, simulation_time, interval=None):
+        self.callback = callback
+        self.onu_ids = list(onu_ids)
+        self.simulation_time = simulation_time
+        self.interval = interval or simulation_time / PROGRESS_UPDATES
+        self.next_time = self.interval
+        self.updates = 0
+        self.started = time.perf_counter()
+        self.last_time = 0.0
+        self.last_bytes = np.zeros(len(self.onu_ids))
+    
+    def due(self, sim_time):
+        """Indica si toca informar en el instante simulado sim_time"""
+        return sim_time >= self.next_time
+    
+    def report(self, sim_time, events, bytes_sent, progress=None):
+        """
+        Enviar un informe
+        
+        Args:
+            sim_time: Tiempo simulado alcanzado, o None si la simulación no
+                avanza en el tiempo (modo vectorizado, ONU a ONU)
+            events: Eventos procesados desde el inicio (paquetes o ciclos DBA)
+            bytes_sent: Array de bytes enviados por cada ONU desde el inicio
+            progress: Fracción completada (por defecto sim_time / simulation_time)
+        """
+        elapsed = time.perf_counter() - self.started
+        bytes_sent = np.asarray(bytes_sent, dtype=np.float64)
+        if sim_time is None:
+            # Throughput final de las ONUs ya simuladas
+            throughput = bytes_sent * 8 / (self.simulation_time * 1e6)
+        else:
+            duration = sim_time - self.last_time
+            throughput = (bytes_sent - self.last_bytes) * 8 / (duration * 1e6) if duration > 0 \
+                else np.zeros(len(self.onu_ids))
+            self.next_time = (int(sim_time / self.interval) + 1) * self.interval
+        
+        self.updates += 1
+        update = {
+            'update': self.updates,
+            'sim_time': sim_time,
+            'simulation_time': self.simulation_time,
+            'progress': progress if progress is not None else min(sim_time / self.simulation_time, 1.0),
+            'events': int(events),
+            'elapsed': elapsed,
+            'events_per_second': events / elapsed if elapsed > 0 else 0.0,
+            'interval_start': self.last_time if sim_time is not None else None,
+            'total_throughput': float(throughput.sum())
+        }
+        if len(self.onu_ids) <= PROGRESS_MAX_ONUS:
+            update['throughput'] = dict(zip(self.onu_ids, throughput.tolist()))
+        
+        if sim_time is not None:
+            self.last_time = sim_time
+            self.last_bytes = bytes_sent.copy()
+        self.callback(update)
@@ -0,0 +1,288 @@
+"""
+Métricas por ventanas de tiempo de una simulación de tráfico con memoria acotada
+"""
+import math
+import numpy as np
+
+
+# Número máximo de ventanas guardadas en la serie por defecto y en total
+DEFAULT_SERIES_WINDOWS = 100
+MAX_SERIES_WINDOWS = 1000
+
+# Histograma logarítmico del throughput por ventana (Mbps) para los percentiles
+THROUGHPUT_HISTOGRAM_EDGES = np.geomspace(1e-3, 1e5, 256)
+WINDOW_PERCENTILES = (50, 95, 99)
+
+
+def window_options(parameters):
+    """
+    Validar las opciones de ventanas de los parámetros de una simulación
+    
+    Args:
+        parameters: Parámetros de la simulación; 'window' es el ancho de
+            ventana en segundos y 'series_windows' el máximo de ventanas
+            guardadas en la serie
+    
+    Returns:
+        Diccionario {window, series_windows}, o None si no se pidieron ventanas
+    """
+    window = parameters.get('window')
+    if window is None:
+        return None
+    if isinstance(window, bool) or not isinstance(window, (int, float)) or not window > 0:
+        raise ValueError("window debe ser un número de segundos mayor que 0")
+    
+    series_windows = parameters.get('series_windows', DEFAULT_SERIES_WINDOWS)
+    if isinstance(series_windows, bool) or not isinstance(series_windows, int) \
+            or not 1 <= series_windows <= MAX_SERIES_WINDOWS:
+        raise ValueError(f"series_windows debe ser un entero entre 1 y {MAX_SERIES_WINDOWS}")
+    return {'window': float(window), 'series_windows': series_windows}
+
+
+class WindowedMetrics:
+    """
+    Bytes y paquetes por ONU en ventanas de tiempo de ancho fijo
+    
+    El tiempo simulado se divide en ventanas iguales del ancho pedido
+    (ajustado para que quepa un número entero). Las ventanas se agrupan en
+    como mucho series_windows ventanas de la serie, guardadas en matrices
+    NumPy (ventanas × ONUs) reservadas al crear el objeto.
+    
+    Además, el throughput de cada ventana se acumula al cerrarse en
+    estadísticos en línea por ONU: media y varianza de Welford (combinando
+    lotes con la fórmula de Chan), mínimo, máximo y un histograma
+    logarítmico para los percentiles. La memoria no depende de la duración
+    de la simulación ni del número de ventanas.
+    
+    Las llegadas de cada ONU deben añadirse en orden de tiempo.
+    """
+    
+    def __init__(self, onu_ids, simulation_time, window, series_windows=DEFAULT_SERIES_WINDOWS):
+        self.onu_ids = list(onu_ids)
+        self.simulation_time = simulation_time
+        self.num_windows = max(1, int(round(simulation_time / window)))
+        self.window = simulation_time / self.num_windows
+        
+        # Ventanas de la serie: grupos de `group` ventanas consecutivas
+        self.group = math.ceil(self.num_windows / series_windows)
+        self.series_windows = math.ceil(self.num_windows / self.group)
+        widths = np.minimum(self.group, self.num_windows - np.arange(self.series_windows) * self.group)
+        self.series_durations = widths * self.window
+        
+        num_onus = len(self.onu_ids)
+        self.bytes = np.zeros((self.series_windows, num_onus))
+        self.packets = np.zeros((self.series_windows, num_onus), dtype=np.int64)
+        
+        # Ventana abierta de cada ONU (la última con llegadas, aún sin cerrar)
+        self.open_window = np.zeros(num_onus, dtype=np.int64)
+        self.open_bytes = np.zeros(num_onus)
+        self.finished = False
+        
+        # Estadísticos en línea del throughput por ventana (Mbps)
+        self.count = np.zeros(num_onus, dtype=np.int64)
+        self.mean = np.zeros(num_onus)
+        self.m2 = np.zeros(num_onus)
+        self.min = np.full(num_onus, np.inf)
+        self.max = np.full(num_onus, -np.inf)
+        self.zero_windows = np.zeros(num_onus, dtype=np.int64)
+        self.histogram = np.zeros((num_onus, len(THROUGHPUT_HISTOGRAM_EDGES)), dtype=np.int64)
+    
+    def _window_index(self, times):
+        """Ventana de cada instante (el final de la simulación cae en la última)"""
+        index = (np.asarray(times, dtype=np.float64) / self.window).astype(np.int64)
+        return np.clip(index, 0, self.num_windows - 1)
+    
+    def add_arrivals(self, onu_index, times, sizes):
+        """
+        Añadir las llegadas de una ONU
+        
+        Args:
+            onu_index: Posición de la ONU en onu_ids
+            times: Instantes de llegada en segundos, crecientes y posteriores
+                a los de llamadas anteriores para la misma ONU
+            sizes: Tamaño de cada paquete en bytes
+        """
+        if len(times) == 0:
+            return
+        index = self._window_index(times)
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        windows = index[starts]
+        window_bytes = np.add.reduceat(np.asarray(sizes, dtype=np.float64), starts)
+        window_packets = np.diff(np.r_[starts, len(index)])
+        
+        series = windows // self.group
+        self.bytes[:, onu_index] += np.bincount(series, window_bytes, minlength=self.series_windows)
+        self.packets[:, onu_index] += np.bincount(series, window_packets, minlength=self.series_windows).astype(np.int64)
+        
+        self._advance([onu_index], windows, window_bytes[:, None])
+    
+    def add_rows(self, times, row_bytes, row_packets):
+        """
+        Añadir llegadas de todas las ONUs en instantes comunes
+        
+        Args:
+            times: Instantes crecientes (p. ej. ciclos DBA)
+            row_bytes: Matriz (instantes, ONUs) de bytes
+            row_packets: Matriz (instantes, ONUs) de paquetes
+        """
+        if len(times) == 0:
+            return
+        index = self._window_index(times)
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        windows = index[starts]
+        window_bytes = np.add.reduceat(np.asarray(row_bytes, dtype=np.float64), starts, axis=0)
+        window_packets = np.add.reduceat(np.asarray(row_packets, dtype=np.int64), starts, axis=0)
+        
+        series = windows // self.group
+        np.add.at(self.bytes, series, window_bytes)
+        np.add.at(self.packets, series, window_packets)
+        
+        self._advance(slice(None), windows, window_bytes)
+    
+    def _advance(self, columns, windows, window_bytes):
+        """
+        Cerrar las ventanas anteriores a la última con llegadas
+        
+        Todas las columnas comparten la ventana abierta y las ventanas de
+        windows (crecientes); window_bytes es (ventanas, columnas).
+        """
+        open_window = int(self.open_window[columns][0])
+        window_bytes = window_bytes.copy()
+        
+        if windows[0] == open_window:
+            window_bytes[0] += self.open_bytes[columns]
+            closed = window_bytes[:-1]
+            empty = int(windows[-1] - windows[0]) - (len(windows) - 1)
+        else:
+            closed = np.vstack([self.open_bytes[columns][None, :], window_bytes[:-1]])
+            empty = int(windows[-1] - open_window) - len(windows)
+        
+        self._observe(columns, closed, empty)
+        self.open_window[columns] = windows[-1]
+        self.open_bytes[columns] = window_bytes[-1]
+    
+    def _observe(self, columns, closed_bytes, empty):
+        """
+        Acumular ventanas cerradas en los estadísticos de las columnas
+        
+        Args:
+            closed_bytes: Matriz (ventanas, columnas) con los bytes de las
+                ventanas cerradas con llegadas o abiertas previamente
+            empty: Número de ventanas cerradas sin llegadas (throughput 0)
+        """
+        values = closed_bytes * 8 / (self.window * 1e6)
+        batch = len(values) + empty
+        if batch == 0:
+            return
+        
+        # Media y suma de cuadrados del lote, incluyendo las ventanas vacías
+        batch_mean = values.sum(axis=0) / batch
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0) + empty * batch_mean ** 2
+        
+        count = self.count[columns]
+        total = count + batch
+        delta = batch_mean - self.mean[columns]
+        self.mean[columns] += delta * batch / total
+        self.m2[columns] += batch_m2 + delta ** 2 * count * batch / total
+        self.count[columns] = total
+        
+        if empty:
+            self.min[columns] = np.minimum(self.min[columns], 0.0)
+            self.max[columns] = np.maximum(self.max[columns], 0.0)
+        if len(values):
+            self.min[columns] = np.minimum(self.min[columns], values.min(axis=0))
+            self.max[columns] = np.maximum(self.max[columns], values.max(axis=0))
+        
+        zero = values == 0
+        self.zero_windows[columns] += empty + zero.sum(axis=0)
+        rows, cols = np.nonzero(~zero)
+        if len(rows):
+            num_bins = len(THROUGHPUT_HISTOGRAM_EDGES)
+            bins = np.minimum(np.searchsorted(THROUGHPUT_HISTOGRAM_EDGES, values[rows, cols]), num_bins - 1)
+            counts = np.bincount(cols * num_bins + bins, minlength=values.shape[1] * num_bins)
+            self.histogram[columns] += counts.reshape(values.shape[1], num_bins)
+    
+    def finish(self):
+        """Cerrar las ventanas abiertas y las vacías hasta el final de la simulación"""
+        if self.finished:
+            return
+        self.finished = True
+        for onu_index in range(len(self.onu_ids)):
+            empty = self.num_windows - 1 - int(self.open_window[onu_index])
+            self._observe([onu_index], self.open_bytes[[onu_index]][None, :], empty)
+    
+    def percentiles(self, percentiles=WINDOW_PERCENTILES):
+        """
+        Percentiles del throughput por ventana de cada ONU
+        
+        Se obtienen del histograma (límite superior del intervalo), por lo
+        que su precisión relativa es la anchura de un intervalo (~7.5%).
+        """
+        counts = np.hstack([self.zero_windows[:, None], self.histogram])
+        values = np.r_[0.0, THROUGHPUT_HISTOGRAM_EDGES]
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1:]
+        result = {}
+        for p in percentiles:
+            index = np.argmax(cumulative >= totals * (p / 100), axis=1)
+            result[p] = values[index]
+        return result
+    
+    def statistics(self):
+        """Estadísticos del throughput por ventana de cada ONU (arrays)"""
+        self.finish()
+        std = np.sqrt(self.m2 / np.maximum(self.count - 1, 1))
+        stats = {
+            'window_throughput_mean': self.mean,
+            'window_throughput_std': std,
+            'window_throughput_min': self.min,
+            'window_throughput_max': self.max
+        }
+        for p, values in self.percentiles().items():
+            stats[f'window_throughput_p{p}'] = values
+        return stats
+    
+    def metrics(self):
+        """
+        Filas de métricas de la serie y de los estadísticos
+        
+        Cada ventana de la serie da las filas 'window_throughput' (Mbps) y
+        'window_packets' de cada ONU con el instante final de la ventana como
+        timestamp; los estadísticos llevan el tiempo de simulación.
+        """
+        throughput = self.bytes * 8 / (self.series_durations[:, None] * 1e6)
+        ends = np.cumsum(self.series_durations)
+        metrics = []
+        for w, end in enumerate(ends.tolist()):
+            for i, onu_id in enumerate(self.onu_ids):
+                metrics.append({
+                    'onu_id': onu_id,
+                    'type': 'window_throughput',
+                    'value': float(throughput[w, i]),
+                    'timestamp': end
+                })
+                metrics.append({
+                    'onu_id': onu_id,
+                    'type': 'window_packets',
+                    'value': int(self.packets[w, i]),
+                    'timestamp': end
+                })
+        
+        for metric_type, values in self.statistics().items():
+            for i, onu_id in enumerate(self.onu_ids):
+                metrics.append({
+                    'onu_id': onu_id,
+                    'type': metric_type,
+                    'value': float(values[i]),
+                    'timestamp': self.simulation_time
+                })
+        return metrics
+    
+    def summary(self):
+        """Descripción de las ventanas para los resultados agregados"""
+        return {
+            'window': self.window,
+            'windows': self.num_windows,
+            'series_window': self.window * self.group,
+            'series_windows': self.series_windows
+        }
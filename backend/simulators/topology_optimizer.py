@@ -0,0 +1,253 @@
+"""
+Búsqueda de diseños de topología Pareto-óptimos (coste y margen de potencia)
+"""
+import numpy as np
+
+
+TOPOLOGY_TYPES = ('star', 'tree', 'bus', 'ring')
+
+SPLIT_RATIOS = ('1:2', '1:4', '1:8', '1:16', '1:32', '1:64', '1:128')
+
+# Bus y anillo usan siempre splitters de derivación 1:2, sea cual sea el ratio
+FIXED_SPLIT_RATIO = {'bus': '1:2', 'ring': '1:2'}
+
+# Restricciones de un diseño válido (None = sin límite)
+OPTIMIZER_CONSTRAINTS = {
+    'min_available_power': 0.0,  # dB, peor ONU (available_power de power budget)
+    'max_fiber_length': None,    # km de fibra en total
+    'max_splitters': None
+}
+
+# Pesos del coste de un diseño
+COST_WEIGHTS = {
+    'fiber_km': 1.0,
+    'splitter': 0.0
+}
+
+# Objetivos de la frontera de Pareto: 1 para minimizar, -1 para maximizar
+OBJECTIVES = (('cost', 1), ('min_available_power', -1))
+
+MAX_OPTIMIZER_ONUS = 100000
+
+
+def _split_count(ratio):
+    """Puertos de salida de un ratio '1:N'"""
+    parts = ratio.split(':') if isinstance(ratio, str) else []
+    if len(parts) != 2 or parts[0] != '1' or not parts[1].isdigit() or int(parts[1]) < 2:
+        raise ValueError(f"Ratio no válido: {ratio} (formato '1:N' con N >= 2)")
+    return int(parts[1])
+
+
+def _options(values, defaults, name):
+    """Completar un diccionario de opciones numéricas con sus valores por defecto"""
+    values = values or {}
+    if not isinstance(values, dict):
+        raise ValueError(f"{name} debe ser un objeto")
+    unknown = set(values) - set(defaults)
+    if unknown:
+        raise ValueError(f"Opciones de {name} no soportadas: {', '.join(sorted(unknown))}")
+    
+    options = {}
+    for key, default in defaults.items():
+        value = values.get(key, default)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"{name}.{key} debe ser un número")
+        options[key] = value
+    return options
+
+
+def optimizer_request(data):
+    """
+    Validar una petición de optimización
+    
+    Args:
+        data: Diccionario {num_onus, topology_types, split_ratios,
+            constraints, weights}; los omitidos toman los valores de
+            TOPOLOGY_TYPES, SPLIT_RATIOS, OPTIMIZER_CONSTRAINTS y COST_WEIGHTS
+    
+    Returns:
+        Diccionario con todas las opciones
+    """
+    if not isinstance(data, dict):
+        raise ValueError("La petición debe ser un objeto")
+    num_onus = data.get('num_onus')
+    if isinstance(num_onus, bool) or not isinstance(num_onus, int) or not 1 <= num_onus <= MAX_OPTIMIZER_ONUS:
+        raise ValueError(f"num_onus debe ser un entero entre 1 y {MAX_OPTIMIZER_ONUS}")
+    
+    topology_types = data.get('topology_types', list(TOPOLOGY_TYPES))
+    if not isinstance(topology_types, list) or not topology_types or any(t not in TOPOLOGY_TYPES for t in topology_types):
+        raise ValueError(f"topology_types debe ser una lista de {', '.join(TOPOLOGY_TYPES)}")
+    
+    split_ratios = data.get('split_ratios', list(SPLIT_RATIOS))
+    if not isinstance(split_ratios, list) or not split_ratios:
+        raise ValueError("split_ratios debe ser una lista no vacía de ratios '1:N'")
+    for ratio in split_ratios:
+        _split_count(ratio)
+    
+    weights = _options(data.get('weights'), COST_WEIGHTS, 'weights')
+    if any(value is None or value < 0 for value in weights.values()):
+        raise ValueError("Los pesos de coste deben ser números no negativos")
+    
+    return {
+        'num_onus': num_onus,
+        'topology_types': list(dict.fromkeys(topology_types)),
+        'split_ratios': list(dict.fromkeys(split_ratios)),
+        'constraints': _options(data.get('constraints'), OPTIMIZER_CONSTRAINTS, 'constraints'),
+        'weights': weights
+    }
+
+
+def candidate_designs(topology_types, split_ratios):
+    """
+    Diseños distintos (topology_type, split_ratio) a evaluar
+    
+    El producto de tipos y ratios, con un solo diseño para las topologías
+    cuyo ratio es fijo (bus y anillo).
+    """
+    designs = []
+    for topology_type in topology_types:
+        if topology_type in FIXED_SPLIT_RATIO:
+            designs.append((topology_type, FIXED_SPLIT_RATIO[topology_type]))
+        else:
+            designs.extend((topology_type, ratio) for ratio in split_ratios)
+    return list(dict.fromkeys(designs))
+
+
+def evaluate_design(num_onus, topology_type, split_ratio):
+    """
+    Evaluar un diseño en un proceso worker
+    
+    Genera la topología como ArrayNetwork y resume su power budget, su
+    fibra y sus splitters. El resultado sólo depende del diseño, así que
+    puede guardarse en caché y reutilizarse con otras restricciones y pesos.
+    
+    Returns:
+        Diccionario {topology_type, split_ratio, served_onus, num_splitters,
+        num_fibers, total_fiber_length, min_available_power, invalid_onus,
+        overloaded_splitters}
+    """
+    from models.network_arrays import ArrayNetwork
+    
+    network = ArrayNetwork(name=None)
+    network.create_ftth_topology(num_onus=num_onus, split_ratio=split_ratio, topology_type=topology_type)
+    available = network.power_budget_arrays()['available_power']
+    
+    # Salidas usadas de cada splitter (fibras que salen de él) frente a sus puertos
+    from_node = network.fiber_data['from_node']
+    sources = from_node[(from_node >= 1) & (from_node <= network.num_splitters)] - 1
+    outputs = np.bincount(sources, minlength=network.num_splitters)
+    ratios, inverse = np.unique(network.splitter_data['ratio'], return_inverse=True)
+    ports = np.array([_split_count(str(ratio)) for ratio in ratios], dtype=np.int64)[inverse]
+    
+    return {
+        'topology_type': topology_type,
+        'split_ratio': split_ratio,
+        'served_onus': int(len(available)),
+        'num_splitters': int(network.num_splitters),
+        'num_fibers': int(len(network.fiber_data['id'])),
+        'total_fiber_length': round(float(network.fiber_data['length'].sum()), 6),
+        'min_available_power': float(available.min()) if len(available) else None,
+        'invalid_onus': int(np.count_nonzero(available < 0)),
+        'overloaded_splitters': int(np.count_nonzero(outputs > ports))
+    }
+
+
+def design_violations(evaluation, num_onus, constraints):
+    """Restricciones que incumple un diseño evaluado (lista vacía si es válido)"""
+    violations = []
+    if evaluation['served_onus'] < num_onus:
+        violations.append(f"sólo conecta {evaluation['served_onus']} de {num_onus} ONUs")
+    if evaluation['overloaded_splitters']:
+        violations.append(f"{evaluation['overloaded_splitters']} splitters con más salidas que puertos")
+    
+    min_available = evaluation['min_available_power']
+    limit = constraints['min_available_power']
+    if min_available is None:
+        violations.append("ninguna ONU alcanzable")
+    elif limit is not None and min_available < limit:
+        violations.append(f"peor margen {min_available:.2f} dB (mínimo {limit} dB)")
+    
+    max_fiber_length = constraints['max_fiber_length']
+    if max_fiber_length is not None and evaluation['total_fiber_length'] > max_fiber_length:
+        violations.append(f"{evaluation['total_fiber_length']:.1f} km de fibra (máximo {max_fiber_length})")
+    
+    max_splitters = constraints['max_splitters']
+    if max_splitters is not None and evaluation['num_splitters'] > max_splitters:
+        violations.append(f"{evaluation['num_splitters']} splitters (máximo {max_splitters})")
+    return violations
+
+
+def design_cost(evaluation, weights):
+    """Coste ponderado de un diseño"""
+    return round(
+        weights['fiber_km'] * evaluation['total_fiber_length']
+        + weights['splitter'] * evaluation['num_splitters'], 6
+    )
+
+
+def pareto_front(points):
+    """
+    Índices de los puntos no dominados
+    
+    Args:
+        points: Lista de tuplas de objetivos a minimizar
+    
+    Returns:
+        Índices de los puntos que ningún otro mejora o iguala en todos los
+        objetivos mejorando al menos uno, en el orden de points
+    """
+    if not points:
+        return []
+    values = np.asarray(points, dtype=np.float64)
+    front = []
+    for i, point in enumerate(values):
+        dominated = np.all(values <= point, axis=1) & np.any(values < point, axis=1)
+        if not dominated.any():
+            front.append(i)
+    return front
+
+
+def select_designs(evaluations, options):
+    """
+    Clasificar los diseños evaluados y obtener la frontera de Pareto
+    
+    Los diseños que generan la misma red (p. ej. un árbol con menos ONUs
+    que puertos, que es una estrella) se agrupan en el primero.
+    
+    Returns:
+        Diccionario {pareto, candidates}: los diseños válidos no dominados
+        ordenados por coste, y todos los diseños con su coste, validez,
+        restricciones incumplidas y si están en la frontera
+    """
+    candidates = []
+    for evaluation in evaluations:
+        violations = design_violations(evaluation, options['num_onus'], options['constraints'])
+        candidates.append({
+            **evaluation,
+            'cost': design_cost(evaluation, options['weights']),
+            'feasible': not violations,
+            'violations': violations,
+            'pareto': False
+        })
+    
+    groups = {}
+    for candidate in candidates:
+        if not candidate['feasible']:
+            continue
+        signature = tuple(candidate[key] for key in (
+            'served_onus', 'num_splitters', 'num_fibers', 'total_fiber_length', 'min_available_power'
+        ))
+        if signature in groups:
+            groups[signature]['equivalent_designs'].append([candidate['topology_type'], candidate['split_ratio']])
+        else:
+            candidate['equivalent_designs'] = []
+            groups[signature] = candidate
+    
+    feasible = list(groups.values())
+    points = [[sign * candidate[key] for key, sign in OBJECTIVES] for candidate in feasible]
+    pareto = [feasible[i] for i in pareto_front(points)]
+    for candidate in pareto:
+        candidate['pareto'] = True
+    pareto.sort(key=lambda candidate: (candidate['cost'], -candidate['min_available_power']))
+    
+    return {'pareto': pareto, 'candidates': candidates}
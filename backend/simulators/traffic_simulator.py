@@ -1,106 +1,305 @@
 """
-Simulador de tráfico usando SimPy
+Simulador de tráfico usando SimPy (por eventos), NumPy (vectorizado) o
+ciclos DBA del canal ascendente GPON
 """
+import functools
+import secrets
 import simpy
-import random
 import numpy as np
 
+from simulators.gpon_upstream import GponUpstreamSimulator
+from simulators.time_series import WindowedMetrics
+from simulators.progress import SimulationProgress, PROGRESS_UPDATES
+
+
+SIMULATION_MODES = ('simpy', 'vectorized', 'gpon')
+
+# Número de paquetes generados por bloque en el modo vectorizado
+VECTORIZED_BLOCK_SIZE = 65536
+
+# Número de intervalos y tamaños pre-generados por bloque en el modo SimPy
+SIMPY_BLOCK_SIZE = 1024
+
+# Las semillas generadas caben en un número de JavaScript (2**53 - 1), así
+# que la semilla devuelta puede copiarse desde el frontend para repetir la
+# simulación
+MAX_GENERATED_SEED = 2**53 - 1
+
+# Máximo de segundos simulados por simulación
+MAX_SIMULATION_TIME = 3600
+
+
+def random_seed():
+    """Semilla aleatoria para una simulación sin semilla"""
+    return secrets.randbelow(MAX_GENERATED_SEED + 1)
+
+
+def simulation_time_option(simulation_time):
+    """
+    Validar el tiempo simulado de una simulación
+    
+    Debe ser un número finito de segundos mayor que 0 y como mucho
+    MAX_SIMULATION_TIME; con otro valor el modo vectorizado no terminaría.
+    """
+    if isinstance(simulation_time, bool) or not isinstance(simulation_time, (int, float)) \
+            or not 0 < simulation_time <= MAX_SIMULATION_TIME:
+        raise ValueError(
+            f"simulation_time debe ser un número de segundos mayor que 0 y como mucho {MAX_SIMULATION_TIME}"
+        )
+    return simulation_time
+
 
 class TrafficGenerator:
     """Generador de tráfico para ONUs"""
     
-    def __init__(self, env, onu_id, traffic_pattern='poisson', rate=10):
+    def __init__(self, env, onu_id, traffic_pattern='poisson', rate=10, rng=None):
         self.env = env
         self.onu_id = onu_id
         self.traffic_pattern = traffic_pattern  # 'constant', 'poisson', 'bursty'
         self.rate = rate  # Mbps
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.packets_sent = 0
         self.bytes_sent = 0
+        # Destino opcional de las llegadas: record(times, sizes)
+        self.record = None
+        self._recorded_times = []
+        self._recorded_sizes = []
         
     def generate_packet_size(self):
         """Generar tamaño de paquete según patrón"""
-        if self.traffic_pattern == 'constant':
-            return 1500  # MTU estándar
-        elif self.traffic_pattern == 'poisson':
+        return int(self.generate_packet_sizes(1)[0])
+    
+    def _stream(self, draw, block_size=SIMPY_BLOCK_SIZE):
+        """Iterar valores escalares sacados de bloques pre-generados por draw(block_size)"""
+        while True:
+            yield from draw(block_size).tolist()
+    
+    def traffic_process(self):
+        """Proceso de generación de tráfico"""
+        intervals = self._stream(self.generate_intervals)
+        sizes = self._stream(self.generate_packet_sizes)
+        while True:
+            yield self.env.timeout(next(intervals))
+            
+            size = next(sizes)
+            self.packets_sent += 1
+            self.bytes_sent += size
+            
+            if self.record is not None:
+                self._recorded_times.append(self.env.now)
+                self._recorded_sizes.append(size)
+                if len(self._recorded_times) >= SIMPY_BLOCK_SIZE:
+                    self.flush_record()
+    
+    def flush_record(self):
+        """Entregar a record las llegadas acumuladas por traffic_process"""
+        if self.record is not None and self._recorded_times:
+            self.record(np.array(self._recorded_times), np.array(self._recorded_sizes))
+        self._recorded_times = []
+        self._recorded_sizes = []
+    
+    def generate_packet_sizes(self, count):
+        """Generar un bloque de tamaños de paquete (versión vectorizada de generate_packet_size)"""
+        if self.traffic_pattern == 'poisson':
             # Distribución exponencial para tamaños
-            return int(np.random.exponential(1000))
+            return self.rng.exponential(1000, count).astype(np.int64)
         elif self.traffic_pattern == 'bursty':
             # Modo bursty: paquetes grandes en ráfagas
-            if random.random() < 0.3:
-                return random.randint(1400, 1500)
-            else:
-                return random.randint(64, 512)
-        return 1500
+            large = self.rng.random(count) < 0.3
+            return np.where(
+                large,
+                self.rng.integers(1400, 1501, count),
+                self.rng.integers(64, 513, count)
+            )
+        # 'constant' y patrones desconocidos usan el MTU estándar
+        return np.full(count, 1500, dtype=np.int64)
     
-    def traffic_process(self):
-        """Proceso de generación de tráfico"""
+    def generate_intervals(self, count):
+        """Generar un bloque de tiempos entre llegadas (versión vectorizada de traffic_process)"""
+        if self.traffic_pattern == 'constant':
+            return np.full(count, 8 * 1500 / (self.rate * 1e6))
+        
+        # El intervalo depende de un tamaño de paquete independiente del transmitido
+        mean_intervals = 8 * self.generate_packet_sizes(count) / (self.rate * 1e6)
+        intervals = self.rng.exponential(1.0, count) * mean_intervals
+        if self.traffic_pattern == 'poisson':
+            return intervals
+        
+        # bursty: ráfagas cortas con probabilidad 0.2
+        burst = self.rng.random(count) < 0.2
+        return np.where(burst, 0.001, intervals)
+    
+    def vectorized_traffic(self, until, block_size=VECTORIZED_BLOCK_SIZE):
+        """
+        Generar todo el tráfico hasta `until` en bloques de NumPy
+        
+        Equivale estadísticamente a ejecutar traffic_process en SimPy: las
+        llegadas son la suma acumulada de los intervalos y sólo se cuentan las
+        que ocurren antes del fin de la simulación.
+        
+        Args:
+            until: Tiempo final de la simulación en segundos
+            block_size: Número de paquetes generados por bloque
+        """
+        now = 0.0
         while True:
-            if self.traffic_pattern == 'constant':
-                interval = 8 * self.generate_packet_size() / (self.rate * 1e6)
-            elif self.traffic_pattern == 'poisson':
-                interval = np.random.exponential(8 * self.generate_packet_size() / (self.rate * 1e6))
-            else:  # bursty
-                if random.random() < 0.2:
-                    interval = 0.001  # Ráfaga corta
-                else:
-                    interval = np.random.exponential(8 * self.generate_packet_size() / (self.rate * 1e6))
+            arrivals = now + np.cumsum(self.generate_intervals(block_size))
+            # SimPy no procesa los eventos programados exactamente en `until`
+            delivered = int(np.searchsorted(arrivals, until, side='left'))
             
-            yield self.env.timeout(interval)
+            sizes = self.generate_packet_sizes(delivered)
+            self.packets_sent += delivered
+            self.bytes_sent += int(sizes.sum())
+            if self.record is not None:
+                self.record(arrivals[:delivered], sizes)
             
-            packet_size = self.generate_packet_size()
-            self.packets_sent += 1
-            self.bytes_sent += packet_size
+            if delivered < block_size:
+                break
+            now = arrivals[-1]
 
 
 class TrafficSimulator:
-    """Simulador de tráfico para red GPON"""
+    """
+    Simulador de tráfico para red GPON
     
-    def __init__(self, num_onus=32, simulation_time=100):
-        self.num_onus = num_onus
-        self.simulation_time = simulation_time
+    Todos los números aleatorios salen de la SeedSequence de `seed`: un hijo
+    para los perfiles por defecto, uno por ONU y otro para el modo 'gpon'. Con
+    la misma semilla se obtienen los mismos resultados, y los generadores de
+    las ONUs no comparten estado aunque se ejecuten en paralelo.
+    
+    `seed` puede ser también una SeedSequence (p. ej. la de un puerto PON
+    derivada de la semilla de la red), y onu_ids fija los ids de las ONUs
+    de los perfiles por defecto (ONU-1, ONU-2... si se omite).
+    """
+    
+    def __init__(self, num_onus=32, simulation_time=100, seed=None, onu_ids=None):
+        self.onu_ids = list(onu_ids) if onu_ids is not None else None
+        self.num_onus = len(self.onu_ids) if self.onu_ids is not None else num_onus
+        self.simulation_time = simulation_time_option(simulation_time)
+        if seed is None:
+            seed = random_seed()
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._profile_seed, self._onu_seed, self._upstream_seed = self.seed_sequence.spawn(3)
         self.env = simpy.Environment()
         self.generators = []
+        self.windows = None
         
-    def setup_onus(self, traffic_profiles=None):
+    def setup_onus(self, traffic_profiles=None, mode='simpy'):
         """Configurar generadores de tráfico para ONUs"""
         if traffic_profiles is None:
             # Perfiles por defecto: Triple Play
+            rng = np.random.default_rng(self._profile_seed)
             traffic_profiles = []
             for i in range(self.num_onus):
                 # Mezcla de servicios: video, internet, voz
-                service_type = random.choice(['video', 'internet', 'voice'])
+                service_type = ('video', 'internet', 'voice')[rng.integers(3)]
                 if service_type == 'video':
-                    rate = random.uniform(10, 25)  # Mbps para video
+                    rate = rng.uniform(10, 25)  # Mbps para video
                     pattern = 'constant'
                 elif service_type == 'internet':
-                    rate = random.uniform(5, 15)  # Mbps para internet
+                    rate = rng.uniform(5, 15)  # Mbps para internet
                     pattern = 'poisson'
                 else:  # voice
-                    rate = random.uniform(0.064, 0.1)  # Mbps para voz
+                    rate = rng.uniform(0.064, 0.1)  # Mbps para voz
                     pattern = 'constant'
                 
                 traffic_profiles.append({
-                    'onu_id': f'ONU-{i+1}',
-                    'rate': rate,
+                    'onu_id': self.onu_ids[i] if self.onu_ids is not None else f'ONU-{i+1}',
+                    'rate': float(rate),
                     'pattern': pattern
                 })
         
-        for profile in traffic_profiles:
+        children = self._onu_seed.spawn(len(traffic_profiles))
+        for profile, child in zip(traffic_profiles, children):
             generator = TrafficGenerator(
                 self.env,
                 profile['onu_id'],
                 profile['pattern'],
-                profile['rate']
+                profile['rate'],
+                rng=np.random.default_rng(child)
             )
             self.generators.append(generator)
-            self.env.process(generator.traffic_process())
+            if mode == 'simpy':
+                self.env.process(generator.traffic_process())
     
-    def run(self, traffic_profiles=None):
-        """Ejecutar simulación"""
-        self.setup_onus(traffic_profiles)
+    def run(self, traffic_profiles=None, mode='simpy', upstream_options=None, window_options=None,
+            progress=None, progress_interval=None):
+        """
+        Ejecutar simulación
+        
+        El resultado incluye 'seed', la entropía de la SeedSequence, que
+        reproduce la simulación aunque no se haya pasado una semilla (en ese
+        caso es una semilla de random_seed()).
+        
+        Args:
+            traffic_profiles: Lista de perfiles {onu_id, rate, pattern} (opcional)
+            mode: 'simpy' (un evento por paquete), 'vectorized' (bloques NumPy)
+                o 'gpon' (colas de las ONUs vaciadas por el DBA ciclo a ciclo)
+            upstream_options: Opciones de GponUpstreamSimulator para el modo
+                'gpon' (cycle_time, capacity, allocator, buffer_size)
+            window_options: Opciones de WindowedMetrics {window, series_windows};
+                si se indican, las métricas incluyen la serie por ventanas de
+                cada ONU y los estadísticos de su throughput por ventana (en
+                'gpon', del throughput entregado por el DBA)
+            progress: Función que recibe los informes de SimulationProgress
+                (opcional)
+            progress_interval: Segundos simulados entre informes de progreso
+        """
+        if mode not in SIMULATION_MODES:
+            raise ValueError(f"Modo de simulación no soportado: {mode}")
+        
+        self.setup_onus(traffic_profiles, mode)
+        
+        if window_options:
+            self.windows = WindowedMetrics(
+                [generator.onu_id for generator in self.generators],
+                self.simulation_time,
+                **window_options
+            )
+            if mode != 'gpon':
+                for i, generator in enumerate(self.generators):
+                    generator.record = functools.partial(self.windows.add_arrivals, i)
+        
+        reporter = None
+        if progress is not None:
+            reporter = SimulationProgress(
+                progress,
+                [generator.onu_id for generator in self.generators],
+                self.simulation_time,
+                progress_interval
+            )
+        
+        if mode == 'gpon':
+            upstream = GponUpstreamSimulator(
+                self.generators,
+                self.simulation_time,
+                rng=np.random.default_rng(self._upstream_seed),
+                windows=self.windows,
+                progress=reporter,
+                **(upstream_options or {})
+            )
+            results = upstream.run()
+            results['seed'] = self.seed_sequence.entropy
+            self._add_windows(results)
+            return results
         
         # Ejecutar simulación
-        self.env.run(until=self.simulation_time)
+        if mode == 'simpy':
+            if reporter is not None:
+                self.env.process(self._progress_process(reporter))
+            self.env.run(until=self.simulation_time)
+            for generator in self.generators:
+                generator.flush_record()
+            if reporter is not None:
+                reporter.report(self.simulation_time, *self._sent())
+        else:
+            # Sin avance en el tiempo: un informe cada ~1/PROGRESS_UPDATES de las ONUs
+            step = max(1, len(self.generators) // PROGRESS_UPDATES)
+            for i, generator in enumerate(self.generators):
+                generator.vectorized_traffic(self.simulation_time)
+                done = i + 1
+                if reporter is not None and (done % step == 0 or done == len(self.generators)):
+                    reporter.report(None, *self._sent(), progress=done / len(self.generators))
         
         # Calcular métricas
         metrics = []
@@ -126,11 +325,35 @@ class TrafficSimulator:
                 'timestamp': self.simulation_time
             })
         
-        return {
+        results = {
             'simulation_time': self.simulation_time,
+            'mode': mode,
+            'seed': self.seed_sequence.entropy,
             'total_throughput': total_throughput,
             'total_packets': total_packets,
             'average_throughput': total_throughput / self.num_onus if self.num_onus > 0 else 0,
             'metrics': metrics
         }
+        self._add_windows(results)
+        return results
+    
+    def _sent(self):
+        """Paquetes enviados en total y bytes enviados por cada ONU"""
+        return (
+            sum(generator.packets_sent for generator in self.generators),
+            [generator.bytes_sent for generator in self.generators]
+        )
+    
+    def _progress_process(self, reporter):
+        """Proceso SimPy que informa del progreso cada reporter.interval segundos simulados"""
+        while True:
+            yield self.env.timeout(reporter.interval)
+            reporter.report(self.env.now, *self._sent())
+    
+    def _add_windows(self, results):
+        """Añadir a los resultados la serie por ventanas, si se pidió"""
+        if self.windows is None:
+            return
+        results['metrics'].extend(self.windows.metrics())
+        results['time_series'] = self.windows.summary()
 
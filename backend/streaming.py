@@ -0,0 +1,120 @@
+"""
+Respuestas JSON por partes (chunked), NDJSON y Server-Sent Events
+"""
+import json
+from collections.abc import Iterator
+from flask import Response, stream_with_context
+
+
+# Tamaño aproximado de cada trozo enviado al cliente
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class RawJSON(str):
+    """Texto JSON ya codificado que se emite sin volver a serializar"""
+
+
+def iter_json(value):
+    """
+    Codificar un valor JSON como una secuencia de fragmentos de texto
+    
+    Los diccionarios y listas se recorren recursivamente; los generadores e
+    iteradores se codifican como arrays consumiéndolos elemento a elemento,
+    de modo que nunca se construye el documento completo en memoria.
+    """
+    if isinstance(value, RawJSON):
+        yield value
+    elif isinstance(value, dict):
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (', ' if i else '') + json.dumps(str(key)) + ': '
+            yield from iter_json(item)
+        yield '}'
+    elif isinstance(value, (list, tuple, Iterator)):
+        yield '['
+        for i, item in enumerate(value):
+            if i:
+                yield ', '
+            yield from iter_json(item)
+        yield ']'
+    else:
+        yield json.dumps(value)
+
+
+def iter_ndjson(records):
+    """Codificar cada registro como una línea JSON"""
+    for record in records:
+        if isinstance(record, RawJSON):
+            yield record + '\n'
+        else:
+            yield json.dumps(record) + '\n'
+
+
+def buffered(fragments, chunk_size=STREAM_CHUNK_SIZE):
+    """Agrupar fragmentos pequeños en trozos de ~chunk_size caracteres"""
+    buffer = []
+    size = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def json_stream_response(value):
+    """Respuesta JSON enviada por partes mientras se codifica"""
+    return Response(
+        stream_with_context(buffered(iter_json(value))),
+        mimetype='application/json'
+    )
+
+
+def ndjson_response(records):
+    """Respuesta NDJSON con un registro por línea"""
+    return Response(
+        stream_with_context(buffered(iter_ndjson(records))),
+        mimetype='application/x-ndjson'
+    )
+
+
+def sse_event(event, data, event_id=None):
+    """Codificar un evento SSE con datos JSON (o RawJSON ya codificado)"""
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append('data: ' + (data if isinstance(data, RawJSON) else json.dumps(data)))
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_response(events, slots=None, retry_after=5):
+    """
+    Respuesta text/event-stream
+    
+    Cada evento se envía en cuanto se genera, sin agrupar en trozos, y se
+    pide a los proxies que no lo almacenen.
+    
+    Args:
+        slots: threading.BoundedSemaphore opcional con las conexiones
+            permitidas a la vez; la respuesta ocupa una plaza hasta que se
+            cierra y, si no queda ninguna, se responde 503 sin consumir events
+        retry_after: Segundos de la cabecera Retry-After del 503
+    """
+    if slots is not None and not slots.acquire(blocking=False):
+        return Response(
+            json.dumps({"success": False, "error": "Too many open event streams, try again later"}),
+            status=503,
+            mimetype='application/json',
+            headers={'Retry-After': str(retry_after)}
+        )
+    response = Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    if slots is not None:
+        response.call_on_close(slots.release)
+    return response
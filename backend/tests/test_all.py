@@ -76,6 +76,162 @@ if __name__ == "__main__":
     test_network_power_budget_calculation()
     test_network_to_dict()
     test_network_add_elements()
+    test_network_power_budget_cascaded_splitters()
+    test_network_all_power_budgets_tree()
+    test_network_from_dict_roundtrip()
+    test_network_element_lookup()
+    print()
+    
+    # Ejecutar tests de ArrayNetwork
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 17 + "TESTS DE ARRAY NETWORK" + " " * 29 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_network_arrays import *
+    test_array_network_matches_objects()
+    test_array_network_power_budget()
+    test_array_network_views()
+    print()
+    
+    # Ejecutar tests de TrafficSimulator
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 15 + "TESTS DE TRAFFIC SIMULATOR" + " " * 27 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_traffic_simulator import *
+    test_simulator_result_keys()
+    test_simulator_vectorized_constant()
+    test_simulator_vectorized_statistical_equivalence()
+    test_simulator_invalid_mode()
+    test_simulator_gpon_light_load()
+    test_simulator_gpon_overload()
+    test_simulator_seed_reproducible()
+    print()
+    
+    # Ejecutar tests de codificación de resultados
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 16 + "TESTS DE RESULTS ENCODING" + " " * 27 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_results_encoding import *
+    test_metrics_encoding_roundtrip()
+    print()
+    
+    # Ejecutar tests de DBA
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 22 + "TESTS DE DBA" + " " * 34 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_dba_algorithm import *
+    test_dba_allocate_bandwidth()
+    test_dba_allocate_batch_matrix()
+    test_dba_fair_allocate_redistribution()
+    test_dba_weighted_fair_by_service_class()
+    print()
+    
+    # Ejecutar tests de barrido de parámetros
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 16 + "TESTS DE PARAMETER SWEEP" + " " * 28 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_parameter_sweep import *
+    test_sweep_grid_expansion()
+    test_sweep_seeds_deterministic()
+    print()
+    
+    # Ejecutar tests de respuestas por partes
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 20 + "TESTS DE STREAMING" + " " * 30 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_streaming import *
+    test_iter_json_matches_json_dumps()
+    test_iter_ndjson_lines()
+    print()
+    
+    # Ejecutar tests de cachés
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 23 + "TESTS DE CACHE" + " " * 31 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_cache import *
+    test_lru_cache_max_bytes()
+    test_result_cache_disk_tier()
+    print()
+    
+    # Ejecutar tests de benchmarks
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 20 + "TESTS DE BENCHMARKS" + " " * 29 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_benchmarks import *
+    test_benchmark_run_and_compare()
+    print()
+    
+    # Ejecutar tests de instrumentación
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 17 + "TESTS DE INSTRUMENTATION" + " " * 27 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_instrumentation import *
+    test_metrics_exposition()
+    test_request_instrumentation()
+    print()
+    
+    # Ejecutar tests de edición incremental
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 22 + "TESTS DE TOPOLOGY EDITS" + " " * 23 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_topology_edits import *
+    test_network_incremental_power_paths()
+    test_network_concurrent_edit()
+    test_topology_edit_document()
+    print()
+    
+    # Ejecutar tests del análisis Monte Carlo
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 17 + "TESTS DE POWER BUDGET MONTE CARLO" + " " * 18 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_power_budget_montecarlo import *
+    test_montecarlo_paths_and_nominal()
+    test_montecarlo_statistics()
+    print()
+    
+    # Ejecutar tests del optimizador de topologías
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 20 + "TESTS DE TOPOLOGY OPTIMIZER" + " " * 21 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_topology_optimizer import *
+    test_design_evaluation()
+    test_pareto_selection()
+    print()
+    
+    # Ejecutar tests de métricas por ventanas
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 24 + "TESTS DE TIME SERIES" + " " * 24 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_time_series import *
+    test_windowed_statistics()
+    test_simulation_time_series()
+    print()
+    
+    # Ejecutar tests de progreso de simulaciones
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 20 + "TESTS DE SIMULATION PROGRESS" + " " * 20 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_simulation_progress import *
+    test_progress_reports()
+    test_progress_relay_and_events()
+    print()
+    
+    # Ejecutar tests de modelos de base de datos
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 24 + "TESTS DE DB MODELS" + " " * 26 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_db_models import *
+    test_element_bulk_insert_matches_each()
+    test_simulation_results_formats()
+    test_upgrade_old_schema()
+    print()
+    
+    # Ejecutar tests de redes multi-PON
+    print("╔" + "═" * 68 + "╗")
+    print("║" + " " * 24 + "TESTS DE PON NETWORK" + " " * 24 + "║")
+    print("╚" + "═" * 68 + "╝")
+    from tests.test_pon_network import *
+    test_pon_generation_and_split()
+    test_pon_sharded_results()
     print()
     
     print("=" * 70)
@@ -86,6 +242,22 @@ if __name__ == "__main__":
     print("  - Tests de ONU: 5 tests")
     print("  - Tests de Splitter: 6 tests")
     print("  - Tests de OpticalFiber: 7 tests")
-    print("  - Tests de OpticalNetwork: 8 tests")
-    print("  - TOTAL: 30 tests ejecutados exitosamente")
+    print("  - Tests de OpticalNetwork: 12 tests")
+    print("  - Tests de ArrayNetwork: 3 tests")
+    print("  - Tests de TrafficSimulator: 7 tests")
+    print("  - Tests de Results Encoding: 1 test")
+    print("  - Tests de DBA: 4 tests")
+    print("  - Tests de Parameter Sweep: 2 tests")
+    print("  - Tests de Streaming: 2 tests")
+    print("  - Tests de Cache: 2 tests")
+    print("  - Tests de Benchmarks: 1 test")
+    print("  - Tests de Instrumentation: 2 tests")
+    print("  - Tests de Topology Edits: 3 tests")
+    print("  - Tests de Power Budget Monte Carlo: 2 tests")
+    print("  - Tests de Topology Optimizer: 2 tests")
+    print("  - Tests de Time Series: 2 tests")
+    print("  - Tests de Simulation Progress: 2 tests")
+    print("  - Tests de DB Models: 3 tests")
+    print("  - Tests de PON Network: 2 tests")
+    print("  - TOTAL: 74 tests ejecutados exitosamente")
     print("=" * 70)
@@ -0,0 +1,51 @@
+"""
+Tests para la suite de benchmarks
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.suite import benchmarks, PROFILES
+from benchmarks.runner import run_benchmarks, compare_results
+
+
+def test_benchmark_run_and_compare():
+    """Test de ejecución de casos y detección de regresiones"""
+    print("\n=== TEST: Ejecución y comparación de benchmarks ===")
+    print("ENTRADA:")
+    print("  - Casos 'dba_allocate[ipact-*]' del perfil quick, 2 repeticiones")
+    
+    results = run_benchmarks(benchmarks('quick'), pattern='dba_allocate[ipact', repeat=2, min_repeat=1, log=lambda line: None)
+    names = sorted(results['results'])
+    
+    # Línea base 10 veces más rápida en un caso y 10 veces más lenta en otro
+    baseline = {'results': {
+        names[0]: {'median': results['results'][names[0]]['median'] / 10},
+        names[1]: {'median': results['results'][names[1]]['median'] * 10}
+    }}
+    comparison = {case['name']: case for case in compare_results(results, baseline, threshold=1.2, min_delta=0)}
+    
+    print("\nDATOS DE SALIDA:")
+    for name in names:
+        print(f"  - {name}: {results['results'][name]['median'] * 1000:.3f} ms, "
+              f"ratio x{comparison[name]['ratio']:.2f}, regresión={comparison[name]['regression']}")
+    
+    # Verificaciones
+    expected = len(PROFILES['quick']['onu_counts'])
+    assert len(names) == expected, f"Error: Deberían ejecutarse {expected} casos, hay {len(names)}"
+    assert all(r['repeats'] == 2 for r in results['results'].values()), "Error: Deberían hacerse 2 repeticiones"
+    assert comparison[names[0]]['regression'], "Error: Un caso 10 veces más lento debería ser regresión"
+    assert not comparison[names[1]]['regression'], "Error: Un caso más rápido no debería ser regresión"
+    
+    print("\n✓ VERIFICACIÓN: Las regresiones se detectan contra la línea base")
+    print("✓ TEST PASADO: benchmarks run and compare OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE BENCHMARKS")
+    print("=" * 70)
+    test_benchmark_run_and_compare()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE BENCHMARKS PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,77 @@
+"""
+Tests para las cachés de resultados
+"""
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache import LRUCache, DiskCache, ResultCache, content_hash
+
+
+def test_lru_cache_max_bytes():
+    """Test de expulsión por tamaño total en LRUCache"""
+    print("\n=== TEST: LRUCache limitada por tamaño ===")
+    print("ENTRADA:")
+    print("  - max_bytes=100, 4 valores de 40 caracteres, 'a' usado antes de insertar 'c'")
+    
+    cache = LRUCache(maxsize=None, max_bytes=100)
+    cache.set('a', 'x' * 40)
+    cache.set('b', 'x' * 40)
+    cache.get('a')
+    cache.set('c', 'x' * 40)
+    cache.set('d', 'x' * 40)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Claves en la caché: {[k for k in 'abcd' if k in cache]}")
+    
+    # Verificaciones
+    assert 'b' not in cache, "Error: 'b' era la entrada menos usada y debería expulsarse"
+    assert 'a' not in cache, "Error: 'a' debería expulsarse al insertar 'd'"
+    assert 'c' in cache and 'd' in cache, "Error: Las entradas recientes deberían conservarse"
+    
+    print("\n✓ VERIFICACIÓN: Se expulsan las entradas menos usadas al superar max_bytes")
+    print("✓ TEST PASADO: LRUCache max_bytes OK\n")
+
+
+def test_result_cache_disk_tier():
+    """Test de resultados compartidos entre instancias a través del disco"""
+    print("\n=== TEST: ResultCache con nivel en disco ===")
+    print("ENTRADA:")
+    print("  - Dos ResultCache sobre el mismo fichero SQLite")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.sqlite')
+        key = 'power-budget:' + content_hash({'onus': [1, 2], 'name': None})
+        calls = []
+        
+        def factory():
+            calls.append(1)
+            return [{'onu_id': 'ONU-1', 'available_power': 3.5}]
+        
+        first = ResultCache(disk=DiskCache(path)).get_or_create(key, factory)
+        second = ResultCache(disk=DiskCache(path)).get_or_create(key, factory)
+        
+        print("\nDATOS DE SALIDA:")
+        print(f"  - Primer resultado: {first}")
+        print(f"  - Segundo resultado: {second}")
+        print(f"  - Llamadas a factory: {len(calls)}")
+        
+        # Verificaciones
+        assert first == second, "Error: Ambas instancias deberían devolver el mismo resultado"
+        assert len(calls) == 1, f"Error: El resultado debería calcularse una sola vez, se calculó {len(calls)}"
+        assert content_hash({'b': 1, 'a': 2}) == content_hash({'a': 2, 'b': 1}), "Error: El hash debería ignorar el orden de claves"
+    
+    print("\n✓ VERIFICACIÓN: El nivel en disco comparte resultados entre instancias")
+    print("✓ TEST PASADO: ResultCache disk tier OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE CACHE")
+    print("=" * 70)
+    test_lru_cache_max_bytes()
+    test_result_cache_disk_tier()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE CACHE PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,209 @@
+"""
+Tests para los modelos de base de datos (sobre SQLite en memoria)
+"""
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from database import db
+from jobs import SimulationJobQueue
+from migrations import upgrade_database
+from models.db_models import NetworkTopology, NetworkElement, Simulation, PerformanceMetric
+from models.network_elements import OpticalNetwork
+from models.network_pons import PonNetwork
+from simulators.traffic_simulator import TrafficSimulator
+
+
+def sqlite_app():
+    """Aplicación Flask con una base de datos SQLite en memoria"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    return app
+
+
+def _element_rows(topology_id):
+    """Filas guardadas de una topología, sin la clave primaria"""
+    return [
+        (row.element_type, row.element_id, row.properties, row.position_x, row.position_y)
+        for row in NetworkElement.query.filter_by(topology_id=topology_id).order_by(NetworkElement.id)
+    ]
+
+
+def test_element_bulk_insert_matches_each():
+    """Test de INSERT masivo con las mismas filas que la inserción elemento a elemento"""
+    print("\n=== TEST: INSERT masivo de elementos de red ===")
+    print("ENTRADA:")
+    print("  - Red en árbol con 40 ONUs (1:8) y red multi-PON con 24 ONUs en 3 puertos")
+    print("  - Cada red guardada con bulk_insert y con insert_each en dos topologías")
+    
+    tree = OpticalNetwork(name="Árbol")
+    tree.create_ftth_topology(num_onus=40, split_ratio="1:8", topology_type="tree")
+    pons = PonNetwork(name="Central")
+    pons.create_ftth_topology(num_onus=24, split_ratio="1:8", topology_type="star", pon_ports=3)
+    
+    app = sqlite_app()
+    compared = {}
+    with app.app_context():
+        db.create_all()
+        for name, network in (('tree', tree), ('pons', pons)):
+            network_dict = network.to_dict()
+            topologies = []
+            for insert in (NetworkElement.bulk_insert, NetworkElement.insert_each):
+                topology = NetworkTopology.from_network(network_dict)
+                db.session.add(topology)
+                db.session.flush()
+                insert(topology.id, network_dict)
+                topologies.append(topology.id)
+            db.session.commit()
+            compared[name] = (network_dict, *(_element_rows(topology_id) for topology_id in topologies))
+    
+    print("\nDATOS DE SALIDA:")
+    for name, (_, bulk, each) in compared.items():
+        counts = {kind: sum(1 for row in bulk if row[0] == kind) for kind in ('OLT', 'SPLITTER', 'ONU', 'FIBER')}
+        print(f"  - {name}: {len(bulk)} filas masivas, {len(each)} filas una a una, {counts}")
+    
+    # Verificaciones
+    for name, (network_dict, bulk, each) in compared.items():
+        olts = network_dict.get('olts') or [network_dict['olt']]
+        expected = len(olts) + sum(len(network_dict[key]) for key in ('splitters', 'onus', 'fibers'))
+        assert len(bulk) == expected, f"Error: Faltan elementos en '{name}'"
+        assert bulk == each, f"Error: Las filas de '{name}' deben ser iguales por ambas rutas"
+    assert [row[1] for row in compared['pons'][1] if row[0] == 'OLT'] == ['OLT-1', 'OLT-2', 'OLT-3'], \
+        "Error: Las redes multi-PON deben guardar una fila por OLT"
+    
+    print("\n✓ VERIFICACIÓN: El INSERT masivo guarda las mismas filas que la ruta original")
+    print("✓ TEST PASADO: NetworkElement bulk_insert OK\n")
+
+
+def test_simulation_results_formats():
+    """Test de guardado de resultados: filas de métricas sólo en formato JSON"""
+    print("\n=== TEST: Formatos de resultados de simulación ===")
+    print("ENTRADA:")
+    print("  - Simulación vectorized de 8 ONUs durante 2 s con semilla 3")
+    print("  - Resultados guardados en formato 'json' y 'compact'")
+    
+    results = TrafficSimulator(num_onus=8, simulation_time=2, seed=3).run(mode='vectorized')
+    
+    app = sqlite_app()
+    stored = {}
+    with app.app_context():
+        db.create_all()
+        topology = NetworkTopology(name="Red", topology_type="star", olt_config="{}")
+        db.session.add(topology)
+        db.session.commit()
+        for results_format in Simulation.RESULTS_FORMATS:
+            simulation = Simulation(topology_id=topology.id, name=results_format, parameters="{}", status='RUNNING')
+            db.session.add(simulation)
+            db.session.commit()
+            SimulationJobQueue()._save_results(simulation.id, results, results_format)
+            simulation = db.session.get(Simulation, simulation.id)
+            stored[results_format] = {
+                'status': simulation.status,
+                'rows': PerformanceMetric.query.filter_by(simulation_id=simulation.id).count(),
+                'metrics': simulation.load_results()['metrics'],
+                'iterated': [
+                    (m['onu_id'], m['metric_type'], m['metric_value'], m['timestamp'])
+                    for m in Simulation.iter_metrics(simulation.id)
+                ]
+            }
+    
+    print("\nDATOS DE SALIDA:")
+    for results_format, data in stored.items():
+        print(f"  - {results_format}: {data['status']}, {data['rows']} filas de métricas, "
+              f"{len(data['metrics'])} métricas en los resultados")
+    
+    # Verificaciones
+    expected = [(m['onu_id'], m['type'], m['value'], m.get('timestamp', 0)) for m in results['metrics']]
+    assert stored['json']['rows'] == len(results['metrics']), "Error: En JSON cada métrica debe tener su fila"
+    assert stored['compact']['rows'] == 0, "Error: En formato compacto no deben guardarse filas de métricas"
+    for data in stored.values():
+        assert data['status'] == 'COMPLETED', "Error: La simulación debe quedar COMPLETED"
+        assert data['metrics'] == results['metrics'], "Error: Las métricas deben recuperarse iguales"
+        assert data['iterated'] == expected, "Error: iter_metrics debe devolver las mismas métricas"
+    
+    print("\n✓ VERIFICACIÓN: Las métricas se guardan una sola vez en formato compacto")
+    print("✓ TEST PASADO: Simulation results formats OK\n")
+
+
+# Esquema de la primera versión de init.sql (sin las columnas añadidas después)
+OLD_SCHEMA = (
+    """CREATE TABLE network_topologies (
+        id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, description TEXT, olt_config JSON,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE network_elements (
+        id INTEGER PRIMARY KEY, topology_id INTEGER NOT NULL REFERENCES network_topologies(id),
+        element_type VARCHAR(8) NOT NULL, element_id VARCHAR(100) NOT NULL, properties JSON,
+        position_x FLOAT, position_y FLOAT)""",
+    """CREATE TABLE simulations (
+        id INTEGER PRIMARY KEY, topology_id INTEGER NOT NULL REFERENCES network_topologies(id),
+        name VARCHAR(255) NOT NULL, parameters JSON, results JSON, status VARCHAR(9) DEFAULT 'PENDING',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, completed_at TIMESTAMP)""",
+    """CREATE TABLE performance_metrics (
+        id INTEGER PRIMARY KEY, simulation_id INTEGER NOT NULL REFERENCES simulations(id),
+        onu_id VARCHAR(100), metric_type VARCHAR(100) NOT NULL, metric_value FLOAT, timestamp FLOAT)"""
+)
+
+
+def test_upgrade_old_schema():
+    """Test de migración de una base de datos creada con el esquema original"""
+    print("\n=== TEST: Migración del esquema original ===")
+    print("ENTRADA:")
+    print("  - Tablas de la primera versión de init.sql con una topología en árbol de 16 ONUs")
+    print("  - upgrade_database ejecutado dos veces")
+    
+    network = OpticalNetwork(name="Antigua")
+    network.create_ftth_topology(num_onus=16, split_ratio="1:8", topology_type="tree")
+    network_dict = network.to_dict()
+    
+    app = sqlite_app()
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for statement in OLD_SCHEMA:
+                connection.execute(text(statement))
+            connection.execute(
+                text("INSERT INTO network_topologies (name, olt_config) VALUES ('Antigua', :config)"),
+                {'config': json.dumps(json.dumps(network_dict))}
+            )
+        statements, backfilled = upgrade_database(db)
+        second = upgrade_database(db)
+        columns = {c['name'] for c in inspect(db.engine).get_columns('simulations')}
+        topology = NetworkTopology.query.one()
+        summary = NetworkTopology.summary_dict(NetworkTopology.summary_query().one())
+        simulation = Simulation(topology_id=topology.id, name="Nueva", parameters="{}", status='PENDING')
+        db.session.add(simulation)
+        db.session.commit()
+        pending = Simulation.query.filter_by(status='PENDING').count()
+    
+    print("\nDATOS DE SALIDA:")
+    for statement in statements:
+        print(f"  - {statement}")
+    print(f"  - Topologías completadas: {backfilled}; segunda ejecución: {second}")
+    print(f"  - Resumen: {summary}")
+    
+    # Verificaciones
+    assert len(statements) == 11, "Error: Deberían añadirse 8 columnas y 3 índices"
+    assert {'sweep_id', 'results_blob', 'progress'} <= columns, "Error: Faltan columnas en simulations"
+    assert backfilled == 1 and second == ([], 0), "Error: La migración debe poder repetirse sin cambios"
+    assert (summary['topology_type'], summary['num_onus'], summary['num_splitters']) == ('tree', 16, 3), \
+        "Error: El resumen de la topología antigua debe completarse"
+    assert pending == 1, "Error: Las consultas de simulaciones deben funcionar tras la migración"
+    
+    print("\n✓ VERIFICACIÓN: Una base de datos antigua se actualiza sin recrearla")
+    print("✓ TEST PASADO: Schema upgrade OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE DB MODELS")
+    print("=" * 70)
+    test_element_bulk_insert_matches_each()
+    test_simulation_results_formats()
+    test_upgrade_old_schema()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE DB MODELS PASARON CORRECTAMENTE")
+    print("=" * 70)
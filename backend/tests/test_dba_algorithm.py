@@ -0,0 +1,146 @@
+"""
+Tests para la clase DynamicBandwidthAllocation
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from simulators.dba_algorithm import DynamicBandwidthAllocation
+
+
+def _sequential_ipact(onu_requests, total_capacity):
+    """Referencia IPACT secuencial: cada ONU recibe min(solicitado, restante)"""
+    remaining = total_capacity
+    grants = {}
+    for onu_id, requested in sorted(onu_requests.items()):
+        grants[onu_id] = min(requested, remaining)
+        remaining -= grants[onu_id]
+    return grants
+
+
+def test_dba_allocate_bandwidth():
+    """Test de asignación IPACT cuando se agota la capacidad"""
+    print("\n=== TEST: Asignación IPACT con capacidad insuficiente ===")
+    print("ENTRADA:")
+    print("  - 4 ONUs: 1000, 1000, 1000 y 5 Mbps")
+    print("  - total_capacity=2500 Mbps")
+    
+    dba = DynamicBandwidthAllocation()
+    onu_requests = {'ONU-1': 1000, 'ONU-2': 1000, 'ONU-3': 1000, 'ONU-4': 5}
+    result = dba.allocate_bandwidth(onu_requests, 2500)
+    
+    print("\nDATOS DE SALIDA:")
+    for onu_id, allocation in result['allocations'].items():
+        print(f"  - {onu_id}: {allocation['granted']} Mbps ({allocation['utilization']:.1f}%)")
+    print(f"  - Utilización global: {result['global_utilization']:.1f}%")
+    
+    # Verificaciones
+    expected = _sequential_ipact(onu_requests, 2500)
+    for onu_id, granted in expected.items():
+        assert result['allocations'][onu_id]['granted'] == granted, f"Error: {onu_id} debería recibir {granted} Mbps"
+    assert list(result['allocations'].keys()) == sorted(onu_requests), "Error: Las asignaciones deberían seguir el orden IPACT"
+    assert result['remaining_capacity'] == 0, f"Error: Capacidad restante esperada 0, obtenida {result['remaining_capacity']}"
+    assert result['global_utilization'] == 100, f"Error: Utilización esperada 100%, obtenida {result['global_utilization']}"
+    
+    print("\n✓ VERIFICACIÓN: Asignación idéntica a IPACT secuencial")
+    print("✓ TEST PASADO: DBA allocate_bandwidth OK\n")
+
+
+def test_dba_allocate_batch_matrix():
+    """Test de la API por lotes con una matriz de ciclos DBA"""
+    print("\n=== TEST: Asignación IPACT por lotes (ciclos x ONUs) ===")
+    print("ENTRADA:")
+    print("  - 50 ciclos x 40 ONUs con solicitudes aleatorias de 0-120 Mbps")
+    print("  - total_capacity=2500 Mbps, IDs en orden desordenado")
+    
+    rng = np.random.default_rng(7)
+    onu_ids = [f'ONU-{i+1}' for i in rng.permutation(40)]
+    requests = rng.uniform(0, 120, size=(50, 40))
+    
+    dba = DynamicBandwidthAllocation()
+    grants = dba.allocate_batch(requests, 2500, onu_ids=onu_ids)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Forma de las concesiones: {grants.shape}")
+    print(f"  - Concedido por ciclo (máx): {grants.sum(axis=1).max():.2f} Mbps")
+    
+    # Verificaciones
+    assert grants.shape == requests.shape, f"Error: Forma esperada {requests.shape}, obtenida {grants.shape}"
+    for cycle in range(requests.shape[0]):
+        expected = _sequential_ipact(dict(zip(onu_ids, requests[cycle])), 2500)
+        for column, onu_id in enumerate(onu_ids):
+            assert abs(grants[cycle, column] - expected[onu_id]) < 1e-9, f"Error: Concesión incorrecta para {onu_id} en ciclo {cycle}"
+    assert np.all(grants.sum(axis=1) <= 2500 + 1e-9), "Error: Se superó la capacidad en algún ciclo"
+    
+    print("\n✓ VERIFICACIÓN: Cada ciclo coincide con IPACT secuencial")
+    print("✓ TEST PASADO: DBA allocate_batch matrix OK\n")
+
+
+def test_dba_fair_allocate_redistribution():
+    """Test de redistribución max-min (water-filling) de la capacidad sobrante"""
+    print("\n=== TEST: Asignación max-min fair con redistribución ===")
+    print("ENTRADA:")
+    print("  - Voz: 0.064 Mbps, datos: 100 Mbps, dos videos: 2000 Mbps")
+    print("  - total_capacity=2500 Mbps")
+    
+    dba = DynamicBandwidthAllocation()
+    onu_requests = {'ONU-1': 0.064, 'ONU-2': 2000, 'ONU-3': 2000, 'ONU-4': 100}
+    result = dba.fair_allocate(onu_requests, 2500)
+    
+    print("\nDATOS DE SALIDA:")
+    for onu_id, allocation in result['allocations'].items():
+        print(f"  - {onu_id}: {allocation['granted']:.3f} Mbps")
+    print(f"  - Nivel de agua: {result['fair_share']:.3f} Mbps")
+    print(f"  - Utilización global: {result['global_utilization']:.2f}%")
+    
+    # Verificaciones
+    expected_video = (2500 - 0.064 - 100) / 2
+    assert result['allocations']['ONU-1']['granted'] == 0.064, "Error: La voz debería recibir todo lo solicitado"
+    assert result['allocations']['ONU-4']['granted'] == 100, "Error: Datos debería recibir todo lo solicitado"
+    assert abs(result['allocations']['ONU-2']['granted'] - expected_video) < 1e-9, "Error: Video debería recibir la capacidad sobrante"
+    assert abs(result['global_utilization'] - 100) < 1e-9, f"Error: Utilización esperada 100%, obtenida {result['global_utilization']}"
+    
+    print("\n✓ VERIFICACIÓN: La capacidad no usada se redistribuye")
+    print("✓ TEST PASADO: DBA fair_allocate redistribution OK\n")
+
+
+def test_dba_weighted_fair_by_service_class():
+    """Test de asignación max-min ponderada por clase de servicio"""
+    print("\n=== TEST: Asignación max-min ponderada por clase de servicio ===")
+    print("ENTRADA:")
+    print("  - ONU-1 video y ONU-2 internet, ambas solicitan 2000 Mbps")
+    print("  - total_capacity=2500 Mbps, pesos video=3, internet=2")
+    
+    dba = DynamicBandwidthAllocation()
+    result = dba.allocate(
+        {'ONU-1': 2000, 'ONU-2': 2000},
+        2500,
+        strategy='weighted_fair',
+        service_classes={'ONU-1': 'video', 'ONU-2': 'internet'}
+    )
+    
+    print("\nDATOS DE SALIDA:")
+    for onu_id, allocation in result['allocations'].items():
+        print(f"  - {onu_id}: {allocation['granted']:.2f} Mbps")
+    
+    # Verificaciones
+    assert abs(result['allocations']['ONU-1']['granted'] - 1500) < 1e-9, "Error: Video debería recibir 3/5 de la capacidad"
+    assert abs(result['allocations']['ONU-2']['granted'] - 1000) < 1e-9, "Error: Internet debería recibir 2/5 de la capacidad"
+    
+    print("\n✓ VERIFICACIÓN: La capacidad se reparte según los pesos")
+    print("✓ TEST PASADO: DBA weighted_fair by service class OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE DBA")
+    print("=" * 70)
+    test_dba_allocate_bandwidth()
+    test_dba_allocate_batch_matrix()
+    test_dba_fair_allocate_redistribution()
+    test_dba_weighted_fair_by_service_class()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE DBA PASARON CORRECTAMENTE")
+    print("=" * 70)
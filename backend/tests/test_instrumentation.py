@@ -0,0 +1,109 @@
+"""
+Tests para las métricas de instrumentación
+"""
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify
+from sqlalchemy import text
+
+from database import db
+from instrumentation import Counter, Histogram, Instrumentation, PHASE_LATENCY, REQUEST_LATENCY, timed
+
+
+def test_metrics_exposition():
+    """Test del formato Prometheus de histogramas y contadores"""
+    print("\n=== TEST: Exposición de métricas Prometheus ===")
+    print("ENTRADA:")
+    print("  - Histograma con límites (0.1, 1) y observaciones 0.05, 0.5, 2 en la ruta '/api/x'")
+    print("  - Contador incrementado 3 veces")
+    
+    histogram = Histogram('test_latency_seconds', 'Latencia', labelnames=('route',), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 2):
+        histogram.observe(value, route='/api/x')
+    counter = Counter('test_total', 'Total', labelnames=('route',))
+    for _ in range(3):
+        counter.inc(route='/api/x')
+    
+    lines = histogram.collect() + counter.collect()
+    
+    print("\nDATOS DE SALIDA:")
+    for line in lines:
+        print(f"  {line}")
+    
+    # Verificaciones
+    assert 'test_latency_seconds_bucket{route="/api/x",le="0.1"} 1' in lines, "Error: Bucket 0.1 incorrecto"
+    assert 'test_latency_seconds_bucket{route="/api/x",le="1.0"} 2' in lines, "Error: Bucket 1 incorrecto"
+    assert 'test_latency_seconds_bucket{route="/api/x",le="+Inf"} 3' in lines, "Error: Bucket +Inf incorrecto"
+    assert 'test_latency_seconds_sum{route="/api/x"} 2.55' in lines, "Error: Suma incorrecta"
+    assert 'test_total{route="/api/x"} 3' in lines, "Error: Contador incorrecto"
+    
+    print("\n✓ VERIFICACIÓN: Los buckets son acumulados y el formato es Prometheus")
+    print("✓ TEST PASADO: instrumentation exposition OK\n")
+
+
+def test_request_instrumentation():
+    """Test de Server-Timing, etiquetas de ruta y métricas sumadas entre procesos"""
+    print("\n=== TEST: Instrumentación de peticiones con el cliente de Flask ===")
+    print("ENTRADA:")
+    print("  - Ruta /api/items/<int:item_id> con la fase 'decode' y 2 consultas SQLite")
+    print("  - METRICS_DIR con el fichero de otro worker que ya atendió 5 peticiones")
+    
+    metrics_dir = tempfile.mkdtemp()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['METRICS_DIR'] = metrics_dir
+    db.init_app(app)
+    Instrumentation(app)
+    
+    @app.route('/api/items/<int:item_id>')
+    def get_item(item_id):
+        with timed('decode'):
+            db.session.execute(text('SELECT 1'))
+        db.session.execute(text('SELECT 2'))
+        return jsonify({'id': item_id})
+    
+    route = '/api/items/<int:item_id>'
+    key = ('GET', route, '200')
+    before = REQUEST_LATENCY.values().get(key, [[], 0.0, 0])[2]
+    other = {REQUEST_LATENCY.name: [[list(key), [[5] * len(REQUEST_LATENCY.buckets), 0.5, 5]]]}
+    with open(os.path.join(metrics_dir, '1-other.json'), 'w') as f:
+        json.dump(other, f)
+    
+    client = app.test_client()
+    responses = [client.get(f'/api/items/{item_id}') for item_id in (1, 2)]
+    server_timing = responses[0].headers['Server-Timing']
+    lines = client.get('/api/metrics').get_data(as_text=True).splitlines()
+    count_line = f'ftth_request_duration_seconds_count{{method="GET",route="{route}",status="200"}}'
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Server-Timing: {server_timing}")
+    print(f"  - {[line for line in lines if line.startswith(count_line)]}")
+    print(f"  - Ficheros de métricas: {sorted(os.listdir(metrics_dir))}")
+    
+    # Verificaciones
+    timings = {part.split(';')[0].strip(): part for part in server_timing.split(',')}
+    assert set(timings) == {'decode', 'db', 'total'}, "Error: Server-Timing debe tener la fase, db y total"
+    assert 'desc="2 queries"' in timings['db'], "Error: Deberían contarse 2 consultas en la petición"
+    assert REQUEST_LATENCY.values()[key][2] == before + 2, "Error: Las peticiones deben etiquetarse con la regla de la ruta"
+    assert PHASE_LATENCY.values()[('decode',)][2] >= 2, "Error: La fase 'decode' debe acumularse en el histograma"
+    assert f'{count_line} {before + 7}' in lines, "Error: /api/metrics debe sumar las métricas de todos los procesos"
+    assert f'ftth_db_queries_total{{route="{route}"}}' in '\n'.join(lines), "Error: Faltan las consultas por ruta"
+    assert len(os.listdir(metrics_dir)) == 2, "Error: Este proceso debe guardar su propio fichero de métricas"
+    
+    print("\n✓ VERIFICACIÓN: Cabecera Server-Timing y métricas por ruta y fase de todos los procesos")
+    print("✓ TEST PASADO: instrumentation requests OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE INSTRUMENTATION")
+    print("=" * 70)
+    test_metrics_exposition()
+    test_request_instrumentation()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE INSTRUMENTATION PASARON CORRECTAMENTE")
+    print("=" * 70)
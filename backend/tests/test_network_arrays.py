@@ -0,0 +1,113 @@
+"""
+Tests para la representación de la red por arrays (ArrayNetwork)
+"""
+import sys
+import os
+import math
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.network_elements import OpticalNetwork
+from models.network_arrays import ArrayNetwork
+
+
+def _build_both(num_onus, split_ratio, topology_type):
+    """Crear la misma topología con ambos backends"""
+    objects = OpticalNetwork(name="Test")
+    objects.create_ftth_topology(num_onus=num_onus, split_ratio=split_ratio, topology_type=topology_type)
+    arrays = ArrayNetwork(name="Test")
+    arrays.create_ftth_topology(num_onus=num_onus, split_ratio=split_ratio, topology_type=topology_type)
+    return objects, arrays
+
+
+def test_array_network_matches_objects():
+    """Test de que ArrayNetwork genera exactamente la misma topología"""
+    print("\n=== TEST: ArrayNetwork vs OpticalNetwork (to_dict) ===")
+    print("ENTRADA:")
+    print("  - Topologías star, bus, ring y tree con 20 ONUs y ratio 1:8")
+    
+    for topology_type in ('star', 'bus', 'ring', 'tree'):
+        objects, arrays = _build_both(20, "1:8", topology_type)
+        expected = objects.to_dict()
+        result = arrays.to_dict()
+        
+        print(f"\nDATOS DE SALIDA ({topology_type}):")
+        print(f"  - Splitters: {len(result['splitters'])}, ONUs: {len(result['onus'])}, Fibras: {len(result['fibers'])}")
+        
+        # Verificaciones
+        assert result == expected, f"Error: to_dict difiere en la topología '{topology_type}'"
+        assert ArrayNetwork.from_dict(expected).to_dict() == expected, f"Error: from_dict no reconstruye '{topology_type}'"
+    
+    print("\n✓ VERIFICACIÓN: Ambos backends producen la misma red")
+    print("✓ TEST PASADO: ArrayNetwork to_dict OK\n")
+
+
+def test_array_network_power_budget():
+    """Test de power budget vectorizado igual al de OpticalNetwork"""
+    print("\n=== TEST: Power budget vectorizado ===")
+    print("ENTRADA:")
+    print("  - Topologías star, bus, ring y tree con 20 ONUs y ratio 1:8")
+    
+    for topology_type in ('star', 'bus', 'ring', 'tree'):
+        objects, arrays = _build_both(20, "1:8", topology_type)
+        expected = objects.calculate_all_power_budgets(include_fiber_losses=True)
+        result = arrays.calculate_all_power_budgets(include_fiber_losses=True)
+        
+        print(f"\nDATOS DE SALIDA ({topology_type}):")
+        print(f"  - ONUs con power budget: {len(result)}")
+        print(f"  - Pérdida total ONU-20: {result[-1]['total_loss']:.3f} dB (objetos: {expected[-1]['total_loss']:.3f} dB)")
+        
+        # Verificaciones
+        assert len(result) == len(expected), f"Error: Número de ONUs distinto en '{topology_type}'"
+        for a, b in zip(result, expected):
+            assert a['onu_id'] == b['onu_id'], "Error: Orden de ONUs distinto"
+            assert math.isclose(a['total_loss'], b['total_loss'], abs_tol=1e-9), f"Error: Pérdida distinta para {a['onu_id']}"
+            assert a['splitters'] == b['splitters'], f"Error: Splitters de la ruta distintos para {a['onu_id']}"
+            assert a['previous'] == b['previous'], f"Error: Elemento anterior distinto para {a['onu_id']}"
+            assert len(a['fiber_losses']) == len(b['fiber_losses']), f"Error: Fibras de la ruta distintas para {a['onu_id']}"
+            assert a['is_valid'] == b['is_valid'], f"Error: Validez distinta para {a['onu_id']}"
+    
+    print("\n✓ VERIFICACIÓN: Las pérdidas coinciden con el recorrido por objetos")
+    print("✓ TEST PASADO: ArrayNetwork power budget OK\n")
+
+
+def test_array_network_views():
+    """Test de las vistas de elementos sobre los arrays"""
+    print("\n=== TEST: Vistas de elementos ===")
+    print("ENTRADA:")
+    print("  - Topología en bus con 10 ONUs")
+    print("  - Modificar la longitud de la primera fibra a través de su vista")
+    
+    network = ArrayNetwork()
+    network.create_ftth_topology(num_onus=10, topology_type="bus")
+    onu = network.onus.get("ONU-5")
+    fiber = network.fibers[0]
+    before = network.calculate_power_budget_path(onu)["total_loss"]
+    fiber.length = 11.0
+    after = network.calculate_power_budget_path(onu)["total_loss"]
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - ONU-5 conectada a: {onu.connected_splitter.id}")
+    print(f"  - Fibra 0: {fiber.from_element.id} -> {fiber.to_element.id}, {fiber.length} km")
+    print(f"  - Pérdida ONU-5 antes/después: {before:.3f} / {after:.3f} dB")
+    
+    # Verificaciones
+    assert onu.connected_splitter.id == "SPLIT-TAP-5", "Error: ONU-5 debería colgar de SPLIT-TAP-5"
+    assert fiber.from_element == network.olt, "Error: La primera fibra debería salir del OLT"
+    assert network.fibers.get(fiber.id) == fiber, "Error: La búsqueda por id debería devolver la misma vista"
+    assert math.isclose(after - before, 10 * 0.2 + 0.5, abs_tol=1e-9), "Error: La pérdida debería subir 2.5 dB"
+    assert fiber.to_dict()["length"] == 11.0, "Error: to_dict de la vista debería reflejar el cambio"
+    
+    print("\n✓ VERIFICACIÓN: Las vistas leen y escriben en los arrays")
+    print("✓ TEST PASADO: ArrayNetwork views OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE ARRAY NETWORK")
+    print("=" * 70)
+    test_array_network_matches_objects()
+    test_array_network_power_budget()
+    test_array_network_views()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE ARRAY NETWORK PASARON CORRECTAMENTE")
+    print("=" * 70)
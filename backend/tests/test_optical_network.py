@@ -255,6 +255,138 @@ def test_network_add_elements():
     print("✓ TEST PASADO: OpticalNetwork add_elements OK\n")
 
 
+def test_network_power_budget_cascaded_splitters():
+    """Test de power budget con splitters en cascada (bus)"""
+    print("\n=== TEST: Power budget con splitters en cascada (bus) ===")
+    print("ENTRADA:")
+    print("  - Crear topología en bus con 4 ONUs")
+    print("  - Calcular power budget para la última ONU")
+    
+    network = OpticalNetwork()
+    network.create_ftth_topology(num_onus=4, topology_type="bus")
+    last_onu = network.onus[-1]
+    
+    print(f"\nPASO 1: Crear topología en bus con 4 ONUs")
+    print(f"PASO 2: Calcular power budget para ONU {last_onu.id}")
+    
+    power_budget = network.calculate_power_budget_path(last_onu)
+    expected_splitter_loss = sum(s.split_loss for s in network.splitters)
+    path_fibers = {"FIBER-BUS-OLT", "FIBER-BUS-1", "FIBER-BUS-2", "FIBER-BUS-3", "FIBER-4"}
+    expected_fiber_loss = sum(f.calculate_loss() for f in network.fibers if f.id in path_fibers)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Splitters en la ruta: {power_budget['splitters']}")
+    print(f"  - Pérdida en splitters: {power_budget['splitter_loss']:.2f} dB (esperada {expected_splitter_loss:.2f} dB)")
+    print(f"  - Pérdida en fibras: {power_budget['total_fiber_loss']:.2f} dB (esperada {expected_fiber_loss:.2f} dB)")
+    print(f"  - Fibras en la ruta: {len(power_budget['fiber_losses'])}")
+    
+    # Verificaciones
+    assert power_budget['splitters'] == [s.id for s in network.splitters], f"Error: Ruta de splitters incorrecta {power_budget['splitters']}"
+    assert abs(power_budget['splitter_loss'] - expected_splitter_loss) < 1e-9, "Error: La pérdida de splitters en cascada no coincide"
+    assert abs(power_budget['total_fiber_loss'] - expected_fiber_loss) < 1e-9, "Error: La pérdida de fibras de la ruta no coincide"
+    assert len(power_budget['fiber_losses']) == 5, f"Error: Deberían haber 5 fibras en la ruta, hay {len(power_budget['fiber_losses'])}"
+    
+    print("\n✓ VERIFICACIÓN: Todas las pérdidas de la ruta están incluidas")
+    print("✓ TEST PASADO: OpticalNetwork power_budget cascaded splitters OK\n")
+
+
+def test_network_all_power_budgets_tree():
+    """Test de power budget para todas las ONUs de un árbol"""
+    print("\n=== TEST: Power budget de todas las ONUs en árbol ===")
+    print("ENTRADA:")
+    print("  - Crear topología en árbol con 64 ONUs y ratio 1:8")
+    
+    network = OpticalNetwork()
+    network.create_ftth_topology(num_onus=64, split_ratio="1:8", topology_type="tree")
+    
+    results = network.calculate_all_power_budgets(include_fiber_losses=True)
+    totals = network.calculate_all_power_budgets()
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Power budgets calculados: {len(results)}")
+    print(f"  - Splitters en la ruta de {results[0]['onu_id']}: {results[0]['splitters']}")
+    print(f"  - Pérdida en splitters: {results[0]['splitter_loss']:.2f} dB")
+    
+    # Verificaciones
+    assert len(results) == 64, f"Error: Deberían haber 64 resultados, hay {len(results)}"
+    for result in results:
+        assert len(result['splitters']) == 2, f"Error: La ONU {result['onu_id']} debería atravesar 2 splitters"
+        assert len(result['fiber_losses']) == 3, f"Error: La ONU {result['onu_id']} debería atravesar 3 fibras"
+        assert abs(result['splitter_loss'] - 2 * network.splitters[0].split_loss) < 1e-9, "Error: Pérdida de splitters incorrecta"
+    for total, result in zip(totals, results):
+        assert 'fiber_losses' not in total, "Error: Por defecto no se incluye el detalle de cada ruta"
+        assert total['previous'] == result['splitters'][-1], "Error: previous debe ser el último splitter de la ruta"
+        assert total['available_power'] == result['available_power'], "Error: Totales distintos sin el detalle"
+    
+    print("\n✓ VERIFICACIÓN: Cada ONU acumula los dos niveles de splitters")
+    print("✓ TEST PASADO: OpticalNetwork all_power_budgets tree OK\n")
+
+
+def test_network_from_dict_roundtrip():
+    """Test de reconstrucción exacta de la red desde to_dict"""
+    print("\n=== TEST: Reconstrucción OpticalNetwork desde diccionario ===")
+    print("ENTRADA:")
+    print("  - Crear topología en árbol con 20 ONUs y ratio 1:8")
+    print("  - Serializar con to_dict() y reconstruir con from_dict()")
+    
+    network = OpticalNetwork("Tree Network")
+    network.create_ftth_topology(num_onus=20, split_ratio="1:8", topology_type="tree")
+    network_dict = network.to_dict()
+    
+    rebuilt = OpticalNetwork.from_dict(network_dict)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Splitters: {len(rebuilt.splitters)}")
+    print(f"  - ONUs: {len(rebuilt.onus)}")
+    print(f"  - Fibers: {len(rebuilt.fibers)}")
+    print(f"  - ONU[0].connected_splitter: {rebuilt.onus[0].connected_splitter.id}")
+    
+    # Verificaciones
+    assert rebuilt.to_dict() == network_dict, "Error: La red reconstruida no coincide con la original"
+    assert rebuilt.fibers[0].from_element is rebuilt.olt, "Error: La primera fibra debería salir del OLT"
+    assert rebuilt.calculate_all_power_budgets() == network.calculate_all_power_budgets(), "Error: Los power budgets no coinciden"
+    
+    print("\n✓ VERIFICACIÓN: La red reconstruida es idéntica a la original")
+    print("✓ TEST PASADO: OpticalNetwork from_dict roundtrip OK\n")
+
+
+def test_network_element_lookup():
+    """Test de colecciones indexadas por id: sin duplicados y búsqueda por id"""
+    print("\n=== TEST: Búsqueda de elementos por id ===")
+    print("ENTRADA:")
+    print("  - Crear topología en bus con 50 ONUs")
+    print("  - Volver a agregar una ONU y una fibra existentes")
+    
+    network = OpticalNetwork()
+    network.create_ftth_topology(num_onus=50, topology_type="bus")
+    num_onus, num_fibers = len(network.onus), len(network.fibers)
+    
+    network.add_onu(network.onus[10])
+    network.add_fiber(network.fibers[0])
+    network.splitters[0].connect_onu(network.onus[0])
+    
+    onu = network.get_element("ONU-25")
+    splitter = network.get_element("SPLIT-TAP-25")
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - ONUs: {len(network.onus)}, fibras: {len(network.fibers)}")
+    print(f"  - ONU-25: {onu.id if onu else 'None'}")
+    print(f"  - SPLIT-TAP-25: {splitter.id if splitter else 'None'}")
+    
+    # Verificaciones
+    assert len(network.onus) == num_onus, "Error: La ONU no debería duplicarse"
+    assert len(network.fibers) == num_fibers, "Error: La fibra no debería duplicarse"
+    assert len(network.splitters[0].connected_onus) == 1, "Error: El splitter no debería duplicar la ONU"
+    assert onu is network.onus[24], "Error: get_element debería devolver ONU-25"
+    assert onu.connected_splitter is splitter, "Error: ONU-25 debería estar conectada a SPLIT-TAP-25"
+    assert "ONU-25" in network.onus and onu in network.onus, "Error: La ONU debería estar en la colección"
+    assert network.get_element("ONU-999") is None, "Error: Un id inexistente debería devolver None"
+    assert network.get_element("OLT-1") is network.olt, "Error: get_element debería devolver el OLT"
+    
+    print("\n✓ VERIFICACIÓN: Elementos únicos y accesibles por id")
+    print("✓ TEST PASADO: OpticalNetwork element lookup OK\n")
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("EJECUTANDO TESTS DE OPTICAL NETWORK")
@@ -267,6 +399,10 @@ if __name__ == "__main__":
     test_network_power_budget_calculation()
     test_network_to_dict()
     test_network_add_elements()
+    test_network_power_budget_cascaded_splitters()
+    test_network_all_power_budgets_tree()
+    test_network_from_dict_roundtrip()
+    test_network_element_lookup()
     print("=" * 70)
     print("✓ TODOS LOS TESTS DE OPTICAL NETWORK PASARON CORRECTAMENTE")
     print("=" * 70)
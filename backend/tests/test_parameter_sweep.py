@@ -0,0 +1,75 @@
+"""
+Tests para el barrido de parámetros
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.parameter_sweep import expand_sweep_grid, sweep_seeds
+
+
+def test_sweep_grid_expansion():
+    """Test de expansión de la rejilla al producto cartesiano"""
+    print("\n=== TEST: Expansión de la rejilla de parámetros ===")
+    print("ENTRADA:")
+    print("  - num_onus=[8, 16, 32], topology_type=['star', 'tree'], simulation_time=10")
+    print("  - Rejillas con parámetros desconocidos y valores inválidos")
+    
+    points = expand_sweep_grid({
+        'num_onus': [8, 16, 32],
+        'topology_type': ['star', 'tree'],
+        'simulation_time': 10
+    })
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Puntos: {len(points)}")
+    print(f"  - Primer punto: {points[0]}")
+    
+    # Verificaciones
+    assert len(points) == 6, f"Error: Deberían haber 6 puntos, hay {len(points)}"
+    assert all(p['split_ratio'] == '1:32' for p in points), "Error: split_ratio debería tomar el valor por defecto"
+    assert all(p['simulation_time'] == 10 for p in points), "Error: simulation_time debería ser 10"
+    
+    errors = []
+    for grid in ({'unknown': [1, 2]}, {'simulation_time': 'x', 'num_onus': 4}, {'num_onus': 'abc'},
+                 {'num_onus': -5}, {'num_onus': [8, 10**6]}, {'topology_type': 'mesh'},
+                 {'split_ratio': ['1:8', '32']}, {'simulation_time': float('nan')}, [1]):
+        try:
+            expand_sweep_grid(grid)
+        except ValueError as e:
+            errors.append(str(e))
+    print(f"  - Rejillas inválidas rechazadas: {len(errors)}")
+    assert len(errors) == 9, "Error: Los parámetros y valores inválidos deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: La rejilla se expande con los valores por defecto")
+    print("✓ TEST PASADO: parameter_sweep grid expansion OK\n")
+
+
+def test_sweep_seeds_deterministic():
+    """Test de semillas deterministas y distintas por punto"""
+    print("\n=== TEST: Semillas por punto del barrido ===")
+    print("ENTRADA: base_seed=42, 50 puntos")
+    
+    seeds = sweep_seeds(42, 50)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Primeras semillas: {seeds[:3]}")
+    
+    # Verificaciones
+    assert seeds == sweep_seeds(42, 50), "Error: Las semillas deberían ser reproducibles"
+    assert len(set(seeds)) == 50, "Error: Cada punto debería tener una semilla distinta"
+    assert seeds != sweep_seeds(43, 50), "Error: Otra semilla base debería dar otras semillas"
+    
+    print("\n✓ VERIFICACIÓN: Semillas reproducibles e independientes")
+    print("✓ TEST PASADO: parameter_sweep seeds OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE PARAMETER SWEEP")
+    print("=" * 70)
+    test_sweep_grid_expansion()
+    test_sweep_seeds_deterministic()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE PARAMETER SWEEP PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,195 @@
+"""
+Tests para las redes multi-PON y los cálculos por puerto
+"""
+import sys
+import os
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.network_elements import OpticalNetwork
+from models.network_arrays import ArrayNetwork
+from models.network_pons import PonNetwork, split_pons, pon_ports_option
+from simulators.traffic_simulator import TrafficSimulator
+from simulators.power_budget_montecarlo import monte_carlo_parameters, run_power_budget_montecarlo
+from simulators.dba_algorithm import DynamicBandwidthAllocation
+from simulators.pon_sharding import (
+    shard_batches, pon_seeds, power_budget_batch, montecarlo_batch, merge_montecarlo,
+    merge_pon_results, merge_progress, merge_allocations
+)
+from jobs import run_simulation_job
+
+
+def test_pon_generation_and_split():
+    """Test de generación de los puertos PON y de su reconstrucción desde el diccionario"""
+    print("\n=== TEST: Generación y separación de puertos PON ===")
+    print("ENTRADA:")
+    print("  - 70 ONUs en 4 puertos PON, topologías star, tree, bus y ring (1:8)")
+    print("  - Diccionario con los elementos desordenados y puertos con ArrayNetwork")
+    
+    networks = {}
+    for topology_type in ('star', 'tree', 'bus', 'ring'):
+        network = PonNetwork(name="Central")
+        network.create_ftth_topology(num_onus=70, split_ratio="1:8", topology_type=topology_type, pon_ports=4)
+        networks[topology_type] = network
+    
+    data = networks['tree'].to_dict()
+    shuffled = {**data}
+    for key in ('splitters', 'onus', 'fibers'):
+        shuffled[key] = random.Random(1).sample(data[key], len(data[key]))
+    rebuilt = PonNetwork.from_dict(shuffled)
+    arrays = PonNetwork.from_dict(data, shard_class=lambda num_onus: ArrayNetwork)
+    
+    errors = []
+    for value in (0, 129, 'abc', True):
+        try:
+            pon_ports_option(value)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    print("\nDATOS DE SALIDA:")
+    for topology_type, network in networks.items():
+        print(f"  - {topology_type}: OLTs {[olt.id for olt in network.olts]}, "
+              f"ONUs por puerto {[len(pon.onus) for pon in network.pons]}")
+    print(f"  - Primera y última ONU: {data['onus'][0]['id']} / {data['onus'][-1]['id']}")
+    print(f"  - Errores de validación: {len(errors)}")
+    
+    # Verificaciones
+    for network in networks.values():
+        data = network.to_dict()
+        ids = [item['id'] for key in ('olts', 'splitters', 'onus', 'fibers') for item in data[key]]
+        assert len(ids) == len(set(ids)), "Error: Los ids de los puertos no deben repetirse"
+        assert [len(pon.onus) for pon in network.pons] == [18, 18, 17, 17], "Error: Reparto de ONUs incorrecto"
+        assert PonNetwork.from_dict(data).to_dict() == data, "Error: from_dict debe reconstruir la red exacta"
+        for port, pon in enumerate(network.pons, start=1):
+            single = OpticalNetwork()
+            single.create_ftth_topology(num_onus=len(pon.onus), split_ratio="1:8", topology_type=network.topology_type)
+            expected = [b['available_power'] for b in single.calculate_all_power_budgets()]
+            budgets = [b for b in network.calculate_all_power_budgets() if b['olt_id'] == f'OLT-{port}']
+            assert [b['available_power'] for b in budgets] == expected, "Error: Cada puerto debe ser el árbol de un OLT"
+            assert all(b['onu_id'].startswith(f'PON{port}-') for b in budgets), "Error: ONUs de otro puerto"
+    
+    assert rebuilt.pon_onu_ids() == [
+        (olt_id, sorted(onu_ids, key=[o['id'] for o in shuffled['onus']].index))
+        for olt_id, onu_ids in networks['tree'].pon_onu_ids()
+    ], "Error: Cada elemento debe volver a su puerto aunque esté desordenado"
+    assert [len(pon['fibers']) for pon in split_pons(shuffled)] == [len(pon.fibers) for pon in networks['tree'].pons], \
+        "Error: Fibras asignadas a otro puerto"
+    array_budgets = arrays.calculate_all_power_budgets()
+    object_budgets = networks['tree'].calculate_all_power_budgets()
+    assert [(b['onu_id'], b['olt_id']) for b in array_budgets] == [(b['onu_id'], b['olt_id']) for b in object_budgets], \
+        "Error: Los puertos con ArrayNetwork deben tener las mismas ONUs"
+    assert all(abs(a['available_power'] - b['available_power']) < 1e-9 for a, b in zip(array_budgets, object_budgets)), \
+        "Error: Los puertos con ArrayNetwork deben dar el mismo power budget"
+    assert len(errors) == 4, "Error: Los números de puertos inválidos deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: Cada puerto es un árbol independiente y la red se reconstruye exacta")
+    print("✓ TEST PASADO: PON generation OK\n")
+
+
+def test_pon_sharded_results():
+    """Test de power budget, Monte Carlo, DBA y simulación por puertos unidos en la red"""
+    print("\n=== TEST: Cálculos por puerto PON ===")
+    print("ENTRADA:")
+    print("  - 48 ONUs en 3 puertos PON (star 1:16), lotes de 2 workers")
+    print("  - Simulaciones vectorized (2 s) y gpon (0.5 s) con semilla 9")
+    
+    network = PonNetwork(name="Central")
+    network.create_ftth_topology(num_onus=48, split_ratio="1:16", topology_type="star", pon_ports=3)
+    pons = network.pon_onu_ids()
+    
+    budgets = [
+        budget for batch in shard_batches(network.pon_dicts(), 2)
+        for budget in power_budget_batch(batch, array_threshold=20)
+    ]
+    
+    parameters = monte_carlo_parameters({'trials': 2000, 'seed': 5})
+    pon_paths = list(zip(network.pon_paths(), pon_seeds(5, len(pons))))
+    per_pon_mc = [result for batch in shard_batches(pon_paths, 2) for result in montecarlo_batch(batch, parameters)]
+    montecarlo = merge_montecarlo(per_pon_mc)
+    
+    simulations = {}
+    for mode, simulation_time in (('vectorized', 2), ('gpon', 0.5)):
+        job_parameters = {'mode': mode, 'simulation_time': simulation_time, 'seed': 9}
+        results = [
+            run_simulation_job(len(onu_ids), job_parameters, None, onu_ids, seed, olt_id)
+            for (olt_id, onu_ids), seed in zip(pons, pon_seeds(9, len(pons)))
+        ]
+        direct = TrafficSimulator(simulation_time=simulation_time, seed=pon_seeds(9, 3)[1], onu_ids=pons[1][1]).run(mode=mode)
+        simulations[mode] = (results, merge_pon_results(results, pons), direct)
+    
+    dba = DynamicBandwidthAllocation()
+    requests = {'PON1-ONU-1': 80, 'PON1-ONU-2': 80, 'PON3-ONU-5': 30}
+    pon_of = network.pon_of()
+    groups = {}
+    for onu_id, requested in requests.items():
+        groups.setdefault(pon_of[onu_id], {})[onu_id] = requested
+    allocation = merge_allocations(
+        {olt_id: dba.allocate(group, 100, strategy='fair') for olt_id, group in groups.items()}, 100
+    )
+    
+    updates = [
+        {'update': 3, 'sim_time': 1.0, 'simulation_time': 2, 'progress': 0.5, 'events': 100, 'elapsed': 1.0,
+         'events_per_second': 100.0, 'interval_start': 0.5, 'total_throughput': 10.0, 'throughput': {'A': 10.0}},
+        {'update': 2, 'sim_time': 0.5, 'simulation_time': 2, 'progress': 0.25, 'events': 50, 'elapsed': 2.0,
+         'events_per_second': 25.0, 'interval_start': 0.0, 'total_throughput': 5.0, 'throughput': {'B': 5.0}}
+    ]
+    partial = merge_progress({'OLT-1': updates[0]}, num_pons=2)
+    progress = merge_progress({'OLT-1': updates[0], 'OLT-2': updates[1]}, num_pons=2)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Power budget: {len(budgets)} ONUs, OLTs {sorted(set(b['olt_id'] for b in budgets))}")
+    print(f"  - Monte Carlo: yield de la red {montecarlo['yield']:.4f}, "
+          f"por puerto {[round(r['yield'], 4) for r in per_pon_mc]}")
+    for mode, (_, merged, _) in simulations.items():
+        print(f"  - {mode}: {merged['total_throughput']:.2f} Mbps, {merged['total_packets']} paquetes, "
+              f"puertos {[round(p['total_throughput'], 2) for p in merged['pons']]}")
+    print(f"  - DBA: concedido {allocation['total_granted']} de {allocation['total_capacity']} Mbps")
+    print(f"  - Progreso: {partial['progress']} con un puerto, {progress['progress']} con los dos")
+    
+    # Verificaciones
+    assert budgets == network.calculate_all_power_budgets(), "Error: El power budget por lotes debe ser el de la red"
+    assert len(shard_batches(range(5), 2)) == 2 and len(shard_batches(range(2), 8)) == 2, "Error: Lotes mal repartidos"
+    
+    for paths, seed in pon_paths:
+        assert list(run_power_budget_montecarlo(paths, {**parameters, 'seed': seed})['mean_margin']) == \
+            list(per_pon_mc[pon_paths.index((paths, seed))]['mean_margin']), "Error: Monte Carlo distinto por lotes"
+    assert montecarlo['onu_ids'] == [onu.id for onu in network.onus], "Error: Faltan ONUs en el Monte Carlo"
+    expected_yield = per_pon_mc[0]['yield'] * per_pon_mc[1]['yield'] * per_pon_mc[2]['yield']
+    assert abs(montecarlo['yield'] - expected_yield) < 1e-12, "Error: El yield de la red es el producto de los puertos"
+    
+    for mode, (results, merged, direct) in simulations.items():
+        assert results[1]['total_packets'] == direct['total_packets'], "Error: Cada puerto debe usar su semilla"
+        assert merged['total_packets'] == sum(r['total_packets'] for r in results), "Error: Paquetes mal sumados"
+        assert abs(merged['total_throughput'] - sum(r['total_throughput'] for r in results)) < 1e-9, \
+            "Error: Throughput mal sumado"
+        assert abs(merged['average_throughput'] - merged['total_throughput'] / 48) < 1e-9, "Error: Media por ONU"
+        onu_ids = [m['onu_id'] for m in merged['metrics'] if m['type'] == 'throughput']
+        assert onu_ids == [onu.id for onu in network.onus], "Error: Las métricas deben ser las ONUs de la red"
+        assert [p['olt_id'] for p in merged['pons']] == ['OLT-1', 'OLT-2', 'OLT-3'], "Error: Falta el resumen por puerto"
+        assert merged['seed'] == 9, "Error: La semilla guardada debe reproducir la simulación"
+    gpon = simulations['gpon'][1]
+    assert abs(gpon['total_offered_load'] - sum(r['total_offered_load'] for r in simulations['gpon'][0])) < 1e-9, \
+        "Error: Carga ofrecida mal sumada"
+    
+    assert allocation['total_capacity'] == 200 and allocation['total_granted'] == 130, \
+        "Error: Cada puerto reparte su propia capacidad"
+    assert allocation['allocations']['PON1-ONU-1']['granted'] == 50, "Error: Reparto justo dentro del puerto"
+    
+    assert partial['sim_time'] is None and partial['progress'] == 0.25, "Error: Los puertos sin informe cuentan como 0"
+    assert progress['sim_time'] == 0.5 and progress['progress'] == 0.375, "Error: Progreso del puerto más atrasado"
+    assert progress['events'] == 150 and progress['update'] == 5, "Error: Eventos e informes mal sumados"
+    assert progress['throughput'] == {'A': 10.0, 'B': 5.0}, "Error: Falta el throughput por ONU"
+    
+    print("\n✓ VERIFICACIÓN: Los resultados por puerto se unen en los de la red")
+    print("✓ TEST PASADO: PON sharding OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE PON NETWORK")
+    print("=" * 70)
+    test_pon_generation_and_split()
+    test_pon_sharded_results()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE PON NETWORK PASARON CORRECTAMENTE")
+    print("=" * 70)
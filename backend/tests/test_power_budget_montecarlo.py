@@ -0,0 +1,124 @@
+"""
+Tests para el análisis Monte Carlo del power budget
+"""
+import sys
+import os
+import math
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.network_elements import OpticalNetwork
+from models.network_arrays import ArrayNetwork
+from simulators.power_budget_montecarlo import (
+    monte_carlo_parameters, run_power_budget_montecarlo, summarize_montecarlo
+)
+
+
+def test_montecarlo_paths_and_nominal():
+    """Test de rutas por columnas y de realizaciones sin tolerancias"""
+    print("\n=== TEST: Rutas del Monte Carlo y caso sin tolerancias ===")
+    print("ENTRADA:")
+    print("  - Topologías en árbol (64 ONUs, 1:8) y anillo (40 ONUs)")
+    print("  - Tolerancias a cero: todas las realizaciones son la red nominal")
+    
+    zero = monte_carlo_parameters({
+        'trials': 20, 'attenuation_sd': 0, 'splice_sd': 0, 'connector_sd': 0, 'splitter_sd': 0
+    })
+    results = {}
+    for topology_type, num_onus in (('tree', 64), ('ring', 40)):
+        network = OpticalNetwork()
+        network.create_ftth_topology(num_onus=num_onus, split_ratio="1:8", topology_type=topology_type)
+        paths = network.power_path_arrays()
+        array_paths = ArrayNetwork.from_network(network).power_path_arrays()
+        budgets = network.calculate_all_power_budgets(include_fiber_losses=False)
+        results[topology_type] = (paths, array_paths, budgets, run_power_budget_montecarlo(paths, zero))
+    
+    print("\nDATOS DE SALIDA:")
+    for topology_type, (paths, _, budgets, result) in results.items():
+        print(f"  - {topology_type}: {len(paths['onu_ids'])} ONUs, {len(paths['parent']) - 1} splitters")
+        print(f"    Margen nominal ONU-1: {budgets[0]['available_power']:.3f} dB, "
+              f"p1/p99: {result['margin_percentiles']['p1'][0]:.3f} / {result['margin_percentiles']['p99'][0]:.3f} dB")
+    
+    # Verificaciones
+    for topology_type, (paths, array_paths, budgets, result) in results.items():
+        assert paths['onu_ids'] == [b['onu_id'] for b in budgets], "Error: Las ONUs deben ser las del power budget"
+        assert paths['onu_ids'] == array_paths['onu_ids'], "Error: ArrayNetwork debería dar las mismas ONUs"
+        assert list(paths['parent']) == list(array_paths['parent']), "Error: ArrayNetwork debería dar las mismas rutas"
+        assert list(paths['onu_source']) == list(array_paths['onu_source']), "Error: Nodos de origen distintos"
+        for i, budget in enumerate(budgets):
+            available = budget['available_power']
+            assert abs(result['nominal_margin'][i] - available) < 1e-9, "Error: Margen nominal incorrecto"
+            assert abs(result['mean_margin'][i] - available) < 1e-4, "Error: Sin tolerancias el margen no varía"
+            for values in result['margin_percentiles'].values():
+                assert abs(values[i] - available) < 1e-4, "Error: Los percentiles deben ser el margen nominal"
+            assert result['violation_probability'][i] == (0.0 if budget['is_valid'] else 1.0), \
+                "Error: La probabilidad de violación debe coincidir con is_valid"
+    
+    print("\n✓ VERIFICACIÓN: Las rutas coinciden en ambas representaciones y el caso nominal es exacto")
+    print("✓ TEST PASADO: Monte Carlo paths OK\n")
+
+
+def test_montecarlo_statistics():
+    """Test de probabilidades y percentiles frente a la distribución normal de la ruta"""
+    print("\n=== TEST: Estadísticas del Monte Carlo ===")
+    print("ENTRADA:")
+    print("  - Topología en estrella con 16 ONUs (1:32)")
+    print("  - Margen de seguridad ajustado para dejar la ONU-1 en el límite")
+    print("  - 20000 realizaciones con las tolerancias por defecto")
+    
+    network = OpticalNetwork()
+    network.create_ftth_topology(num_onus=16, split_ratio="1:32", topology_type="star")
+    paths = network.power_path_arrays()
+    available = network.calculate_all_power_budgets(include_fiber_losses=False)[0]['available_power']
+    parameters = monte_carlo_parameters({'trials': 20000, 'seed': 7, 'safety_margin': 3.0 + available - 0.5})
+    
+    result = run_power_budget_montecarlo(paths, parameters)
+    repeated = run_power_budget_montecarlo(paths, parameters)
+    summary = summarize_montecarlo(result, parameters)
+    
+    # Desviación de la ruta OLT -> ONU-1: dos tramos (troncal y bajada)
+    variance = 0.0
+    for length, from_splitter in ((paths['parent_length'][1], 0), (paths['onu_length'][0], 1)):
+        splices = int(length / 2) + 1
+        variance += (length * 0.01) ** 2 + splices * 0.05 ** 2 + 2 * 0.1 ** 2 + from_splitter * 0.5 ** 2
+    sd = math.sqrt(variance)
+    expected_violation = 0.5 * (1 + math.erf((0 - 0.5) / sd / math.sqrt(2)))
+    
+    errors = []
+    for values in ({'trials': 0}, {'splitter_sd': -1}, {'trials': 'abc'}, {'foo': 1}):
+        try:
+            monte_carlo_parameters(values)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    onu = summary['onus'][0]
+    print("\nDATOS DE SALIDA:")
+    print(f"  - ONU-1: margen nominal {onu['nominal_margin']} dB, medio {onu['mean_margin']} dB")
+    print(f"  - Desviación: {onu['std_margin']} dB (esperada {sd:.4f} dB)")
+    print(f"  - Probabilidad de violación: {onu['violation_probability']:.4f} (esperada {expected_violation:.4f})")
+    print(f"  - Percentiles del margen: {onu['margin_percentiles']}")
+    print(f"  - Yield de la red: {summary['yield']:.4f}")
+    print(f"  - Errores de validación: {len(errors)}")
+    
+    # Verificaciones
+    assert abs(onu['nominal_margin'] - 0.5) < 1e-4, "Error: El margen nominal de la ONU-1 debería ser 0.5 dB"
+    assert abs(onu['std_margin'] - sd) < 0.03 * sd, "Error: La desviación no coincide con la de la ruta"
+    assert abs(onu['violation_probability'] - expected_violation) < 0.02, "Error: Probabilidad de violación incorrecta"
+    assert abs(onu['margin_percentiles']['p50'] - 0.5) < 0.03, "Error: La mediana debería ser el margen nominal"
+    assert abs(onu['margin_percentiles']['p5'] - (0.5 - 1.645 * sd)) < 0.05, "Error: Percentil 5 incorrecto"
+    assert summary['yield'] <= 1 - max(result['violation_probability']), "Error: El yield no puede superar al de cada ONU"
+    assert (result['mean_margin'] == repeated['mean_margin']).all(), "Error: Con la misma semilla el resultado debe repetirse"
+    assert len(errors) == 4, "Error: Los parámetros inválidos deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: Las estadísticas coinciden con la distribución de la ruta")
+    print("✓ TEST PASADO: Monte Carlo statistics OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE POWER BUDGET MONTE CARLO")
+    print("=" * 70)
+    test_montecarlo_paths_and_nominal()
+    test_montecarlo_statistics()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE POWER BUDGET MONTE CARLO PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,47 @@
+"""
+Tests para la codificación compacta de métricas
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.results_encoding import encode_metrics, decode_metrics, columns_to_metrics
+
+
+def test_metrics_encoding_roundtrip():
+    """Test de codificación y decodificación de métricas en npz"""
+    print("\n=== TEST: Codificación compacta de métricas ===")
+    print("ENTRADA:")
+    print("  - 200 métricas (throughput y packets_sent para 100 ONUs)")
+    
+    metrics = []
+    for i in range(100):
+        metrics.append({'onu_id': f'ONU-{i+1}', 'type': 'throughput', 'value': 1.5 * i, 'timestamp': 100.0})
+        metrics.append({'onu_id': f'ONU-{i+1}', 'type': 'packets_sent', 'value': float(10 * i), 'timestamp': 100.0})
+    
+    blob = encode_metrics(metrics)
+    columns = decode_metrics(blob)
+    decoded = columns_to_metrics(columns)
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Tamaño del blob: {len(blob)} bytes")
+    print(f"  - Columnas: {list(columns.keys())}")
+    print(f"  - Métricas decodificadas: {len(decoded)}")
+    
+    # Verificaciones
+    assert isinstance(blob, bytes), "Error: El blob debería ser bytes"
+    assert len(columns['value']) == 200, f"Error: Deberían haber 200 valores, hay {len(columns['value'])}"
+    assert decoded == metrics, "Error: Las métricas decodificadas no coinciden con las originales"
+    
+    print("\n✓ VERIFICACIÓN: Las métricas se recuperan sin pérdidas")
+    print("✓ TEST PASADO: results_encoding roundtrip OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE RESULTS ENCODING")
+    print("=" * 70)
+    test_metrics_encoding_roundtrip()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE RESULTS ENCODING PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,157 @@
+"""
+Tests para los informes de progreso de las simulaciones
+"""
+import sys
+import os
+import json
+import queue
+import threading
+from concurrent.futures import Future
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.traffic_simulator import TrafficSimulator
+from flask import Flask
+
+from simulators.progress import progress_interval, PROGRESS_UPDATES
+from streaming import RawJSON, sse_event, sse_response
+from jobs import SimulationJobQueue
+
+
+def test_progress_reports():
+    """Test de los informes de progreso en los tres modos de simulación"""
+    print("\n=== TEST: Informes de progreso ===")
+    print("ENTRADA:")
+    print("  - 6 ONUs, semilla 4")
+    print("  - simpy (10 s, cada 1 s), vectorized (10 s) y gpon (1 s, por defecto)")
+    
+    runs = {}
+    for mode, simulation_time, interval in (('simpy', 10, 1.0), ('vectorized', 10, None), ('gpon', 1, None)):
+        updates = []
+        plain = TrafficSimulator(num_onus=6, simulation_time=simulation_time, seed=4).run(mode=mode)
+        results = TrafficSimulator(num_onus=6, simulation_time=simulation_time, seed=4).run(
+            mode=mode, progress=updates.append, progress_interval=interval
+        )
+        runs[mode] = (plain, results, updates)
+    
+    errors = []
+    for parameters in ({'progress_interval': 0}, {'progress_interval': 'abc'}, {'progress_interval': True}):
+        try:
+            progress_interval(parameters)
+        except ValueError as e:
+            errors.append(str(e))
+    intervals = [
+        progress_interval(parameters)
+        for parameters in ({'progress_interval': 1e-9, 'simulation_time': 10}, {'progress_interval': 1e-9},
+                           {'progress_interval': 2, 'simulation_time': 10})
+    ]
+    
+    print("\nDATOS DE SALIDA:")
+    for mode, (_, results, updates) in runs.items():
+        last = updates[-1]
+        print(f"  - {mode}: {len(updates)} informes, último: progreso {last['progress']}, "
+              f"{last['events']} eventos, {last['events_per_second']:.0f} eventos/s")
+    print(f"  - Errores de validación: {len(errors)}")
+    print(f"  - Intervalos con límite inferior: {intervals}")
+    
+    # Verificaciones
+    for mode, (plain, results, updates) in runs.items():
+        assert results['total_packets'] == plain['total_packets'], "Error: El progreso no debe cambiar la simulación"
+        assert [u['update'] for u in updates] == list(range(1, len(updates) + 1)), "Error: Informes mal numerados"
+        assert all(a['progress'] <= b['progress'] for a, b in zip(updates, updates[1:])), "Error: El progreso no puede retroceder"
+        assert updates[-1]['progress'] == 1.0, "Error: El último informe debe marcar el final"
+        assert all(set(u['throughput']) == {f'ONU-{i+1}' for i in range(6)} for u in updates), "Error: Falta el throughput por ONU"
+    
+    _, simpy_results, simpy_updates = runs['simpy']
+    assert [u['sim_time'] for u in simpy_updates] == [float(t) for t in range(1, 11)], "Error: Un informe por segundo simulado"
+    assert simpy_updates[-1]['events'] == simpy_results['total_packets'], "Error: En simpy los eventos son los paquetes"
+    average = sum(u['total_throughput'] for u in simpy_updates) / len(simpy_updates)
+    assert abs(average - simpy_results['total_throughput']) < 1e-6, "Error: Los intervalos deben promediar el throughput"
+    
+    _, vectorized_results, vectorized_updates = runs['vectorized']
+    assert all(u['sim_time'] is None for u in vectorized_updates), "Error: El modo vectorizado avanza por ONUs"
+    assert abs(vectorized_updates[-1]['total_throughput'] - vectorized_results['total_throughput']) < 1e-6, \
+        "Error: El último informe vectorizado debe dar el throughput final"
+    
+    _, gpon_results, gpon_updates = runs['gpon']
+    assert gpon_updates[-1]['events'] == gpon_results['cycles'], "Error: En gpon los eventos son los ciclos DBA"
+    assert len(gpon_updates) <= PROGRESS_UPDATES + 1, "Error: Demasiados informes"
+    assert len(errors) == 3, "Error: Los intervalos inválidos deberían rechazarse"
+    assert intervals == [0.01, 0.1, 2.0], "Error: El intervalo debe ser al menos 1/1000 de la simulación"
+    
+    print("\n✓ VERIFICACIÓN: Los informes avanzan hasta el final sin alterar la simulación")
+    print("✓ TEST PASADO: Progress reports OK\n")
+
+
+def test_progress_relay_and_events():
+    """Test del reenvío de informes por la cola del trabajo y de los eventos SSE"""
+    print("\n=== TEST: Reenvío de progreso y eventos SSE ===")
+    print("ENTRADA:")
+    print("  - Un trabajo que envía 5 informes por una cola y termina")
+    print("  - Eventos SSE con datos JSON y RawJSON")
+    print("  - Flujos SSE con una sola plaza: abrir dos a la vez, cerrar el primero y abrir otro")
+    
+    saved = []
+    job_queue = SimulationJobQueue()
+    job_queue._set_progress = lambda simulation_id, update: saved.append((simulation_id, update))
+    
+    updates = queue.Queue()
+    future = Future()
+    
+    def job():
+        for i in range(1, 6):
+            updates.put({'update': i})
+        future.set_result({'total_packets': 0})
+    
+    worker = threading.Timer(0.1, job)
+    worker.start()
+    job_queue._relay_progress(7, future, updates)
+    worker.join()
+    
+    progress_event = sse_event('progress', RawJSON(json.dumps({'update': 3})), 3)
+    status_event = sse_event('status', {'id': 7, 'status': 'COMPLETED'})
+    
+    app = Flask(__name__)
+    slots = threading.BoundedSemaphore(1)
+    
+    @app.route('/events')
+    def events():
+        return sse_response(iter([status_event]), slots)
+    
+    client = app.test_client()
+    first = client.get('/events', buffered=False)
+    rejected = client.get('/events')
+    first.close()
+    reopened = client.get('/events')
+    statuses = [first.status_code, rejected.status_code, reopened.status_code]
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Informes guardados: {saved}")
+    print(f"  - Evento de progreso: {progress_event!r}")
+    print(f"  - Evento de estado: {status_event!r}")
+    print(f"  - Estados HTTP de los flujos: {statuses}")
+    
+    # Verificaciones
+    assert saved and saved[-1] == (7, {'update': 5}), "Error: Debe guardarse el último informe"
+    assert [update['update'] for _, update in saved] == sorted({update['update'] for _, update in saved}), \
+        "Error: Los informes guardados deben ir en orden"
+    assert updates.empty(), "Error: La cola debe vaciarse antes de terminar"
+    assert progress_event == 'event: progress\nid: 3\ndata: {"update": 3}\n\n', "Error: Evento de progreso mal formado"
+    assert status_event.endswith('\n\n') and 'id:' not in status_event, "Error: Evento de estado mal formado"
+    assert json.loads(status_event.split('data: ')[1]) == {'id': 7, 'status': 'COMPLETED'}, "Error: Datos del evento incorrectos"
+    assert statuses == [200, 503, 200], "Error: Sin plazas libres se responde 503 hasta que se cierra un flujo"
+    assert rejected.headers['Retry-After'] == '5' and not rejected.json['success'], "Error: Respuesta 503 mal formada"
+    assert reopened.get_data(as_text=True) == status_event, "Error: El flujo debe enviar sus eventos"
+    
+    print("\n✓ VERIFICACIÓN: El último informe llega a la simulación y se envía como evento SSE")
+    print("✓ TEST PASADO: Progress relay OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE PROGRESO DE SIMULACIONES")
+    print("=" * 70)
+    test_progress_reports()
+    test_progress_relay_and_events()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE PROGRESO DE SIMULACIONES PASARON CORRECTAMENTE")
+    print("=" * 70)
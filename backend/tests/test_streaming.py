@@ -0,0 +1,81 @@
+"""
+Tests para la codificación JSON por partes y NDJSON
+"""
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streaming import RawJSON, iter_json, iter_ndjson, buffered
+
+
+def test_iter_json_matches_json_dumps():
+    """Test de que la codificación por partes produce el mismo documento"""
+    print("\n=== TEST: iter_json con generadores y RawJSON ===")
+    print("ENTRADA:")
+    print("  - Red con OLT en RawJSON, 1000 ONUs en un generador y listas anidadas")
+    
+    onus = [{'id': f'ONU-{i+1}', 'tx_power': 2.5, 'connected': i % 2 == 0} for i in range(1000)]
+    olt = {'id': 'OLT-1', 'name': 'OLT "Principal"', 'type': 'OLT'}
+    value = {
+        'success': True,
+        'data': {
+            'olt': RawJSON(json.dumps(olt)),
+            'onus': (onu for onu in onus),
+            'fibers': [],
+            'empty': iter([]),
+            'nested': [[1, 2], {'a': None}]
+        }
+    }
+    expected = {
+        'success': True,
+        'data': {'olt': olt, 'onus': onus, 'fibers': [], 'empty': [], 'nested': [[1, 2], {'a': None}]}
+    }
+    
+    chunks = list(buffered(iter_json(value), chunk_size=4096))
+    decoded = json.loads(''.join(chunks))
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Trozos emitidos: {len(chunks)}")
+    print(f"  - Tamaño máximo de trozo: {max(len(c) for c in chunks)} caracteres")
+    
+    # Verificaciones
+    assert decoded == expected, "Error: El documento decodificado no coincide con el original"
+    assert len(chunks) > 1, "Error: La respuesta debería enviarse en varios trozos"
+    
+    print("\n✓ VERIFICACIÓN: El JSON por partes equivale a json.dumps")
+    print("✓ TEST PASADO: streaming iter_json OK\n")
+
+
+def test_iter_ndjson_lines():
+    """Test de un registro por línea en NDJSON"""
+    print("\n=== TEST: iter_ndjson ===")
+    print("ENTRADA:")
+    print("  - Cabecera, un RawJSON y 3 métricas")
+    
+    records = [{'type': 'SIMULATION', 'id': 1}, RawJSON('{"type": "OLT"}')]
+    records += [{'type': 'METRIC', 'value': i / 3} for i in range(3)]
+    lines = ''.join(iter_ndjson(iter(records))).splitlines()
+    
+    print("\nDATOS DE SALIDA:")
+    for line in lines:
+        print(f"  - {line}")
+    
+    # Verificaciones
+    assert len(lines) == 5, f"Error: Deberían haber 5 líneas, hay {len(lines)}"
+    assert json.loads(lines[1]) == {'type': 'OLT'}, "Error: RawJSON debería emitirse tal cual"
+    assert [json.loads(line)['type'] for line in lines[2:]] == ['METRIC'] * 3, "Error: Métricas incorrectas"
+    
+    print("\n✓ VERIFICACIÓN: Cada registro es una línea JSON válida")
+    print("✓ TEST PASADO: streaming iter_ndjson OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE STREAMING")
+    print("=" * 70)
+    test_iter_json_matches_json_dumps()
+    test_iter_ndjson_lines()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE STREAMING PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,123 @@
+"""
+Tests para las métricas por ventanas de tiempo
+"""
+import sys
+import os
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.time_series import WindowedMetrics, window_options
+from simulators.traffic_simulator import TrafficSimulator
+
+
+def test_windowed_statistics():
+    """Test de la serie por ventanas y de los estadísticos en línea"""
+    print("\n=== TEST: Estadísticos por ventanas ===")
+    print("ENTRADA:")
+    print("  - 3 ONUs, 10 s en ventanas de 0.1 s (100 ventanas)")
+    print("  - Llegadas aleatorias añadidas en lotes, con huecos sin tráfico")
+    
+    rng = np.random.default_rng(5)
+    windows = WindowedMetrics(['ONU-1', 'ONU-2', 'ONU-3'], 10, 0.1)
+    coarse = WindowedMetrics(['ONU-1', 'ONU-2', 'ONU-3'], 10, 0.1, series_windows=8)
+    for i, rate in enumerate((200, 20, 2)):
+        times = np.sort(rng.uniform(0, 10, rate * 10))
+        times = times[(times < 3) | (times > 4.5)]  # hueco de 1.5 s
+        sizes = rng.integers(64, 1501, len(times))
+        for batch in np.array_split(np.arange(len(times)), 7):
+            windows.add_arrivals(i, times[batch], sizes[batch])
+            coarse.add_arrivals(i, times[batch], sizes[batch])
+    
+    exact = windows.bytes * 8 / (0.1 * 1e6)
+    stats = windows.statistics()
+    coarse_stats = coarse.statistics()
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Serie: {windows.bytes.shape}, agrupada: {coarse.bytes.shape} ({coarse.series_durations.tolist()})")
+    for i in range(3):
+        print(f"  - ONU-{i+1}: media {stats['window_throughput_mean'][i]:.4f} Mbps, "
+              f"desviación {stats['window_throughput_std'][i]:.4f}, p95 {stats['window_throughput_p95'][i]:.4f}")
+    
+    # Verificaciones
+    assert windows.bytes.shape == (100, 3) and coarse.bytes.shape == (8, 3), "Error: Tamaño de la serie incorrecto"
+    assert abs(coarse.series_durations.sum() - 10) < 1e-9, "Error: La serie agrupada debe cubrir toda la simulación"
+    assert np.allclose(stats['window_throughput_mean'], exact.mean(axis=0)), "Error: Media de Welford incorrecta"
+    assert np.allclose(stats['window_throughput_std'], exact.std(axis=0, ddof=1)), "Error: Desviación de Welford incorrecta"
+    assert np.allclose(stats['window_throughput_min'], exact.min(axis=0)), "Error: Mínimo incorrecto"
+    assert np.allclose(stats['window_throughput_max'], exact.max(axis=0)), "Error: Máximo incorrecto"
+    assert (windows.count == 100).all(), "Error: Todas las ventanas deben contarse, también las vacías"
+    for p in (50, 95, 99):
+        expected = np.percentile(exact, p, axis=0, method='inverted_cdf')
+        assert np.all(np.abs(stats[f'window_throughput_p{p}'] - expected) <= 0.08 * expected), \
+            f"Error: Percentil {p} fuera de la resolución del histograma"
+    for key, values in coarse_stats.items():
+        assert np.allclose(values, stats[key]), "Error: Los estadísticos no dependen de la agrupación de la serie"
+    assert (coarse.packets.sum(axis=0) == windows.packets.sum(axis=0)).all(), "Error: La serie agrupada pierde paquetes"
+    
+    print("\n✓ VERIFICACIÓN: Los estadísticos en línea coinciden con los de la serie completa")
+    print("✓ TEST PASADO: Windowed statistics OK\n")
+
+
+def test_simulation_time_series():
+    """Test de la serie por ventanas en los tres modos de simulación"""
+    print("\n=== TEST: Serie temporal de la simulación ===")
+    print("ENTRADA:")
+    print("  - 4 ONUs, semilla 11, ventanas de 0.05 s")
+    print("  - Modos simpy y vectorized (5 s, 100 ventanas en 20 de serie)")
+    print("  - Modo gpon (0.5 s, 10 ventanas)")
+    
+    results = {}
+    for mode, simulation_time in (('simpy', 5), ('vectorized', 5), ('gpon', 0.5)):
+        plain = TrafficSimulator(num_onus=4, simulation_time=simulation_time, seed=11).run(mode=mode)
+        windowed = TrafficSimulator(num_onus=4, simulation_time=simulation_time, seed=11).run(
+            mode=mode, window_options=window_options({'window': 0.05, 'series_windows': 20})
+        )
+        results[mode] = (plain, windowed)
+    
+    errors = []
+    for parameters in ({'window': 0}, {'window': 'abc'}, {'window': 1, 'series_windows': 0},
+                       {'window': 1, 'series_windows': 5000}):
+        try:
+            window_options(parameters)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    print("\nDATOS DE SALIDA:")
+    for mode, (plain, windowed) in results.items():
+        series = [m for m in windowed['metrics'] if m['type'] == 'window_throughput']
+        print(f"  - {mode}: {windowed['time_series']}, {len(series)} filas de serie")
+    print(f"  - Errores de validación: {len(errors)}")
+    
+    # Verificaciones
+    for mode, (plain, windowed) in results.items():
+        assert windowed['total_packets'] == plain['total_packets'], "Error: Las ventanas no deben cambiar la simulación"
+        assert 'time_series' not in plain, "Error: Sin ventanas no hay serie"
+        assert windowed['metrics'][:len(plain['metrics'])] == plain['metrics'], "Error: Las métricas finales no cambian"
+        
+        throughput = {m['onu_id']: m['value'] for m in plain['metrics'] if m['type'] == 'throughput'}
+        series = [m for m in windowed['metrics'] if m['type'] == 'window_throughput']
+        packets = [m for m in windowed['metrics'] if m['type'] == 'window_packets']
+        durations = windowed['time_series']['series_window']
+        num_windows = windowed['time_series']['series_windows']
+        assert len(series) == len(packets) == num_windows * 4, "Error: Una fila por ventana de la serie y ONU"
+        assert len({m['timestamp'] for m in series}) == num_windows, "Error: Cada ventana tiene su timestamp"
+        assert abs(max(m['timestamp'] for m in series) - plain['simulation_time']) < 1e-9, "Error: La última ventana acaba al final"
+        assert sum(m['value'] for m in packets) == plain['total_packets'], "Error: La serie debe contar todos los paquetes"
+        for onu_id, value in throughput.items():
+            mean = sum(m['value'] for m in series if m['onu_id'] == onu_id) * durations / plain['simulation_time']
+            assert abs(mean - value) < 1e-6 * max(value, 1), "Error: La serie debe promediar el throughput final"
+    assert len(errors) == 4, "Error: Las opciones inválidas deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: La serie reparte en el tiempo las métricas finales")
+    print("✓ TEST PASADO: Simulation time series OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE MÉTRICAS POR VENTANAS")
+    print("=" * 70)
+    test_windowed_statistics()
+    test_simulation_time_series()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE MÉTRICAS POR VENTANAS PASARON CORRECTAMENTE")
+    print("=" * 70)
@@ -0,0 +1,177 @@
+"""
+Tests para la edición incremental de topologías
+"""
+import sys
+import os
+import json
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.network_elements import OpticalNetwork
+from models.topology_edits import TopologyEdit, patch_power_budgets
+
+
+def test_network_incremental_power_paths():
+    """Test de rutas actualizadas sólo aguas abajo de los elementos editados"""
+    print("\n=== TEST: Rutas incrementales tras editar la red ===")
+    print("ENTRADA:")
+    print("  - Topologías en árbol (40 ONUs, 1:8) y anillo (20 ONUs)")
+    print("  - Cambiar una fibra de bajada, una fibra troncal y el ratio de un splitter")
+    
+    tree = OpticalNetwork("Tree Network")
+    tree.create_ftth_topology(num_onus=40, split_ratio="1:8", topology_type="tree")
+    tree.calculate_all_power_budgets()
+    
+    drop = tree.set_fiber_length("FIBER-TREE-10", 4.0)
+    trunk = tree.set_fiber_length("FIBER-INTER-2", 3.5)
+    ratio = tree.set_splitter_ratio("SPLIT-INTER-3", "1:16")
+    tree_fresh = OpticalNetwork.from_dict(tree.to_dict())
+    
+    ring = OpticalNetwork("Ring Network")
+    ring.create_ftth_topology(num_onus=20, topology_type="ring")
+    ring.calculate_all_power_budgets()
+    ring_affected = ring.set_fiber_length("FIBER-RING-5", 3.0)
+    ring_fresh = OpticalNetwork.from_dict(ring.to_dict())
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Fibra de bajada FIBER-TREE-10: {drop}")
+    print(f"  - Fibra troncal FIBER-INTER-2: {len(trunk)} ONUs")
+    print(f"  - Splitter SPLIT-INTER-3: {len(ratio)} ONUs")
+    print(f"  - Anillo FIBER-RING-5: {len(ring_affected)} ONUs")
+    print(f"  - Versión de la red tras 3 ediciones: {tree.version}")
+    
+    # Verificaciones
+    assert drop == ["ONU-10"], "Error: Una fibra de bajada sólo afecta a su ONU"
+    assert sorted(trunk) == sorted(tree.downstream_onus("SPLIT-INTER-2")), "Error: Una fibra troncal afecta a su subárbol"
+    assert len(trunk) == 8 and len(ratio) == 8, "Error: Cada splitter intermedio alimenta 8 ONUs"
+    assert tree.version == 6, "Error: Cada edición debería incrementar la versión dos veces"
+    assert tree.calculate_all_power_budgets() == tree_fresh.calculate_all_power_budgets(), "Error: Las rutas incrementales no coinciden con el cálculo completo"
+    assert ring.calculate_all_power_budgets() == ring_fresh.calculate_all_power_budgets(), "Error: Las rutas del anillo no coinciden"
+    
+    print("\n✓ VERIFICACIÓN: Sólo cambian las ONUs aguas abajo y los resultados son exactos")
+    print("✓ TEST PASADO: OpticalNetwork incremental power paths OK\n")
+
+
+def test_network_concurrent_edit():
+    """Test de rutas calculadas por un lector durante una edición, que no deben guardarse"""
+    print("\n=== TEST: Lectura concurrente con una edición ===")
+    print("ENTRADA:")
+    print("  - Anillo con 20 ONUs; un hilo calcula las rutas y se detiene antes de guardarlas")
+    print("  - Mientras tanto se cambia FIBER-RING-5 a 3 km")
+    
+    ring = OpticalNetwork("Ring Network")
+    ring.create_ftth_topology(num_onus=20, topology_type="ring")
+    
+    computed = threading.Event()
+    resume = threading.Event()
+    compute = ring._compute_power_paths
+    
+    def slow_compute():
+        paths = compute()
+        if threading.current_thread() is not threading.main_thread():
+            computed.set()
+            resume.wait()
+        return paths
+    
+    ring._compute_power_paths = slow_compute
+    reader = threading.Thread(target=ring.calculate_all_power_budgets)
+    reader.start()
+    computed.wait()
+    version = ring.version
+    affected = ring.set_fiber_length("FIBER-RING-5", 3.0)
+    resume.set()
+    reader.join()
+    fresh = OpticalNetwork.from_dict(ring.to_dict())
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - ONUs afectadas: {len(affected)}")
+    print(f"  - Versión antes y después de la edición: {version} -> {ring.version}")
+    
+    # Verificaciones
+    assert ring.version == version + 2, "Error: La edición debería incrementar la versión dos veces"
+    assert ring.calculate_all_power_budgets() == fresh.calculate_all_power_budgets(), \
+        "Error: Las rutas del lector son de la red anterior y no deberían guardarse"
+    
+    print("\n✓ VERIFICACIÓN: Las rutas guardadas son las de la red editada")
+    print("✓ TEST PASADO: OpticalNetwork concurrent edit OK\n")
+
+
+def test_topology_edit_document():
+    """Test de edición del texto de olt_config y del power budget guardado"""
+    print("\n=== TEST: TopologyEdit sobre olt_config ===")
+    print("ENTRADA:")
+    print("  - Topología en estrella con 16 ONUs")
+    print("  - Añadir una ONU, quitar ONU-3 y cambiar la fibra FIBER-7")
+    print("  - Árbol con 40 ONUs (1:8): añadir una ONU o poner 1:4 en un splitter lleno")
+    
+    network = OpticalNetwork("Star Network")
+    network.create_ftth_topology(num_onus=16, split_ratio="1:32", topology_type="star")
+    previous_budgets = json.dumps(network.calculate_all_power_budgets())
+    
+    edit = TopologyEdit(json.dumps(network.to_dict()))
+    added = edit.apply({"op": "add_onu", "splitter_id": "SPLIT-1", "fiber_length": 2.5})
+    edit.apply({"op": "remove_onu", "onu_id": "ONU-3"})
+    edit.apply({"op": "set_fiber_length", "fiber_id": "FIBER-7", "length": 6.0})
+    
+    tree = OpticalNetwork("Tree Network")
+    tree.create_ftth_topology(num_onus=40, split_ratio="1:8", topology_type="tree")
+    full = TopologyEdit(json.dumps(tree.to_dict()))
+    
+    errors = []
+    for target, operation in ((edit, {"op": "remove_onu", "onu_id": "ONU-3"}),
+                              (edit, {"op": "set_splitter_ratio", "splitter_id": "SPLIT-1", "ratio": "32"}),
+                              (edit, {"op": "set_splitter_ratio", "splitter_id": "SPLIT-1", "ratio": "1:8"}),
+                              (full, {"op": "add_onu", "splitter_id": "SPLIT-INTER-1"}),
+                              (full, {"op": "set_splitter_ratio", "splitter_id": "SPLIT-INTER-1", "ratio": "1:4"})):
+        try:
+            target.apply(operation)
+        except ValueError as e:
+            errors.append(str(e))
+    full.apply({"op": "set_splitter_ratio", "splitter_id": "SPLIT-INTER-1", "ratio": "1:8"})
+    
+    affected = edit.apply_to_network(network)
+    budgets = {
+        onu_id: {
+            "onu_id": onu_id,
+            **network.calculate_power_budget_path(network.onus.get(onu_id), include_fiber_losses=False)
+        }
+        for onu_id in affected
+    }
+    patched = patch_power_budgets(previous_budgets, budgets, edit.removed_onus(), edit.added_onus())
+    new_rows, updated_rows, removed_rows = edit.row_changes()
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - ONU añadida: {added['onu_id']} (fibra {added['fiber_id']})")
+    print(f"  - ONUs afectadas: {affected}")
+    print(f"  - Filas nuevas: {[e['id'] for _, e in new_rows]}")
+    print(f"  - Filas modificadas: {[e['id'] for _, e in updated_rows]}")
+    print(f"  - Filas eliminadas: {removed_rows}")
+    print(f"  - Errores de validación: {errors}")
+    
+    # Verificaciones
+    assert added['onu_id'] == "ONU-17", "Error: El id generado debería ser ONU-17"
+    assert json.loads(edit.document.text) == network.to_dict(), "Error: olt_config editado no coincide con la red"
+    assert affected == ["ONU-17", "ONU-7"], f"Error: ONUs afectadas inesperadas: {affected}"
+    assert sorted(removed_rows) == ["FIBER-3", "ONU-3"], "Error: Deberían borrarse ONU-3 y su fibra"
+    assert [e['id'] for _, e in updated_rows] == ["SPLIT-1", "FIBER-7"], "Error: Filas modificadas inesperadas"
+    assert edit.count('ONU') == 16, "Error: Deberían quedar 16 ONUs"
+    assert len(errors) == 5, "Error: Las operaciones inválidas deberían rechazarse"
+    assert "no free ports" in errors[3], "Error: No se puede añadir una ONU a un splitter sin puertos libres"
+    assert full.operations == [{"op": "set_splitter_ratio", "splitter_id": "SPLIT-INTER-1", "ratio": "1:8"}], \
+        "Error: Un ratio con puertos para todas las salidas debería aceptarse"
+    assert json.loads(patched) == network.calculate_all_power_budgets(), "Error: El power budget actualizado no coincide"
+    
+    print("\n✓ VERIFICACIÓN: Sólo se reescriben los elementos y power budgets afectados")
+    print("✓ TEST PASADO: TopologyEdit OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE TOPOLOGY EDITS")
+    print("=" * 70)
+    test_network_incremental_power_paths()
+    test_network_concurrent_edit()
+    test_topology_edit_document()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE TOPOLOGY EDITS PASARON CORRECTAMENTE")
+    print("=" * 70)
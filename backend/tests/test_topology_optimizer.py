@@ -0,0 +1,104 @@
+"""
+Tests para el optimizador de diseños de topología
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.topology_optimizer import (
+    optimizer_request, candidate_designs, evaluate_design, select_designs, pareto_front
+)
+
+
+def test_design_evaluation():
+    """Test de candidatos y evaluación de diseños"""
+    print("\n=== TEST: Evaluación de diseños ===")
+    print("ENTRADA:")
+    print("  - 32 ONUs, tipos por defecto y ratios 1:8, 1:32")
+    
+    options = optimizer_request({'num_onus': 32, 'split_ratios': ['1:8', '1:32']})
+    designs = candidate_designs(options['topology_types'], options['split_ratios'])
+    evaluations = {design: evaluate_design(32, *design) for design in designs}
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Diseños candidatos: {designs}")
+    for design, evaluation in evaluations.items():
+        print(f"  - {design}: {evaluation['served_onus']} ONUs, {evaluation['total_fiber_length']} km, "
+              f"peor margen {evaluation['min_available_power']:.2f} dB, "
+              f"{evaluation['overloaded_splitters']} splitters sobrecargados")
+    
+    # Verificaciones
+    assert designs == [('star', '1:8'), ('star', '1:32'), ('tree', '1:8'), ('tree', '1:32'),
+                       ('bus', '1:2'), ('ring', '1:2')], "Error: Bus y anillo deberían evaluarse una sola vez"
+    assert evaluations[('star', '1:8')]['overloaded_splitters'] == 1, "Error: Una estrella 1:8 no admite 32 ONUs"
+    assert evaluations[('star', '1:32')]['overloaded_splitters'] == 0, "Error: Una estrella 1:32 admite 32 ONUs"
+    assert evaluations[('tree', '1:8')]['served_onus'] == 32, "Error: Un árbol 1:8 conecta hasta 64 ONUs"
+    assert evaluations[('tree', '1:8')]['num_splitters'] == 5, "Error: Raíz y 4 splitters intermedios"
+    assert evaluations[('bus', '1:2')]['min_available_power'] < 0, "Error: Un bus de 32 ONUs no tiene margen"
+    assert abs(evaluations[('star', '1:32')]['total_fiber_length'] - (2.0 + sum(3.0 + i * 0.1 for i in range(32)))) < 1e-6, \
+        "Error: Longitud de fibra incorrecta"
+    
+    print("\n✓ VERIFICACIÓN: Cada diseño se evalúa una vez con sus puertos, fibra y margen")
+    print("✓ TEST PASADO: Design evaluation OK\n")
+
+
+def test_pareto_selection():
+    """Test de restricciones y frontera de Pareto"""
+    print("\n=== TEST: Frontera de Pareto ===")
+    print("ENTRADA:")
+    print("  - 32 ONUs, todos los tipos y ratios")
+    print("  - Pesos: 100 por km de fibra, 50 por splitter")
+    
+    options = optimizer_request({'num_onus': 32, 'weights': {'fiber_km': 100, 'splitter': 50}})
+    designs = candidate_designs(options['topology_types'], options['split_ratios'])
+    evaluations = [evaluate_design(32, *design) for design in designs]
+    selection = select_designs(evaluations, options)
+    
+    strict = optimizer_request({'num_onus': 32, 'constraints': {'min_available_power': 7}})
+    strict_selection = select_designs(evaluations, strict)
+    
+    errors = []
+    for data in ({'num_onus': 0}, {'num_onus': 8, 'split_ratios': ['32']},
+                 {'num_onus': 8, 'weights': {'fiber_km': -1}}, {'num_onus': 8, 'constraints': {'foo': 1}},
+                 {'num_onus': 8, 'topology_types': 5}, {'num_onus': 8, 'topology_types': 'star'},
+                 {'num_onus': 8, 'split_ratios': '1:8'}, [8]):
+        try:
+            optimizer_request(data)
+        except ValueError as e:
+            errors.append(str(e))
+    
+    pareto = [(d['topology_type'], d['split_ratio']) for d in selection['pareto']]
+    print("\nDATOS DE SALIDA:")
+    for design in selection['pareto']:
+        print(f"  - Pareto: {design['topology_type']} {design['split_ratio']}: coste {design['cost']}, "
+              f"peor margen {design['min_available_power']:.2f} dB, equivalentes {design['equivalent_designs']}")
+    print(f"  - Diseños válidos: {sum(d['feasible'] for d in selection['candidates'])} de {len(designs)}")
+    print(f"  - Con margen mínimo de 7 dB: {[(d['topology_type'], d['split_ratio']) for d in strict_selection['pareto']]}")
+    print(f"  - Errores de validación: {len(errors)}")
+    
+    # Verificaciones
+    assert pareto_front([[1, 5], [2, 4], [2, 6], [3, 3], [1, 5]]) == [0, 1, 3, 4], "Error: Frontera de Pareto incorrecta"
+    assert pareto_front([]) == [], "Error: Sin puntos no hay frontera"
+    assert pareto == [('tree', '1:8'), ('star', '1:32')], f"Error: Frontera inesperada: {pareto}"
+    assert selection['pareto'][1]['equivalent_designs'] == [['tree', '1:32']], "Error: El árbol 1:32 es una estrella"
+    assert selection['pareto'][0]['cost'] == 100 * selection['pareto'][0]['total_fiber_length'] + 50 * 5, "Error: Coste incorrecto"
+    for design in selection['candidates']:
+        assert design['feasible'] == (not design['violations']), "Error: Un diseño válido no incumple restricciones"
+        assert not design['pareto'] or design['feasible'], "Error: La frontera sólo incluye diseños válidos"
+    assert [(d['topology_type'], d['split_ratio']) for d in strict_selection['pareto']] == [('star', '1:32')], \
+        "Error: Con 7 dB sólo la estrella cumple"
+    assert len(errors) == 8, "Error: Las peticiones inválidas deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: Sólo los diseños válidos no dominados forman la frontera")
+    print("✓ TEST PASADO: Pareto selection OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DEL OPTIMIZADOR DE TOPOLOGÍAS")
+    print("=" * 70)
+    test_design_evaluation()
+    test_pareto_selection()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DEL OPTIMIZADOR DE TOPOLOGÍAS PASARON CORRECTAMENTE")
+    print("=" * 70)
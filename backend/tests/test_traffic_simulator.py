@@ -0,0 +1,222 @@
+"""
+Tests para la clase TrafficSimulator
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulators.traffic_simulator import TrafficSimulator
+from simulators.gpon_upstream import upstream_options
+
+
+def _profiles(pattern, num_onus=4):
+    """Perfiles de tráfico fijos para comparar ambos modos"""
+    return [
+        {'onu_id': f'ONU-{i+1}', 'rate': 2.0 + i, 'pattern': pattern}
+        for i in range(num_onus)
+    ]
+
+
+def test_simulator_result_keys():
+    """Test de que ambos modos devuelven el mismo formato de resultado"""
+    print("\n=== TEST: Formato de resultados en modo simpy y vectorized ===")
+    print("ENTRADA:")
+    print("  - num_onus=4, simulation_time=1")
+    
+    keys = {}
+    for mode in ('simpy', 'vectorized'):
+        results = TrafficSimulator(num_onus=4, simulation_time=1).run(mode=mode)
+        keys[mode] = set(results.keys())
+        print(f"\nDATOS DE SALIDA ({mode}):")
+        print(f"  - Claves: {sorted(keys[mode])}")
+        print(f"  - Métricas: {len(results['metrics'])}")
+        
+        assert len(results['metrics']) == 8, f"Error: Deberían haber 8 métricas, hay {len(results['metrics'])}"
+    
+    # Verificaciones
+    assert keys['simpy'] == keys['vectorized'], "Error: Los modos devuelven claves distintas"
+    for key in ('total_throughput', 'total_packets', 'metrics'):
+        assert key in keys['vectorized'], f"Error: '{key}' no está en el resultado"
+    
+    print("\n✓ VERIFICACIÓN: Ambos modos devuelven el mismo formato")
+    print("✓ TEST PASADO: TrafficSimulator result keys OK\n")
+
+
+def test_simulator_vectorized_constant():
+    """Test de equivalencia exacta para tráfico constante"""
+    print("\n=== TEST: Modo vectorizado con tráfico constante ===")
+    print("ENTRADA:")
+    print("  - 4 ONUs con patrón 'constant' (2-5 Mbps), simulation_time=5")
+    
+    simpy_results = TrafficSimulator(num_onus=4, simulation_time=5).run(_profiles('constant'))
+    vector_results = TrafficSimulator(num_onus=4, simulation_time=5).run(_profiles('constant'), mode='vectorized')
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Paquetes SimPy: {simpy_results['total_packets']}")
+    print(f"  - Paquetes vectorizado: {vector_results['total_packets']}")
+    
+    # Verificaciones
+    diff = abs(simpy_results['total_packets'] - vector_results['total_packets'])
+    assert diff <= 4, f"Error: Diferencia de paquetes demasiado grande ({diff})"
+    
+    print("\n✓ VERIFICACIÓN: El tráfico constante coincide con SimPy")
+    print("✓ TEST PASADO: TrafficSimulator vectorized constant OK\n")
+
+
+def test_simulator_vectorized_statistical_equivalence():
+    """Test de equivalencia estadística para tráfico poisson y bursty"""
+    print("\n=== TEST: Equivalencia estadística SimPy vs vectorizado ===")
+    print("ENTRADA:")
+    print("  - 4 ONUs con patrones 'poisson' y 'bursty', simulation_time=5")
+    
+    for pattern in ('poisson', 'bursty'):
+        simpy_results = TrafficSimulator(num_onus=4, simulation_time=5).run(_profiles(pattern))
+        vector_results = TrafficSimulator(num_onus=4, simulation_time=5).run(_profiles(pattern), mode='vectorized')
+        
+        ratio = vector_results['total_throughput'] / simpy_results['total_throughput']
+        print(f"\nDATOS DE SALIDA ({pattern}):")
+        print(f"  - Throughput SimPy: {simpy_results['total_throughput']:.3f} Mbps")
+        print(f"  - Throughput vectorizado: {vector_results['total_throughput']:.3f} Mbps")
+        print(f"  - Ratio: {ratio:.3f}")
+        
+        # Verificaciones
+        assert 0.9 < ratio < 1.1, f"Error: Throughput fuera de tolerancia para '{pattern}' (ratio {ratio:.3f})"
+    
+    print("\n✓ VERIFICACIÓN: Ambos modos son estadísticamente equivalentes")
+    print("✓ TEST PASADO: TrafficSimulator statistical equivalence OK\n")
+
+
+def test_simulator_invalid_mode():
+    """Test de modo de simulación no soportado"""
+    print("\n=== TEST: Modo de simulación inválido ===")
+    print("ENTRADA: mode='invalid' y simulation_time 'x', 0, -1, NaN, infinito y 10**6")
+    
+    try:
+        TrafficSimulator(num_onus=2, simulation_time=1).run(mode='invalid')
+        raised = False
+    except ValueError as e:
+        raised = True
+        print(f"\nDATOS DE SALIDA:\n  - ValueError: {e}")
+    
+    errors = []
+    for simulation_time in ('x', 0, -1, float('nan'), float('inf'), 10**6, True):
+        try:
+            TrafficSimulator(num_onus=2, simulation_time=simulation_time, seed=1).run(mode='vectorized')
+        except ValueError as e:
+            errors.append(str(e))
+    print(f"  - Tiempos de simulación rechazados: {len(errors)}")
+    
+    # Verificaciones
+    assert raised, "Error: Debería lanzar ValueError para un modo inválido"
+    assert len(errors) == 7, "Error: Los tiempos de simulación inválidos deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: Modo y tiempo de simulación inválidos rechazados")
+    print("✓ TEST PASADO: TrafficSimulator invalid mode OK\n")
+
+
+def test_simulator_gpon_light_load():
+    """Test del modo GPON con carga baja: sin pérdidas y retardo de ~1 ciclo"""
+    print("\n=== TEST: Modo GPON con carga baja ===")
+    print("ENTRADA:")
+    print("  - 8 ONUs 'poisson' a 10 Mbps, simulation_time=0.5, capacidad 1244.16 Mbps")
+    
+    profiles = [{'onu_id': f'ONU-{i+1}', 'rate': 10.0, 'pattern': 'poisson'} for i in range(8)]
+    results = TrafficSimulator(num_onus=8, simulation_time=0.5).run(profiles, mode='gpon')
+    p99 = [m['value'] for m in results['metrics'] if m['type'] == 'delay_p99']
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Ciclos: {results['cycles']}")
+    print(f"  - Carga ofrecida: {results['total_offered_load']:.2f} Mbps")
+    print(f"  - Throughput: {results['total_throughput']:.2f} Mbps")
+    print(f"  - Bytes descartados: {results['total_dropped_bytes']}")
+    print(f"  - Retardo p99 máximo: {max(p99) * 1e6:.1f} µs")
+    
+    # Verificaciones
+    assert results['cycles'] == 4000, f"Error: Deberían simularse 4000 ciclos, hay {results['cycles']}"
+    assert results['total_dropped_bytes'] == 0, "Error: No debería haber descartes con carga baja"
+    assert abs(results['total_throughput'] - results['total_offered_load']) < 1, "Error: El throughput debería igualar la carga ofrecida"
+    assert max(p99) < 5 * results['cycle_time'], f"Error: Retardo p99 demasiado alto ({max(p99)} s)"
+    
+    print("\n✓ VERIFICACIÓN: Las colas se vacían en cada ciclo")
+    print("✓ TEST PASADO: TrafficSimulator gpon light load OK\n")
+
+
+def test_simulator_gpon_overload():
+    """Test del modo GPON con sobrecarga: capacidad saturada y descartes"""
+    print("\n=== TEST: Modo GPON con sobrecarga ===")
+    print("ENTRADA:")
+    print("  - 16 ONUs 'constant' a 100 Mbps (1600 Mbps ofrecidos), simulation_time=0.5")
+    print("  - Asignador 'fair', buffer de 100000 bytes")
+    
+    profiles = [{'onu_id': f'ONU-{i+1}', 'rate': 100.0, 'pattern': 'constant'} for i in range(16)]
+    options = upstream_options({'upstream': {'allocator': 'fair', 'buffer_size': 100000, 'other': 1}})
+    results = TrafficSimulator(num_onus=16, simulation_time=0.5).run(
+        profiles, mode='gpon', upstream_options=options
+    )
+    
+    errors = []
+    for upstream in ({'cycle_time': 0}, {'capacity': -1}, {'buffer_size': 'x'}, {'allocator': 'rr'}, 5):
+        try:
+            upstream_options({'upstream': upstream})
+        except ValueError as e:
+            errors.append(str(e))
+    
+    print("\nDATOS DE SALIDA:")
+    print(f"  - Throughput: {results['total_throughput']:.2f} Mbps")
+    print(f"  - Ratio de descarte: {results['drop_ratio']:.3f}")
+    print(f"  - Opciones inválidas rechazadas: {len(errors)}")
+    
+    # Verificaciones
+    assert results['total_throughput'] > 0.99 * results['upstream_capacity'], "Error: La capacidad debería estar saturada"
+    assert results['total_throughput'] <= results['upstream_capacity'] + 1e-6, "Error: Se superó la capacidad del canal"
+    assert results['drop_ratio'] > 0.1, f"Error: Debería haber descartes, ratio {results['drop_ratio']}"
+    assert options == {'allocator': 'fair', 'buffer_size': 100000}, "Error: Sólo deben pasarse las opciones conocidas"
+    assert len(errors) == 5, "Error: Las opciones del canal ascendente inválidas deberían rechazarse"
+    
+    print("\n✓ VERIFICACIÓN: El canal se satura y se descartan paquetes")
+    print("✓ TEST PASADO: TrafficSimulator gpon overload OK\n")
+
+
+def test_simulator_seed_reproducible():
+    """Test de resultados idénticos con la misma semilla"""
+    print("\n=== TEST: Reproducibilidad con semilla ===")
+    print("ENTRADA:")
+    print("  - num_onus=6, simulation_time=1, seed=1234 (perfiles por defecto)")
+    
+    for mode in ('simpy', 'vectorized', 'gpon'):
+        first = TrafficSimulator(num_onus=6, simulation_time=1, seed=1234).run(mode=mode)
+        second = TrafficSimulator(num_onus=6, simulation_time=1, seed=1234).run(mode=mode)
+        other = TrafficSimulator(num_onus=6, simulation_time=1, seed=4321).run(mode=mode)
+        
+        print(f"\nDATOS DE SALIDA ({mode}):")
+        print(f"  - Paquetes seed=1234: {first['total_packets']}, {second['total_packets']}")
+        print(f"  - Paquetes seed=4321: {other['total_packets']}")
+        
+        # Verificaciones
+        assert first == second, f"Error: La misma semilla debería dar el mismo resultado en modo '{mode}'"
+        assert first['seed'] == 1234, "Error: El resultado debería incluir la semilla"
+        assert first['metrics'] != other['metrics'], f"Error: Otra semilla debería dar otro resultado en modo '{mode}'"
+    
+    unseeded = TrafficSimulator(num_onus=6, simulation_time=1).run(mode='vectorized')
+    replay = TrafficSimulator(num_onus=6, simulation_time=1, seed=unseeded['seed']).run(mode='vectorized')
+    assert 0 <= unseeded['seed'] <= 2**53 - 1, "Error: La semilla generada debe caber en un número de JavaScript"
+    assert replay == unseeded, "Error: La semilla devuelta debería repetir una simulación sin semilla"
+    
+    print("\n✓ VERIFICACIÓN: Misma semilla, mismos resultados")
+    print("✓ TEST PASADO: TrafficSimulator seed reproducible OK\n")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("EJECUTANDO TESTS DE TRAFFIC SIMULATOR")
+    print("=" * 70)
+    test_simulator_result_keys()
+    test_simulator_vectorized_constant()
+    test_simulator_vectorized_statistical_equivalence()
+    test_simulator_invalid_mode()
+    test_simulator_gpon_light_load()
+    test_simulator_gpon_overload()
+    test_simulator_seed_reproducible()
+    print("=" * 70)
+    print("✓ TODOS LOS TESTS DE TRAFFIC SIMULATOR PASARON CORRECTAMENTE")
+    print("=" * 70)
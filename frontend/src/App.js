@@ -6,7 +6,7 @@ import SimulationPanel from './components/SimulationPanel';
 import ResultsPanel from './components/ResultsPanel';
 import CalculationFormulas from './components/CalculationFormulas';
 import TopologyPerformanceAnalysis from './components/TopologyPerformanceAnalysis';
-import api from './services/api';
+import api, { streamNDJSON } from './services/api';
 import './App.css';
 
 function TabPanel({ children, value, index }) {
@@ -43,40 +43,55 @@ function App() {
   const handleTopologyCreated = async (topologyData) => {
     await loadTopologies();
     if (topologyData.id) {
-      const response = await api.get(`/topologies/${topologyData.id}`);
-      if (response.data.success) {
-        setSelectedTopology(response.data.data);
-        setNetworkData(response.data.data.network);
-        // Cargar power budget
-        try {
-          const pbResponse = await api.get(`/topologies/${topologyData.id}/power-budget`);
-          if (pbResponse.data.success) {
-            setPowerBudgetData(pbResponse.data.data);
-          }
-        } catch (pbError) {
-          console.error('Error loading power budget:', pbError);
+      setTabValue(1); // Cambiar a pestaña de diagrama
+      try {
+        await loadTopology(topologyData.id);
+      } catch (error) {
+        console.error('Error loading topology:', error);
+      }
+    }
+  };
+
+  // Cargar la topología en NDJSON: el diagrama se redibuja con cada trozo
+  // recibido y la topología se selecciona al terminar la descarga
+  const loadTopology = async (topologyId) => {
+    const network = { name: '', topology_type: 'star', olt: null, olts: [], splitters: [], onus: [], fibers: [] };
+    const elementLists = { SPLITTER: network.splitters, ONU: network.onus, FIBER: network.fibers };
+    let topology = null;
+
+    setSelectedTopology(null);
+    await streamNDJSON(`/topologies/${topologyId}?format=ndjson`, (records) => {
+      records.forEach((record) => {
+        if (record.type === 'TOPOLOGY') {
+          topology = { id: record.id, name: record.name, network };
+          network.name = record.name;
+          network.topology_type = record.topology_type;
+        } else if (record.type === 'OLT') {
+          // Una red multi-PON envía un OLT por puerto; el diagrama dibuja un árbol por OLT
+          network.olts.push(record);
+          network.olt = network.olts[0];
+        } else if (elementLists[record.type]) {
+          elementLists[record.type].push(record);
         }
-        setTabValue(1); // Cambiar a pestaña de diagrama
+      });
+      setNetworkData({ ...network });
+    });
+    setSelectedTopology(topology);
+
+    // Cargar power budget
+    try {
+      const pbResponse = await api.get(`/topologies/${topologyId}/power-budget`);
+      if (pbResponse.data.success) {
+        setPowerBudgetData(pbResponse.data.data);
       }
+    } catch (pbError) {
+      console.error('Error loading power budget:', pbError);
     }
   };
 
   const handleTopologySelected = async (topologyId) => {
     try {
-      const response = await api.get(`/topologies/${topologyId}`);
-      if (response.data.success) {
-        setSelectedTopology(response.data.data);
-        setNetworkData(response.data.data.network);
-        // Cargar power budget
-        try {
-          const pbResponse = await api.get(`/topologies/${topologyId}/power-budget`);
-          if (pbResponse.data.success) {
-            setPowerBudgetData(pbResponse.data.data);
-          }
-        } catch (pbError) {
-          console.error('Error loading power budget:', pbError);
-        }
-      }
+      await loadTopology(topologyId);
     } catch (error) {
       console.error('Error loading topology:', error);
     }
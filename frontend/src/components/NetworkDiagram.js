@@ -11,6 +11,50 @@ import 'reactflow/dist/style.css';
 import { Box, Typography, Card } from '@mui/material';
 import api from '../services/api';
 
+// Separación horizontal entre los árboles de dos puertos PON
+const PON_SPACING = 400;
+
+// Separar una red multi-PON en un árbol por OLT recorriendo las fibras desde
+// cada OLT; una red con un solo OLT se devuelve tal cual
+function splitPons(networkData) {
+  const olts = networkData.olts || [];
+  if (olts.length <= 1) return [networkData];
+
+  const fibersByElement = {};
+  (networkData.fibers || []).forEach((fiber) => {
+    [fiber.from_element, fiber.to_element].forEach((elementId) => {
+      if (!elementId) return;
+      if (!fibersByElement[elementId]) fibersByElement[elementId] = [];
+      fibersByElement[elementId].push(fiber);
+    });
+  });
+
+  return olts.map((olt) => {
+    const reached = new Set([olt.id]);
+    const fibers = new Set();
+    const pending = [olt.id];
+    while (pending.length > 0) {
+      const current = pending.pop();
+      (fibersByElement[current] || []).forEach((fiber) => {
+        fibers.add(fiber);
+        [fiber.from_element, fiber.to_element].forEach((elementId) => {
+          if (elementId && !reached.has(elementId)) {
+            reached.add(elementId);
+            pending.push(elementId);
+          }
+        });
+      });
+    }
+    return {
+      ...networkData,
+      olt,
+      splitters: (networkData.splitters || []).filter((splitter) => reached.has(splitter.id)),
+      onus: (networkData.onus || []).filter((onu) => reached.has(onu.id)),
+      fibers: [...fibers],
+    };
+  });
+}
+
 function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
   const [nodes, setNodes, onNodesChange] = useNodesState([]);
   const [edges, setEdges, onEdgesChange] = useEdgesState([]);
@@ -78,40 +122,60 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     );
   };
 
-  const buildDiagram = () => {
-    if (!networkData) return;
-
-    const topologyType = networkData.topology_type || 'star';
-    
-    switch (topologyType) {
-      case 'star':
-        buildStarTopology();
-        break;
+  const buildTopology = (net) => {
+    switch (net.topology_type || 'star') {
       case 'bus':
-        buildBusTopology();
-        break;
+        return buildBusTopology(net);
       case 'ring':
-        buildRingTopology();
-        break;
+        return buildRingTopology(net);
       case 'tree':
-        buildTreeTopology();
-        break;
+        return buildTreeTopology(net);
       default:
-        buildStarTopology();
+        return buildStarTopology(net);
     }
   };
 
-  const createOLTNode = (x, y) => {
-    if (!networkData.olt) return null;
+  // Con varios puertos PON se dibuja un árbol por OLT, uno junto a otro
+  const buildDiagram = () => {
+    if (!networkData) return;
+
+    const pons = splitPons(networkData);
+    if (pons.length === 1) {
+      const diagram = buildTopology(pons[0]);
+      setNodes(diagram.nodes);
+      setEdges(diagram.edges);
+      return;
+    }
+
+    const newNodes = [];
+    const newEdges = [];
+    let offsetX = 0;
+    pons.forEach((pon) => {
+      const diagram = buildTopology(pon);
+      if (diagram.nodes.length === 0) return;
+      const xs = diagram.nodes.map((node) => node.position.x);
+      const minX = Math.min(...xs);
+      diagram.nodes.forEach((node) => {
+        newNodes.push({ ...node, position: { x: node.position.x - minX + offsetX, y: node.position.y } });
+      });
+      newEdges.push(...diagram.edges);
+      offsetX += Math.max(...xs) - minX + PON_SPACING;
+    });
+    setNodes(newNodes);
+    setEdges(newEdges);
+  };
+
+  const createOLTNode = (net, x, y) => {
+    if (!net.olt) return null;
     return {
-      id: networkData.olt.id,
+      id: net.olt.id,
       type: 'input',
       position: { x, y },
       data: {
         label: (
           <div>
-            <strong>{networkData.olt.name}</strong>
-            <div style={{ fontSize: '10px' }}>TX: {networkData.olt.tx_power} dBm</div>
+            <strong>{net.olt.name}</strong>
+            <div style={{ fontSize: '10px' }}>TX: {net.olt.tx_power} dBm</div>
           </div>
         ),
       },
@@ -177,7 +241,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     };
   };
 
-  const buildStarTopology = () => {
+  const buildStarTopology = (net) => {
     const newNodes = [];
     const newEdges = [];
     const centerX = 500;
@@ -185,20 +249,20 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     const radius = 300;
 
     // OLT en la parte superior
-    const oltNode = createOLTNode(centerX - 75, 100);
+    const oltNode = createOLTNode(net, centerX - 75, 100);
     if (oltNode) newNodes.push(oltNode);
 
     // Splitter central
-    const mainSplitter = networkData.splitters?.[0];
+    const mainSplitter = net.splitters?.[0];
     if (mainSplitter) {
       const splitterNode = createSplitterNode(mainSplitter, centerX - 70, centerY - 50);
       newNodes.push(splitterNode);
 
       // Conectar OLT a Splitter
-      if (networkData.olt) {
+      if (net.olt) {
         newEdges.push({
-          id: `e-${networkData.olt.id}-${mainSplitter.id}`,
-          source: networkData.olt.id,
+          id: `e-${net.olt.id}-${mainSplitter.id}`,
+          source: net.olt.id,
           target: mainSplitter.id,
           animated: true,
           style: { stroke: '#FF9800', strokeWidth: 3 },
@@ -206,7 +270,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       }
 
       // ONUs distribuidas en círculo alrededor del splitter
-      const onus = networkData.onus || [];
+      const onus = net.onus || [];
       onus.forEach((onu, idx) => {
         const angle = (idx / onus.length) * 2 * Math.PI;
         const onuX = centerX + radius * Math.cos(angle) - 60;
@@ -225,11 +289,10 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       });
     }
 
-    setNodes(newNodes);
-    setEdges(newEdges);
+    return { nodes: newNodes, edges: newEdges };
   };
 
-  const buildBusTopology = () => {
+  const buildBusTopology = (net) => {
     const newNodes = [];
     const newEdges = [];
     const startX = 100;
@@ -237,12 +300,12 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     const spacing = 250;
 
     // OLT a la izquierda
-    const oltNode = createOLTNode(startX, busY - 50);
+    const oltNode = createOLTNode(net, startX, busY - 50);
     if (oltNode) newNodes.push(oltNode);
 
     // Construir mapa de conexiones desde fibers
     const fiberMap = {};
-    networkData.fibers?.forEach(fiber => {
+    net.fibers?.forEach(fiber => {
       if (fiber.from_element && fiber.to_element) {
         if (!fiberMap[fiber.from_element]) fiberMap[fiber.from_element] = [];
         fiberMap[fiber.from_element].push(fiber.to_element);
@@ -250,9 +313,9 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     });
 
     // Ordenar splitters según su conexión secuencial
-    const splitters = networkData.splitters || [];
+    const splitters = net.splitters || [];
     const orderedSplitters = [];
-    let currentElement = networkData.olt?.id;
+    let currentElement = net.olt?.id;
     
     // Construir orden de splitters basado en conexiones
     while (currentElement && orderedSplitters.length < splitters.length) {
@@ -284,10 +347,10 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       newNodes.push(splitterNode);
 
       // Conectar al elemento anterior
-      if (idx === 0 && networkData.olt) {
+      if (idx === 0 && net.olt) {
         newEdges.push({
-          id: `e-${networkData.olt.id}-${splitter.id}`,
-          source: networkData.olt.id,
+          id: `e-${net.olt.id}-${splitter.id}`,
+          source: net.olt.id,
           target: splitter.id,
           animated: true,
           style: { stroke: '#FF9800', strokeWidth: 3 },
@@ -304,7 +367,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       }
 
       // Buscar ONUs conectadas a este splitter usando fibers
-      const onusForSplitter = networkData.onus?.filter(onu => 
+      const onusForSplitter = net.onus?.filter(onu => 
         fiberMap[splitter.id]?.includes(onu.id)
       ) || [];
 
@@ -325,31 +388,30 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       });
     });
 
-    setNodes(newNodes);
-    setEdges(newEdges);
+    return { nodes: newNodes, edges: newEdges };
   };
 
-  const buildRingTopology = () => {
+  const buildRingTopology = (net) => {
     const newNodes = [];
     const newEdges = [];
     const centerX = 600;
     const centerY = 400;
-    const ringRadius = Math.min(400, 50 + (networkData.onus?.length || 0) * 8);
+    const ringRadius = Math.min(400, 50 + (net.onus?.length || 0) * 8);
 
     // OLT en el centro
-    const oltNode = createOLTNode(centerX - 75, centerY - 50);
+    const oltNode = createOLTNode(net, centerX - 75, centerY - 50);
     if (oltNode) newNodes.push(oltNode);
 
     // Splitter principal conectado al OLT
-    const mainSplitter = networkData.splitters?.find(s => s.id.includes('RING-0') || s.id.includes('ROOT')) || networkData.splitters?.[0];
+    const mainSplitter = net.splitters?.find(s => s.id.includes('RING-0') || s.id.includes('ROOT')) || net.splitters?.[0];
     if (mainSplitter) {
       const splitterNode = createSplitterNode(mainSplitter, centerX - 70, centerY - 150);
       newNodes.push(splitterNode);
 
-      if (networkData.olt) {
+      if (net.olt) {
         newEdges.push({
-          id: `e-${networkData.olt.id}-${mainSplitter.id}`,
-          source: networkData.olt.id,
+          id: `e-${net.olt.id}-${mainSplitter.id}`,
+          source: net.olt.id,
           target: mainSplitter.id,
           animated: true,
           style: { stroke: '#FF9800', strokeWidth: 3 },
@@ -359,7 +421,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
 
     // Construir mapa de conexiones
     const fiberMap = {};
-    networkData.fibers?.forEach(fiber => {
+    net.fibers?.forEach(fiber => {
       if (fiber.from_element && fiber.to_element) {
         if (!fiberMap[fiber.from_element]) fiberMap[fiber.from_element] = [];
         fiberMap[fiber.from_element].push({
@@ -370,8 +432,8 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     });
 
     // ONUs y splitters en círculo
-    const onus = networkData.onus || [];
-    const ringSplitters = networkData.splitters?.filter(s => 
+    const onus = net.onus || [];
+    const ringSplitters = net.splitters?.filter(s => 
       s.id.includes('RING') && s.id !== mainSplitter?.id
     ) || [];
 
@@ -438,7 +500,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       });
 
       // Buscar ONU conectada a este splitter
-      const connectedOnu = networkData.onus?.find(onu => 
+      const connectedOnu = net.onus?.find(onu => 
         fiberMap[splitter.id]?.some(conn => conn.to === onu.id)
       );
 
@@ -484,11 +546,10 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       }
     });
 
-    setNodes(newNodes);
-    setEdges(newEdges);
+    return { nodes: newNodes, edges: newEdges };
   };
 
-  const buildTreeTopology = () => {
+  const buildTreeTopology = (net) => {
     const newNodes = [];
     const newEdges = [];
     const startX = 400;
@@ -497,21 +558,21 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
     const levelWidth = 300;
 
     // OLT en la parte superior
-    const oltNode = createOLTNode(startX - 75, startY);
+    const oltNode = createOLTNode(net, startX - 75, startY);
     if (oltNode) newNodes.push(oltNode);
 
     // Splitter raíz
-    const rootSplitter = networkData.splitters?.find(s => s.id.includes('ROOT')) || networkData.splitters?.[0];
+    const rootSplitter = net.splitters?.find(s => s.id.includes('ROOT')) || net.splitters?.[0];
     if (rootSplitter) {
       const rootX = startX - 70;
       const rootY = startY + 150;
       const rootSplitterNode = createSplitterNode(rootSplitter, rootX, rootY);
       newNodes.push(rootSplitterNode);
 
-      if (networkData.olt) {
+      if (net.olt) {
         newEdges.push({
-          id: `e-${networkData.olt.id}-${rootSplitter.id}`,
-          source: networkData.olt.id,
+          id: `e-${net.olt.id}-${rootSplitter.id}`,
+          source: net.olt.id,
           target: rootSplitter.id,
           animated: true,
           style: { stroke: '#FF9800', strokeWidth: 3 },
@@ -519,7 +580,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       }
 
       // Splitters intermedios
-      const intermediateSplitters = networkData.splitters?.filter(s => 
+      const intermediateSplitters = net.splitters?.filter(s => 
         s.id.includes('INTER') && s.id !== rootSplitter.id
       ) || [];
       
@@ -539,7 +600,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
         });
 
         // ONUs conectadas a splitters intermedios
-        const onus = networkData.onus || [];
+        const onus = net.onus || [];
         const onusPerSplitter = Math.ceil(onus.length / intermediateSplitters.length);
         const startOnuIdx = idx * onusPerSplitter;
         
@@ -562,7 +623,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
 
       // Si no hay splitters intermedios, conectar ONUs directamente a la raíz
       if (intermediateSplitters.length === 0) {
-        const onus = networkData.onus || [];
+        const onus = net.onus || [];
         onus.forEach((onu, idx) => {
           const onuX = startX - 200 + (idx % 5) * 150;
           const onuY = startY + 350 + Math.floor(idx / 5) * 120;
@@ -581,8 +642,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
       }
     }
 
-    setNodes(newNodes);
-    setEdges(newEdges);
+    return { nodes: newNodes, edges: newEdges };
   };
 
   const onConnect = useCallback(
@@ -607,6 +667,7 @@ function NetworkDiagram({ networkData, topology, onPowerBudgetLoad }) {
         <Typography variant="body2" color="textSecondary">
           {topology?.name || 'Red GPON'} - {networkData.onus?.length || 0} ONUs
           {networkData.topology_type && ` - Tipo: ${networkData.topology_type.toUpperCase()}`}
+          {networkData.olts?.length > 1 && ` - ${networkData.olts.length} puertos PON`}
         </Typography>
       </Card>
       <div style={{ width: '100%', height: '100%', border: '1px solid #ddd', borderRadius: '4px' }}>
@@ -74,6 +74,18 @@ function ResultsPanel({ results }) {
     .filter((d) => !isNaN(d.packets) && d.packets >= 0)
     .sort((a, b) => a.name.localeCompare(b.name)); // Ordenar por nombre
 
+  // Serie por ventanas (parámetro 'window'): throughput total al final de cada ventana
+  const timeSeriesTotals = {};
+  metrics.forEach((m) => {
+    const metricType = m.metric_type || m.type;
+    if (metricType !== 'window_throughput') return;
+    const value = m.metric_value !== undefined ? m.metric_value : m.value;
+    timeSeriesTotals[m.timestamp] = (timeSeriesTotals[m.timestamp] || 0) + (parseFloat(value) || 0);
+  });
+  const timeSeriesData = Object.entries(timeSeriesTotals)
+    .map(([timestamp, throughput]) => ({ time: parseFloat(timestamp), throughput }))
+    .sort((a, b) => a.time - b.time);
+
   return (
     <Box>
       <Grid container spacing={3}>
@@ -192,6 +204,36 @@ function ResultsPanel({ results }) {
           </Card>
         </Grid>
 
+        {timeSeriesData.length > 0 && (
+          <Grid item xs={12}>
+            <Card>
+              <CardContent>
+                <Typography variant="h6" gutterBottom>
+                  Throughput Total por Ventana
+                </Typography>
+                <ResponsiveContainer width="100%" height={300}>
+                  <LineChart data={timeSeriesData}>
+                    <CartesianGrid strokeDasharray="3 3" />
+                    <XAxis
+                      dataKey="time"
+                      type="number"
+                      domain={[0, 'dataMax']}
+                      label={{ value: 's', position: 'insideBottomRight', offset: -5 }}
+                    />
+                    <YAxis label={{ value: 'Mbps', angle: -90, position: 'insideLeft' }} />
+                    <Tooltip
+                      formatter={(value) => `${value.toFixed(2)} Mbps`}
+                      labelFormatter={(label) => `Hasta ${label.toFixed(2)} s`}
+                    />
+                    <Legend />
+                    <Line type="stepBefore" dataKey="throughput" stroke="#FF9800" dot={false} name="Throughput (Mbps)" />
+                  </LineChart>
+                </ResponsiveContainer>
+              </CardContent>
+            </Card>
+          </Grid>
+        )}
+
         <Grid item xs={12}>
           <Card>
             <CardContent>
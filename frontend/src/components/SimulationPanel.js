@@ -9,8 +9,57 @@ import {
   Grid,
   Alert,
   CircularProgress,
+  LinearProgress,
 } from '@mui/material';
-import api from '../services/api';
+import {
+  LineChart,
+  Line,
+  XAxis,
+  YAxis,
+  CartesianGrid,
+  Tooltip,
+  ResponsiveContainer,
+} from 'recharts';
+import api, { simulationEventsURL } from '../services/api';
+
+const POLL_INTERVAL_MS = 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Consultar el estado de la simulación hasta que termine
+async function waitForSimulation(simulationId) {
+  for (;;) {
+    const response = await api.get(`/simulations/${simulationId}`);
+    const simulation = response.data.data;
+    if (!response.data.success || ['COMPLETED', 'FAILED'].includes(simulation.status)) {
+      return response.data;
+    }
+    await sleep(POLL_INTERVAL_MS);
+  }
+}
+
+// Seguir el progreso por Server-Sent Events y obtener el resultado al terminar;
+// si el navegador no los soporta o la conexión falla, se consulta el estado
+function followSimulation(simulationId, onProgress) {
+  if (typeof EventSource === 'undefined') {
+    return waitForSimulation(simulationId);
+  }
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(simulationEventsURL(simulationId));
+    const finish = (promise) => {
+      source.close();
+      promise.then(resolve, reject);
+    };
+    source.addEventListener('progress', (event) => onProgress(JSON.parse(event.data)));
+    source.addEventListener('status', (event) => {
+      const { status } = JSON.parse(event.data);
+      if (['COMPLETED', 'FAILED'].includes(status)) {
+        finish(api.get(`/simulations/${simulationId}`).then((response) => response.data));
+      }
+    });
+    source.onerror = () => finish(waitForSimulation(simulationId));
+  });
+}
 
 function SimulationPanel({ topology, onSimulationComplete }) {
   const [simulationParams, setSimulationParams] = useState({
@@ -19,6 +68,8 @@ function SimulationPanel({ topology, onSimulationComplete }) {
   });
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [progress, setProgress] = useState(null);
+  const [progressSeries, setProgressSeries] = useState([]);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -29,6 +80,8 @@ function SimulationPanel({ topology, onSimulationComplete }) {
 
     setLoading(true);
     setError(null);
+    setProgress(null);
+    setProgressSeries([]);
 
     try {
       const response = await api.post('/simulations', {
@@ -39,10 +92,24 @@ function SimulationPanel({ topology, onSimulationComplete }) {
         },
       });
 
-      if (response.data.success) {
-        onSimulationComplete(response.data.data);
-      } else {
+      if (!response.data.success) {
         setError(response.data.error || 'Error en la simulación');
+        return;
+      }
+
+      const result = await followSimulation(response.data.data.id, (update) => {
+        setProgress(update);
+        if (update.sim_time !== null) {
+          setProgressSeries((series) => [
+            ...series,
+            { time: update.sim_time, throughput: update.total_throughput },
+          ]);
+        }
+      });
+      if (result.success && result.data.status === 'COMPLETED') {
+        onSimulationComplete(result.data);
+      } else {
+        setError(result.error || result.data?.results?.error || 'Error en la simulación');
       }
     } catch (err) {
       setError(err.response?.data?.error || 'Error al ejecutar simulación');
@@ -110,6 +177,41 @@ function SimulationPanel({ topology, onSimulationComplete }) {
                   {error}
                 </Alert>
               )}
+              {loading && progress && (
+                <Box sx={{ mb: 2 }}>
+                  <LinearProgress variant="determinate" value={progress.progress * 100} />
+                  <Typography variant="body2" color="textSecondary" sx={{ mt: 1 }}>
+                    {progress.sim_time !== null
+                      ? `${progress.sim_time.toFixed(1)} de ${progress.simulation_time} s simulados`
+                      : `${Math.round(progress.progress * 100)}% de las ONUs simuladas`}
+                    {' | '}
+                    {Math.round(progress.events_per_second).toLocaleString()} eventos/s
+                  </Typography>
+                  {progressSeries.length > 1 && (
+                    <ResponsiveContainer width="100%" height={200}>
+                      <LineChart data={progressSeries}>
+                        <CartesianGrid strokeDasharray="3 3" />
+                        <XAxis
+                          dataKey="time"
+                          type="number"
+                          domain={[0, progress.simulation_time]}
+                          label={{ value: 's', position: 'insideBottomRight', offset: -5 }}
+                        />
+                        <YAxis label={{ value: 'Mbps', angle: -90, position: 'insideLeft' }} />
+                        <Tooltip formatter={(value) => `${value.toFixed(2)} Mbps`} />
+                        <Line
+                          type="stepBefore"
+                          dataKey="throughput"
+                          stroke="#2196F3"
+                          dot={false}
+                          isAnimationActive={false}
+                          name="Throughput total"
+                        />
+                      </LineChart>
+                    </ResponsiveContainer>
+                  )}
+                </Box>
+              )}
               <Button
                 type="submit"
                 variant="contained"
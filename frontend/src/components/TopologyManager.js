@@ -26,6 +26,7 @@ function TopologyManager({ topologies, onTopologyCreated, onTopologySelected, se
     num_onus: 32,
     split_ratio: '1:32',
     topology_type: 'star',
+    pon_ports: 1,
   });
   const [loading, setLoading] = useState(false);
 
@@ -43,6 +44,7 @@ function TopologyManager({ topologies, onTopologyCreated, onTopologySelected, se
           num_onus: 32,
           split_ratio: '1:32',
           topology_type: 'star',
+          pon_ports: 1,
         });
         onTopologyCreated(response.data.data);
       }
@@ -102,6 +104,16 @@ function TopologyManager({ topologies, onTopologyCreated, onTopologySelected, se
                 required
                 inputProps={{ min: 1, max: 128 }}
               />
+              <TextField
+                fullWidth
+                type="number"
+                label="Puertos PON"
+                value={formData.pon_ports}
+                onChange={(e) => setFormData({ ...formData, pon_ports: parseInt(e.target.value) })}
+                margin="normal"
+                helperText="Las ONUs se reparten entre un OLT por puerto"
+                inputProps={{ min: 1, max: 128 }}
+              />
               {formData.topology_type === 'star' || formData.topology_type === 'tree' ? (
                 <FormControl fullWidth margin="normal">
                   <InputLabel>Ratio de Splitter</InputLabel>
@@ -151,7 +163,7 @@ function TopologyManager({ topologies, onTopologyCreated, onTopologySelected, se
                     >
                       <ListItemText
                         primary={topology.name}
-                        secondary={`ID: ${topology.id} - Creado: ${new Date(topology.created_at).toLocaleDateString()}`}
+                        secondary={`ID: ${topology.id} - ${topology.topology_type || 'star'}${topology.num_onus != null ? `, ${topology.num_onus} ONUs` : ''} - Creado: ${new Date(topology.created_at).toLocaleDateString()}`}
                       />
                     </ListItemButton>
                     <Divider />
@@ -11,3 +11,33 @@ const api = axios.create({
 
 export default api;
 
+
+// Leer una respuesta NDJSON por partes, llamando a onRecords con los
+// registros completos de cada trozo recibido
+export const streamNDJSON = async (path, onRecords) => {
+  const response = await fetch(`${API_URL}/api${path}`, {
+    headers: { Accept: 'application/x-ndjson' },
+  });
+  if (!response.ok) {
+    throw new Error(`HTTP ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let pending = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    pending += done ? decoder.decode() : decoder.decode(value, { stream: true });
+    const lines = pending.split('\n');
+    pending = done ? '' : lines.pop();
+    const records = lines.filter((line) => line.trim()).map((line) => JSON.parse(line));
+    if (records.length) {
+      onRecords(records);
+    }
+    if (done) break;
+  }
+};
+
+// URL del flujo Server-Sent Events con el progreso de una simulación
+export const simulationEventsURL = (simulationId) =>
+  `${API_URL}/api/simulations/${simulationId}/events`;